@@ -0,0 +1 @@
+"""Benchmarks for VWS clients and transports."""
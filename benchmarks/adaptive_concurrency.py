@@ -0,0 +1,152 @@
+"""Compare fixed concurrency limits with an adaptive one, against a
+simulated server which throttles clients.
+
+The simulated server handles up to a fixed number of requests at once,
+each taking a fixed time. A request which arrives while the server is
+full gets a ``429 Too Many Requests`` response at once, and is retried
+by the client after a short wait, as ``AsyncRetryingTransport`` would.
+
+A fixed limit which is too low leaves the server idle, and one which is
+too high wastes requests on ``429`` responses. The adaptive limit should
+find a window close to the server's capacity on its own.
+
+Run with ``python -m benchmarks.adaptive_concurrency``.
+"""
+
+import asyncio
+import functools
+import time
+from http import HTTPStatus
+
+from beartype import beartype
+
+from vws.concurrency import AdaptiveConcurrencyLimiter
+from vws.response import Response
+
+_SERVER_CAPACITY = 12
+_SERVICE_SECONDS = 0.01
+_RETRY_SECONDS = 0.005
+_NUMBER_OF_REQUESTS = 2000
+_FIXED_LIMITS = (2, 8, 12, 32, 128)
+
+
+@beartype
+class _ThrottlingServer:
+    """An async transport which simulates a server which can handle a
+    fixed number of requests at once.
+    """
+
+    def __init__(self, *, capacity: int, service_seconds: float) -> None:
+        """
+        Args:
+            capacity: The number of requests which the server handles at
+                once.
+            service_seconds: How long the server takes to handle a
+                request.
+        """
+        self._capacity = capacity
+        self._service_seconds = service_seconds
+        self._in_flight = 0
+        self.throttled = 0
+
+    async def aclose(self) -> None:
+        """Close the transport."""
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Handle a request, or throttle it if the server is full."""
+        del method, headers, data, request_timeout
+        if self._in_flight >= self._capacity:
+            self.throttled += 1
+            status_code = HTTPStatus.TOO_MANY_REQUESTS
+        else:
+            self._in_flight += 1
+            await asyncio.sleep(delay=self._service_seconds)
+            self._in_flight -= 1
+            status_code = HTTPStatus.OK
+        return Response(
+            url=url,
+            status_code=status_code,
+            headers={},
+            tell_position=0,
+            content=b"",
+        )
+
+
+@beartype
+async def _run(*, limit: int | None) -> str:
+    """Make many requests to a throttling server, each until it
+    succeeds.
+
+    Args:
+        limit: The fixed number of requests to make at once, or
+            ``None`` to use an adaptive limit.
+
+    Returns:
+        A line describing the result.
+    """
+    server = _ThrottlingServer(
+        capacity=_SERVER_CAPACITY,
+        service_seconds=_SERVICE_SECONDS,
+    )
+    adaptive = AdaptiveConcurrencyLimiter()
+    semaphore = asyncio.Semaphore(value=limit or 1)
+
+    async def request() -> None:
+        """Make a request until it succeeds."""
+        while True:
+            make_request = functools.partial(
+                server,
+                method="GET",
+                url="https://vws.vuforia.com/summary",
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            )
+            if limit is None:
+                response = await adaptive.limit(make_request=make_request)
+            else:
+                async with semaphore:
+                    response = await make_request()
+            if response.status_code == HTTPStatus.OK:
+                return
+            await asyncio.sleep(delay=_RETRY_SECONDS)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(_NUMBER_OF_REQUESTS)))
+    elapsed = time.perf_counter() - start
+
+    label = "adaptive" if limit is None else f"fixed {limit}"
+    line = (
+        f"{label:>10}: {_NUMBER_OF_REQUESTS / elapsed:7.0f} requests/s, "
+        f"{server.throttled:6d} throttled"
+    )
+    if limit is None:
+        statistics = adaptive.statistics
+        line += (
+            f", final window {statistics.window:5.1f}, "
+            f"largest window {statistics.max_window:5.1f}"
+        )
+    return line
+
+
+def main() -> None:
+    """Print the throughput and throttling for each limit."""
+    print(  # noqa: T201
+        f"Server capacity: {_SERVER_CAPACITY} requests at once, "
+        f"{_SERVICE_SECONDS * 1000:.0f} ms per request, best possible "
+        f"{_SERVER_CAPACITY / _SERVICE_SECONDS:.0f} requests/s",
+    )
+    for limit in (*_FIXED_LIMITS, None):
+        print(asyncio.run(main=_run(limit=limit)))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Measure how many queries a ``DuplicateFrameFilter`` skips for a
+synthetic camera frame sequence, and what it costs.
+
+The sequence is made of scenes. Each frame of a scene is the scene's
+image with a little random noise and a small change in brightness, as
+from a camera held still, encoded as a JPEG. Queries are made to a
+``MockVWS`` through an ``InMemoryTransport``, with and without the
+filter.
+
+Run with ``python -m benchmarks.duplicate_frames``.
+"""
+
+import argparse
+import io
+import time
+
+import numpy as np
+from mock_vws import MockVWS
+from mock_vws.database import CloudDatabase
+from PIL import Image
+
+from tests.in_memory_transports import InMemoryTransport
+from vws import CloudRecoService
+from vws.duplicate_frames import DuplicateFrameFilter, image_fingerprint
+
+
+def _frames(*, scenes: int, frames_per_scene: int) -> list[bytes]:
+    """Make a synthetic camera frame sequence.
+
+    Args:
+        scenes: The number of scenes.
+        frames_per_scene: The number of frames of each scene.
+
+    Returns:
+        JPEG frames.
+    """
+    random = np.random.default_rng(seed=0)
+    frames: list[bytes] = []
+    for _ in range(scenes):
+        # Smooth the random scene, so that it looks more like a photo
+        # than noise.
+        coarse = random.integers(low=0, high=256, size=(12, 16, 3))
+        scene_image = Image.fromarray(
+            obj=coarse.astype(dtype=np.uint8),
+        ).resize(size=(640, 480), resample=Image.Resampling.BICUBIC)
+        scene = (
+            np.frombuffer(buffer=scene_image.tobytes(), dtype=np.uint8)
+            .reshape(480, 640, 3)
+            .astype(dtype=np.int16)
+        )
+        for _ in range(frames_per_scene):
+            noise = random.integers(low=-6, high=7, size=scene.shape)
+            brightness = random.integers(low=-3, high=4)
+            pixels = np.clip(a=scene + noise + brightness, min=0, max=255)
+            frame_buffer = io.BytesIO()
+            Image.fromarray(obj=pixels.astype(dtype=np.uint8)).save(
+                fp=frame_buffer,
+                format="JPEG",
+                quality=85,
+            )
+            frames.append(frame_buffer.getvalue())
+    return frames
+
+
+def main() -> None:
+    """Print the queries made and the time taken for a frame sequence,
+    with and without a ``DuplicateFrameFilter``.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenes", type=int, default=10)
+    parser.add_argument("--frames-per-scene", type=int, default=30)
+    parser.add_argument("--max-distance", type=int, default=4)
+    arguments = parser.parse_args()
+
+    frames = _frames(
+        scenes=arguments.scenes,
+        frames_per_scene=arguments.frames_per_scene,
+    )
+
+    start = time.perf_counter()
+    for frame in frames:
+        image_fingerprint(image_data=frame)
+    fingerprints_per_second = len(frames) / (time.perf_counter() - start)
+    print(  # noqa: T201
+        f"{len(frames)} frames, {fingerprints_per_second:.0f} fingerprints/s",
+    )
+
+    mock = MockVWS(processing_time_seconds=0)
+    database = CloudDatabase()
+    mock.add_cloud_database(cloud_database=database)
+    cloud_reco_client = CloudRecoService(
+        client_access_key=database.client_access_key,
+        client_secret_key=database.client_secret_key,
+        transport=InMemoryTransport(mock=mock),
+    )
+
+    start = time.perf_counter()
+    for frame in frames:
+        cloud_reco_client.query(image=io.BytesIO(initial_bytes=frame))
+    elapsed_seconds = time.perf_counter() - start
+    print(  # noqa: T201
+        f"{'Without filter':>15}: {len(frames):5} queries, "
+        f"{elapsed_seconds:6.2f} s",
+    )
+
+    duplicate_frame_filter = DuplicateFrameFilter(
+        max_distance=arguments.max_distance,
+    )
+    start = time.perf_counter()
+    for frame in frames:
+        duplicate_frame_filter.query(
+            client=cloud_reco_client,
+            image=io.BytesIO(initial_bytes=frame),
+        )
+    elapsed_seconds = time.perf_counter() - start
+    statistics = duplicate_frame_filter.statistics
+    print(  # noqa: T201
+        f"{'With filter':>15}: "
+        f"{statistics.frames - statistics.skipped:5} queries, "
+        f"{elapsed_seconds:6.2f} s, {statistics.skipped} skipped",
+    )
+
+
+if __name__ == "__main__":
+    main()
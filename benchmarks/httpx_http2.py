@@ -0,0 +1,123 @@
+"""Compare HTTP/1.1 and HTTP/2 for concurrent async requests.
+
+The same number of concurrent requests is made with an
+``AsyncHTTPXTransport`` using HTTP/1.1, and then with one using HTTP/2.
+For each, this prints the throughput and the number of sockets which the
+process has open after the burst of requests.
+
+By default, requests are made to a local HTTPS server which supports
+HTTP/2, with a certificate which is trusted for this run only. Give
+``--url`` to make requests to another server instead, for example one
+with real network latency. Counting sockets reads ``/proc/self/fd``, so
+socket counts are shown only on Linux.
+
+Run with ``python -m benchmarks.httpx_http2``.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+from pathlib import Path
+
+from tests.local_server import local_server
+from vws.transports import AsyncHTTPXTransport
+
+
+def _open_socket_count() -> int | None:
+    """Get the number of sockets which this process has open.
+
+    Returns:
+        The number of open sockets, or ``None`` if this cannot be found
+        on this platform.
+    """
+    fd_directory = Path("/proc/self/fd")
+    if not fd_directory.is_dir():
+        return None
+
+    sockets = 0
+    for fd_path in fd_directory.iterdir():
+        try:
+            target = str(object=fd_path.readlink())
+        except OSError:
+            continue
+        if target.startswith("socket:"):
+            sockets += 1
+    return sockets
+
+
+async def _burst(
+    *,
+    url: str,
+    concurrency: int,
+    http2: bool,
+) -> tuple[float, int | None]:
+    """Make concurrent requests with a new transport.
+
+    Args:
+        url: The URL to make requests to.
+        concurrency: The number of requests to make at once.
+        http2: Whether to use HTTP/2.
+
+    Returns:
+        The number of requests per second, and the number of sockets open
+        after the requests.
+    """
+    async with AsyncHTTPXTransport(http2=http2) as transport:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                transport(
+                    method="GET",
+                    url=url,
+                    headers={},
+                    data=b"",
+                    request_timeout=30.0,
+                )
+                for _ in range(concurrency)
+            ),
+        )
+        elapsed = time.perf_counter() - start
+        return concurrency / elapsed, _open_socket_count()
+
+
+async def _main(*, url: str, concurrency: int) -> None:
+    """Print throughput and socket counts for HTTP/1.1 and HTTP/2.
+
+    Args:
+        url: The URL to make requests to.
+        concurrency: The number of requests to make at once.
+    """
+    for label, http2 in (("HTTP/1.1", False), ("HTTP/2", True)):
+        requests_per_second, sockets = await _burst(
+            url=url,
+            concurrency=concurrency,
+            http2=http2,
+        )
+        print(  # noqa: T201
+            f"{label:>8}: {requests_per_second:8.1f} requests/s, "
+            f"{sockets} sockets open",
+        )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url")
+    parser.add_argument("--concurrency", type=int, default=100)
+    arguments = parser.parse_args()
+    with contextlib.ExitStack() as stack:
+        url = arguments.url
+        if url is None:
+            server = stack.enter_context(cm=local_server(tls=True))
+            url = server.base_url + "/v1/query"
+            # ``httpx`` trusts the certificate authority in this file.
+            os.environ["SSL_CERT_FILE"] = str(
+                object=server.certificate_authority_file,
+            )
+        asyncio.run(main=_main(url=url, concurrency=arguments.concurrency))
+
+
+if __name__ == "__main__":
+    main()
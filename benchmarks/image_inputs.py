@@ -0,0 +1,155 @@
+"""Compare the memory used and the throughput of queries of a large
+image, for each type of image input.
+
+Queries are sent to a transport which discards them, so that the
+results measure only the work done by the client: getting the image
+data, building and hashing the request body, and signing the request.
+
+For each type of input, this prints the peak memory allocated during a
+query as a multiple of the image size, and the rate at which image data
+is queried. The request body holds one copy of the image, so a query
+allocates at least one times the image size. Inputs which the client
+must read in full, such as open files, allocate another copy. Memory
+mapped files are not counted, as their pages belong to the operating
+system's file cache.
+
+Run with ``python -m benchmarks.image_inputs``.
+"""
+
+import argparse
+import functools
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator  # noqa: TC003
+from contextlib import contextmanager
+from http import HTTPStatus
+from pathlib import Path
+from typing import BinaryIO
+
+from beartype import beartype
+
+from vws import CloudRecoService
+from vws.response import Response
+
+_ImageInput = io.BytesIO | BinaryIO | bytes | memoryview | Path
+_RESPONSE_BODY = b'{"result_code":"Success","results":[]}'
+
+
+@beartype
+class _DiscardingTransport:
+    """A transport which discards each request, and gives a response with
+    no matches.
+    """
+
+    def close(self) -> None:
+        """Close the transport."""
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Discard a request."""
+        del method, headers, data, request_timeout
+        return Response(
+            url=url,
+            status_code=HTTPStatus.OK,
+            headers={"Content-Type": "application/json"},
+            tell_position=0,
+            content=_RESPONSE_BODY,
+        )
+
+
+@contextmanager
+def _image_inputs(*, path: Path) -> Iterator[list[tuple[str, _ImageInput]]]:
+    """Open an image file as each type of image input.
+
+    Args:
+        path: The image file.
+
+    Yields:
+        For each type of input, its name and the image as that type.
+    """
+    image_data = path.read_bytes()
+    with path.open(mode="rb") as file:
+        yield [
+            ("BytesIO", io.BytesIO(initial_bytes=image_data)),
+            ("file", file),
+            ("bytes", image_data),
+            ("memoryview", memoryview(image_data)),
+            ("path", path),
+        ]
+
+
+def _measure(
+    *,
+    query: Callable[[], object],
+    queries: int,
+) -> tuple[int, float]:
+    """Make queries, and measure the memory and time used.
+
+    Args:
+        query: A function which makes one query.
+        queries: The number of queries to make.
+
+    Returns:
+        The peak number of bytes allocated during a query, and the mean
+        number of seconds each query took.
+    """
+    tracemalloc.start()
+    query()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        query()
+    return peak, (time.perf_counter() - start) / queries
+
+
+def main() -> None:
+    """Print the memory used and throughput of each type of image
+    input.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--image-megabytes", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=10)
+    arguments = parser.parse_args()
+    image_size = arguments.image_megabytes * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "image.jpg"
+        # The client does not look inside the image, so random data
+        # stands in for a large photo.
+        path.write_bytes(data=os.urandom(image_size))
+        with (
+            CloudRecoService(
+                client_access_key="access_key",
+                client_secret_key="secret_key",  # noqa: S106
+                transport=_DiscardingTransport(),
+            ) as cloud_reco_client,
+            _image_inputs(path=path) as image_inputs,
+        ):
+            for label, image in image_inputs:
+                peak, seconds_per_query = _measure(
+                    query=functools.partial(
+                        cloud_reco_client.query,
+                        image=image,
+                    ),
+                    queries=arguments.queries,
+                )
+                print(  # noqa: T201
+                    f"{label:>10}: peak {peak / image_size:.2f} x image "
+                    f"size, {image_size / seconds_per_query / 1e6:8.1f} MB/s",
+                )
+
+
+if __name__ == "__main__":
+    main()
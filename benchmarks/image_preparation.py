@@ -0,0 +1,129 @@
+"""Compare the end-to-end latency of queries of a large phone photo, with
+and without a ``QueryImagePreparer``.
+
+Queries are made to a local HTTP server which reads request bodies at a
+limited rate, as a stand-in for a slow mobile upload link. The prepared
+queries include the CPU time spent resizing and re-encoding the image.
+
+Run with ``python -m benchmarks.image_preparation``.
+"""
+
+import argparse
+import io
+import statistics
+import time
+
+import numpy as np
+from PIL import Image
+
+from tests.local_server import local_server
+from vws import CloudRecoService
+from vws.image_preparation import QueryImagePreparer
+
+
+def _phone_photo() -> bytes:
+    """Make a JPEG image with the size and detail of a phone photo.
+
+    Returns:
+        A 4032x3024 JPEG image.
+    """
+    random = np.random.default_rng(seed=0)
+    coarse = random.integers(low=0, high=256, size=(30, 40, 3))
+    scene_image = Image.fromarray(obj=coarse.astype(dtype=np.uint8)).resize(
+        size=(4032, 3024),
+        resample=Image.Resampling.BICUBIC,
+    )
+    scene = (
+        np.frombuffer(buffer=scene_image.tobytes(), dtype=np.uint8)
+        .reshape(3024, 4032, 3)
+        .astype(dtype=np.int16)
+    )
+    # Sensor noise, which makes the photo large when encoded.
+    noise = random.integers(low=-8, high=9, size=scene.shape)
+    pixels = np.clip(a=scene + noise, min=0, max=255).astype(dtype=np.uint8)
+    image_buffer = io.BytesIO()
+    Image.fromarray(obj=pixels).save(
+        fp=image_buffer,
+        format="JPEG",
+        quality=92,
+    )
+    return image_buffer.getvalue()
+
+
+def _latencies(
+    *,
+    cloud_reco_client: CloudRecoService,
+    image_data: bytes,
+    queries: int,
+) -> list[float]:
+    """Make queries and time each one.
+
+    Args:
+        cloud_reco_client: The client to query with.
+        image_data: The image to query.
+        queries: The number of queries to make.
+
+    Returns:
+        The number of seconds each query took.
+    """
+    latencies: list[float] = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        cloud_reco_client.query(image=io.BytesIO(initial_bytes=image_data))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    """Print query latencies with and without image preparation."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument(
+        "--upload-bytes-per-second",
+        type=float,
+        default=2_000_000,
+    )
+    parser.add_argument("--max-dimension", type=int, default=1024)
+    parser.add_argument("--jpeg-quality", type=int, default=85)
+    arguments = parser.parse_args()
+
+    image_data = _phone_photo()
+    print(f"Photo: {len(image_data)} bytes")  # noqa: T201
+
+    with local_server(
+        upload_bytes_per_second=arguments.upload_bytes_per_second,
+    ) as server:
+        preparer = QueryImagePreparer(
+            max_dimension=arguments.max_dimension,
+            jpeg_quality=arguments.jpeg_quality,
+        )
+        for label, image_preparer in (
+            ("as given", None),
+            ("prepared", preparer),
+        ):
+            with CloudRecoService(
+                client_access_key="access_key",
+                client_secret_key="secret_key",  # noqa: S106
+                base_vwq_url=server.base_url,
+                image_preparer=image_preparer,
+            ) as cloud_reco_client:
+                latencies = _latencies(
+                    cloud_reco_client=cloud_reco_client,
+                    image_data=image_data,
+                    queries=arguments.queries,
+                )
+            print(  # noqa: T201
+                f"{label:>8}: median "
+                f"{statistics.median(data=latencies) * 1000:8.1f} ms",
+            )
+
+    preparation_statistics = preparer.statistics
+    print(  # noqa: T201
+        f"Saved {preparation_statistics.bytes_saved} bytes over "
+        f"{preparation_statistics.images} queries, with "
+        f"{preparation_statistics.cpu_seconds * 1000:.1f} ms of CPU time",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compare the throughput of a ``MockVWS`` used through request
+interception and through an ``InMemoryTransport``.
+
+The same client calls are made against a started ``MockVWS`` with the
+default transport, whose requests the mock intercepts, and then with an
+``InMemoryTransport``, which gives requests straight to the mock's fake
+APIs. Both print the number of calls made each second.
+
+Run with ``python -m benchmarks.in_memory_mock``.
+"""
+
+import argparse
+import io
+import time
+import uuid
+from collections.abc import Callable  # noqa: TC003
+
+from mock_vws import MockVWS
+from mock_vws.database import CloudDatabase
+from PIL import Image
+
+from tests.in_memory_transports import InMemoryTransport
+from vws import VWS, CloudRecoService
+from vws.transports import RequestsTransport, Transport
+
+
+def _image() -> io.BytesIO:
+    """Get a small image which the mock accepts.
+
+    Returns:
+        A PNG image.
+    """
+    image_buffer = io.BytesIO()
+    Image.new(mode="RGB", size=(32, 32), color=(255, 0, 0)).save(
+        fp=image_buffer,
+        format="PNG",
+    )
+    return image_buffer
+
+
+def _calls_per_second(*, call: Callable[[], object], calls: int) -> float:
+    """Make a call many times, and measure how many are made each second.
+
+    Args:
+        call: The call to make.
+        calls: The number of times to make it.
+
+    Returns:
+        The number of calls made each second.
+    """
+    start = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return calls / (time.perf_counter() - start)
+
+
+def _run(*, mock: MockVWS, transport: Transport, calls: int) -> None:
+    """Print the throughput of client calls to a mock.
+
+    Args:
+        mock: The mock to add a database to.
+        transport: The transport for the clients to use.
+        calls: The number of calls of each kind to make.
+    """
+    database = CloudDatabase()
+    mock.add_cloud_database(cloud_database=database)
+    vws_client = VWS(
+        server_access_key=database.server_access_key,
+        server_secret_key=database.server_secret_key,
+        transport=transport,
+    )
+    cloud_reco_client = CloudRecoService(
+        client_access_key=database.client_access_key,
+        client_secret_key=database.client_secret_key,
+        transport=transport,
+    )
+    image = _image()
+
+    def add_target() -> str:
+        """Add a target with a unique name."""
+        return vws_client.add_target(
+            name=uuid.uuid4().hex,
+            width=1,
+            image=image,
+            active_flag=False,
+            application_metadata=None,
+        )
+
+    target_id = add_target()
+    for name, call in (
+        ("add_target", add_target),
+        (
+            "get_target_record",
+            lambda: vws_client.get_target_record(target_id=target_id),
+        ),
+        ("query", lambda: cloud_reco_client.query(image=image)),
+    ):
+        rate = _calls_per_second(call=call, calls=calls)
+        print(f"  {name:>18}: {rate:8.0f} calls/s")  # noqa: T201
+
+
+def main() -> None:
+    """Print the throughput of client calls to a ``MockVWS`` with and
+    without request interception.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    arguments = parser.parse_args()
+
+    print("Request interception:")  # noqa: T201
+    with MockVWS(processing_time_seconds=0) as mock:
+        _run(mock=mock, transport=RequestsTransport(), calls=arguments.calls)
+
+    print("InMemoryTransport:")  # noqa: T201
+    mock = MockVWS(processing_time_seconds=0)
+    _run(
+        mock=mock,
+        transport=InMemoryTransport(mock=mock),
+        calls=arguments.calls,
+    )
+
+
+if __name__ == "__main__":
+    main()
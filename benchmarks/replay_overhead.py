@@ -0,0 +1,94 @@
+"""Measure the CPU time which the library spends on a query, without the
+network.
+
+A query is recorded once against a local HTTP server with a
+``RecordingTransport``. The recording is then replayed many times with a
+``ReplayTransport``, which gives responses in no time, so what is
+measured is only the work done by the client: reading the image,
+building the multipart body, signing the request and parsing the
+response.
+
+Run with ``python -m benchmarks.replay_overhead``.
+"""
+
+import io
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from tests.local_server import local_server
+from vws import CloudRecoService
+from vws.recording import RecordingTransport, ReplayTransport
+from vws.transports import RequestsTransport
+
+_IMAGE_SIZE = 100 * 1024
+_NUMBER_OF_QUERIES = 2000
+_NUMBER_OF_ROUNDS = 5
+
+
+def _record(*, path: Path, base_vwq_url: str, image: io.BytesIO) -> None:
+    """Record a query.
+
+    Args:
+        path: The file to record to.
+        base_vwq_url: The base URL of the server to query.
+        image: The image to query with.
+    """
+    with CloudRecoService(
+        client_access_key="access_key",
+        client_secret_key="secret_key",  # noqa: S106
+        base_vwq_url=base_vwq_url,
+        transport=RecordingTransport(
+            transport=RequestsTransport(),
+            path=path,
+        ),
+    ) as client:
+        client.query(image=image)
+
+
+def _microseconds_per_query(*, path: Path, image: io.BytesIO) -> list[float]:
+    """Replay a recorded query many times, and measure the CPU time
+    spent on each.
+
+    Args:
+        path: The recording to replay.
+        image: The image to query with.
+
+    Returns:
+        For each round of queries, the mean number of microseconds of CPU
+        time spent on a query.
+    """
+    client = CloudRecoService(
+        client_access_key="access_key",
+        client_secret_key="secret_key",  # noqa: S106
+        transport=ReplayTransport(path=path, repeat=True),
+    )
+    results: list[float] = []
+    for _ in range(_NUMBER_OF_ROUNDS):
+        start = time.thread_time()
+        for _ in range(_NUMBER_OF_QUERIES):
+            client.query(image=image)
+        elapsed = time.thread_time() - start
+        results.append(elapsed / _NUMBER_OF_QUERIES * 1e6)
+    return results
+
+
+def main() -> None:
+    """Print the CPU time which the client spends on a query."""
+    image = io.BytesIO(initial_bytes=b"0" * _IMAGE_SIZE)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "recording.jsonl"
+        with local_server() as server:
+            _record(path=path, base_vwq_url=server.base_url, image=image)
+        results = _microseconds_per_query(path=path, image=image)
+
+    print(  # noqa: T201
+        f"query with a {_IMAGE_SIZE // 1024} KiB image: median "
+        f"{statistics.median(data=results):7.1f} us CPU per query, best "
+        f"{min(results):7.1f} us",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare the per-request latency of ``RequestsTransport`` with and
+without connection pooling.
+
+The mock used in the test suite intercepts requests before a
+connection is opened, so it cannot show the cost of connecting. This
+benchmark uses a local HTTP server instead. Vuforia is served over TLS,
+so against Vuforia each new connection also costs a TLS handshake, and
+the saving from pooling is larger than shown here.
+
+Run with ``python -m benchmarks.requests_transport``.
+"""
+
+import statistics
+import time
+
+from tests.local_server import local_server
+from vws.transports import RequestsTransport
+
+_NUMBER_OF_REQUESTS = 500
+
+
+def _latencies(*, transport: RequestsTransport, url: str) -> list[float]:
+    """Make requests with a transport and time each one.
+
+    Args:
+        transport: The transport to make requests with.
+        url: The URL to make requests to.
+
+    Returns:
+        The number of seconds each request took.
+    """
+    latencies: list[float] = []
+    for _ in range(_NUMBER_OF_REQUESTS):
+        start = time.perf_counter()
+        transport(
+            method="POST",
+            url=url,
+            headers={"Content-Type": "application/json"},
+            data=b"{}",
+            request_timeout=30.0,
+        )
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    """Print per-request latencies with and without pooling."""
+    with local_server() as server:
+        url = server.base_url + "/targets"
+        for label, keep_alive in (("pooled", True), ("unpooled", False)):
+            with RequestsTransport(keep_alive=keep_alive) as transport:
+                latencies = _latencies(transport=transport, url=url)
+            mean_microseconds = statistics.mean(data=latencies) * 1e6
+            median_microseconds = statistics.median(data=latencies) * 1e6
+            print(  # noqa: T201
+                f"{label:>8}: mean {mean_microseconds:8.1f} us, "
+                f"median {median_microseconds:8.1f} us",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Measure the memory used to download a large response.
+
+For each built-in transport, this prints the memory still allocated
+after downloading a large body into a ``Response``, and the peak memory
+allocated during the download, as multiples of the body size. A
+response which keeps its body once, without a decoded copy, keeps close
+to one times the body size.
+
+It then prints the peak memory used to stream the same body to a file,
+which stays a small fraction of the body size.
+
+Run with ``python -m benchmarks.response_memory``.
+"""
+
+import tempfile
+import tracemalloc
+
+from tests.local_server import local_server
+from vws.response import Response  # noqa: TC001
+from vws.transports import (
+    HTTPXTransport,
+    RequestsTransport,
+    StreamingTransport,
+)
+
+_BODY_SIZE = 50 * 1024 * 1024
+
+
+def _download(
+    *,
+    transport: StreamingTransport,
+    url: str,
+) -> tuple[Response, int, int]:
+    """Download a body, and measure the memory allocated.
+
+    Args:
+        transport: The transport to download with.
+        url: The URL to download.
+
+    Returns:
+        The response, the number of bytes still allocated after
+        downloading it, and the peak number of bytes allocated while
+        downloading it.
+    """
+    tracemalloc.start()
+    response = transport(
+        method="GET",
+        url=url,
+        headers={},
+        data=b"",
+        request_timeout=30.0,
+    )
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return response, retained, peak
+
+
+def _stream_to_file(*, transport: StreamingTransport, url: str) -> int:
+    """Stream a body to a temporary file, and measure the peak memory
+    allocated.
+
+    Args:
+        transport: The transport to download with.
+        url: The URL to download.
+
+    Returns:
+        The peak number of bytes allocated while downloading.
+    """
+    tracemalloc.start()
+    with (
+        tempfile.TemporaryFile() as file,
+        transport.stream(
+            method="GET",
+            url=url,
+            headers={},
+            data=b"",
+            request_timeout=30.0,
+        ) as streamed_response,
+    ):
+        for chunk in streamed_response.iter_bytes():
+            file.write(chunk)
+        assert file.tell() == _BODY_SIZE  # noqa: S101
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    """Print the peak memory used to download a large body."""
+    transports: list[tuple[str, StreamingTransport]] = [
+        ("requests", RequestsTransport()),
+        ("httpx", HTTPXTransport()),
+    ]
+    with local_server() as server:
+        url = f"{server.base_url}/download/{_BODY_SIZE}"
+        for label, transport in transports:
+            response, retained, peak = _download(
+                transport=transport,
+                url=url,
+            )
+            assert len(response.content) == _BODY_SIZE  # noqa: S101
+            del response
+            streamed_peak = _stream_to_file(transport=transport, url=url)
+            transport.close()
+            print(  # noqa: T201
+                f"{label:>8}: retained {retained / _BODY_SIZE:.2f}, "
+                f"peak {peak / _BODY_SIZE:.2f} x body size; "
+                f"streamed peak {streamed_peak / _BODY_SIZE:.4f} x body size",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare the throughput of signing requests with ``vws_auth_tools`` and
+with the signer which clients keep.
+
+Each request is signed with a new ``Date`` header, as clients do. For
+``vws_auth_tools``, this keys a new HMAC and formats the date for every
+request. The client signer keys its HMAC once and formats the date at
+most once a second.
+
+Run with ``python -m benchmarks.signing``.
+"""
+
+import functools
+import statistics
+import time
+from collections.abc import Callable  # noqa: TC003
+from http import HTTPMethod
+
+from vws_auth_tools import authorization_header, rfc_1123_date
+
+from vws._signing import Signer
+
+_NUMBER_OF_SIGNATURES = 20_000
+_NUMBER_OF_ROUNDS = 5
+_ACCESS_KEY = "access_key"
+_SECRET_KEY = "secret_key"  # noqa: S105
+
+
+def _sign_with_vws_auth_tools(*, content: bytes) -> None:
+    """Sign a request with ``vws_auth_tools``.
+
+    Args:
+        content: The request body.
+    """
+    authorization_header(
+        access_key=_ACCESS_KEY,
+        secret_key=_SECRET_KEY,
+        method=HTTPMethod.POST,
+        content=content,
+        content_type="application/json",
+        date=rfc_1123_date(),
+        request_path="/targets",
+    )
+
+
+def _signatures_per_second(*, sign: Callable[[], object]) -> list[float]:
+    """Sign many requests, and measure how many are signed each second.
+
+    Args:
+        sign: A function which signs one request.
+
+    Returns:
+        For each round, the number of requests signed each second.
+    """
+    results: list[float] = []
+    for _ in range(_NUMBER_OF_ROUNDS):
+        start = time.perf_counter()
+        for _ in range(_NUMBER_OF_SIGNATURES):
+            sign()
+        results.append(_NUMBER_OF_SIGNATURES / (time.perf_counter() - start))
+    return results
+
+
+def main() -> None:
+    """Print the number of requests signed each second in each way."""
+    signer = Signer(access_key=_ACCESS_KEY, secret_key=_SECRET_KEY)
+    for content_size in (0, 1024, 10 * 1024):
+        content = b"0" * content_size
+        for name, sign in (
+            (
+                "vws_auth_tools",
+                functools.partial(_sign_with_vws_auth_tools, content=content),
+            ),
+            (
+                "Signer",
+                functools.partial(
+                    signer.headers,
+                    method=HTTPMethod.POST,
+                    content=content,
+                    content_type="application/json",
+                    request_path="/targets",
+                ),
+            ),
+        ):
+            results = _signatures_per_second(sign=sign)
+            print(  # noqa: T201
+                f"{name:>14}, {content_size:>6} byte body: median "
+                f"{statistics.median(data=results):9.0f} signatures/s",
+            )
+
+
+if __name__ == "__main__":
+    main()
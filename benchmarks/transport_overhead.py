@@ -0,0 +1,107 @@
+"""Compare the CPU time which each built-in sync transport spends on a
+request.
+
+Each transport makes many small requests to a local HTTP server over a
+pooled connection. The CPU time of the calling thread is measured, so
+time spent waiting for the server, and the server's own work, which
+runs on other threads, is not counted. What is left is the overhead of
+the transport and the HTTP library beneath it.
+
+Run with ``python -m benchmarks.transport_overhead``.
+"""
+
+import statistics
+import time
+
+from tests.local_server import local_server
+from vws.transports import (
+    HTTPXTransport,
+    RequestsTransport,
+    Transport,
+    URLLib3Transport,
+)
+
+_NUMBER_OF_WARM_UP_REQUESTS = 100
+_NUMBER_OF_REQUESTS = 2000
+_NUMBER_OF_ROUNDS = 5
+
+
+def _make_requests(
+    *,
+    transport: Transport,
+    url: str,
+    number_of_requests: int,
+) -> None:
+    """Make a number of requests with a transport.
+
+    Args:
+        transport: The transport to make requests with.
+        url: The URL to make requests to.
+        number_of_requests: The number of requests to make.
+    """
+    for _ in range(number_of_requests):
+        transport(
+            method="POST",
+            url=url,
+            headers={"Content-Type": "application/json"},
+            data=b"{}",
+            request_timeout=30.0,
+        )
+
+
+def _cpu_microseconds_per_request(
+    *,
+    transport: Transport,
+    url: str,
+) -> list[float]:
+    """Measure the CPU time which a transport spends on a request.
+
+    Args:
+        transport: The transport to make requests with.
+        url: The URL to make requests to.
+
+    Returns:
+        For each round of requests, the mean number of microseconds of
+        CPU time which the calling thread spent on a request.
+    """
+    _make_requests(
+        transport=transport,
+        url=url,
+        number_of_requests=_NUMBER_OF_WARM_UP_REQUESTS,
+    )
+    results: list[float] = []
+    for _ in range(_NUMBER_OF_ROUNDS):
+        start = time.thread_time()
+        _make_requests(
+            transport=transport,
+            url=url,
+            number_of_requests=_NUMBER_OF_REQUESTS,
+        )
+        elapsed = time.thread_time() - start
+        results.append(elapsed / _NUMBER_OF_REQUESTS * 1e6)
+    return results
+
+
+def main() -> None:
+    """Print the CPU time which each transport spends on a request."""
+    transports: list[tuple[str, Transport]] = [
+        ("requests", RequestsTransport()),
+        ("httpx", HTTPXTransport()),
+        ("urllib3", URLLib3Transport()),
+    ]
+    with local_server() as server:
+        url = server.base_url + "/v1/query"
+        for label, transport in transports:
+            results = _cpu_microseconds_per_request(
+                transport=transport,
+                url=url,
+            )
+            transport.close()
+            print(  # noqa: T201
+                f"{label:>8}: median {statistics.median(data=results):7.1f} "
+                f"us CPU per request, best {min(results):7.1f} us",
+            )
+
+
+if __name__ == "__main__":
+    main()
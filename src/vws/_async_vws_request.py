@@ -2,9 +2,19 @@
 Vuforia Target API.
 """
 
+from collections.abc import Sequence  # noqa: TC003
+from urllib.parse import urlsplit
+
 from beartype import BeartypeConf, beartype
-from vws_auth_tools import authorization_header, rfc_1123_date
 
+from vws._signing import Signer, async_send_signed
+from vws.concurrency import AdaptiveConcurrencyLimiter  # noqa: TC001
+from vws.middleware import (
+    Middleware,
+    Request,
+    async_send_with_middleware,
+)
+from vws.rate_limiting import RateLimiter  # noqa: TC001
 from vws.response import Response  # noqa: TC001
 from vws.transports import AsyncTransport  # noqa: TC001
 
@@ -13,26 +23,30 @@ from vws.transports import AsyncTransport  # noqa: TC001
 async def async_target_api_request(
     *,
     content_type: str,
-    server_access_key: str,
-    server_secret_key: str,
+    signer: Signer,
     method: str,
     data: bytes,
+    content_md5_hex: str | None,
     request_path: str,
     base_vws_url: str,
     request_timeout_seconds: float | tuple[float, float],
     extra_headers: dict[str, str],
     transport: AsyncTransport,
+    middleware: Sequence[Middleware],
+    concurrency_limiter: AdaptiveConcurrencyLimiter | None,
+    rate_limiter: RateLimiter | None,
 ) -> Response:
     """Make an async request to the Vuforia Target API.
 
     Args:
         content_type: The content type of the request.
-        server_access_key: A VWS server access key.
-        server_secret_key: A VWS server secret key.
+        signer: A signer for a VWS server access key and secret key.
         method: The HTTP method which will be used in the
             request.
         data: The request body which will be used in the
             request.
+        content_md5_hex: The hex MD5 hash of ``data``, if it is
+            already known.
         request_path: The path to the endpoint which will be
             used in the request.
         base_vws_url: The base URL for the VWS API.
@@ -43,35 +57,69 @@ async def async_target_api_request(
             request.
         transport: The async HTTP transport to use for the
             request.
+        middleware: The middleware to send the request through
+            before it is signed.
+        concurrency_limiter: A limit on the number of requests in flight
+            at once, which the request waits for before it is signed.
+        rate_limiter: A rate limiter to wait for before each time the
+            request is sent, keyed by the access key of the signer.
 
     Returns:
-        The response to the request.
+        The response to the request. If Vuforia rejects the request
+        because the local clock is too far from Vuforia's, the request is
+        signed again with Vuforia's time and sent once more, without
+        going through middleware again.
     """
-    date_string = rfc_1123_date()
-
-    signature_string = authorization_header(
-        access_key=server_access_key,
-        secret_key=server_secret_key,
+    url = base_vws_url.rstrip("/") + request_path
+    request = Request(
         method=method,
-        content=data,
-        content_type=content_type,
-        date=date_string,
-        request_path=request_path,
+        url=url,
+        headers={"Content-Type": content_type, **extra_headers},
+        data=data,
     )
 
-    headers = {
-        "Authorization": signature_string,
-        "Date": date_string,
-        "Content-Type": content_type,
-        **extra_headers,
-    }
+    async def send(request: Request) -> Response:
+        """Sign and send a request which has been through middleware."""
 
-    url = base_vws_url.rstrip("/") + request_path
+        async def sign_and_send() -> Response:
+            """Sign and send the request.
 
-    return await transport(
-        method=method,
-        url=url,
-        headers=headers,
-        data=data,
-        request_timeout=request_timeout_seconds,
+            This is signed only once there is room within the concurrency
+            limit, so that the ``Date`` header is not stale when the
+            request is sent.
+            """
+            signature_headers = signer.headers(
+                method=request.method,
+                content=request.data,
+                content_type=request.headers.get("Content-Type", ""),
+                request_path=urlsplit(url=request.url).path,
+                # Middleware may have changed the body.
+                content_md5_hex=(
+                    content_md5_hex if request.data is data else None
+                ),
+            )
+            return await transport(
+                method=request.method,
+                url=request.url,
+                headers={**signature_headers, **request.headers},
+                data=request.data,
+                request_timeout=request_timeout_seconds,
+            )
+
+        async def send_within_limits() -> Response:
+            """Sign and send the request, once the rate limiter allows it
+            and there is room within the concurrency limit.
+            """
+            if rate_limiter is not None:
+                await rate_limiter.aacquire(key=signer.access_key)
+            if concurrency_limiter is None:
+                return await sign_and_send()
+            return await concurrency_limiter.limit(make_request=sign_and_send)
+
+        return await async_send_signed(signer=signer, send=send_within_limits)
+
+    return await async_send_with_middleware(
+        middleware=middleware,
+        request=request,
+        send=send,
     )
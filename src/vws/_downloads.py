@@ -0,0 +1,193 @@
+"""Internal helpers for downloading response bodies to files."""
+
+import contextlib
+import io
+from collections.abc import (  # noqa: TC003
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+)
+from pathlib import Path
+from typing import BinaryIO
+
+from beartype import BeartypeConf, beartype
+
+from vws.response import AsyncStreamedResponse, StreamedResponse
+from vws.transports import (
+    AsyncStreamingTransport,
+    AsyncTransport,
+    StreamingTransport,
+    Transport,
+)
+
+DownloadDestination = Path | io.BytesIO | BinaryIO
+
+
+@contextlib.contextmanager
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+def stream_request(
+    *,
+    transport: Transport,
+    method: str,
+    url: str,
+    headers: dict[str, str],
+    data: bytes,
+    request_timeout: float | tuple[float, float],
+) -> Iterator[StreamedResponse]:
+    """Make a request, streaming the response body if the transport
+    supports it.
+
+    A transport which does not support streaming reads the whole body,
+    which is then given as a single chunk.
+
+    Args:
+        transport: The transport to make the request with.
+        method: The HTTP method.
+        url: The full URL.
+        headers: Request headers.
+        data: The request body.
+        request_timeout: The request timeout.
+
+    Yields:
+        The response, with its body not yet read.
+    """
+    if isinstance(transport, StreamingTransport):
+        with transport.stream(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        ) as streamed_response:
+            yield streamed_response
+        return
+
+    response = transport(
+        method=method,
+        url=url,
+        headers=headers,
+        data=data,
+        request_timeout=request_timeout,
+    )
+    yield StreamedResponse(
+        url=response.url,
+        status_code=response.status_code,
+        headers=response.headers,
+        chunks=iter((response.content,)),
+        request_body=response.request_body,
+        encoding=response.encoding,
+    )
+
+
+async def _single_chunk(*, chunk: bytes) -> AsyncIterator[bytes]:
+    """Give a body which has already been read as a single chunk.
+
+    Args:
+        chunk: The body.
+
+    Yields:
+        The body.
+    """
+    yield chunk
+
+
+@contextlib.asynccontextmanager
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+async def async_stream_request(
+    *,
+    transport: AsyncTransport,
+    method: str,
+    url: str,
+    headers: dict[str, str],
+    data: bytes,
+    request_timeout: float | tuple[float, float],
+) -> AsyncIterator[AsyncStreamedResponse]:
+    """Make an async request, streaming the response body if the
+    transport supports it.
+
+    A transport which does not support streaming reads the whole body,
+    which is then given as a single chunk.
+
+    Args:
+        transport: The transport to make the request with.
+        method: The HTTP method.
+        url: The full URL.
+        headers: Request headers.
+        data: The request body.
+        request_timeout: The request timeout.
+
+    Yields:
+        The response, with its body not yet read.
+    """
+    if isinstance(transport, AsyncStreamingTransport):
+        async with transport.stream(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        ) as streamed_response:
+            yield streamed_response
+        return
+
+    response = await transport(
+        method=method,
+        url=url,
+        headers=headers,
+        data=data,
+        request_timeout=request_timeout,
+    )
+    yield AsyncStreamedResponse(
+        url=response.url,
+        status_code=response.status_code,
+        headers=response.headers,
+        chunks=_single_chunk(chunk=response.content),
+        request_body=response.request_body,
+        encoding=response.encoding,
+    )
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+def write_chunks(
+    *,
+    chunks: Iterable[bytes],
+    destination: DownloadDestination,
+) -> None:
+    """Write chunks of a body to a file, one at a time.
+
+    Args:
+        chunks: The chunks to write.
+        destination: The path of a file to create or replace, or a
+            binary file object to write to.
+    """
+    with (
+        destination.open(mode="wb")
+        if isinstance(destination, Path)
+        else contextlib.nullcontext(enter_result=destination)
+    ) as file:
+        for chunk in chunks:
+            file.write(chunk)
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+async def async_write_chunks(
+    *,
+    chunks: AsyncIterable[bytes],
+    destination: DownloadDestination,
+) -> None:
+    """Write chunks of a body to a file, one at a time, as they are
+    received.
+
+    Args:
+        chunks: The chunks to write.
+        destination: The path of a file to create or replace, or a
+            binary file object to write to.
+    """
+    with (
+        destination.open(mode="wb")
+        if isinstance(destination, Path)
+        else contextlib.nullcontext(enter_result=destination)
+    ) as file:
+        async for chunk in chunks:
+            file.write(chunk)
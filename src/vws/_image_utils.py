@@ -1,18 +1,106 @@
 """Image utility functions shared across VWS modules."""
 
+import contextlib
 import io
+import mmap
+import os
+from collections.abc import Buffer, Iterator
+from pathlib import Path
 from typing import BinaryIO
 
 from beartype import beartype
 
-ImageType = io.BytesIO | BinaryIO
+# An image may be given as a file object, as any object which supports the
+# buffer protocol, such as ``bytes``, ``bytearray``, ``memoryview`` or
+# ``mmap.mmap``, or as the path to an image file.
+ImageType = io.BytesIO | BinaryIO | Buffer | os.PathLike[str]
 
 
 @beartype
-def get_image_data(image: ImageType) -> bytes:
-    """Get the data of an image file."""
+def _map_file(
+    *,
+    path: os.PathLike[str],
+    stack: contextlib.ExitStack,
+) -> bytes | memoryview:
+    """Memory-map a file, so that it is not read into memory.
+
+    Args:
+        path: The file to map.
+        stack: The stack which the map and its view are closed with.
+
+    Returns:
+        A read-only view of the file.
+    """
+    with Path(path).open(mode="rb") as file:
+        # Empty files cannot be memory-mapped.
+        if not os.fstat(fd=file.fileno()).st_size:
+            return b""
+        mapped_file = stack.enter_context(
+            cm=mmap.mmap(
+                fileno=file.fileno(),
+                length=0,
+                access=mmap.ACCESS_READ,
+            ),
+        )
+    # The map cannot be closed while there is a view of it, so the view
+    # is released first.
+    return stack.enter_context(cm=memoryview(mapped_file))
+
+
+@beartype
+def _get_image_data(
+    *,
+    image: ImageType,
+    stack: contextlib.ExitStack,
+) -> bytes | memoryview:
+    """Get the data of an image, without copying it where possible.
+
+    Args:
+        image: The image.
+        stack: The stack which any map or view of the image is closed
+            with.
+
+    Returns:
+        The data of the image.
+    """
+    if isinstance(image, bytes):
+        return image
+    if isinstance(image, io.BytesIO):
+        # This shares the buffer of the ``BytesIO`` until it is changed.
+        return image.getvalue()
+    if isinstance(image, os.PathLike):
+        return _map_file(path=image, stack=stack)
+    if isinstance(image, Buffer):
+        view = stack.enter_context(cm=memoryview(image))
+        if not view.c_contiguous:
+            return view.tobytes()
+        return stack.enter_context(cm=view.cast(format="B"))
     original_tell = image.tell()
     image.seek(0)
     image_data = image.read()
     image.seek(original_tell)
     return image_data
+
+
+@contextlib.contextmanager
+@beartype
+def open_image_data(*, image: ImageType) -> Iterator[bytes | memoryview]:
+    """Get the data of an image, without copying it where possible.
+
+    ``bytes`` are used as given, and other buffers are viewed rather than
+    copied. The whole of a ``BytesIO`` is used, whatever its position. A
+    path is memory-mapped. Other file objects are read in full, and left
+    at the position they were at.
+
+    Views are released, and a map is closed, on exit, so the data must
+    not be used after that. Request bodies are copies, so they can be
+    built within the context and sent after it.
+
+    Args:
+        image: The image.
+
+    Yields:
+        The data of the image.
+    """
+    with contextlib.ExitStack() as stack:
+        yield _get_image_data(image=image, stack=stack)
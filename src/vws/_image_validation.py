@@ -0,0 +1,291 @@
+"""Internal helpers for checking images against Vuforia's documented
+limits before they are uploaded.
+
+Only the headers of an image are read, so the checks are cheap. They
+catch images which Vuforia would reject for their format, color space,
+dimensions or size. An image which passes may still be rejected by
+Vuforia, for example if its data is corrupt.
+"""
+
+import json
+import struct
+from dataclasses import dataclass
+from http import HTTPStatus
+
+from beartype import beartype
+
+from vws.exceptions.cloud_reco_exceptions import (
+    BadImageError as CloudRecoBadImageError,
+)
+from vws.exceptions.custom_exceptions import RequestEntityTooLargeError
+from vws.exceptions.vws_exceptions import BadImageError, ImageTooLargeError
+from vws.response import Response
+
+# Target images may be up to 2.25 MiB.
+_MAX_TARGET_IMAGE_BYTES = 2_359_296
+# Query images may be up to 2 MiB.
+_MAX_QUERY_IMAGE_BYTES = 2 * 1024 * 1024
+_MAX_QUERY_IMAGE_DIMENSION = 30_000
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_JPEG_SIGNATURE = b"\xff\xd8"
+# Vuforia supports images with 8 bits for each channel.
+_BITS_PER_CHANNEL = 8
+# The start of each PNG IHDR chunk: width, height, bit depth and color
+# type.
+_PNG_IHDR_FORMAT = ">IIBB"
+# The start of each JPEG start of frame segment: precision, height, width
+# and number of components.
+_JPEG_START_OF_FRAME_FORMAT = ">BHHB"
+_JPEG_MARKER_PREFIX = 0xFF
+# PNG color types for grayscale and RGB images, without alpha.
+_PNG_GRAYSCALE = 0
+_PNG_RGB = 2
+# JPEG start of frame markers, which give the image dimensions. 0xC4,
+# 0xC8 and 0xCC are other markers in the same range.
+_JPEG_START_OF_FRAME_MARKERS = frozenset(range(0xC0, 0xD0)) - {
+    0xC4,
+    0xC8,
+    0xCC,
+}
+# JPEG markers which have no length or segment data.
+_JPEG_STANDALONE_MARKERS = frozenset({0x01, *range(0xD0, 0xD8)})
+# The JPEG start of scan and end of image markers. Image data follows the
+# start of scan, so a start of frame marker must come before either.
+_JPEG_IMAGE_DATA_MARKERS = frozenset({0xD9, 0xDA})
+
+
+@dataclass(frozen=True, kw_only=True)
+class _ImageHeader:
+    """What the header of an image says about it."""
+
+    width: int
+    height: int
+    # Whether the image is 8 bit grayscale or RGB.
+    supported_color_space: bool
+
+
+@beartype
+def _png_header(*, image_data: bytes | memoryview) -> _ImageHeader | None:
+    """Read the ``IHDR`` chunk of a PNG image."""
+    # The signature, then the chunk length and type, then the chunk.
+    ihdr_start = len(_PNG_SIGNATURE) + 8
+    if image_data[len(_PNG_SIGNATURE) + 4 : ihdr_start] != b"IHDR":
+        return None
+    ihdr = image_data[
+        ihdr_start : ihdr_start + struct.calcsize(_PNG_IHDR_FORMAT)
+    ]
+    if len(ihdr) < struct.calcsize(_PNG_IHDR_FORMAT):
+        return None
+    width, height, bit_depth, color_type = struct.unpack(
+        _PNG_IHDR_FORMAT,
+        ihdr,
+    )
+    return _ImageHeader(
+        width=width,
+        height=height,
+        supported_color_space=(
+            bit_depth == _BITS_PER_CHANNEL
+            and color_type in {_PNG_GRAYSCALE, _PNG_RGB}
+        ),
+    )
+
+
+@beartype
+def _jpeg_header(*, image_data: bytes | memoryview) -> _ImageHeader | None:
+    """Find the start of frame segment of a JPEG image."""
+    position = len(_JPEG_SIGNATURE)
+    while position + 4 <= len(image_data):
+        if image_data[position] != _JPEG_MARKER_PREFIX:
+            return None
+        marker = image_data[position + 1]
+        if marker == _JPEG_MARKER_PREFIX:
+            # Markers may be preceded by any number of fill bytes.
+            position += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            position += 2
+            continue
+        if marker in _JPEG_IMAGE_DATA_MARKERS:
+            return None
+        (segment_length,) = struct.unpack(
+            ">H",
+            image_data[position + 2 : position + 4],
+        )
+        if marker in _JPEG_START_OF_FRAME_MARKERS:
+            segment_start = position + 4
+            segment = image_data[
+                segment_start : segment_start
+                + struct.calcsize(_JPEG_START_OF_FRAME_FORMAT)
+            ]
+            if len(segment) < struct.calcsize(_JPEG_START_OF_FRAME_FORMAT):
+                return None
+            precision, height, width, components = struct.unpack(
+                _JPEG_START_OF_FRAME_FORMAT,
+                segment,
+            )
+            return _ImageHeader(
+                width=width,
+                height=height,
+                # 1 component is grayscale, and 3 are RGB. 4 are CMYK,
+                # which Vuforia does not support.
+                supported_color_space=(
+                    precision == _BITS_PER_CHANNEL and components in {1, 3}
+                ),
+            )
+        position += 2 + segment_length
+    return None
+
+
+@beartype
+def _image_problem(
+    *,
+    image_data: bytes | memoryview,
+    max_dimension: int | None,
+) -> str | None:
+    """Find a problem with the format, color space or dimensions of an
+    image.
+
+    Returns:
+        A description of the problem, or ``None`` if there is none.
+    """
+    # Only the start of the image is copied, to compare it with the
+    # signatures.
+    image_start = bytes(image_data[: len(_PNG_SIGNATURE)])
+    if image_start.startswith(_PNG_SIGNATURE):
+        header = _png_header(image_data=image_data)
+    elif image_start.startswith(_JPEG_SIGNATURE):
+        header = _jpeg_header(image_data=image_data)
+    else:
+        return "The image is not a JPEG or PNG file."
+
+    if header is None:
+        return "The image header could not be read."
+    if not header.supported_color_space:
+        return "The image is not an 8 bit grayscale or RGB image."
+    if max_dimension is not None and max(header.width, header.height) > (
+        max_dimension
+    ):
+        return (
+            f"The image is {header.width}x{header.height} pixels, which "
+            f"is larger than {max_dimension} pixels in some dimension."
+        )
+    return None
+
+
+@beartype
+def _local_error_response(
+    *,
+    url: str,
+    status_code: int,
+    result_code: str | None,
+    detail: str,
+) -> Response:
+    """Make a response for an error found before a request is sent.
+
+    The body is the JSON error body Vuforia would give, with a
+    ``detail`` of the problem, or just the problem if Vuforia would not
+    give a result code.
+    """
+    if result_code is None:
+        headers = {"Content-Type": "text/plain"}
+        text = detail
+    else:
+        headers = {"Content-Type": "application/json"}
+        text = json.dumps(
+            obj={
+                "transaction_id": "",
+                "result_code": result_code,
+                "detail": detail,
+            },
+        )
+    return Response(
+        url=url,
+        status_code=status_code,
+        headers=headers,
+        tell_position=0,
+        content=text.encode(encoding="utf-8"),
+        text=text,
+    )
+
+
+@beartype
+def validate_target_image(*, image_data: bytes | memoryview, url: str) -> None:
+    """Check that an image can be used as a target image.
+
+    Args:
+        image_data: The image.
+        url: The URL which the image would be sent to.
+
+    Raises:
+        ~vws.exceptions.vws_exceptions.BadImageError: The image is not a
+            grayscale or RGB JPEG or PNG file.
+        ~vws.exceptions.vws_exceptions.ImageTooLargeError: The image file
+            is too large.
+    """
+    problem = _image_problem(image_data=image_data, max_dimension=None)
+    if problem is not None:
+        raise BadImageError(
+            response=_local_error_response(
+                url=url,
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                result_code="BadImage",
+                detail=problem,
+            ),
+        )
+
+    if len(image_data) > _MAX_TARGET_IMAGE_BYTES:
+        raise ImageTooLargeError(
+            response=_local_error_response(
+                url=url,
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                result_code="ImageTooLarge",
+                detail=(
+                    f"The image is {len(image_data)} bytes, which is "
+                    f"larger than {_MAX_TARGET_IMAGE_BYTES} bytes."
+                ),
+            ),
+        )
+
+
+@beartype
+def validate_query_image(*, image_data: bytes | memoryview, url: str) -> None:
+    """Check that an image can be used to make a query.
+
+    Args:
+        image_data: The image.
+        url: The URL which the image would be sent to.
+
+    Raises:
+        ~vws.exceptions.cloud_reco_exceptions.BadImageError: The image is
+            not a grayscale or RGB JPEG or PNG file, or its dimensions are
+            too large.
+        ~vws.exceptions.custom_exceptions.RequestEntityTooLargeError: The
+            image file is too large.
+    """
+    if len(image_data) > _MAX_QUERY_IMAGE_BYTES:
+        raise RequestEntityTooLargeError(
+            response=_local_error_response(
+                url=url,
+                status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                result_code=None,
+                detail=(
+                    f"The image is {len(image_data)} bytes, which is "
+                    f"larger than {_MAX_QUERY_IMAGE_BYTES} bytes."
+                ),
+            ),
+        )
+
+    problem = _image_problem(
+        image_data=image_data,
+        max_dimension=_MAX_QUERY_IMAGE_DIMENSION,
+    )
+    if problem is not None:
+        raise CloudRecoBadImageError(
+            response=_local_error_response(
+                url=url,
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                result_code="BadImage",
+                detail=problem,
+            ),
+        )
@@ -55,15 +55,12 @@ def reco_counts_report_body(*, year: int, month: calendar.Month) -> bytes:
 
 
 @beartype(conf=BeartypeConf(is_pep484_tower=True))
-def report_from_download_response(*, response: Response) -> RecoCountsReport:
-    """Get a reco counts report from a response from a report's URL.
+def raise_for_download_error(*, response: Response) -> None:
+    """Raise an exception if a report could not be downloaded.
 
     Args:
         response: The response from a report's download URL.
 
-    Returns:
-        The downloaded report.
-
     Raises:
         ~vws.exceptions.custom_exceptions.RecoCountsReportNotReadyError:
             Vuforia has not finished generating the report.
@@ -77,4 +74,23 @@ def report_from_download_response(*, response: Response) -> RecoCountsReport:
     if response.status_code != HTTPStatus.OK:
         raise RecoCountsReportDownloadError(response=response)
 
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+def report_from_download_response(*, response: Response) -> RecoCountsReport:
+    """Get a reco counts report from a response from a report's URL.
+
+    Args:
+        response: The response from a report's download URL.
+
+    Returns:
+        The downloaded report.
+
+    Raises:
+        ~vws.exceptions.custom_exceptions.RecoCountsReportNotReadyError:
+            Vuforia has not finished generating the report.
+        ~vws.exceptions.custom_exceptions.RecoCountsReportDownloadError: The
+            report could not be downloaded. For example, the report's URL may
+            have expired.
+    """
+    raise_for_download_error(response=response)
     return RecoCountsReport.from_csv(csv_bytes=response.content)
@@ -0,0 +1,133 @@
+"""Internal helpers for building request bodies and their MD5 hashes in
+one pass.
+
+Vuforia signatures include the MD5 hash of the request body. The
+builders here hash each piece of a body as it is written, so that a
+large image is not read again to hash it after the body is built.
+"""
+
+import base64
+import dataclasses
+import hashlib
+import io
+import json
+import os
+from collections.abc import Mapping, Sequence  # noqa: TC003
+
+from beartype import beartype
+
+# A multiple of 3, so that each chunk is Base64 encoded without padding.
+_BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+JSONFieldValue = str | bool | float | int | bytes | memoryview | None
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class HashedBody:
+    """A request body, with its MD5 hash."""
+
+    content: bytes
+    content_md5_hex: str
+
+
+@beartype
+class _HashingWriter:
+    """Write a body, hashing it as it is written."""
+
+    def __init__(self) -> None:
+        """Create a writer with an empty body."""
+        self._buffer = io.BytesIO()
+        self._md5 = hashlib.md5(usedforsecurity=False)
+
+    def write(self, *, data: bytes | memoryview) -> None:
+        """Add data to the end of the body.
+
+        Args:
+            data: The data to add.
+        """
+        self._buffer.write(data)
+        self._md5.update(data)
+
+    def finish(self) -> HashedBody:
+        """Get the body which has been written.
+
+        Returns:
+            The body, with its MD5 hash.
+        """
+        return HashedBody(
+            content=self._buffer.getvalue(),
+            content_md5_hex=self._md5.hexdigest(),
+        )
+
+
+@beartype
+def json_body(*, fields: Mapping[str, JSONFieldValue]) -> HashedBody:
+    """Build a JSON object body.
+
+    The body is the same as ``json.dumps(obj=fields).encode()``, except
+    that ``bytes`` and ``memoryview`` values are written as Base64
+    strings. These are encoded in chunks, so no full-size Base64 string
+    is made.
+
+    Args:
+        fields: The members of the JSON object.
+
+    Returns:
+        The body, with its MD5 hash.
+    """
+    writer = _HashingWriter()
+    writer.write(data=b"{")
+    for index, (key, value) in enumerate(iterable=fields.items()):
+        if index:
+            writer.write(data=b", ")
+        writer.write(data=json.dumps(obj=key).encode(encoding="utf-8"))
+        writer.write(data=b": ")
+        if isinstance(value, bytes | memoryview):
+            view = memoryview(value)
+            writer.write(data=b'"')
+            for start in range(0, len(view), _BASE64_CHUNK_SIZE):
+                writer.write(
+                    data=base64.b64encode(
+                        s=view[start : start + _BASE64_CHUNK_SIZE],
+                    ),
+                )
+            writer.write(data=b'"')
+        else:
+            writer.write(data=json.dumps(obj=value).encode(encoding="utf-8"))
+    writer.write(data=b"}")
+    return writer.finish()
+
+
+@beartype
+def multipart_form_data_body(
+    *,
+    fields: Sequence[tuple[str, str | None, bytes | memoryview, str]],
+) -> tuple[HashedBody, str]:
+    """Build a ``multipart/form-data`` body.
+
+    Args:
+        fields: For each part, its name, its file name or ``None``, its
+            data and its content type.
+
+    Returns:
+        The body, with its MD5 hash, and the ``Content-Type`` header to
+        send it with.
+    """
+    boundary = os.urandom(16).hex()
+    writer = _HashingWriter()
+    for name, filename, data, content_type in fields:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        writer.write(
+            data=(
+                f"--{boundary}\r\n"
+                f"Content-Disposition: {disposition}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                "\r\n"
+            ).encode(),
+        )
+        writer.write(data=data)
+        writer.write(data=b"\r\n")
+    writer.write(data=f"--{boundary}--\r\n".encode())
+    return writer.finish(), f"multipart/form-data; boundary={boundary}"
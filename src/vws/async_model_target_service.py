@@ -3,14 +3,17 @@
 import asyncio
 import time
 from collections.abc import Sequence  # noqa: TC003
-from http import HTTPMethod
+from http import HTTPMethod, HTTPStatus
 from typing import Self
 
 from beartype import BeartypeConf, beartype
 
+from vws._downloads import DownloadDestination as _DownloadDestination
+from vws._downloads import async_stream_request, async_write_chunks
 from vws._model_targets import (
     JSON_CONTENT_TYPE,
     OAUTH2_TOKEN_BODY,
+    OAUTH2_TOKEN_CONTENT_TYPE,
     OAUTH2_TOKEN_PATH,
     access_token_from_response,
     dataset_collection_path,
@@ -26,6 +29,11 @@ from vws._model_targets import (
 from vws.exceptions.model_target_exceptions import (
     ModelTargetDatasetTimeoutError,
 )
+from vws.middleware import (
+    Middleware,
+    Request,
+    async_send_with_middleware,
+)
 from vws.model_target_datasets import (  # noqa: TC001
     ModelTargetDatasetType,
     ModelTargetModel,
@@ -52,6 +60,7 @@ class AsyncModelTargetService:
         base_vws_url: str = "https://vws.vuforia.com",
         request_timeout_seconds: float | tuple[float, float] = 30.0,
         transport: AsyncTransport | None = None,
+        middleware: Sequence[Middleware] = (),
     ) -> None:
         """
         Args:
@@ -68,6 +77,11 @@ class AsyncModelTargetService:
             transport: The async HTTP transport to use for
                 requests. Defaults to
                 ``AsyncHTTPXTransport()``.
+                The client closes this transport when it is
+                closed.
+            middleware: Middleware to send each request
+                through, outermost first. See
+                :mod:`vws.middleware`.
         """
         self._client_id = client_id
         self._client_secret = client_secret
@@ -76,11 +90,17 @@ class AsyncModelTargetService:
         self._transport = (
             transport if transport is not None else AsyncHTTPXTransport()
         )
+        self._middleware = tuple(middleware)
         self._access_token: str | None = None
         self._access_token_expiry_time = 0.0
 
     async def aclose(self) -> None:
-        """Close the underlying transport if it supports closing."""
+        """Close the transport.
+
+        The client owns its transport, including a transport which was
+        given to it. To share one transport between clients, do not close
+        the clients. Close the transport once none of them is in use.
+        """
         await self._transport.aclose()
 
     async def __aenter__(self) -> Self:
@@ -113,15 +133,33 @@ class AsyncModelTargetService:
         ):
             return self._access_token
 
-        response = await self._transport(
-            method=HTTPMethod.POST,
-            url=self._base_vws_url.rstrip("/") + OAUTH2_TOKEN_PATH,
-            headers=oauth2_token_headers(
-                client_id=self._client_id,
-                client_secret=self._client_secret,
+        async def send(request: Request) -> Response:
+            """Authorize and send a request which has been through
+            middleware.
+            """
+            return await self._transport(
+                method=request.method,
+                url=request.url,
+                headers={
+                    **oauth2_token_headers(
+                        client_id=self._client_id,
+                        client_secret=self._client_secret,
+                    ),
+                    **request.headers,
+                },
+                data=request.data,
+                request_timeout=self._request_timeout_seconds,
+            )
+
+        response = await async_send_with_middleware(
+            middleware=self._middleware,
+            request=Request(
+                method=HTTPMethod.POST,
+                url=self._base_vws_url.rstrip("/") + OAUTH2_TOKEN_PATH,
+                headers={"Content-Type": OAUTH2_TOKEN_CONTENT_TYPE},
+                data=OAUTH2_TOKEN_BODY,
             ),
-            data=OAUTH2_TOKEN_BODY,
-            request_timeout=self._request_timeout_seconds,
+            send=send,
         )
 
         access_token, expires_in_seconds = access_token_from_response(
@@ -165,17 +203,31 @@ class AsyncModelTargetService:
                 Vuforia is rate limiting access.
         """
         access_token = await self.get_access_token()
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            **(extra_headers or {}),
-        }
 
-        response = await self._transport(
-            method=method,
-            url=self._base_vws_url.rstrip("/") + request_path,
-            headers=headers,
-            data=data,
-            request_timeout=self._request_timeout_seconds,
+        async def send(request: Request) -> Response:
+            """Authorize and send a request which has been through
+            middleware.
+            """
+            return await self._transport(
+                method=request.method,
+                url=request.url,
+                headers={
+                    "Authorization": f"Bearer {access_token}",
+                    **request.headers,
+                },
+                data=request.data,
+                request_timeout=self._request_timeout_seconds,
+            )
+
+        response = await async_send_with_middleware(
+            middleware=self._middleware,
+            request=Request(
+                method=method,
+                url=self._base_vws_url.rstrip("/") + request_path,
+                headers=extra_headers or {},
+                data=data,
+            ),
+            send=send,
         )
 
         raise_for_error(response=response)
@@ -350,6 +402,55 @@ class AsyncModelTargetService:
 
         return response.content
 
+    async def download_dataset_to_file(
+        self,
+        *,
+        dataset_uuid: str,
+        dataset_type: ModelTargetDatasetType,
+        file: _DownloadDestination,
+    ) -> None:
+        """Download a generated Model Target dataset to a file.
+
+        The dataset is written as it is received, so it is never held in
+        memory all at once.
+
+        Args:
+            dataset_uuid: The UUID of the dataset, as given by
+                :meth:`create_dataset`.
+            dataset_type: The kind of dataset to download.
+            file: The path of a file to write the dataset's zip file to,
+                or a binary file object to write it to.
+
+        Raises:
+            ~vws.exceptions.model_target_exceptions.ModelTargetAuthenticationError:
+                The request was not authenticated.
+            ~vws.exceptions.model_target_exceptions.UnknownModelTargetDatasetError:
+                No dataset of the given type matches the given UUID.
+            ~vws.exceptions.model_target_exceptions.ModelTargetDatasetNotDoneError:
+                Vuforia has not generated the dataset.
+            ~vws.exceptions.model_target_exceptions.ModelTargetOAuth2Error:
+                Vuforia did not give an access token.
+        """
+        request_path = dataset_download_path(
+            dataset_type=dataset_type,
+            dataset_uuid=dataset_uuid,
+        )
+        access_token = await self.get_access_token()
+        async with async_stream_request(
+            transport=self._transport,
+            method=HTTPMethod.GET,
+            url=self._base_vws_url.rstrip("/") + request_path,
+            headers={"Authorization": f"Bearer {access_token}"},
+            data=b"",
+            request_timeout=self._request_timeout_seconds,
+        ) as streamed_response:
+            if streamed_response.status_code >= HTTPStatus.BAD_REQUEST:
+                raise_for_error(response=await streamed_response.aread())
+            await async_write_chunks(
+                chunks=streamed_response.aiter_bytes(),
+                destination=file,
+            )
+
     async def delete_dataset(
         self,
         *,
@@ -2,16 +2,24 @@
 Web APIs.
 """
 
+import asyncio
+import functools
 import json
+import time
+from collections.abc import Callable, Sequence  # noqa: TC003
 from http import HTTPMethod, HTTPStatus
-from typing import Any, Self
+from typing import Self
+from urllib.parse import urlsplit
 
 from beartype import BeartypeConf, beartype
-from urllib3.filepost import encode_multipart_formdata
-from vws_auth_tools import authorization_header, rfc_1123_date
 
 from vws._image_utils import ImageType as _ImageType
-from vws._image_utils import get_image_data as _get_image_data
+from vws._image_utils import open_image_data as _open_image_data
+from vws._image_validation import validate_query_image
+from vws._request_bodies import multipart_form_data_body
+from vws._signing import Signer, async_send_signed
+from vws.batch_queries import BatchQueryResult, batch_query_statistics
+from vws.concurrency import AdaptiveConcurrencyLimiter  # noqa: TC001
 from vws.exceptions.base_exceptions import CloudRecoError
 from vws.exceptions.cloud_reco_exceptions import (
     AuthenticationFailureError,
@@ -24,8 +32,17 @@ from vws.exceptions.custom_exceptions import (
     RequestEntityTooLargeError,
     ServerError,
 )
+from vws.hedging import HedgingPolicy  # noqa: TC001
 from vws.include_target_data import CloudRecoIncludeTargetData
+from vws.middleware import (
+    Middleware,
+    Request,
+    async_send_with_middleware,
+)
+from vws.query_cache import QueryResultCache  # noqa: TC001
+from vws.rate_limiting import RateLimiter  # noqa: TC001
 from vws.reports import QueryResult
+from vws.response import Response  # noqa: TC001
 from vws.transports import AsyncHTTPXTransport, AsyncTransport
 
 
@@ -43,6 +60,15 @@ class AsyncCloudRecoService:
         base_vwq_url: str = "https://cloudreco.vuforia.com",
         request_timeout_seconds: float | tuple[float, float] = 30.0,
         transport: AsyncTransport | None = None,
+        rate_limiter: RateLimiter | None = None,
+        concurrency_limiter: AdaptiveConcurrencyLimiter | None = None,
+        hedging_policy: HedgingPolicy | None = None,
+        middleware: Sequence[Middleware] = (),
+        query_cache: QueryResultCache | None = None,
+        validate_images: bool = False,
+        image_preparer: (
+            Callable[[bytes | memoryview], bytes | memoryview] | None
+        ) = None,
     ) -> None:
         """
         Args:
@@ -56,17 +82,72 @@ class AsyncCloudRecoService:
             transport: The async HTTP transport to use for
                 requests. Defaults to
                 ``AsyncHTTPXTransport()``.
+                The client closes this transport when it is
+                closed.
+            rate_limiter: A rate limiter to wait for before each
+                request, including the second attempt of a hedged
+                query, keyed by the client access key. Share one
+                rate limiter between clients to limit their combined
+                request rate.
+            concurrency_limiter: A limit on the number of requests in
+                flight at once, which each request waits for before it
+                is signed. Share one limiter between clients to limit
+                their combined requests. By default, there is no limit.
+            hedging_policy: A policy for sending a query a second time
+                if the first attempt is slow, and using whichever
+                response arrives first. By default, each query is sent
+                once.
+            middleware: Middleware to send each request
+                through, outermost first. See
+                :mod:`vws.middleware`.
+            query_cache: A cache of query results, keyed by the
+                image content and the query options. By default,
+                results are not cached.
+            validate_images: Whether to check query images against
+                Vuforia's documented limits before uploading them,
+                and raise the error which Vuforia would give, without a
+                request. Only the image headers are read.
+            image_preparer: A function which prepares each query image
+                before it is uploaded, for example a
+                :class:`vws.image_preparation.QueryImagePreparer` which
+                shrinks large images. By default, images are uploaded as
+                given.
         """
         self._client_access_key = client_access_key
-        self._client_secret_key = client_secret_key
+        self._signer = Signer(
+            access_key=client_access_key,
+            secret_key=client_secret_key,
+        )
         self._base_vwq_url = base_vwq_url
         self._request_timeout_seconds = request_timeout_seconds
         self._transport = (
             transport if transport is not None else AsyncHTTPXTransport()
         )
+        self._middleware = tuple(middleware)
+        self._validate_images = validate_images
+        self._image_preparer = image_preparer
+        self._rate_limiter = rate_limiter
+        self._concurrency_limiter = concurrency_limiter
+        self._hedging_policy = hedging_policy
+        self._query_cache = query_cache
+
+    @property
+    def clock_offset_seconds(self) -> float:
+        """The number of seconds which Vuforia's clock was last measured
+        to be ahead of the local clock, or behind it if negative.
+
+        This is measured from the ``Date`` header of each response, and
+        requests are signed with the local time plus this offset.
+        """
+        return self._signer.clock_offset_seconds
 
     async def aclose(self) -> None:
-        """Close the underlying transport if it supports closing."""
+        """Close the transport.
+
+        The client owns its transport, including a transport which was
+        given to it. To share one transport between clients, do not close
+        the clients. Close the transport once none of them is in use.
+        """
         await self._transport.aclose()
 
     async def __aenter__(self) -> Self:
@@ -112,7 +193,8 @@ class AsyncCloudRecoService:
             ~vws.exceptions.cloud_reco_exceptions.InactiveProjectError: The
                 project is inactive.
             ~vws.exceptions.cloud_reco_exceptions.RequestTimeTooSkewedError:
-                There is an error with the time sent to Vuforia.
+                There is an error with the time sent to Vuforia, even
+                after the request is signed again with Vuforia's time.
             ~vws.exceptions.cloud_reco_exceptions.BadImageError: There is a
                 problem with the given image. For example, it must be a JPEG or
                 PNG file in the grayscale or RGB color space.
@@ -129,53 +211,171 @@ class AsyncCloudRecoService:
             An ordered list of target details of matching
             targets.
         """
-        image_content = _get_image_data(image=image)
-        body: dict[str, Any] = {
-            "image": (
-                "image.jpeg",
-                image_content,
-                "image/jpeg",
-            ),
-            "max_num_results": (
-                None,
-                int(max_num_results),
-                "text/plain",
-            ),
-            "include_target_data": (
-                None,
-                include_target_data.value,
-                "text/plain",
-            ),
-        }
-        date = rfc_1123_date()
-        request_path = "/v1/query"
-        content, content_type_header = encode_multipart_formdata(fields=body)
-        method = HTTPMethod.POST
-
-        authorization_string = authorization_header(
-            access_key=self._client_access_key,
-            secret_key=self._client_secret_key,
-            method=method,
-            content=content,
-            # Note that this is not the actual Content-Type
-            # header value sent.
-            content_type="multipart/form-data",
-            date=date,
-            request_path=request_path,
+        with _open_image_data(image=image) as given_image_data:
+            # Preparing an image can take a while, so do not block the
+            # event loop.
+            image_data = (
+                given_image_data
+                if self._image_preparer is None
+                else await asyncio.to_thread(
+                    self._image_preparer,
+                    given_image_data,
+                )
+            )
+            if self._validate_images:
+                validate_query_image(
+                    image_data=image_data,
+                    url=self._base_vwq_url.rstrip("/") + "/v1/query",
+                )
+            if self._query_cache is None:
+                return await self._query(
+                    image_data=image_data,
+                    max_num_results=max_num_results,
+                    include_target_data=include_target_data,
+                )
+            return await self._query_cache.aquery(
+                namespace=(self._base_vwq_url, self._client_access_key),
+                image_data=image_data,
+                max_num_results=max_num_results,
+                include_target_data=include_target_data,
+                make_query=functools.partial(
+                    self._query,
+                    image_data=image_data,
+                    max_num_results=max_num_results,
+                    include_target_data=include_target_data,
+                ),
+            )
+
+    async def _wait_for_rate_limiter(self) -> None:
+        """Wait for the rate limiter, if there is one, before a request is
+        sent.
+        """
+        if self._rate_limiter is not None:
+            await self._rate_limiter.aacquire(key=self._client_access_key)
+
+    async def _send_query_request(
+        self,
+        *,
+        request: Request,
+        content_md5_hex: str | None,
+    ) -> Response:
+        """Sign and send a query request, once the rate limiter allows it
+        and there is room within the concurrency limit.
+
+        Args:
+            request: The request, after it has been through middleware.
+            content_md5_hex: The hex MD5 hash of the request body, if it
+                is already known.
+
+        Returns:
+            The response to the request.
+        """
+        await self._wait_for_rate_limiter()
+
+        async def sign_and_send() -> Response:
+            """Sign and send the request.
+
+            This is signed only once there is room within the concurrency
+            limit, so that the ``Date`` header is not stale when the
+            request is sent.
+            """
+            headers = {
+                **self._signer.headers(
+                    method=request.method,
+                    content=request.data,
+                    # Note that this is not the actual Content-Type header
+                    # value sent.
+                    content_type="multipart/form-data",
+                    request_path=urlsplit(url=request.url).path,
+                    content_md5_hex=content_md5_hex,
+                ),
+                **request.headers,
+            }
+            if self._hedging_policy is None:
+                return await self._transport(
+                    method=request.method,
+                    url=request.url,
+                    headers=headers,
+                    data=request.data,
+                    request_timeout=self._request_timeout_seconds,
+                )
+            return await self._hedging_policy.arequest(
+                transport=self._transport,
+                method=request.method,
+                url=request.url,
+                headers=headers,
+                data=request.data,
+                request_timeout=self._request_timeout_seconds,
+                before_hedge=self._wait_for_rate_limiter,
+            )
+
+        if self._concurrency_limiter is None:
+            return await sign_and_send()
+        return await self._concurrency_limiter.limit(
+            make_request=sign_and_send,
         )
 
-        headers = {
-            "Authorization": authorization_string,
-            "Date": date,
-            "Content-Type": content_type_header,
-        }
+    async def _query(
+        self,
+        *,
+        image_data: bytes | memoryview,
+        max_num_results: int,
+        include_target_data: CloudRecoIncludeTargetData,
+    ) -> list[QueryResult]:
+        """Make an Image Recognition Query, without the cache.
 
-        response = await self._transport(
-            method=method,
+        See :meth:`query`.
+        """
+        request_path = "/v1/query"
+        body, content_type_header = multipart_form_data_body(
+            fields=[
+                (
+                    "image",
+                    "image.jpeg",
+                    image_data,
+                    "image/jpeg",
+                ),
+                (
+                    "max_num_results",
+                    None,
+                    str(object=int(max_num_results)).encode(encoding="ascii"),
+                    "text/plain",
+                ),
+                (
+                    "include_target_data",
+                    None,
+                    include_target_data.value.encode(encoding="ascii"),
+                    "text/plain",
+                ),
+            ],
+        )
+        request = Request(
+            method=HTTPMethod.POST,
             url=self._base_vwq_url.rstrip("/") + request_path,
-            headers=headers,
-            data=content,
-            request_timeout=self._request_timeout_seconds,
+            headers={"Content-Type": content_type_header},
+            data=body.content,
+        )
+
+        async def send(request: Request) -> Response:
+            """Sign and send a request which has been through middleware."""
+            return await async_send_signed(
+                signer=self._signer,
+                send=functools.partial(
+                    self._send_query_request,
+                    request=request,
+                    # Middleware may have changed the body.
+                    content_md5_hex=(
+                        body.content_md5_hex
+                        if request.data is body.content
+                        else None
+                    ),
+                ),
+            )
+
+        response = await async_send_with_middleware(
+            middleware=self._middleware,
+            request=request,
+            send=send,
         )
 
         if response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE:
@@ -222,3 +422,74 @@ class AsyncCloudRecoService:
             QueryResult.from_response_dict(response_dict=item)
             for item in result_list
         ]
+
+    async def query_many(
+        self,
+        *,
+        images: Sequence[_ImageType],
+        max_num_results: int = 1,
+        include_target_data: CloudRecoIncludeTargetData = (
+            CloudRecoIncludeTargetData.TOP
+        ),
+        max_concurrency: int = 8,
+    ) -> BatchQueryResult:
+        """Make an Image Recognition Query for each of many images, with
+        up to ``max_concurrency`` queries in flight at once.
+
+        An error from one query does not stop the others; it is returned
+        in place of that query's results.
+
+        Args:
+            images: The images to make queries against.
+            max_num_results: The maximum number of matching targets to be
+                returned for each image.
+            include_target_data: Indicates if target_data records shall be
+                returned for the matched targets. See :meth:`query`.
+            max_concurrency: The maximum number of queries to make at once.
+
+        Raises:
+            ValueError: ``max_concurrency`` is less than 1.
+
+        Returns:
+            For each image, in the order given, the matching targets or
+            the error raised by its query, and statistics for the batch.
+        """
+        if max_concurrency < 1:
+            msg = "max_concurrency must be at least 1."
+            raise ValueError(msg)
+
+        semaphore = asyncio.Semaphore(value=max_concurrency)
+
+        async def query_one(
+            image: _ImageType,
+        ) -> tuple[list[QueryResult] | Exception, float]:
+            """Make one query, and measure how long it takes."""
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    result: list[QueryResult] | Exception = await self.query(
+                        image=image,
+                        max_num_results=max_num_results,
+                        include_target_data=include_target_data,
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    result = exc
+                return result, time.perf_counter() - start
+
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(query_one(image=image) for image in images),
+        )
+        elapsed_seconds = time.perf_counter() - start
+
+        results = [result for result, _ in outcomes]
+        return BatchQueryResult(
+            results=results,
+            statistics=batch_query_statistics(
+                latencies_seconds=[latency for _, latency in outcomes],
+                failures=sum(
+                    isinstance(result, Exception) for result in results
+                ),
+                elapsed_seconds=elapsed_seconds,
+            ),
+        )
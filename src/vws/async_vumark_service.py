@@ -1,15 +1,18 @@
 """Async interface to the Vuforia VuMark Generation Web API."""
 
 import json
+from collections.abc import Sequence  # noqa: TC003
 from http import HTTPMethod, HTTPStatus
 from typing import Self
 
 from beartype import BeartypeConf, beartype
 
 from vws._async_vws_request import async_target_api_request
+from vws._signing import Signer
 from vws.exceptions.base_exceptions import VWSError
 from vws.exceptions.custom_exceptions import ServerError
 from vws.exceptions.vws_exceptions import TooManyRequestsError
+from vws.middleware import Middleware  # noqa: TC001
 from vws.transports import AsyncHTTPXTransport, AsyncTransport
 from vws.vumark_accept import VuMarkAccept  # noqa: TC001
 
@@ -28,6 +31,7 @@ class AsyncVuMarkService:
         base_vws_url: str = "https://vws.vuforia.com",
         request_timeout_seconds: float | tuple[float, float] = 30.0,
         transport: AsyncTransport | None = None,
+        middleware: Sequence[Middleware] = (),
     ) -> None:
         """
         Args:
@@ -41,17 +45,40 @@ class AsyncVuMarkService:
             transport: The async HTTP transport to use for
                 requests. Defaults to
                 ``AsyncHTTPXTransport()``.
+                The client closes this transport when it is
+                closed.
+            middleware: Middleware to send each request
+                through, outermost first. See
+                :mod:`vws.middleware`.
         """
-        self._server_access_key = server_access_key
-        self._server_secret_key = server_secret_key
+        self._signer = Signer(
+            access_key=server_access_key,
+            secret_key=server_secret_key,
+        )
         self._base_vws_url = base_vws_url
         self._request_timeout_seconds = request_timeout_seconds
         self._transport = (
             transport if transport is not None else AsyncHTTPXTransport()
         )
+        self._middleware = tuple(middleware)
+
+    @property
+    def clock_offset_seconds(self) -> float:
+        """The number of seconds which Vuforia's clock was last measured
+        to be ahead of the local clock, or behind it if negative.
+
+        This is measured from the ``Date`` header of each response, and
+        requests are signed with the local time plus this offset.
+        """
+        return self._signer.clock_offset_seconds
 
     async def aclose(self) -> None:
-        """Close the underlying transport if it supports closing."""
+        """Close the transport.
+
+        The client owns its transport, including a transport which was
+        given to it. To share one transport between clients, do not close
+        the clients. Close the transport once none of them is in use.
+        """
         await self._transport.aclose()
 
     async def __aenter__(self) -> Self:
@@ -121,15 +148,18 @@ class AsyncVuMarkService:
 
         response = await async_target_api_request(
             content_type=content_type,
-            server_access_key=self._server_access_key,
-            server_secret_key=self._server_secret_key,
+            signer=self._signer,
             method=HTTPMethod.POST,
             data=request_data,
+            content_md5_hex=None,
             request_path=request_path,
             base_vws_url=self._base_vws_url,
             request_timeout_seconds=(self._request_timeout_seconds),
             extra_headers={"Accept": accept},
             transport=self._transport,
+            middleware=self._middleware,
+            concurrency_limiter=None,
+            rate_limiter=None,
         )
 
         if (
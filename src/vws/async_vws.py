@@ -1,23 +1,31 @@
 """Async tools for interacting with Vuforia APIs."""
 
 import asyncio
-import base64
 import calendar  # noqa: TC003
+import contextlib
 import json
 import time
+from collections.abc import Sequence  # noqa: TC003
 from http import HTTPMethod, HTTPStatus
 from typing import Self
 
 from beartype import BeartypeConf, beartype
 
 from vws._async_vws_request import async_target_api_request
+from vws._downloads import DownloadDestination as _DownloadDestination
+from vws._downloads import async_stream_request, async_write_chunks
 from vws._image_utils import ImageType as _ImageType
-from vws._image_utils import get_image_data as _get_image_data
+from vws._image_utils import open_image_data as _open_image_data
+from vws._image_validation import validate_target_image
 from vws._reco_counts import (
+    raise_for_download_error,
     reco_counts_report_body,
     reco_counts_report_path,
     report_from_download_response,
 )
+from vws._request_bodies import JSONFieldValue, json_body
+from vws._signing import Signer
+from vws.concurrency import AdaptiveConcurrencyLimiter  # noqa: TC001
 from vws.exceptions.base_exceptions import VWSError
 from vws.exceptions.custom_exceptions import (
     RecoCountsReportNotReadyError,
@@ -26,6 +34,12 @@ from vws.exceptions.custom_exceptions import (
     TargetProcessingTimeoutError,
 )
 from vws.exceptions.vws_exceptions import TooManyRequestsError
+from vws.middleware import (
+    Middleware,
+    Request,
+    async_send_with_middleware,
+)
+from vws.rate_limiting import RateLimiter  # noqa: TC001
 from vws.reports import (
     DatabaseSummaryReport,
     RecoCountsReport,
@@ -51,6 +65,10 @@ class AsyncVWS:
         database_id: str | None = None,
         request_timeout_seconds: float | tuple[float, float] = 30.0,
         transport: AsyncTransport | None = None,
+        rate_limiter: RateLimiter | None = None,
+        concurrency_limiter: AdaptiveConcurrencyLimiter | None = None,
+        middleware: Sequence[Middleware] = (),
+        validate_images: bool = False,
     ) -> None:
         """
         Args:
@@ -68,18 +86,57 @@ class AsyncVWS:
             transport: The async HTTP transport to use for
                 requests. Defaults to
                 ``AsyncHTTPXTransport()``.
+                The client closes this transport when it is
+                closed.
+            rate_limiter: A rate limiter to wait for before each
+                request, keyed by the server access key. Share one
+                rate limiter between clients to limit their combined
+                request rate.
+            concurrency_limiter: A limit on the number of requests in
+                flight at once, which each request waits for before it
+                is signed. Share one limiter between clients to limit
+                their combined requests. By default, there is no limit.
+            middleware: Middleware to send each request
+                through, outermost first. See
+                :mod:`vws.middleware`.
+            validate_images: Whether to check target images against
+                Vuforia's documented limits before uploading them,
+                and raise the error which Vuforia would give, without a
+                request. Only the image headers are read.
         """
         self._server_access_key = server_access_key
-        self._server_secret_key = server_secret_key
+        self._signer = Signer(
+            access_key=server_access_key,
+            secret_key=server_secret_key,
+        )
         self._base_vws_url = base_vws_url
         self._database_id = database_id
         self._request_timeout_seconds = request_timeout_seconds
         self._transport = (
             transport if transport is not None else AsyncHTTPXTransport()
         )
+        self._middleware = tuple(middleware)
+        self._validate_images = validate_images
+        self._rate_limiter = rate_limiter
+        self._concurrency_limiter = concurrency_limiter
+
+    @property
+    def clock_offset_seconds(self) -> float:
+        """The number of seconds which Vuforia's clock was last measured
+        to be ahead of the local clock, or behind it if negative.
+
+        This is measured from the ``Date`` header of each response, and
+        requests are signed with the local time plus this offset.
+        """
+        return self._signer.clock_offset_seconds
 
     async def aclose(self) -> None:
-        """Close the underlying transport if it supports closing."""
+        """Close the transport.
+
+        The client owns its transport, including a transport which was
+        given to it. To share one transport between clients, do not close
+        the clients. Close the transport once none of them is in use.
+        """
         await self._transport.aclose()
 
     async def __aenter__(self) -> Self:
@@ -99,6 +156,7 @@ class AsyncVWS:
         expected_result_code: str,
         content_type: str,
         extra_headers: dict[str, str] | None = None,
+        content_md5_hex: str | None = None,
     ) -> Response:
         """Make an async request to the Vuforia Target API.
 
@@ -115,6 +173,9 @@ class AsyncVWS:
             content_type: The content type of the request.
             extra_headers: Additional headers to include in
                 the request.
+            content_md5_hex: The hex MD5 hash of ``data``, if it is
+                already known. Otherwise, ``data`` is hashed to sign
+                the request.
 
         Returns:
             The response to the request.
@@ -130,15 +191,18 @@ class AsyncVWS:
         """
         response = await async_target_api_request(
             content_type=content_type,
-            server_access_key=self._server_access_key,
-            server_secret_key=self._server_secret_key,
+            signer=self._signer,
             method=method,
             data=data,
+            content_md5_hex=content_md5_hex,
             request_path=request_path,
             base_vws_url=self._base_vws_url,
             request_timeout_seconds=self._request_timeout_seconds,
             extra_headers=extra_headers or {},
             transport=self._transport,
+            middleware=self._middleware,
+            concurrency_limiter=self._concurrency_limiter,
+            rate_limiter=self._rate_limiter,
         )
 
         if (
@@ -216,24 +280,26 @@ class AsyncVWS:
             ~vws.exceptions.vws_exceptions.TooManyRequestsError: Vuforia is
                 rate limiting access.
         """
-        image_data = _get_image_data(image=image)
-        image_data_encoded = base64.b64encode(s=image_data).decode(
-            encoding="ascii",
-        )
-
-        data = {
-            "name": name,
-            "width": width,
-            "image": image_data_encoded,
-            "active_flag": active_flag,
-            "application_metadata": application_metadata,
-        }
-
-        content = json.dumps(obj=data).encode(encoding="utf-8")
+        with _open_image_data(image=image) as image_data:
+            if self._validate_images:
+                validate_target_image(
+                    image_data=image_data,
+                    url=self._base_vws_url.rstrip("/") + "/targets",
+                )
+            body = json_body(
+                fields={
+                    "name": name,
+                    "width": width,
+                    "image": image_data,
+                    "active_flag": active_flag,
+                    "application_metadata": application_metadata,
+                },
+            )
 
         response = await self.make_request(
             method=HTTPMethod.POST,
-            data=content,
+            data=body.content,
+            content_md5_hex=body.content_md5_hex,
             request_path="/targets",
             expected_result_code="TargetCreated",
             content_type="application/json",
@@ -534,15 +600,71 @@ class AsyncVWS:
                 The report could not be downloaded. For example, the report's
                 URL may have expired.
         """
-        response = await self._transport(
+
+        async def send(request: Request) -> Response:
+            """Send a request which has been through middleware."""
+            return await self._transport(
+                method=request.method,
+                url=request.url,
+                headers=request.headers,
+                data=request.data,
+                request_timeout=self._request_timeout_seconds,
+            )
+
+        response = await async_send_with_middleware(
+            middleware=self._middleware,
+            request=Request(
+                method=HTTPMethod.GET,
+                url=presigned_url,
+                headers={},
+                data=b"",
+            ),
+            send=send,
+        )
+
+        return report_from_download_response(response=response)
+
+    async def download_reco_counts_report_to_file(
+        self,
+        *,
+        presigned_url: str,
+        file: _DownloadDestination,
+    ) -> None:
+        """Download a requested reco counts report to a file.
+
+        The report is written as it is received, so it is never held in
+        memory all at once. Use :meth:`download_reco_counts_report` to get
+        a parsed report instead.
+
+        Args:
+            presigned_url: The URL of the report, as given by
+                :meth:`request_database_reco_counts_report`.
+            file: The path of a file to write the report's CSV to, or a
+                binary file object to write it to.
+
+        Raises:
+            ~vws.exceptions.custom_exceptions.RecoCountsReportNotReadyError:
+                Vuforia has not finished generating the report.
+            ~vws.exceptions.custom_exceptions.RecoCountsReportDownloadError:
+                The report could not be downloaded. For example, the report's
+                URL may have expired.
+        """
+        async with async_stream_request(
+            transport=self._transport,
             method=HTTPMethod.GET,
             url=presigned_url,
             headers={},
             data=b"",
             request_timeout=self._request_timeout_seconds,
-        )
-
-        return report_from_download_response(response=response)
+        ) as streamed_response:
+            if streamed_response.status_code != HTTPStatus.OK:
+                raise_for_download_error(
+                    response=await streamed_response.aread(),
+                )
+            await async_write_chunks(
+                chunks=streamed_response.aiter_bytes(),
+                destination=file,
+            )
 
     async def wait_for_reco_counts_report(
         self,
@@ -720,7 +842,7 @@ class AsyncVWS:
             ~vws.exceptions.vws_exceptions.TooManyRequestsError: Vuforia is
                 rate limiting access.
         """
-        data: dict[str, str | bool | float | int] = {}
+        data: dict[str, JSONFieldValue] = {}
 
         if name is not None:
             data["name"] = name
@@ -728,24 +850,31 @@ class AsyncVWS:
         if width is not None:
             data["width"] = width
 
-        if image is not None:
-            image_data = _get_image_data(image=image)
-            image_data_encoded = base64.b64encode(
-                s=image_data,
-            ).decode(encoding="ascii")
-            data["image"] = image_data_encoded
+        with contextlib.ExitStack() as stack:
+            if image is not None:
+                image_data = stack.enter_context(
+                    cm=_open_image_data(image=image),
+                )
+                if self._validate_images:
+                    validate_target_image(
+                        image_data=image_data,
+                        url=self._base_vws_url.rstrip("/")
+                        + f"/targets/{target_id}",
+                    )
+                data["image"] = image_data
 
-        if active_flag is not None:
-            data["active_flag"] = active_flag
+            if active_flag is not None:
+                data["active_flag"] = active_flag
 
-        if application_metadata is not None:
-            data["application_metadata"] = application_metadata
+            if application_metadata is not None:
+                data["application_metadata"] = application_metadata
 
-        content = json.dumps(obj=data).encode(encoding="utf-8")
+            body = json_body(fields=data)
 
         await self.make_request(
             method=HTTPMethod.PUT,
-            data=content,
+            data=body.content,
+            content_md5_hex=body.content_md5_hex,
             request_path=f"/targets/{target_id}",
             expected_result_code="Success",
             content_type="application/json",
@@ -0,0 +1,106 @@
+"""Results of querying many images at once, with
+:meth:`vws.CloudRecoService.query_many` and
+:meth:`vws.AsyncCloudRecoService.query_many`.
+"""
+
+import math
+import statistics
+from collections.abc import Sequence  # noqa: TC003
+from dataclasses import dataclass
+
+from beartype import beartype
+
+from vws.reports import QueryResult  # noqa: TC001
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class BatchQueryStatistics:
+    """Throughput and latency of the queries in a batch.
+
+    Latencies are measured for each query, from when it starts, which may
+    be after it waits for a free worker, to when it returns or raises.
+
+    Args:
+        queries: The number of images queried.
+        failures: The number of queries which raised an error.
+        elapsed_seconds: The time taken for the whole batch.
+        queries_per_second: The number of queries made each second, over
+            the whole batch.
+        mean_latency_seconds: The mean latency of a query.
+        median_latency_seconds: The median latency of a query.
+        p95_latency_seconds: The 95th percentile latency of a query.
+        max_latency_seconds: The longest latency of a query.
+    """
+
+    queries: int
+    failures: int
+    elapsed_seconds: float
+    queries_per_second: float
+    mean_latency_seconds: float
+    median_latency_seconds: float
+    p95_latency_seconds: float
+    max_latency_seconds: float
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class BatchQueryResult:
+    """The results of querying a batch of images.
+
+    Args:
+        results: For each image, in the order given, the matching
+            targets, or the error which its query raised.
+        statistics: Throughput and latency of the queries.
+    """
+
+    results: list[list[QueryResult] | Exception]
+    statistics: BatchQueryStatistics
+
+
+@beartype
+def batch_query_statistics(
+    *,
+    latencies_seconds: Sequence[float],
+    failures: int,
+    elapsed_seconds: float,
+) -> BatchQueryStatistics:
+    """Summarize the queries in a batch.
+
+    Args:
+        latencies_seconds: The latency of each query.
+        failures: The number of queries which raised an error.
+        elapsed_seconds: The time taken for the whole batch.
+
+    Returns:
+        Throughput and latency of the queries.
+    """
+    if not latencies_seconds:
+        return BatchQueryStatistics(
+            queries=0,
+            failures=0,
+            elapsed_seconds=elapsed_seconds,
+            queries_per_second=0.0,
+            mean_latency_seconds=0.0,
+            median_latency_seconds=0.0,
+            p95_latency_seconds=0.0,
+            max_latency_seconds=0.0,
+        )
+
+    sorted_latencies = sorted(latencies_seconds)
+    # Nearest-rank percentile.
+    p95_index = math.ceil(0.95 * len(sorted_latencies)) - 1
+    return BatchQueryStatistics(
+        queries=len(sorted_latencies),
+        failures=failures,
+        elapsed_seconds=elapsed_seconds,
+        queries_per_second=(
+            len(sorted_latencies) / elapsed_seconds
+            if elapsed_seconds > 0
+            else 0.0
+        ),
+        mean_latency_seconds=statistics.fmean(data=sorted_latencies),
+        median_latency_seconds=statistics.median(data=sorted_latencies),
+        p95_latency_seconds=sorted_latencies[p95_index],
+        max_latency_seconds=sorted_latencies[-1],
+    )
@@ -0,0 +1,634 @@
+"""Transports which fail fast for hosts which are failing."""
+
+import contextlib
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator  # noqa: TC003
+from dataclasses import dataclass
+from enum import StrEnum, auto, unique
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+import urllib3
+from beartype import BeartypeConf, beartype
+
+from vws._downloads import async_stream_request, stream_request
+from vws.exceptions.custom_exceptions import CircuitOpenError
+from vws.response import (  # noqa: TC001
+    AsyncStreamedResponse,
+    Response,
+    StreamedResponse,
+)
+from vws.transports import AsyncTransport, Transport  # noqa: TC001
+
+# Errors which mean that a request timed out.
+_DEFAULT_FAILURE_EXCEPTIONS: tuple[type[Exception], ...] = (
+    requests.Timeout,
+    httpx.TimeoutException,
+    urllib3.exceptions.TimeoutError,
+)
+
+
+@beartype
+@unique
+class CircuitState(StrEnum):
+    """The state of the circuit for a host."""
+
+    # Requests are made as usual.
+    CLOSED = auto()
+    # Requests fail fast without being made.
+    OPEN = auto()
+    # A limited number of requests are made, to test whether the host
+    # has recovered.
+    HALF_OPEN = auto()
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class CircuitBreakerStatistics:
+    """Counts of what a circuit breaker transport did.
+
+    Args:
+        requests: The number of requests made through the transport,
+            including those which failed fast.
+        failures: The number of requests which got a server error or
+            timed out.
+        rejected: The number of requests which failed fast.
+        opened: The number of times that a circuit was opened.
+        probes: The number of requests let through to test whether a
+            host had recovered.
+    """
+
+    requests: int
+    failures: int
+    rejected: int
+    opened: int
+    probes: int
+
+
+@beartype
+class _HostCircuit:
+    """The state of the circuit for one host."""
+
+    def __init__(self) -> None:
+        """Create a closed circuit."""
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_time = 0.0
+        self.probes_in_flight = 0
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class _CircuitBreaker:
+    """Track the circuit for each host, and decide which requests to make.
+
+    This is shared by the sync and async circuit breaker transports.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        recovery_seconds: float,
+        half_open_max_requests: int,
+        failure_exceptions: tuple[type[Exception], ...],
+    ) -> None:
+        """
+        Args:
+            failure_threshold: The number of failures in a row which open
+                the circuit.
+            recovery_seconds: How long a circuit stays open.
+            half_open_max_requests: The number of requests to let through
+                at once while testing whether a host has recovered.
+            failure_exceptions: The errors which count as failures.
+        """
+        self.failure_exceptions = failure_exceptions
+        self._failure_threshold = failure_threshold
+        self._recovery_seconds = recovery_seconds
+        self._half_open_max_requests = half_open_max_requests
+        self._lock = threading.Lock()
+        self._circuits: dict[str, _HostCircuit] = {}
+        self._requests = 0
+        self._failures = 0
+        self._rejected = 0
+        self._opened = 0
+        self._probes = 0
+
+    def _circuit(self, *, host: str) -> _HostCircuit:
+        """Get the circuit for a host, creating it if needed.
+
+        This must be called with the lock held.
+
+        Args:
+            host: The host.
+
+        Returns:
+            The circuit for the host.
+        """
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = _HostCircuit()
+            self._circuits[host] = circuit
+        return circuit
+
+    def state(self, *, host: str) -> CircuitState:
+        """Get the state of the circuit for a host.
+
+        Args:
+            host: The host.
+
+        Returns:
+            The state of the circuit.
+        """
+        with self._lock:
+            return self._circuit(host=host).state
+
+    def statistics(self) -> CircuitBreakerStatistics:
+        """Get counts of what the circuit breaker did."""
+        with self._lock:
+            return CircuitBreakerStatistics(
+                requests=self._requests,
+                failures=self._failures,
+                rejected=self._rejected,
+                opened=self._opened,
+                probes=self._probes,
+            )
+
+    def before_request(self, *, host: str) -> bool:
+        """Decide whether to make a request.
+
+        Args:
+            host: The host which the request is for.
+
+        Returns:
+            Whether the request is a probe to test whether the host has
+            recovered.
+
+        Raises:
+            CircuitOpenError: The request should fail fast.
+        """
+        with self._lock:
+            self._requests += 1
+            circuit = self._circuit(host=host)
+            if circuit.state == CircuitState.CLOSED:
+                return False
+
+            now = time.monotonic()
+            open_seconds = now - circuit.opened_time
+            if (
+                circuit.state == CircuitState.OPEN
+                and open_seconds >= self._recovery_seconds
+            ):
+                circuit.state = CircuitState.HALF_OPEN
+
+            if (
+                circuit.state == CircuitState.HALF_OPEN
+                and circuit.probes_in_flight < self._half_open_max_requests
+            ):
+                circuit.probes_in_flight += 1
+                self._probes += 1
+                return True
+
+            self._rejected += 1
+            retry_after_seconds = max(
+                0.0,
+                self._recovery_seconds - open_seconds,
+            )
+
+        raise CircuitOpenError(
+            host=host,
+            retry_after_seconds=retry_after_seconds,
+        )
+
+    def after_request(
+        self,
+        *,
+        host: str,
+        is_probe: bool,
+        failed: bool | None,
+    ) -> None:
+        """Update the circuit for a host after a request.
+
+        Args:
+            host: The host which the request was for.
+            is_probe: Whether the request was a probe.
+            failed: Whether the request failed, or ``None`` if it ended
+                with an error which says nothing about the host.
+        """
+        with self._lock:
+            circuit = self._circuit(host=host)
+            if is_probe:
+                circuit.probes_in_flight -= 1
+
+            if failed is None:
+                return
+
+            if not failed:
+                circuit.consecutive_failures = 0
+                if is_probe:
+                    circuit.state = CircuitState.CLOSED
+                return
+
+            self._failures += 1
+            circuit.consecutive_failures += 1
+            # A failed probe opens the circuit again at once.
+            if (
+                is_probe
+                or circuit.consecutive_failures >= self._failure_threshold
+            ) and circuit.state != CircuitState.OPEN:
+                circuit.state = CircuitState.OPEN
+                circuit.opened_time = time.monotonic()
+                self._opened += 1
+
+
+@beartype
+def _is_failure(
+    *,
+    response: Response | StreamedResponse | AsyncStreamedResponse,
+) -> bool:
+    """Whether a response shows that the host is failing.
+
+    Args:
+        response: The response.
+
+    Returns:
+        Whether the response is a server error.
+    """
+    return response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class CircuitBreakerTransport:
+    """A transport which stops making requests to a host for a while
+    after several requests to it fail.
+
+    The circuit for each host is tracked separately, so that, for
+    example, failures of the Cloud Recognition (VWQ) host do not stop
+    requests to the VWS host.
+
+    A request fails if it gets a server error or times out. After
+    ``failure_threshold`` failures in a row, the circuit for the host
+    opens, and requests to the host raise
+    :class:`~vws.exceptions.custom_exceptions.CircuitOpenError` at once,
+    rather than waiting for the request timeout. After
+    ``recovery_seconds``, the circuit is half-open, and up to
+    ``half_open_max_requests`` requests at a time are let through as
+    probes. A probe which succeeds closes the circuit, and one which
+    fails opens it again.
+    """
+
+    def __init__(
+        self,
+        *,
+        transport: Transport,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30.0,
+        half_open_max_requests: int = 1,
+        failure_exceptions: tuple[
+            type[Exception],
+            ...,
+        ] = _DEFAULT_FAILURE_EXCEPTIONS,
+    ) -> None:
+        """Create a ``CircuitBreakerTransport``.
+
+        Args:
+            transport: The transport to make requests with.
+            failure_threshold: The number of failed requests in a row to
+                a host which open its circuit.
+            recovery_seconds: How long a circuit stays open before
+                requests are let through to test whether the host has
+                recovered.
+            half_open_max_requests: The number of requests to let through
+                at once to test whether a host has recovered.
+            failure_exceptions: The errors from ``transport`` which count
+                as failures. By default, these are the timeout errors
+                from the libraries used by the built-in transports.
+        """
+        self._transport = transport
+        self._circuit_breaker = _CircuitBreaker(
+            failure_threshold=failure_threshold,
+            recovery_seconds=recovery_seconds,
+            half_open_max_requests=half_open_max_requests,
+            failure_exceptions=failure_exceptions,
+        )
+
+    @property
+    def statistics(self) -> CircuitBreakerStatistics:
+        """Counts of what this transport did."""
+        return self._circuit_breaker.statistics()
+
+    def state(self, *, host: str) -> CircuitState:
+        """Get the state of the circuit for a host.
+
+        Args:
+            host: The host, for example ``vws.vuforia.com``.
+
+        Returns:
+            The state of the circuit.
+        """
+        return self._circuit_breaker.state(host=host)
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Make an HTTP request, unless the circuit for the host is open.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Returns:
+            The response to the request.
+        """
+        host = urlsplit(url=url).netloc
+        is_probe = self._circuit_breaker.before_request(host=host)
+        try:
+            response = self._transport(
+                method=method,
+                url=url,
+                headers=headers,
+                data=data,
+                request_timeout=request_timeout,
+            )
+        except self._circuit_breaker.failure_exceptions:
+            self._circuit_breaker.after_request(
+                host=host,
+                is_probe=is_probe,
+                failed=True,
+            )
+            raise
+        except BaseException:
+            self._circuit_breaker.after_request(
+                host=host,
+                is_probe=is_probe,
+                failed=None,
+            )
+            raise
+
+        self._circuit_breaker.after_request(
+            host=host,
+            is_probe=is_probe,
+            failed=_is_failure(response=response),
+        )
+        return response
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Iterator[StreamedResponse]:
+        """Make an HTTP request without reading the response body, unless
+        the circuit for the host is open.
+
+        Whether the request failed is decided from its status code,
+        before the body is read. If the wrapped transport cannot stream
+        response bodies, the whole body is read and given as a single
+        chunk.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Yields:
+            The response to the request, with its body not yet read.
+        """
+        host = urlsplit(url=url).netloc
+        is_probe = self._circuit_breaker.before_request(host=host)
+        with contextlib.ExitStack() as stack:
+            try:
+                streamed_response = stack.enter_context(
+                    cm=stream_request(
+                        transport=self._transport,
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        data=data,
+                        request_timeout=request_timeout,
+                    ),
+                )
+            except self._circuit_breaker.failure_exceptions:
+                self._circuit_breaker.after_request(
+                    host=host,
+                    is_probe=is_probe,
+                    failed=True,
+                )
+                raise
+            except BaseException:
+                self._circuit_breaker.after_request(
+                    host=host,
+                    is_probe=is_probe,
+                    failed=None,
+                )
+                raise
+
+            self._circuit_breaker.after_request(
+                host=host,
+                is_probe=is_probe,
+                failed=_is_failure(response=streamed_response),
+            )
+            yield streamed_response
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class AsyncCircuitBreakerTransport:
+    """An async transport which stops making requests to a host for a
+    while after several requests to it fail.
+
+    This works like :class:`CircuitBreakerTransport`.
+    """
+
+    def __init__(
+        self,
+        *,
+        transport: AsyncTransport,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30.0,
+        half_open_max_requests: int = 1,
+        failure_exceptions: tuple[
+            type[Exception],
+            ...,
+        ] = _DEFAULT_FAILURE_EXCEPTIONS,
+    ) -> None:
+        """Create an ``AsyncCircuitBreakerTransport``.
+
+        Args:
+            transport: The transport to make requests with.
+            failure_threshold: The number of failed requests in a row to
+                a host which open its circuit.
+            recovery_seconds: How long a circuit stays open before
+                requests are let through to test whether the host has
+                recovered.
+            half_open_max_requests: The number of requests to let through
+                at once to test whether a host has recovered.
+            failure_exceptions: The errors from ``transport`` which count
+                as failures. By default, these are the timeout errors
+                from the libraries used by the built-in transports.
+        """
+        self._transport = transport
+        self._circuit_breaker = _CircuitBreaker(
+            failure_threshold=failure_threshold,
+            recovery_seconds=recovery_seconds,
+            half_open_max_requests=half_open_max_requests,
+            failure_exceptions=failure_exceptions,
+        )
+
+    @property
+    def statistics(self) -> CircuitBreakerStatistics:
+        """Counts of what this transport did."""
+        return self._circuit_breaker.statistics()
+
+    def state(self, *, host: str) -> CircuitState:
+        """Get the state of the circuit for a host.
+
+        Args:
+            host: The host, for example ``vws.vuforia.com``.
+
+        Returns:
+            The state of the circuit.
+        """
+        return self._circuit_breaker.state(host=host)
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.aclose()
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Make an async HTTP request, unless the circuit for the host is
+        open.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Returns:
+            The response to the request.
+        """
+        host = urlsplit(url=url).netloc
+        is_probe = self._circuit_breaker.before_request(host=host)
+        try:
+            response = await self._transport(
+                method=method,
+                url=url,
+                headers=headers,
+                data=data,
+                request_timeout=request_timeout,
+            )
+        except self._circuit_breaker.failure_exceptions:
+            self._circuit_breaker.after_request(
+                host=host,
+                is_probe=is_probe,
+                failed=True,
+            )
+            raise
+        except BaseException:
+            self._circuit_breaker.after_request(
+                host=host,
+                is_probe=is_probe,
+                failed=None,
+            )
+            raise
+
+        self._circuit_breaker.after_request(
+            host=host,
+            is_probe=is_probe,
+            failed=_is_failure(response=response),
+        )
+        return response
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> AsyncIterator[AsyncStreamedResponse]:
+        """Make an async HTTP request without reading the response body, unless
+        the circuit for the host is open.
+
+        Whether the request failed is decided from its status code,
+        before the body is read. If the wrapped transport cannot stream
+        response bodies, the whole body is read and given as a single
+        chunk.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Yields:
+            The response to the request, with its body not yet read.
+        """
+        host = urlsplit(url=url).netloc
+        is_probe = self._circuit_breaker.before_request(host=host)
+        async with contextlib.AsyncExitStack() as stack:
+            try:
+                streamed_response = await stack.enter_async_context(
+                    cm=async_stream_request(
+                        transport=self._transport,
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        data=data,
+                        request_timeout=request_timeout,
+                    ),
+                )
+            except self._circuit_breaker.failure_exceptions:
+                self._circuit_breaker.after_request(
+                    host=host,
+                    is_probe=is_probe,
+                    failed=True,
+                )
+                raise
+            except BaseException:
+                self._circuit_breaker.after_request(
+                    host=host,
+                    is_probe=is_probe,
+                    failed=None,
+                )
+                raise
+
+            self._circuit_breaker.after_request(
+                host=host,
+                is_probe=is_probe,
+                failed=_is_failure(response=streamed_response),
+            )
+            yield streamed_response
@@ -0,0 +1,294 @@
+"""Limits which adapt the number of requests made at once."""
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable  # noqa: TC003
+from dataclasses import dataclass
+from http import HTTPStatus
+
+import httpx
+import requests
+import urllib3
+from beartype import BeartypeConf, beartype
+
+from vws.response import Response  # noqa: TC001
+
+# Errors which mean that a request timed out or could not be completed,
+# which suggests that the server or the network is overloaded.
+_DEFAULT_OVERLOAD_EXCEPTIONS: tuple[type[Exception], ...] = (
+    TimeoutError,
+    requests.ConnectionError,
+    requests.Timeout,
+    httpx.TransportError,
+    urllib3.exceptions.HTTPError,
+)
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class ConcurrencyStatistics:
+    """The state of an adaptive concurrency limit.
+
+    Args:
+        window: The number of requests which may currently be in flight
+            at once. Only the whole part is used.
+        in_flight: The number of requests in flight.
+        requests: The number of requests made within the limit.
+        overloaded_responses: The number of responses which showed that
+            the server was overloaded.
+        overload_errors: The number of requests which timed out or
+            failed with a connection error.
+        decreases: The number of times that the window was cut.
+        max_window: The largest window so far.
+        wait_seconds: The total number of seconds which requests waited
+            for room in the window.
+    """
+
+    window: float
+    in_flight: int
+    requests: int
+    overloaded_responses: int
+    overload_errors: int
+    decreases: int
+    max_window: float
+    wait_seconds: float
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class AdaptiveConcurrencyLimiter:
+    """A limit on the number of requests in flight at once, which adapts
+    to the server.
+
+    Give this to an async client as its ``concurrency_limiter``. This is
+    useful when running many requests with ``asyncio.gather``, in place
+    of a fixed-size semaphore. A request waits for room in the limit
+    before it is signed, so that a long wait does not make its ``Date``
+    header stale. The limit, or window, is changed with additive
+    increase and multiplicative decrease:
+
+    * Each response which is quick and not an error adds
+      ``additive_increase / window`` to the window, so that the window
+      grows by about ``additive_increase`` each time a whole window of
+      requests succeeds.
+    * A ``429 Too Many Requests`` response, a server error, or a
+      request which times out or fails with a connection error
+      multiplies the window by ``decrease_factor``. Requests which were
+      already in flight when the window was cut do not cut it again, so
+      that a burst of errors caused by one overload counts once.
+
+    A response is quick if it took at most ``latency_tolerance`` times
+    as long as the quickest of the last ``latency_window_size``
+    responses. Only recent responses are compared, so that one unusually
+    quick response does not stop the window from growing for good. A
+    slow response leaves the window as it is, as it suggests that
+    requests are queueing at the server.
+
+    This does not retry requests. To retry requests which get a ``429``
+    response, give the client an
+    :class:`~vws.retries.AsyncRetryingTransport`.
+
+    One limiter can be shared between clients which use the same event
+    loop, so that their combined requests are limited.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_window: float = 4.0,
+        min_window: float = 1.0,
+        max_window: float = 64.0,
+        additive_increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_window_size: int = 100,
+        overload_exceptions: tuple[
+            type[Exception],
+            ...,
+        ] = _DEFAULT_OVERLOAD_EXCEPTIONS,
+    ) -> None:
+        """Create an ``AdaptiveConcurrencyLimiter``.
+
+        Args:
+            initial_window: The number of requests which may be in
+                flight at once to begin with.
+            min_window: The smallest window. This must be at least 1.
+            max_window: The largest window.
+            additive_increase: The amount which the window grows by for
+                each window of requests which succeed.
+            decrease_factor: The number which the window is multiplied
+                by when the server is overloaded.
+            latency_tolerance: How many times longer than the quickest
+                recent response a response may take and still grow the
+                window.
+            latency_window_size: The number of recent response latencies
+                to find the quickest response among.
+            overload_exceptions: The errors which show that the server
+                is overloaded. By default, these are timeouts and
+                connection errors from the libraries used by the
+                built-in transports.
+        """
+        self._min_window = min_window
+        self._max_window = max_window
+        self._additive_increase = additive_increase
+        self._decrease_factor = decrease_factor
+        self._latency_tolerance = latency_tolerance
+        self._overload_exceptions = overload_exceptions
+        self._window = min(max(initial_window, min_window), max_window)
+        # Requests waiting for room in the window, first come first
+        # served. A waiter's future is set once room is taken for it.
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._in_flight = 0
+        self._latencies: deque[float] = deque(maxlen=latency_window_size)
+        # Requests which started before this time do not cut the window.
+        self._last_decrease_time = float("-inf")
+        self._requests = 0
+        self._overloaded_responses = 0
+        self._overload_errors = 0
+        self._decreases = 0
+        self._largest_window = self._window
+        self._wait_seconds = 0.0
+
+    @property
+    def window(self) -> float:
+        """The number of requests which may currently be in flight at
+        once.
+        """
+        return self._window
+
+    @property
+    def statistics(self) -> ConcurrencyStatistics:
+        """The state of the window, and counts of what changed it."""
+        return ConcurrencyStatistics(
+            window=self._window,
+            in_flight=self._in_flight,
+            requests=self._requests,
+            overloaded_responses=self._overloaded_responses,
+            overload_errors=self._overload_errors,
+            decreases=self._decreases,
+            max_window=self._largest_window,
+            wait_seconds=self._wait_seconds,
+        )
+
+    def _wake_waiters(self) -> None:
+        """Take room in the window for as many waiting requests as fit."""
+        while self._waiters and self._in_flight < int(self._window):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    async def _acquire(self) -> None:
+        """Wait until there is room in the window, and take it."""
+        if not self._waiters and self._in_flight < int(self._window):
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                # The waiter may already have been passed over by
+                # ``_wake_waiters``.
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+            else:
+                # Room was taken for this request just as it was
+                # cancelled, so give the room to another request.
+                self._in_flight -= 1
+                self._wake_waiters()
+            raise
+
+    def _decrease_window(self, *, start_time: float) -> None:
+        """Cut the window after a sign that the server is overloaded,
+        unless it was cut after the request started.
+
+        Args:
+            start_time: When the request was sent.
+        """
+        if start_time > self._last_decrease_time:
+            self._window = max(
+                self._min_window,
+                self._window * self._decrease_factor,
+            )
+            self._last_decrease_time = time.monotonic()
+            self._decreases += 1
+
+    def _update_window(
+        self,
+        *,
+        response: Response,
+        start_time: float,
+        latency_seconds: float,
+    ) -> None:
+        """Change the window after a response.
+
+        Args:
+            response: The response.
+            start_time: When the request was sent.
+            latency_seconds: How long the request took.
+        """
+        overloaded = (
+            response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+            or response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+        if overloaded:
+            self._overloaded_responses += 1
+            self._decrease_window(start_time=start_time)
+            return
+
+        self._latencies.append(latency_seconds)
+        quick = (
+            latency_seconds <= min(self._latencies) * self._latency_tolerance
+        )
+        if quick:
+            self._window = min(
+                self._max_window,
+                self._window + self._additive_increase / self._window,
+            )
+            self._largest_window = max(self._largest_window, self._window)
+
+    async def limit(
+        self,
+        *,
+        make_request: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """Make a request once there is room in the window, and change
+        the window according to how the request went.
+
+        Args:
+            make_request: A function which signs and sends the request.
+
+        Returns:
+            The response to the request.
+        """
+        wait_start_time = time.monotonic()
+        await self._acquire()
+        self._requests += 1
+        start_time = time.monotonic()
+        self._wait_seconds += start_time - wait_start_time
+
+        try:
+            response = await make_request()
+        except self._overload_exceptions:
+            self._in_flight -= 1
+            self._overload_errors += 1
+            self._decrease_window(start_time=start_time)
+            self._wake_waiters()
+            raise
+        except BaseException:
+            self._in_flight -= 1
+            self._wake_waiters()
+            raise
+
+        self._in_flight -= 1
+        self._update_window(
+            response=response,
+            start_time=start_time,
+            latency_seconds=time.monotonic() - start_time,
+        )
+        self._wake_waiters()
+        return response
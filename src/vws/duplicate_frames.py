@@ -0,0 +1,302 @@
+"""Skip Cloud Recognition queries for frames which are nearly the same as
+a recently queried frame.
+
+Consecutive frames from a camera are often nearly identical. Each frame
+is given a cheap perceptual fingerprint, a difference hash of a small
+grayscale copy of the image. When the fingerprint is within a chosen
+Hamming distance of the fingerprint of a recently queried frame, the
+results of that frame are used instead of making a query.
+
+This needs the ``frames`` extra, installed with
+``pip install vws-python[frames]``.
+"""
+
+import io
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+from beartype import BeartypeConf, beartype
+from PIL import Image
+
+from vws._image_utils import ImageType as _ImageType
+from vws._image_utils import open_image_data as _open_image_data
+from vws.async_query import AsyncCloudRecoService  # noqa: TC001
+from vws.include_target_data import CloudRecoIncludeTargetData
+from vws.query import CloudRecoService  # noqa: TC001
+from vws.reports import QueryResult  # noqa: TC001
+
+# Fingerprints have ``_HASH_SIZE * _HASH_SIZE`` bits.
+_HASH_SIZE = 8
+
+
+@beartype
+def image_fingerprint(
+    *,
+    image_data: bytes | memoryview,
+) -> npt.NDArray[np.bool_]:
+    """Get the perceptual fingerprint of an image.
+
+    Similar images have fingerprints which differ in few bits.
+
+    Args:
+        image_data: A JPEG or PNG image.
+
+    Returns:
+        For each pixel of a small grayscale copy of the image, whether it
+        is brighter than the pixel to its left.
+    """
+    with Image.open(fp=io.BytesIO(initial_bytes=image_data)) as image:
+        # Decode JPEG images at a reduced size, which is much faster.
+        image.draft(mode="L", size=(_HASH_SIZE * 4, _HASH_SIZE * 4))
+        small_image = image.convert(mode="L").resize(
+            size=(_HASH_SIZE + 1, _HASH_SIZE),
+            resample=Image.Resampling.BOX,
+        )
+    pixels = np.frombuffer(
+        buffer=small_image.tobytes(),
+        dtype=np.uint8,
+    ).reshape(_HASH_SIZE, _HASH_SIZE + 1)
+    return (pixels[:, 1:] > pixels[:, :-1]).ravel()
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class DuplicateFrameStatistics:
+    """Counts of the frames given to a duplicate frame filter.
+
+    Args:
+        frames: The number of frames given.
+        skipped: The number of frames whose query was skipped, because
+            they were near duplicates of a recently queried frame.
+    """
+
+    frames: int
+    skipped: int
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class _QueriedFrame:
+    """A recently queried frame.
+
+    Args:
+        client: The client which made the query.
+        max_num_results: The ``max_num_results`` of the query.
+        include_target_data: The ``include_target_data`` of the query.
+        queried_at: The ``time.monotonic()`` time of the query.
+        results: The results of the query.
+    """
+
+    client: CloudRecoService | AsyncCloudRecoService
+    max_num_results: int
+    include_target_data: CloudRecoIncludeTargetData
+    queried_at: float
+    results: tuple[QueryResult, ...]
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class DuplicateFrameFilter:
+    """Query frames, skipping frames which are near duplicates of a
+    recently queried frame.
+
+    A filter can be shared between threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_distance: int = 4,
+        history_size: int = 16,
+        max_age_seconds: float = 5.0,
+    ) -> None:
+        """Create a ``DuplicateFrameFilter``.
+
+        Args:
+            max_distance: The largest number of fingerprint bits, out of
+                64, in which a frame can differ from a recently queried
+                frame to be treated as a duplicate of it. With 0, only
+                frames with identical fingerprints are skipped.
+            history_size: The number of recently queried frames to
+                compare each frame with.
+            max_age_seconds: How long the results of a query can be used
+                for other frames.
+        """
+        self._max_distance = max_distance
+        self._max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        # The fingerprints of recently queried frames, one in each row,
+        # so that a frame is compared with all of them at once. The
+        # oldest row is replaced first.
+        self._fingerprints = np.zeros(
+            shape=(history_size, _HASH_SIZE * _HASH_SIZE),
+            dtype=np.bool_,
+        )
+        self._queried_frames: list[_QueriedFrame | None] = [
+            None,
+        ] * history_size
+        self._next_index = 0
+        self._frames = 0
+        self._skipped = 0
+
+    @property
+    def statistics(self) -> DuplicateFrameStatistics:
+        """Counts of the frames given to this filter."""
+        with self._lock:
+            return DuplicateFrameStatistics(
+                frames=self._frames,
+                skipped=self._skipped,
+            )
+
+    def _lookup(
+        self,
+        *,
+        client: CloudRecoService | AsyncCloudRecoService,
+        fingerprint: npt.NDArray[np.bool_],
+        max_num_results: int,
+        include_target_data: CloudRecoIncludeTargetData,
+    ) -> list[QueryResult] | None:
+        """Get the results of the closest recently queried frame which
+        the given frame is a duplicate of, if there is one.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._frames += 1
+            distances: npt.NDArray[np.intp] = np.count_nonzero(
+                a=self._fingerprints != fingerprint,
+                axis=1,
+            )
+            for index in np.argsort(a=distances, kind="stable"):
+                if distances[index] > self._max_distance:
+                    break
+                queried_frame = self._queried_frames[index]
+                if (
+                    queried_frame is not None
+                    and queried_frame.client is client
+                    and queried_frame.max_num_results == max_num_results
+                    and queried_frame.include_target_data
+                    == include_target_data
+                    and now - queried_frame.queried_at < self._max_age_seconds
+                ):
+                    self._skipped += 1
+                    return list(queried_frame.results)
+        return None
+
+    def _remember(
+        self,
+        *,
+        fingerprint: npt.NDArray[np.bool_],
+        queried_frame: _QueriedFrame,
+    ) -> None:
+        """Remember a queried frame, replacing the oldest."""
+        with self._lock:
+            self._fingerprints[self._next_index] = fingerprint
+            self._queried_frames[self._next_index] = queried_frame
+            self._next_index = (self._next_index + 1) % len(
+                self._queried_frames,
+            )
+
+    def query(
+        self,
+        *,
+        client: CloudRecoService,
+        image: _ImageType,
+        max_num_results: int = 1,
+        include_target_data: CloudRecoIncludeTargetData = (
+            CloudRecoIncludeTargetData.TOP
+        ),
+    ) -> list[QueryResult]:
+        """Query a frame, unless it is a near duplicate of a recently
+        queried frame.
+
+        Args:
+            client: The client to query with.
+            image: The frame.
+            max_num_results: See :meth:`vws.CloudRecoService.query`.
+            include_target_data: See :meth:`vws.CloudRecoService.query`.
+
+        Returns:
+            The matching targets of the frame, or of the recently queried
+            frame which it is a near duplicate of.
+        """
+        with _open_image_data(image=image) as image_data:
+            fingerprint = image_fingerprint(image_data=image_data)
+            cached_results = self._lookup(
+                client=client,
+                fingerprint=fingerprint,
+                max_num_results=max_num_results,
+                include_target_data=include_target_data,
+            )
+            if cached_results is not None:
+                return cached_results
+
+            results = client.query(
+                image=image_data,
+                max_num_results=max_num_results,
+                include_target_data=include_target_data,
+            )
+        self._remember(
+            fingerprint=fingerprint,
+            queried_frame=_QueriedFrame(
+                client=client,
+                max_num_results=max_num_results,
+                include_target_data=include_target_data,
+                queried_at=time.monotonic(),
+                results=tuple(results),
+            ),
+        )
+        return results
+
+    async def aquery(
+        self,
+        *,
+        client: AsyncCloudRecoService,
+        image: _ImageType,
+        max_num_results: int = 1,
+        include_target_data: CloudRecoIncludeTargetData = (
+            CloudRecoIncludeTargetData.TOP
+        ),
+    ) -> list[QueryResult]:
+        """Query a frame asynchronously, unless it is a near duplicate of
+        a recently queried frame.
+
+        Args:
+            client: The client to query with.
+            image: The frame.
+            max_num_results: See :meth:`vws.AsyncCloudRecoService.query`.
+            include_target_data: See
+                :meth:`vws.AsyncCloudRecoService.query`.
+
+        Returns:
+            The matching targets of the frame, or of the recently queried
+            frame which it is a near duplicate of.
+        """
+        with _open_image_data(image=image) as image_data:
+            fingerprint = image_fingerprint(image_data=image_data)
+            cached_results = self._lookup(
+                client=client,
+                fingerprint=fingerprint,
+                max_num_results=max_num_results,
+                include_target_data=include_target_data,
+            )
+            if cached_results is not None:
+                return cached_results
+
+            results = await client.query(
+                image=image_data,
+                max_num_results=max_num_results,
+                include_target_data=include_target_data,
+            )
+        self._remember(
+            fingerprint=fingerprint,
+            queried_frame=_QueriedFrame(
+                client=client,
+                max_num_results=max_num_results,
+                include_target_data=include_target_data,
+                queried_at=time.monotonic(),
+                results=tuple(results),
+            ),
+        )
+        return results
@@ -105,3 +105,68 @@ class ServerError(Exception):  # pragma: no cover
     def response(self) -> Response:
         """The response returned by Vuforia which included this error."""
         return self._response
+
+
+@beartype
+class CircuitOpenError(Exception):
+    """Exception raised when a request is not made because recent
+    requests to the same host failed.
+
+    This is raised by a circuit breaker transport instead of waiting for
+    a host which is likely to fail.
+    """
+
+    def __init__(self, *, host: str, retry_after_seconds: float) -> None:
+        """
+        Args:
+            host: The host which the request was for.
+            retry_after_seconds: The number of seconds until a request to
+                the host will be let through to test whether it has
+                recovered.
+        """
+        super().__init__(
+            f"Requests to {host} are failing fast. A request will be let "
+            f"through in {retry_after_seconds:.1f} seconds.",
+        )
+        self._host = host
+        self._retry_after_seconds = retry_after_seconds
+
+    @property
+    def host(self) -> str:
+        """The host which the request was for."""
+        return self._host
+
+    @property
+    def retry_after_seconds(self) -> float:
+        """The number of seconds until a request to the host will be let
+        through.
+        """
+        return self._retry_after_seconds
+
+
+@beartype
+class UnrecordedRequestError(Exception):
+    """Exception raised when a replay transport is asked to make a request
+    for which no response was recorded, or for which all recorded
+    responses have been used.
+    """
+
+    def __init__(self, *, method: str, path: str) -> None:
+        """
+        Args:
+            method: The HTTP method of the request.
+            path: The path of the request.
+        """
+        super().__init__(f"No recorded response for {method} {path}.")
+        self._method = method
+        self._path = path
+
+    @property
+    def method(self) -> str:
+        """The HTTP method of the request."""
+        return self._method
+
+    @property
+    def path(self) -> str:
+        """The path of the request."""
+        return self._path
@@ -0,0 +1,449 @@
+"""Hedged requests, which cut the tail latency of slow requests.
+
+A hedged request is sent once, and sent again if no response arrives
+within a delay. Whichever response arrives first is used. The delay is a
+high percentile of recent latencies, so that only the slowest requests
+are sent twice.
+"""
+
+import asyncio
+import concurrent.futures
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import (  # noqa: TC003
+    Awaitable,
+    Callable,
+    Sequence,
+)
+from collections.abc import Set as AbstractSet  # noqa: TC003
+from dataclasses import dataclass
+from typing import Self
+
+from beartype import BeartypeConf, beartype
+
+from vws.response import Response  # noqa: TC001
+from vws.transports import AsyncTransport, Transport  # noqa: TC001
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class HedgingStatistics:
+    """Counts of the hedged requests made with a hedging policy.
+
+    Args:
+        requests: The number of requests made with the policy.
+        hedges: The number of requests which were sent a second time
+            because the first attempt was slow.
+        hedge_wins: The number of those requests for which the second
+            attempt gave the response which was used.
+        delay_seconds: The current delay before a second attempt.
+    """
+
+    requests: int
+    hedges: int
+    hedge_wins: int
+    delay_seconds: float
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class HedgingPolicy:
+    """Decide when to send a slow request again, and make hedged
+    requests.
+
+    Only use hedging for requests which are safe to repeat, such as
+    Cloud Recognition queries. A hedging policy can be shared between
+    clients, and between threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 95.0,
+        window_size: int = 200,
+        min_samples: int = 20,
+        initial_delay_seconds: float = 1.0,
+        min_delay_seconds: float = 0.05,
+        max_workers: int = 8,
+    ) -> None:
+        """Create a ``HedgingPolicy``.
+
+        Args:
+            percentile: The percentile of recent latencies to wait for
+                before sending a request again. For example, with 95, about
+                one request in 20 is sent twice.
+            window_size: The number of recent latencies to keep.
+            min_samples: The number of latencies needed before the delay
+                is worked out from them. Until then,
+                ``initial_delay_seconds`` is used.
+            initial_delay_seconds: The delay to use until enough
+                latencies are known.
+            min_delay_seconds: The shortest delay, so that a burst of
+                quick responses does not cause every request to be sent
+                twice.
+            max_workers: The number of threads used to make sync hedged
+                requests. Each sync hedged request uses up to two. A
+                sync request which is made while all of the threads are
+                in use is made on the calling thread, and is not hedged.
+        """
+        self._percentile = percentile
+        self._min_samples = min_samples
+        self._initial_delay_seconds = initial_delay_seconds
+        self._min_delay_seconds = min_delay_seconds
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window_size)
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        # Threads in the executor which are not in use. Attempts are not
+        # queued for threads, so that the executor does not limit how
+        # many sync requests are made at once.
+        self._free_workers = threading.BoundedSemaphore(value=max_workers)
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    @property
+    def statistics(self) -> HedgingStatistics:
+        """Counts of the hedged requests made with this policy."""
+        delay_seconds = self.delay_seconds()
+        with self._lock:
+            return HedgingStatistics(
+                requests=self._requests,
+                hedges=self._hedges,
+                hedge_wins=self._hedge_wins,
+                delay_seconds=delay_seconds,
+            )
+
+    def close(self) -> None:
+        """Stop the threads used for sync hedged requests.
+
+        Requests still being made are left to finish in the background.
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        """Exit the context manager and stop the threads used for sync
+        hedged requests.
+        """
+        self.close()
+
+    def delay_seconds(self) -> float:
+        """Get the number of seconds to wait for a response before
+        sending a request again.
+
+        Returns:
+            The chosen percentile of recent latencies, or the initial
+            delay if too few latencies are known.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self._min_samples:
+            return self._initial_delay_seconds
+
+        rank = math.ceil(self._percentile / 100 * len(latencies))
+        index = min(len(latencies), max(rank, 1)) - 1
+        return max(self._min_delay_seconds, latencies[index])
+
+    def record_latency(self, *, latency_seconds: float) -> None:
+        """Record how long a request took.
+
+        Args:
+            latency_seconds: How long the request took.
+        """
+        with self._lock:
+            self._latencies.append(latency_seconds)
+
+    def _record_result(
+        self,
+        *,
+        hedged: bool,
+        hedge_won: bool,
+        latency_seconds: float | None,
+    ) -> None:
+        """Record the result of a hedged request.
+
+        Args:
+            hedged: Whether the request was sent a second time.
+            hedge_won: Whether the second attempt gave the response which
+                was used.
+            latency_seconds: How long it took from when the request was
+                first sent to when the response which was used arrived,
+                or ``None`` if no response was used.
+        """
+        with self._lock:
+            self._requests += 1
+            self._hedges += int(hedged)
+            self._hedge_wins += int(hedge_won)
+            if latency_seconds is not None:
+                self._latencies.append(latency_seconds)
+
+    def _submit(
+        self,
+        *,
+        attempt: Callable[[], Response],
+    ) -> concurrent.futures.Future[Response] | None:
+        """Make an attempt on one of the threads used for sync hedged
+        requests, starting them if needed.
+
+        Args:
+            attempt: A function which makes the attempt.
+
+        Returns:
+            The attempt, or ``None`` if all of the threads are in use.
+        """
+        if not self._free_workers.acquire(blocking=False):
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="vws-hedging",
+                )
+            future = self._executor.submit(attempt)
+
+        def free_worker(_: concurrent.futures.Future[Response]) -> None:
+            """Free the thread which the attempt was made on."""
+            self._free_workers.release()
+
+        future.add_done_callback(fn=free_worker)
+        return future
+
+    def _first_response(
+        self,
+        *,
+        attempts: Sequence[
+            concurrent.futures.Future[Response] | asyncio.Task[Response]
+        ],
+        done: AbstractSet[
+            concurrent.futures.Future[Response] | asyncio.Task[Response]
+        ],
+        pending: AbstractSet[
+            concurrent.futures.Future[Response] | asyncio.Task[Response]
+        ],
+        start_time: float,
+    ) -> Response | None:
+        """Get the response of the first successful attempt which is
+        done, and record the result of the request.
+
+        Args:
+            attempts: The attempts, first attempt first.
+            done: The attempts which have finished since this was last
+                called.
+            pending: The attempts which have not finished.
+            start_time: When the first attempt was made.
+
+        Returns:
+            The response, or ``None`` if no attempt has succeeded and some
+            have not finished.
+        """
+        hedged = len(attempts) > 1
+        for attempt in attempts:
+            if attempt in done and attempt.exception() is None:
+                self._record_result(
+                    hedged=hedged,
+                    hedge_won=attempt is not attempts[0],
+                    latency_seconds=time.monotonic() - start_time,
+                )
+                return attempt.result()
+        if pending:
+            return None
+        self._record_result(
+            hedged=hedged,
+            hedge_won=False,
+            latency_seconds=None,
+        )
+        # Every attempt failed, so this raises the error from the first
+        # attempt.
+        return attempts[0].result()
+
+    def request(
+        self,
+        *,
+        transport: Transport,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+        before_hedge: Callable[[], None] | None = None,
+    ) -> Response:
+        """Make an HTTP request, and make it again if it is slow.
+
+        Both attempts are made on threads, so that whichever response
+        arrives first can be used. A sync attempt cannot be stopped once
+        it has started, so the slower attempt is left to finish in the
+        background and its response is dropped. If all of the threads
+        are in use, the request is made once, on the calling thread.
+
+        Args:
+            transport: The transport to make the request with.
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+            before_hedge: A function to call before the second attempt is
+                made, for example to wait for a rate limiter.
+
+        Returns:
+            The first successful response. If both attempts fail, the
+            error from the first attempt is raised.
+        """
+
+        def attempt() -> Response:
+            """Make the request once."""
+            return transport(
+                method=method,
+                url=url,
+                headers=headers,
+                data=data,
+                request_timeout=request_timeout,
+            )
+
+        def hedge_attempt() -> Response:
+            """Make the request a second time."""
+            if before_hedge is not None:
+                before_hedge()
+            return attempt()
+
+        start_time = time.monotonic()
+        first_future = self._submit(attempt=attempt)
+        if first_future is None:
+            try:
+                response = attempt()
+            except BaseException:
+                self._record_result(
+                    hedged=False,
+                    hedge_won=False,
+                    latency_seconds=None,
+                )
+                raise
+            self._record_result(
+                hedged=False,
+                hedge_won=False,
+                latency_seconds=time.monotonic() - start_time,
+            )
+            return response
+
+        futures = [first_future]
+        done, pending = concurrent.futures.wait(
+            fs=futures,
+            timeout=self.delay_seconds(),
+        )
+        if pending:
+            hedge_future = self._submit(attempt=hedge_attempt)
+            if hedge_future is not None:
+                futures.append(hedge_future)
+                pending.add(hedge_future)
+
+        try:
+            first_response = self._first_response(
+                attempts=futures,
+                done=done,
+                pending=pending,
+                start_time=start_time,
+            )
+            while first_response is None:
+                done, pending = concurrent.futures.wait(
+                    fs=pending,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                first_response = self._first_response(
+                    attempts=futures,
+                    done=done,
+                    pending=pending,
+                    start_time=start_time,
+                )
+            return first_response
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def arequest(
+        self,
+        *,
+        transport: AsyncTransport,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+        before_hedge: Callable[[], Awaitable[None]] | None = None,
+    ) -> Response:
+        """Make an async HTTP request, and make it again if it is slow.
+
+        The slower attempt is cancelled once a response is used.
+
+        Args:
+            transport: The transport to make the request with.
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+            before_hedge: A function to call before the second attempt is
+                made, for example to wait for a rate limiter.
+
+        Returns:
+            The first successful response. If both attempts fail, the
+            error from the first attempt is raised.
+        """
+
+        async def attempt() -> Response:
+            """Make the request once."""
+            return await transport(
+                method=method,
+                url=url,
+                headers=headers,
+                data=data,
+                request_timeout=request_timeout,
+            )
+
+        async def hedge_attempt() -> Response:
+            """Make the request a second time."""
+            if before_hedge is not None:
+                await before_hedge()
+            return await attempt()
+
+        start_time = time.monotonic()
+        tasks = [asyncio.create_task(coro=attempt())]
+        pending: set[asyncio.Task[Response]] = set(tasks)
+        try:
+            done, pending = await asyncio.wait(
+                fs=pending,
+                timeout=self.delay_seconds(),
+            )
+            if pending:
+                tasks.append(asyncio.create_task(coro=hedge_attempt()))
+                pending.add(tasks[-1])
+
+            response = self._first_response(
+                attempts=tasks,
+                done=done,
+                pending=pending,
+                start_time=start_time,
+            )
+            while response is None:
+                done, pending = await asyncio.wait(
+                    fs=pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                response = self._first_response(
+                    attempts=tasks,
+                    done=done,
+                    pending=pending,
+                    start_time=start_time,
+                )
+            return response
+        finally:
+            for task in pending:
+                task.cancel()
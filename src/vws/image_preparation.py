@@ -0,0 +1,157 @@
+"""Shrink query images before they are uploaded.
+
+Photos from phone cameras are often far larger than a Cloud
+Recognition query needs. A :class:`QueryImagePreparer` can be given as
+the ``image_preparer`` of :class:`vws.CloudRecoService` or
+:class:`vws.AsyncCloudRecoService`. It resizes large images and
+re-encodes them as JPEG files, which are quicker to upload and are less
+likely to be rejected as too large.
+
+This needs the ``images`` extra, installed with
+``pip install vws-python[images]``.
+"""
+
+import io
+import threading
+import time
+from dataclasses import dataclass
+
+from beartype import beartype
+from PIL import Image, ImageOps
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class ImagePreparationStatistics:
+    """Counts of the images prepared by a query image preparer.
+
+    Args:
+        images: The number of images given to the preparer.
+        reencoded: The number of images which were resized or re-encoded,
+            with a smaller result.
+        bytes_saved: The total number of bytes by which images were made
+            smaller.
+        cpu_seconds: The CPU time spent preparing images.
+    """
+
+    images: int
+    reencoded: int
+    bytes_saved: int
+    cpu_seconds: float
+
+
+@beartype
+class QueryImagePreparer:
+    """Resize and re-encode large query images.
+
+    An image is re-encoded if it is larger than ``max_dimension`` in some
+    dimension, or if its file is larger than ``max_bytes``. The original
+    image is used if re-encoding does not make it smaller. A preparer
+    can be shared between clients, and between threads.
+
+    Re-encoded images do not keep EXIF metadata, so any EXIF orientation
+    is applied to the pixels first, as a phone camera photo is often
+    stored on its side.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_dimension: int = 1024,
+        max_bytes: int = 512 * 1024,
+        jpeg_quality: int = 85,
+    ) -> None:
+        """Create a ``QueryImagePreparer``.
+
+        Args:
+            max_dimension: The largest width or height of an image to
+                upload. Larger images are scaled down to fit, keeping
+                their aspect ratio.
+            max_bytes: The largest image file to upload without
+                re-encoding it.
+            jpeg_quality: The JPEG quality to re-encode images with, from
+                1 to 95.
+        """
+        self._max_dimension = max_dimension
+        self._max_bytes = max_bytes
+        self._jpeg_quality = jpeg_quality
+        self._lock = threading.Lock()
+        self._images = 0
+        self._reencoded = 0
+        self._bytes_saved = 0
+        self._cpu_seconds = 0.0
+
+    @property
+    def statistics(self) -> ImagePreparationStatistics:
+        """Counts of the images prepared by this preparer."""
+        with self._lock:
+            return ImagePreparationStatistics(
+                images=self._images,
+                reencoded=self._reencoded,
+                bytes_saved=self._bytes_saved,
+                cpu_seconds=self._cpu_seconds,
+            )
+
+    def _reencode(
+        self,
+        *,
+        image_data: bytes | memoryview,
+    ) -> bytes | memoryview:
+        """Resize and re-encode an image if it is too large.
+
+        Returns:
+            The re-encoded image, or the given image if it is not too
+            large.
+        """
+        with Image.open(fp=io.BytesIO(initial_bytes=image_data)) as image:
+            if (
+                max(image.size) <= self._max_dimension
+                and len(image_data) <= self._max_bytes
+            ):
+                return image_data
+            # Decode JPEG images at a reduced size if that is still at
+            # least the target size, which is much faster.
+            image.draft(
+                mode="RGB",
+                size=(self._max_dimension, self._max_dimension),
+            )
+            mode = "L" if image.mode in {"1", "L", "I;16"} else "RGB"
+            prepared_image = ImageOps.exif_transpose(image=image).convert(
+                mode=mode,
+            )
+        prepared_image.thumbnail(
+            size=(self._max_dimension, self._max_dimension),
+            resample=Image.Resampling.LANCZOS,
+        )
+        image_buffer = io.BytesIO()
+        prepared_image.save(
+            fp=image_buffer,
+            format="JPEG",
+            quality=self._jpeg_quality,
+        )
+        return image_buffer.getvalue()
+
+    def __call__(
+        self,
+        image_data: bytes | memoryview,
+    ) -> bytes | memoryview:
+        """Prepare an image to be uploaded.
+
+        Args:
+            image_data: A query image.
+
+        Returns:
+            The image, resized and re-encoded if it is too large.
+        """
+        start = time.thread_time()
+        prepared_image_data = self._reencode(image_data=image_data)
+        if len(prepared_image_data) >= len(image_data):
+            prepared_image_data = image_data
+        cpu_seconds = time.thread_time() - start
+
+        with self._lock:
+            self._images += 1
+            self._reencoded += int(prepared_image_data is not image_data)
+            self._bytes_saved += len(image_data) - len(prepared_image_data)
+            self._cpu_seconds += cpu_seconds
+        return prepared_image_data
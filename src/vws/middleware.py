@@ -0,0 +1,204 @@
+"""Middleware which sees each request a client makes, and its response.
+
+A middleware is a callable which takes a :class:`Request` and returns a
+generator. The generator yields the request to send, which may be the
+given request or a changed copy, and is sent the response to it. It then
+returns the response for the client to use::
+
+    LOGGER = logging.getLogger(name=__name__)
+
+    def timing(request: Request) -> Generator[Request, Response, Response]:
+        start = time.monotonic()
+        response = yield request
+        elapsed_seconds = time.monotonic() - start
+        LOGGER.info("%s took %.3f seconds", request.url, elapsed_seconds)
+        return response
+
+If the request fails, the error is raised at the ``yield``.
+
+The same middleware works with sync and async clients. Clients run
+their middleware in order, so the first middleware sees the request
+first and the response last. Requests are given to middleware before
+they are signed, so a middleware which changes a request does not break
+its signature. If Vuforia rejects a request because the local clock is
+too far from Vuforia's, the client signs the request again and sends it
+once more without running its middleware again, so middleware sees one
+request, and the response to the request which was sent last.
+
+Downloads which are written straight to files, with the ``_to_file``
+methods, are streamed and are not sent through middleware.
+"""
+
+import dataclasses
+from collections.abc import (
+    Awaitable,
+    Callable,
+    Generator,
+    Sequence,
+)
+
+from beartype import BeartypeConf, beartype
+
+from vws.response import Response
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Request:
+    """A request which a client is about to sign and send.
+
+    Use :func:`dataclasses.replace` to make a changed copy.
+    """
+
+    method: str
+    url: str
+    headers: dict[str, str]
+    data: bytes
+
+
+Middleware = Callable[[Request], Generator[Request, Response, Response]]
+
+_ONE_REQUEST_MESSAGE = "Middleware must yield exactly one request."
+
+
+@beartype
+def _start(*, flow: Generator[Request, Response, Response]) -> Request:
+    """Run a middleware until it yields the request to send.
+
+    Args:
+        flow: The generator which the middleware returned.
+
+    Returns:
+        The request which the middleware yields.
+
+    Raises:
+        RuntimeError: The middleware returned without yielding a request.
+    """
+    try:
+        return next(flow)
+    except StopIteration:
+        raise RuntimeError(_ONE_REQUEST_MESSAGE) from None
+
+
+@beartype
+def _give_response(
+    *,
+    flow: Generator[Request, Response, Response],
+    response: Response,
+) -> Response:
+    """Give a middleware the response to its request, and get the
+    response it returns.
+
+    Args:
+        flow: The generator which the middleware returned.
+        response: The response to the request.
+
+    Returns:
+        The response which the middleware returns.
+
+    Raises:
+        RuntimeError: The middleware yielded more than one request.
+    """
+    try:
+        flow.send(response)
+    except StopIteration as stop:
+        finished_response: Response = stop.value
+        return finished_response
+    flow.close()
+    raise RuntimeError(_ONE_REQUEST_MESSAGE)
+
+
+@beartype
+def _give_error(
+    *,
+    flow: Generator[Request, Response, Response],
+    error: Exception,
+) -> Response:
+    """Raise the error from sending a request in the middleware which
+    yielded it, and get the response it returns.
+
+    Args:
+        flow: The generator which the middleware returned.
+        error: The error from sending the request.
+
+    Returns:
+        The response which the middleware returns, if it handles the
+        error.
+
+    Raises:
+        RuntimeError: The middleware yielded more than one request.
+    """
+    try:
+        flow.throw(error)
+    except StopIteration as stop:
+        finished_response: Response = stop.value
+        return finished_response
+    flow.close()
+    raise RuntimeError(_ONE_REQUEST_MESSAGE)
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+def send_with_middleware(
+    *,
+    middleware: Sequence[Middleware],
+    request: Request,
+    send: Callable[[Request], Response],
+) -> Response:
+    """Send a request through middleware.
+
+    Args:
+        middleware: The middleware to run, outermost first.
+        request: The request to send.
+        send: A function which signs and sends the request which the
+            innermost middleware yields.
+
+    Returns:
+        The response which the outermost middleware returns.
+    """
+    if not middleware:
+        return send(request)
+
+    flow = middleware[0](request)
+    outgoing_request = _start(flow=flow)
+    try:
+        response = send_with_middleware(
+            middleware=middleware[1:],
+            request=outgoing_request,
+            send=send,
+        )
+    except Exception as exc:  # noqa: BLE001
+        return _give_error(flow=flow, error=exc)
+    return _give_response(flow=flow, response=response)
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+async def async_send_with_middleware(
+    *,
+    middleware: Sequence[Middleware],
+    request: Request,
+    send: Callable[[Request], Awaitable[Response]],
+) -> Response:
+    """Send a request through middleware, asynchronously.
+
+    Args:
+        middleware: The middleware to run, outermost first.
+        request: The request to send.
+        send: An async function which signs and sends the request which
+            the innermost middleware yields.
+
+    Returns:
+        The response which the outermost middleware returns.
+    """
+    if not middleware:
+        return await send(request)
+
+    flow = middleware[0](request)
+    outgoing_request = _start(flow=flow)
+    try:
+        response = await async_send_with_middleware(
+            middleware=middleware[1:],
+            request=outgoing_request,
+            send=send,
+        )
+    except Exception as exc:  # noqa: BLE001
+        return _give_error(flow=flow, error=exc)
+    return _give_response(flow=flow, response=response)
@@ -1,15 +1,23 @@
 """Tools for interacting with the Vuforia Cloud Recognition Web APIs."""
 
+import contextlib
+import functools
 import json
+import time
+from collections.abc import Callable, Sequence  # noqa: TC003
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPMethod, HTTPStatus
-from typing import Any
+from typing import Self
+from urllib.parse import urlsplit
 
 from beartype import BeartypeConf, beartype
-from urllib3.filepost import encode_multipart_formdata
-from vws_auth_tools import authorization_header, rfc_1123_date
 
 from vws._image_utils import ImageType as _ImageType
-from vws._image_utils import get_image_data as _get_image_data
+from vws._image_utils import open_image_data as _open_image_data
+from vws._image_validation import validate_query_image
+from vws._request_bodies import multipart_form_data_body
+from vws._signing import Signer, send_signed
+from vws.batch_queries import BatchQueryResult, batch_query_statistics
 from vws.exceptions.base_exceptions import CloudRecoError
 from vws.exceptions.cloud_reco_exceptions import (
     AuthenticationFailureError,
@@ -22,8 +30,13 @@ from vws.exceptions.custom_exceptions import (
     RequestEntityTooLargeError,
     ServerError,
 )
+from vws.hedging import HedgingPolicy  # noqa: TC001
 from vws.include_target_data import CloudRecoIncludeTargetData
+from vws.middleware import Middleware, Request, send_with_middleware
+from vws.query_cache import QueryResultCache  # noqa: TC001
+from vws.rate_limiting import RateLimiter  # noqa: TC001
 from vws.reports import QueryResult
+from vws.response import Response  # noqa: TC001
 from vws.transports import RequestsTransport, Transport
 
 
@@ -39,6 +52,14 @@ class CloudRecoService:
         base_vwq_url: str = "https://cloudreco.vuforia.com",
         request_timeout_seconds: float | tuple[float, float] = 30.0,
         transport: Transport | None = None,
+        rate_limiter: RateLimiter | None = None,
+        hedging_policy: HedgingPolicy | None = None,
+        middleware: Sequence[Middleware] = (),
+        query_cache: QueryResultCache | None = None,
+        validate_images: bool = False,
+        image_preparer: (
+            Callable[[bytes | memoryview], bytes | memoryview] | None
+        ) = None,
     ) -> None:
         """
         Args:
@@ -52,14 +73,76 @@ class CloudRecoService:
             transport: The HTTP transport to use for
                 requests. Defaults to
                 ``RequestsTransport()``.
+                The client closes this transport when it is
+                closed.
+            rate_limiter: A rate limiter to wait for before each
+                request, including the second attempt of a hedged
+                query, keyed by the client access key. Share one
+                rate limiter between clients to limit their combined
+                request rate.
+            hedging_policy: A policy for sending a query a second time
+                if the first attempt is slow, and using whichever
+                response arrives first. By default, each query is sent
+                once.
+            middleware: Middleware to send each request
+                through, outermost first. See
+                :mod:`vws.middleware`.
+            query_cache: A cache of query results, keyed by the
+                image content and the query options. By default,
+                results are not cached.
+            validate_images: Whether to check query images against
+                Vuforia's documented limits before uploading them,
+                and raise the error which Vuforia would give, without a
+                request. Only the image headers are read.
+            image_preparer: A function which prepares each query image
+                before it is uploaded, for example a
+                :class:`vws.image_preparation.QueryImagePreparer` which
+                shrinks large images. By default, images are uploaded as
+                given.
         """
         self._client_access_key = client_access_key
-        self._client_secret_key = client_secret_key
+        self._signer = Signer(
+            access_key=client_access_key,
+            secret_key=client_secret_key,
+        )
         self._base_vwq_url = base_vwq_url
         self._request_timeout_seconds = request_timeout_seconds
         self._transport = (
             transport if transport is not None else RequestsTransport()
         )
+        self._middleware = tuple(middleware)
+        self._validate_images = validate_images
+        self._image_preparer = image_preparer
+        self._rate_limiter = rate_limiter
+        self._hedging_policy = hedging_policy
+        self._query_cache = query_cache
+
+    @property
+    def clock_offset_seconds(self) -> float:
+        """The number of seconds which Vuforia's clock was last measured
+        to be ahead of the local clock, or behind it if negative.
+
+        This is measured from the ``Date`` header of each response, and
+        requests are signed with the local time plus this offset.
+        """
+        return self._signer.clock_offset_seconds
+
+    def close(self) -> None:
+        """Close the transport.
+
+        The client owns its transport, including a transport which was
+        given to it. To share one transport between clients, do not close
+        the clients. Close the transport once none of them is in use.
+        """
+        self._transport.close()
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        """Exit the context manager and close the transport."""
+        self.close()
 
     def query(
         self,
@@ -94,7 +177,8 @@ class CloudRecoService:
             ~vws.exceptions.cloud_reco_exceptions.InactiveProjectError: The
                 project is inactive.
             ~vws.exceptions.cloud_reco_exceptions.RequestTimeTooSkewedError:
-                There is an error with the time sent to Vuforia.
+                There is an error with the time sent to Vuforia, even
+                after the request is signed again with Vuforia's time.
             ~vws.exceptions.cloud_reco_exceptions.BadImageError: There is a
                 problem with the given image. For example, it must be a JPEG or
                 PNG file in the grayscale or RGB color space.
@@ -110,44 +194,151 @@ class CloudRecoService:
         Returns:
             An ordered list of target details of matching targets.
         """
-        image_content = _get_image_data(image=image)
-        body: dict[str, Any] = {
-            "image": ("image.jpeg", image_content, "image/jpeg"),
-            "max_num_results": (None, int(max_num_results), "text/plain"),
-            "include_target_data": (
-                None,
-                include_target_data.value,
-                "text/plain",
+        with _open_image_data(image=image) as given_image_data:
+            image_data = (
+                given_image_data
+                if self._image_preparer is None
+                else self._image_preparer(given_image_data)
+            )
+            if self._validate_images:
+                validate_query_image(
+                    image_data=image_data,
+                    url=self._base_vwq_url.rstrip("/") + "/v1/query",
+                )
+            if self._query_cache is None:
+                return self._query(
+                    image_data=image_data,
+                    max_num_results=max_num_results,
+                    include_target_data=include_target_data,
+                )
+            return self._query_cache.query(
+                namespace=(self._base_vwq_url, self._client_access_key),
+                image_data=image_data,
+                max_num_results=max_num_results,
+                include_target_data=include_target_data,
+                make_query=functools.partial(
+                    self._query,
+                    image_data=image_data,
+                    max_num_results=max_num_results,
+                    include_target_data=include_target_data,
+                ),
+            )
+
+    def _wait_for_rate_limiter(self) -> None:
+        """Wait for the rate limiter, if there is one, before a request is
+        sent.
+        """
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire(key=self._client_access_key)
+
+    def _send_query_request(
+        self,
+        *,
+        request: Request,
+        content_md5_hex: str | None,
+    ) -> Response:
+        """Sign and send a query request, once the rate limiter allows it.
+
+        Args:
+            request: The request, after it has been through middleware.
+            content_md5_hex: The hex MD5 hash of the request body, if it
+                is already known.
+
+        Returns:
+            The response to the request.
+        """
+        self._wait_for_rate_limiter()
+        headers = {
+            **self._signer.headers(
+                method=request.method,
+                content=request.data,
+                # Note that this is not the actual Content-Type header value
+                # sent.
+                content_type="multipart/form-data",
+                request_path=urlsplit(url=request.url).path,
+                content_md5_hex=content_md5_hex,
             ),
+            **request.headers,
         }
-        date = rfc_1123_date()
-        request_path = "/v1/query"
-        content, content_type_header = encode_multipart_formdata(fields=body)
-        method = HTTPMethod.POST
-
-        authorization_string = authorization_header(
-            access_key=self._client_access_key,
-            secret_key=self._client_secret_key,
-            method=method,
-            content=content,
-            # Note that this is not the actual Content-Type header value sent.
-            content_type="multipart/form-data",
-            date=date,
-            request_path=request_path,
+        if self._hedging_policy is None:
+            return self._transport(
+                method=request.method,
+                url=request.url,
+                headers=headers,
+                data=request.data,
+                request_timeout=self._request_timeout_seconds,
+            )
+        return self._hedging_policy.request(
+            transport=self._transport,
+            method=request.method,
+            url=request.url,
+            headers=headers,
+            data=request.data,
+            request_timeout=self._request_timeout_seconds,
+            before_hedge=self._wait_for_rate_limiter,
         )
 
-        headers = {
-            "Authorization": authorization_string,
-            "Date": date,
-            "Content-Type": content_type_header,
-        }
+    def _query(
+        self,
+        *,
+        image_data: bytes | memoryview,
+        max_num_results: int,
+        include_target_data: CloudRecoIncludeTargetData,
+    ) -> list[QueryResult]:
+        """Make an Image Recognition Query, without the cache.
 
-        response = self._transport(
-            method=method,
+        See :meth:`query`.
+        """
+        request_path = "/v1/query"
+        body, content_type_header = multipart_form_data_body(
+            fields=[
+                (
+                    "image",
+                    "image.jpeg",
+                    image_data,
+                    "image/jpeg",
+                ),
+                (
+                    "max_num_results",
+                    None,
+                    str(object=int(max_num_results)).encode(encoding="ascii"),
+                    "text/plain",
+                ),
+                (
+                    "include_target_data",
+                    None,
+                    include_target_data.value.encode(encoding="ascii"),
+                    "text/plain",
+                ),
+            ],
+        )
+        request = Request(
+            method=HTTPMethod.POST,
             url=self._base_vwq_url.rstrip("/") + request_path,
-            headers=headers,
-            data=content,
-            request_timeout=self._request_timeout_seconds,
+            headers={"Content-Type": content_type_header},
+            data=body.content,
+        )
+
+        def send(request: Request) -> Response:
+            """Sign and send a request which has been through middleware."""
+            return send_signed(
+                signer=self._signer,
+                send=functools.partial(
+                    self._send_query_request,
+                    request=request,
+                    # Middleware may have changed the body.
+                    content_md5_hex=(
+                        body.content_md5_hex
+                        if request.data is body.content
+                        else None
+                    ),
+                ),
+            )
+
+        response = send_with_middleware(
+            middleware=self._middleware,
+            request=request,
+            send=send,
         )
 
         if response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE:
@@ -192,3 +383,100 @@ class CloudRecoService:
             QueryResult.from_response_dict(response_dict=item)
             for item in result_list
         ]
+
+    def query_many(
+        self,
+        *,
+        images: Sequence[_ImageType],
+        max_num_results: int = 1,
+        include_target_data: CloudRecoIncludeTargetData = (
+            CloudRecoIncludeTargetData.TOP
+        ),
+        max_concurrency: int = 8,
+    ) -> BatchQueryResult:
+        """Make an Image Recognition Query for each of many images, with
+        up to ``max_concurrency`` queries in flight at once.
+
+        Queries are made on a thread pool. An error from one query does
+        not stop the others; it is returned in place of that query's
+        results.
+
+        Args:
+            images: The images to make queries against.
+            max_num_results: The maximum number of matching targets to be
+                returned for each image.
+            include_target_data: Indicates if target_data records shall be
+                returned for the matched targets. See :meth:`query`.
+            max_concurrency: The maximum number of queries to make at once.
+
+        Raises:
+            ValueError: ``max_concurrency`` is less than 1.
+
+        Returns:
+            For each image, in the order given, the matching targets or
+            the error raised by its query, and statistics for the batch.
+        """
+        if max_concurrency < 1:
+            msg = "max_concurrency must be at least 1."
+            raise ValueError(msg)
+
+        # Read each image here, as file objects are not safe to share
+        # between threads.
+        with contextlib.ExitStack() as stack:
+            image_data = [
+                stack.enter_context(cm=_open_image_data(image=image))
+                for image in images
+            ]
+            return self._query_image_data(
+                image_data=image_data,
+                max_num_results=max_num_results,
+                include_target_data=include_target_data,
+                max_concurrency=max_concurrency,
+            )
+
+    def _query_image_data(
+        self,
+        *,
+        image_data: Sequence[bytes | memoryview],
+        max_num_results: int,
+        include_target_data: CloudRecoIncludeTargetData,
+        max_concurrency: int,
+    ) -> BatchQueryResult:
+        """Query each of many images which have been read.
+
+        See :meth:`query_many`.
+        """
+
+        def query_one(
+            data: bytes | memoryview,
+        ) -> tuple[list[QueryResult] | Exception, float]:
+            """Make one query, and measure how long it takes."""
+            start = time.perf_counter()
+            try:
+                result: list[QueryResult] | Exception = self.query(
+                    image=data,
+                    max_num_results=max_num_results,
+                    include_target_data=include_target_data,
+                )
+            except Exception as exc:  # noqa: BLE001
+                result = exc
+            return result, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, max(len(image_data), 1)),
+        ) as executor:
+            outcomes = list(executor.map(query_one, image_data))
+        elapsed_seconds = time.perf_counter() - start
+
+        results = [result for result, _ in outcomes]
+        return BatchQueryResult(
+            results=results,
+            statistics=batch_query_statistics(
+                latencies_seconds=[latency for _, latency in outcomes],
+                failures=sum(
+                    isinstance(result, Exception) for result in results
+                ),
+                elapsed_seconds=elapsed_seconds,
+            ),
+        )
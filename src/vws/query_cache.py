@@ -0,0 +1,341 @@
+"""A cache of Cloud Recognition query results, keyed by the content of
+the query image.
+
+Querying the same image bytes again, for example when an image is
+scanned again or a query is retried, gives the cached results without a
+request to Vuforia. Results are cached for a fixed time, and the least
+recently used results are evicted when the cache holds too many results,
+or too many bytes of results.
+
+Identical queries which are made at the same time share one request.
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+
+from beartype import BeartypeConf, beartype
+
+from vws.include_target_data import CloudRecoIncludeTargetData
+from vws.reports import QueryResult  # noqa: TC001
+
+_CacheKey = tuple[Hashable, bytes, int, CloudRecoIncludeTargetData]
+
+
+@beartype
+def _estimate_size(*, key: _CacheKey, results: tuple[QueryResult, ...]) -> int:
+    """Estimate the number of bytes which cached results take up.
+
+    Only the image hash, target IDs, names and application metadata are
+    counted, as these make up nearly all of a large entry.
+
+    Args:
+        key: The cache key of the results.
+        results: The results.
+
+    Returns:
+        The estimated size in bytes.
+    """
+    _, image_hash, _, _ = key
+    size = len(image_hash)
+    for result in results:
+        size += len(result.target_id)
+        if result.target_data is not None:
+            size += len(result.target_data.name)
+            size += len(result.target_data.application_metadata or "")
+    return size
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class QueryCacheStatistics:
+    """Counts of the lookups made in a query result cache.
+
+    Args:
+        hits: The number of queries answered from the cache.
+        misses: The number of queries which made a request.
+        shared: The number of queries which waited for an identical
+            query which was already being made, rather than making a
+            request.
+        evictions: The number of results evicted because the cache was
+            full.
+        entries: The number of results in the cache. This can include
+            results which have expired but have not yet been removed.
+        size_bytes: The estimated number of bytes which the results in
+            the cache take up.
+    """
+
+    hits: int
+    misses: int
+    shared: int
+    evictions: int
+    entries: int
+    size_bytes: int
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class QueryResultCache:
+    """Cache the results of Cloud Recognition queries.
+
+    Errors are not cached. A cache can be shared between clients, and
+    between threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 60.0,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        """Create a ``QueryResultCache``.
+
+        Args:
+            ttl_seconds: How long to use the results of a query for.
+                Targets added to or removed from a database in this time
+                are not reflected in cached results.
+            max_entries: The maximum number of query results to keep.
+            max_bytes: The maximum estimated number of bytes of query
+                results to keep. The target IDs, names and application
+                metadata of results are counted. Results which are larger
+                than this on their own are not cached.
+        """
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Each key maps to the time at which its results expire, the
+        # results, and their estimated size. The least recently used key
+        # is first.
+        self._entries: OrderedDict[
+            _CacheKey,
+            tuple[float, tuple[QueryResult, ...], int],
+        ] = OrderedDict()
+        self._size_bytes = 0
+        self._in_flight: dict[
+            _CacheKey,
+            concurrent.futures.Future[tuple[QueryResult, ...]],
+        ] = {}
+        # Async queries share a request only within one event loop.
+        self._async_in_flight: dict[
+            tuple[asyncio.AbstractEventLoop, _CacheKey],
+            asyncio.Future[tuple[QueryResult, ...]],
+        ] = {}
+        self._hits = 0
+        self._misses = 0
+        self._shared = 0
+        self._evictions = 0
+
+    @property
+    def statistics(self) -> QueryCacheStatistics:
+        """Counts of the lookups made in this cache."""
+        with self._lock:
+            return QueryCacheStatistics(
+                hits=self._hits,
+                misses=self._misses,
+                shared=self._shared,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+            )
+
+    def clear(self) -> None:
+        """Remove all results from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def _lookup(self, *, key: _CacheKey) -> tuple[QueryResult, ...] | None:
+        """Get results from the cache, if they have not expired.
+
+        The lock must be held.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, results, size = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._size_bytes -= size
+            return None
+        self._entries.move_to_end(key=key)
+        self._hits += 1
+        return results
+
+    def _store(
+        self,
+        *,
+        key: _CacheKey,
+        results: tuple[QueryResult, ...],
+    ) -> None:
+        """Add results to the cache, evicting the least recently used
+        results if the cache is full.
+
+        The lock must be held.
+        """
+        size = _estimate_size(key=key, results=results)
+        if size > self._max_bytes:
+            return
+        previous_entry = self._entries.pop(key=key, default=None)
+        if previous_entry is not None:
+            _, _, previous_size = previous_entry
+            self._size_bytes -= previous_size
+        expires_at = time.monotonic() + self._ttl_seconds
+        self._entries[key] = (expires_at, results, size)
+        self._size_bytes += size
+        while (
+            len(self._entries) > self._max_entries
+            or self._size_bytes > self._max_bytes
+        ):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._size_bytes -= evicted_size
+            self._evictions += 1
+
+    def query(
+        self,
+        *,
+        namespace: Hashable,
+        image_data: bytes | memoryview,
+        max_num_results: int,
+        include_target_data: CloudRecoIncludeTargetData,
+        make_query: Callable[[], list[QueryResult]],
+    ) -> list[QueryResult]:
+        """Get the results of a query from the cache, or make the query.
+
+        Args:
+            namespace: A value which separates the results of different
+                clients, such as the client access key and the base URL.
+            image_data: The image to query.
+            max_num_results: The maximum number of matching targets.
+            include_target_data: Which target data records to include.
+            make_query: A function which makes the query.
+
+        Returns:
+            The matching targets.
+        """
+        key = (
+            namespace,
+            hashlib.sha256(data=image_data).digest(),
+            max_num_results,
+            include_target_data,
+        )
+        while True:
+            with self._lock:
+                results = self._lookup(key=key)
+                if results is not None:
+                    return list(results)
+                future = self._in_flight.get(key)
+                if future is None:
+                    future = concurrent.futures.Future()
+                    self._in_flight[key] = future
+                    self._misses += 1
+                    break
+                self._shared += 1
+            # If the query being waited for was interrupted, for example
+            # by ``KeyboardInterrupt`` in its thread, make the query
+            # again.
+            with contextlib.suppress(concurrent.futures.CancelledError):
+                return list(future.result())
+
+        try:
+            results = tuple(make_query())
+        except Exception as exc:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(exception=exc)
+            raise
+        except BaseException:
+            # Only errors from the query are given to waiters. Others,
+            # such as ``KeyboardInterrupt``, belong to this thread.
+            with self._lock:
+                del self._in_flight[key]
+            future.cancel()
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            self._store(key=key, results=results)
+        future.set_result(result=results)
+        return list(results)
+
+    async def aquery(
+        self,
+        *,
+        namespace: Hashable,
+        image_data: bytes | memoryview,
+        max_num_results: int,
+        include_target_data: CloudRecoIncludeTargetData,
+        make_query: Callable[[], Awaitable[list[QueryResult]]],
+    ) -> list[QueryResult]:
+        """Get the results of a query from the cache, or make the query
+        asynchronously.
+
+        Only queries made in the same event loop share a request.
+
+        Args:
+            namespace: A value which separates the results of different
+                clients, such as the client access key and the base URL.
+            image_data: The image to query.
+            max_num_results: The maximum number of matching targets.
+            include_target_data: Which target data records to include.
+            make_query: A function which makes the query.
+
+        Returns:
+            The matching targets.
+        """
+        key = (
+            namespace,
+            hashlib.sha256(data=image_data).digest(),
+            max_num_results,
+            include_target_data,
+        )
+        loop = asyncio.get_running_loop()
+        in_flight_key = (loop, key)
+        while True:
+            with self._lock:
+                results = self._lookup(key=key)
+                if results is not None:
+                    return list(results)
+                future = self._async_in_flight.get(in_flight_key)
+                if future is None:
+                    future = loop.create_future()
+                    self._async_in_flight[in_flight_key] = future
+                    self._misses += 1
+                    break
+                self._shared += 1
+            try:
+                return list(await asyncio.shield(arg=future))
+            except asyncio.CancelledError:
+                # If the query being waited for was cancelled, rather
+                # than this one, make the query again.
+                if not future.cancelled():
+                    raise
+
+        # Waiters retrieve any error. Without waiters, it is raised by
+        # this call, so do not log it as never retrieved.
+        future.add_done_callback(
+            lambda done: None if done.cancelled() else done.exception(),
+        )
+
+        try:
+            results = tuple(await make_query())
+        except asyncio.CancelledError:
+            with self._lock:
+                del self._async_in_flight[in_flight_key]
+            future.cancel()
+            raise
+        except BaseException as exc:
+            with self._lock:
+                del self._async_in_flight[in_flight_key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._async_in_flight[in_flight_key]
+            self._store(key=key, results=results)
+        future.set_result(results)
+        return list(results)
@@ -0,0 +1,266 @@
+"""Query a stream of frames, such as a decoded video stream, with a
+bounded number of queries in flight.
+
+When frames arrive faster than Vuforia answers queries, a
+:class:`StaleFramePolicy` decides whether to wait for the service or to
+drop frames.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator  # noqa: TC003
+from enum import StrEnum, auto, unique
+
+from beartype import beartype
+
+from vws._image_utils import ImageType as _ImageType  # noqa: TC001
+from vws.async_query import AsyncCloudRecoService  # noqa: TC001
+from vws.include_target_data import CloudRecoIncludeTargetData
+from vws.reports import QueryResult  # noqa: TC001
+
+
+@beartype
+@unique
+class StaleFramePolicy(StrEnum):
+    """What to do with a frame which arrives when the in-flight window is
+    full.
+    """
+
+    # Stop reading frames until a query finishes, so that no frame is
+    # dropped.
+    WAIT = auto()
+    # Drop the frame which arrived.
+    DROP_NEWEST = auto()
+    # Keep the frame which arrived to query next, and drop any frame
+    # which was kept before it.
+    DROP_OLDEST = auto()
+
+
+@beartype
+@unique
+class StreamResultOrder(StrEnum):
+    """The order in which to give the results of a stream of queries."""
+
+    # The order of the frames. A slow query holds back the results of
+    # later frames.
+    INPUT = auto()
+    # The order in which the queries finish.
+    COMPLETION = auto()
+
+
+@beartype
+class _FrameQueries[FrameID]:
+    """The queries of a stream of frames, each of which takes a slot."""
+
+    def __init__(
+        self,
+        *,
+        client: AsyncCloudRecoService,
+        frames: AsyncIterable[tuple[FrameID, _ImageType]],
+        max_in_flight: int,
+        stale_frame_policy: StaleFramePolicy,
+        max_num_results: int,
+        include_target_data: CloudRecoIncludeTargetData,
+    ) -> None:
+        """
+        Args:
+            client: The client to query with.
+            frames: Pairs of a frame ID and the image of the frame.
+            max_in_flight: The maximum number of queries to make at once.
+            stale_frame_policy: What to do with a frame which arrives when
+                every slot is taken.
+            max_num_results: The maximum number of matching targets to be
+                returned for each frame.
+            include_target_data: Indicates if target_data records shall be
+                returned for the matched targets.
+        """
+        self._client = client
+        self._frames = frames
+        self._max_in_flight = max_in_flight
+        self._stale_frame_policy = stale_frame_policy
+        self._max_num_results = max_num_results
+        self._include_target_data = include_target_data
+        self._slots = asyncio.Semaphore(value=max_in_flight)
+        # A frame kept to query when a slot is free, for ``DROP_OLDEST``.
+        self._waiting_frames: deque[tuple[FrameID, _ImageType]] = deque(
+            maxlen=1,
+        )
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._next_sequence = 0
+        # Each item holds a slot until it has been consumed, so at most
+        # ``max_in_flight`` results wait here. ``None`` is put once every
+        # frame has been read and every result has been consumed.
+        self.finished: asyncio.Queue[
+            tuple[int, FrameID, list[QueryResult] | Exception] | None
+        ] = asyncio.Queue()
+
+    def _start(self, *, frame_id: FrameID, image: _ImageType) -> None:
+        """Start a query in a slot which has been acquired.
+
+        Args:
+            frame_id: The ID of the frame to query.
+            image: The image of the frame.
+        """
+        task = asyncio.create_task(
+            coro=self._run(
+                sequence=self._next_sequence,
+                frame_id=frame_id,
+                image=image,
+            ),
+        )
+        self._next_sequence += 1
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self,
+        *,
+        sequence: int,
+        frame_id: FrameID,
+        image: _ImageType,
+    ) -> None:
+        """Query one frame.
+
+        Args:
+            sequence: The position of the query among the queries started.
+            frame_id: The ID of the frame to query.
+            image: The image of the frame.
+        """
+        try:
+            result: list[QueryResult] | Exception = await self._client.query(
+                image=image,
+                max_num_results=self._max_num_results,
+                include_target_data=self._include_target_data,
+            )
+        except Exception as exc:  # noqa: BLE001
+            result = exc
+        self.finished.put_nowait(item=(sequence, frame_id, result))
+
+    def free_slot(self) -> None:
+        """Pass on the slot of a result which has been consumed."""
+        if self._waiting_frames:
+            frame_id, image = self._waiting_frames.popleft()
+            self._start(frame_id=frame_id, image=image)
+        else:
+            self._slots.release()
+
+    async def read_frames(self) -> None:
+        """Start a query for each frame which is not dropped."""
+        try:
+            async for frame_id, image in self._frames:
+                if self._stale_frame_policy is StaleFramePolicy.WAIT:
+                    await self._slots.acquire()
+                elif self._slots.locked():
+                    if (
+                        self._stale_frame_policy
+                        is StaleFramePolicy.DROP_OLDEST
+                    ):
+                        self._waiting_frames.append((frame_id, image))
+                    continue
+                else:
+                    await self._slots.acquire()
+                self._start(frame_id=frame_id, image=image)
+            # A slot may be passed on to a kept frame, so wait until
+            # every slot is free, which means every result has been
+            # consumed.
+            for _ in range(self._max_in_flight):
+                await self._slots.acquire()
+        finally:
+            self.finished.put_nowait(item=None)
+
+    def cancel(self) -> None:
+        """Cancel the queries which are in flight."""
+        for task in set(self._tasks):
+            task.cancel()
+
+
+@beartype
+async def stream_queries[FrameID](
+    *,
+    client: AsyncCloudRecoService,
+    frames: AsyncIterable[tuple[FrameID, _ImageType]],
+    max_in_flight: int = 4,
+    stale_frame_policy: StaleFramePolicy = StaleFramePolicy.WAIT,
+    result_order: StreamResultOrder = StreamResultOrder.INPUT,
+    max_num_results: int = 1,
+    include_target_data: CloudRecoIncludeTargetData = (
+        CloudRecoIncludeTargetData.TOP
+    ),
+) -> AsyncIterator[tuple[FrameID, list[QueryResult]]]:
+    """Query each frame of a stream, and give the results as they are
+    ready.
+
+    Each query takes one of ``max_in_flight`` slots, and keeps it until
+    its result has been consumed. A slow consumer of results therefore
+    holds back the queries, rather than letting results pile up in
+    memory.
+
+    The stream stops at the first query which fails. The results of
+    the frames before it are given, then the error is raised, and the
+    queries which are in flight are cancelled. To keep a stream going
+    through errors which may pass, such as server errors, give
+    ``client`` an ``AsyncRetryingTransport``.
+
+    Args:
+        client: The client to query with.
+        frames: Pairs of a frame ID and the image of the frame.
+        max_in_flight: The maximum number of queries to make at once.
+        stale_frame_policy: What to do with a frame which arrives when
+            every slot is taken.
+        result_order: The order in which to give results.
+        max_num_results: The maximum number of matching targets to be
+            returned for each frame.
+        include_target_data: Indicates if target_data records shall be
+            returned for the matched targets.
+
+    Yields:
+        Pairs of a frame ID and the matching targets for the frame. No
+        pair is given for a dropped frame.
+
+    Raises:
+        ValueError: ``max_in_flight`` is less than 1.
+        Exception: Any error raised by reading a frame or by a query.
+    """
+    if max_in_flight < 1:
+        msg = "max_in_flight must be at least 1."
+        raise ValueError(msg)
+
+    queries = _FrameQueries(
+        client=client,
+        frames=frames,
+        max_in_flight=max_in_flight,
+        stale_frame_policy=stale_frame_policy,
+        max_num_results=max_num_results,
+        include_target_data=include_target_data,
+    )
+    reader = asyncio.create_task(coro=queries.read_frames())
+    # Results and errors which wait for the results of earlier frames.
+    results_by_sequence: dict[
+        int,
+        tuple[FrameID, list[QueryResult] | Exception],
+    ] = {}
+    next_sequence_to_give = 0
+    try:
+        while (item := await queries.finished.get()) is not None:
+            sequence, frame_id, result = item
+            if result_order is StreamResultOrder.INPUT:
+                results_by_sequence[sequence] = (frame_id, result)
+                while next_sequence_to_give in results_by_sequence:
+                    frame_id, result = results_by_sequence.pop(
+                        next_sequence_to_give,
+                    )
+                    if isinstance(result, Exception):
+                        raise result
+                    yield frame_id, result
+                    next_sequence_to_give += 1
+                    queries.free_slot()
+                continue
+            if isinstance(result, Exception):
+                raise result
+            yield frame_id, result
+            queries.free_slot()
+        # Raise any error from reading frames.
+        await reader
+    finally:
+        reader.cancel()
+        queries.cancel()
@@ -0,0 +1,584 @@
+"""Rate limiters which smooth the requests made by clients."""
+
+import asyncio
+import contextlib
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections.abc import Iterator  # noqa: TC003
+from dataclasses import dataclass
+from pathlib import Path  # noqa: TC003
+from typing import Protocol, Self, runtime_checkable
+
+from beartype import BeartypeConf, beartype
+
+if sys.platform == "win32":  # pragma: no cover
+    import msvcrt
+
+    @beartype
+    def _lock_file(*, file_descriptor: int) -> None:
+        """Wait for an exclusive lock on the first byte of a file.
+
+        Args:
+            file_descriptor: The file to lock.
+        """
+        os.lseek(file_descriptor, 0, os.SEEK_SET)
+        msvcrt.locking(file_descriptor, msvcrt.LK_LOCK, 1)
+
+    @beartype
+    def _unlock_file(*, file_descriptor: int) -> None:
+        """Release a lock taken with ``_lock_file``.
+
+        Args:
+            file_descriptor: The file to unlock.
+        """
+        os.lseek(file_descriptor, 0, os.SEEK_SET)
+        msvcrt.locking(file_descriptor, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    @beartype
+    def _lock_file(*, file_descriptor: int) -> None:
+        """Wait for an exclusive lock on the first byte of a file.
+
+        This is a POSIX record lock, which belongs to the process, so a
+        process forked after the file is opened does not share it.
+
+        Args:
+            file_descriptor: The file to lock.
+        """
+        fcntl.lockf(file_descriptor, fcntl.LOCK_EX, 1)
+
+    @beartype
+    def _unlock_file(*, file_descriptor: int) -> None:
+        """Release a lock taken with ``_lock_file``.
+
+        Args:
+            file_descriptor: The file to unlock.
+        """
+        fcntl.lockf(file_descriptor, fcntl.LOCK_UN, 1)
+
+
+# The start of a shared rate limiter file: a marker and the number of
+# slots which follow.
+_SHARED_HEADER = struct.Struct(format="<8sQ")
+_SHARED_MAGIC = b"VWSRATE1"
+# A slot for one key: a hash of the key, and the time at which the next
+# request for the key would be made if requests were evenly spaced.
+_SHARED_SLOT = struct.Struct(format="<Qd")
+
+
+@beartype
+class _SharedFile:
+    """A rate limiter file, opened and mapped once in this process.
+
+    POSIX record locks belong to a process rather than to a file
+    descriptor, so they do not exclude threads of the same process from
+    each other, and closing any descriptor for a file releases every
+    lock which the process holds on it. Every rate limiter in a process
+    which uses a file therefore shares one ``_SharedFile``, with one
+    descriptor and one thread lock.
+    """
+
+    def __init__(self, *, path: Path, file_descriptor: int) -> None:
+        """
+        Args:
+            path: The resolved path of the file.
+            file_descriptor: The open file.
+        """
+        self.path = path
+        self.file_descriptor = file_descriptor
+        self.mmap = mmap.mmap(fileno=file_descriptor, length=0)
+        self.users = 1
+        self._thread_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the file lock, which excludes every thread in every
+        process which uses the file.
+        """
+        with self._thread_lock:
+            _lock_file(file_descriptor=self.file_descriptor)
+            try:
+                yield
+            finally:
+                _unlock_file(file_descriptor=self.file_descriptor)
+
+
+# The rate limiter files which are open in this process, by resolved path.
+_shared_files: dict[Path, _SharedFile] = {}
+_shared_files_lock = threading.Lock()
+
+
+@beartype
+def _open_shared_file(*, path: Path, max_keys: int) -> _SharedFile:
+    """Get the open rate limiter file at a path, opening it, and
+    creating it if it does not exist, if it is not open already.
+
+    Args:
+        path: The file.
+        max_keys: The number of keys which a new file has room for.
+
+    Returns:
+        The open file. Release it with ``_close_shared_file``.
+    """
+    resolved_path = path.resolve()
+    with _shared_files_lock:
+        shared_file = _shared_files.get(resolved_path)
+        if shared_file is not None:
+            shared_file.users += 1
+            return shared_file
+
+        file_descriptor = os.open(
+            path=resolved_path,
+            flags=os.O_RDWR | os.O_CREAT,
+            mode=0o600,
+        )
+        _lock_file(file_descriptor=file_descriptor)
+        try:
+            is_new_file = os.fstat(fd=file_descriptor).st_size == 0
+            if is_new_file:
+                size = _SHARED_HEADER.size + max_keys * _SHARED_SLOT.size
+                os.ftruncate(file_descriptor, size)
+            shared_file = _SharedFile(
+                path=resolved_path,
+                file_descriptor=file_descriptor,
+            )
+            if is_new_file:
+                _SHARED_HEADER.pack_into(
+                    shared_file.mmap,
+                    0,
+                    _SHARED_MAGIC,
+                    max_keys,
+                )
+        finally:
+            _unlock_file(file_descriptor=file_descriptor)
+
+        _shared_files[resolved_path] = shared_file
+        return shared_file
+
+
+@beartype
+def _close_shared_file(*, shared_file: _SharedFile) -> None:
+    """Release a rate limiter file, and close it if nothing else in this
+    process uses it.
+
+    Args:
+        shared_file: The file to release.
+    """
+    with _shared_files_lock:
+        shared_file.users -= 1
+        if shared_file.users:
+            return
+        del _shared_files[shared_file.path]
+        shared_file.mmap.close()
+        os.close(fd=shared_file.file_descriptor)
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class RateLimiterStatistics:
+    """Counts of the waits made by callers of a rate limiter.
+
+    Args:
+        acquisitions: The number of times that permission to make a
+            request was given.
+        delayed_acquisitions: The number of those times which the caller
+            had to wait for.
+        wait_seconds: The total number of seconds which callers waited.
+        max_wait_seconds: The longest wait of a single caller, in
+            seconds.
+    """
+
+    acquisitions: int
+    delayed_acquisitions: int
+    wait_seconds: float
+    max_wait_seconds: float
+
+
+@runtime_checkable
+class RateLimiter(Protocol):
+    """Protocol for rate limiters used by VWS clients.
+
+    A client waits for its rate limiter before each request. One rate
+    limiter can be shared between clients, so that their combined
+    request rate is limited.
+    """
+
+    def acquire(self, *, key: str) -> float:
+        """Wait until a request may be made.
+
+        Args:
+            key: The key which the request is limited by, such as the
+                access key which the request is made with.
+
+        Returns:
+            The number of seconds waited.
+        """
+        ...  # pylint: disable=unnecessary-ellipsis
+
+    async def aacquire(self, *, key: str) -> float:
+        """Wait, without blocking the event loop, until a request may be
+        made.
+
+        Args:
+            key: The key which the request is limited by, such as the
+                access key which the request is made with.
+
+        Returns:
+            The number of seconds waited.
+        """
+        ...  # pylint: disable=unnecessary-ellipsis
+
+
+@beartype
+class _WaitCounters:
+    """Thread-safe counters for the waits given by a rate limiter."""
+
+    def __init__(self) -> None:
+        """Create counters which start at zero."""
+        self._lock = threading.Lock()
+        self._acquisitions = 0
+        self._delayed_acquisitions = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def record_wait(self, *, wait_seconds: float) -> None:
+        """Record that a caller was given permission to make a request.
+
+        Args:
+            wait_seconds: The number of seconds which the caller waits
+                before making the request.
+        """
+        with self._lock:
+            self._acquisitions += 1
+            if wait_seconds > 0:
+                self._delayed_acquisitions += 1
+                self._wait_seconds += wait_seconds
+                self._max_wait_seconds = max(
+                    self._max_wait_seconds,
+                    wait_seconds,
+                )
+
+    def snapshot(self) -> RateLimiterStatistics:
+        """Get the current values of the counters."""
+        with self._lock:
+            return RateLimiterStatistics(
+                acquisitions=self._acquisitions,
+                delayed_acquisitions=self._delayed_acquisitions,
+                wait_seconds=self._wait_seconds,
+                max_wait_seconds=self._max_wait_seconds,
+            )
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class TokenBucketRateLimiter:
+    """A rate limiter which keeps a token bucket for each key.
+
+    Each request takes a token from the bucket for its key. Tokens are
+    added at ``requests_per_second``, up to ``burst`` tokens. A caller
+    which finds the bucket empty reserves the next token to be added,
+    and waits until then, so that concurrent callers are let through in
+    turn rather than all at once.
+
+    A ``TokenBucketRateLimiter`` can be shared between threads, and
+    between clients.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_second: float,
+        burst: int = 1,
+    ) -> None:
+        """Create a ``TokenBucketRateLimiter``.
+
+        Args:
+            requests_per_second: The rate at which requests may be made
+                for each key.
+            burst: The number of requests which may be made for a key at
+                once, after no requests have been made for a while.
+        """
+        self._requests_per_second = requests_per_second
+        self._burst = burst
+        self._lock = threading.Lock()
+        # For each key, the number of tokens in the bucket, and the time
+        # at which that number was worked out. The number of tokens is
+        # negative when tokens which have not been added yet are reserved.
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._counters = _WaitCounters()
+
+    @property
+    def statistics(self) -> RateLimiterStatistics:
+        """Counts of the waits made by callers of this rate limiter."""
+        return self._counters.snapshot()
+
+    def reserve(self, *, key: str) -> float:
+        """Take a token for a request, without waiting.
+
+        Args:
+            key: The key which the request is limited by.
+
+        Returns:
+            The number of seconds to wait before making the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_time = self._buckets.get(
+                key,
+                (float(self._burst), now),
+            )
+            tokens = min(
+                float(self._burst),
+                tokens + (now - updated_time) * self._requests_per_second,
+            )
+            tokens -= 1
+            self._buckets[key] = (tokens, now)
+
+        wait_seconds = max(0.0, -tokens / self._requests_per_second)
+        self._counters.record_wait(wait_seconds=wait_seconds)
+        return wait_seconds
+
+    def acquire(self, *, key: str) -> float:
+        """Wait until a request may be made.
+
+        Args:
+            key: The key which the request is limited by.
+
+        Returns:
+            The number of seconds waited.
+        """
+        wait_seconds = self.reserve(key=key)
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+        return wait_seconds
+
+    async def aacquire(self, *, key: str) -> float:
+        """Wait, without blocking the event loop, until a request may be
+        made.
+
+        Args:
+            key: The key which the request is limited by.
+
+        Returns:
+            The number of seconds waited.
+        """
+        wait_seconds = self.reserve(key=key)
+        if wait_seconds > 0:
+            await asyncio.sleep(delay=wait_seconds)
+        return wait_seconds
+
+
+@beartype
+def _key_hash(*, key: str) -> int:
+    """Get a hash of a key which is the same in every process.
+
+    Args:
+        key: The key to hash.
+
+    Returns:
+        A non-zero 64-bit hash of the key. Zero marks an empty slot.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(key.encode(encoding="utf-8"))
+    return int.from_bytes(bytes=digest.digest(), byteorder="little") or 1
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class SharedMemoryRateLimiter:
+    """A rate limiter whose state is shared by all processes on a host.
+
+    The state is kept in a memory-mapped file, so every process which
+    uses the same file shares one limit for each key. For example, give
+    each web server worker process a ``SharedMemoryRateLimiter`` with
+    the same ``path``.
+
+    Each key has a slot holding the time at which its next request
+    would be made if requests were evenly spaced (the generic cell rate
+    algorithm). A request reads and advances this time while holding a
+    lock on the file. Reading and writing the slot are memory accesses,
+    so the only system calls made for a request are those which take
+    and release the lock.
+
+    Rate limiters in one process which use the same file share one open
+    file and one lock, so they exclude each other as rate limiters in
+    different processes do.
+
+    Times are measured from when the host started, so use a file on a
+    file system which is cleared when the host restarts, such as
+    ``/dev/shm`` or ``/run``.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: Path,
+        requests_per_second: float,
+        burst: int = 1,
+        max_keys: int = 256,
+    ) -> None:
+        """Create a ``SharedMemoryRateLimiter``.
+
+        Every process which uses the same ``path`` must give the same
+        ``requests_per_second``, ``burst`` and ``max_keys``.
+
+        Args:
+            path: The file to keep the shared state in. It is created
+                if it does not exist.
+            requests_per_second: The rate at which requests may be made
+                for each key, across all processes.
+            burst: The number of requests which may be made for a key at
+                once, after no requests have been made for a while.
+            max_keys: The number of keys which the file has room for.
+
+        Raises:
+            ValueError: The file exists but was not created by a
+                ``SharedMemoryRateLimiter`` with the same ``max_keys``.
+        """
+        self._emission_interval_seconds = 1 / requests_per_second
+        self._tolerance_seconds = (burst - 1) * self._emission_interval_seconds
+        self._max_keys = max_keys
+        self._slot_offsets: dict[str, tuple[int, int]] = {}
+        self._counters = _WaitCounters()
+        self._shared_file = _open_shared_file(path=path, max_keys=max_keys)
+        self._mmap = self._shared_file.mmap
+        self._closed = False
+
+        magic, file_max_keys = _SHARED_HEADER.unpack_from(
+            buffer=self._mmap,
+        )
+        if magic != _SHARED_MAGIC or file_max_keys != max_keys:
+            self.close()
+            msg = (
+                f"{path} is not a rate limiter file with room for "
+                f"{max_keys} keys."
+            )
+            raise ValueError(msg)
+
+    @property
+    def statistics(self) -> RateLimiterStatistics:
+        """Counts of the waits made by callers of this rate limiter in
+        this process.
+        """
+        return self._counters.snapshot()
+
+    def close(self) -> None:
+        """Stop using the shared file.
+
+        The file is unmapped and closed once no rate limiter in this
+        process uses it.
+        """
+        if not self._closed:
+            self._closed = True
+            _close_shared_file(shared_file=self._shared_file)
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        """Exit the context manager and close the shared file."""
+        self.close()
+
+    def _slot_offset(self, *, key: str) -> tuple[int, int]:
+        """Find the slot for a key, claiming an empty slot if the key has
+        none.
+
+        This must be called while the file is locked.
+
+        Args:
+            key: The key to find the slot for.
+
+        Returns:
+            The offset of the slot in the file, and the hash of the key.
+
+        Raises:
+            ValueError: There is no room for another key.
+        """
+        cached = self._slot_offsets.get(key)
+        if cached is not None:
+            return cached
+
+        key_hash = _key_hash(key=key)
+        first_slot = key_hash % self._max_keys
+        for probe in range(self._max_keys):
+            slot = (first_slot + probe) % self._max_keys
+            offset = _SHARED_HEADER.size + slot * _SHARED_SLOT.size
+            slot_key_hash, _ = _SHARED_SLOT.unpack_from(
+                buffer=self._mmap,
+                offset=offset,
+            )
+            if slot_key_hash in {0, key_hash}:
+                self._slot_offsets[key] = (offset, key_hash)
+                return offset, key_hash
+
+        msg = f"There is no room for more than {self._max_keys} keys."
+        raise ValueError(msg)
+
+    def reserve(self, *, key: str) -> float:
+        """Reserve a time for a request, without waiting.
+
+        Args:
+            key: The key which the request is limited by.
+
+        Returns:
+            The number of seconds to wait before making the request.
+        """
+        with self._shared_file.locked():
+            offset, key_hash = self._slot_offset(key=key)
+            stored_next_time: float = _SHARED_SLOT.unpack_from(
+                buffer=self._mmap,
+                offset=offset,
+            )[1]
+            now = time.monotonic()
+            next_time = max(stored_next_time, now)
+            wait_seconds = max(
+                0.0,
+                next_time - self._tolerance_seconds - now,
+            )
+            _SHARED_SLOT.pack_into(
+                self._mmap,
+                offset,
+                key_hash,
+                next_time + self._emission_interval_seconds,
+            )
+
+        self._counters.record_wait(wait_seconds=wait_seconds)
+        return wait_seconds
+
+    def acquire(self, *, key: str) -> float:
+        """Wait until a request may be made.
+
+        Args:
+            key: The key which the request is limited by.
+
+        Returns:
+            The number of seconds waited.
+        """
+        wait_seconds = self.reserve(key=key)
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+        return wait_seconds
+
+    async def aacquire(self, *, key: str) -> float:
+        """Wait, without blocking the event loop, until a request may be
+        made.
+
+        The reservation is made in a worker thread, as taking the file
+        lock may wait for other processes.
+
+        Args:
+            key: The key which the request is limited by.
+
+        Returns:
+            The number of seconds waited.
+        """
+        wait_seconds = await asyncio.to_thread(self.reserve, key=key)
+        if wait_seconds > 0:
+            await asyncio.sleep(delay=wait_seconds)
+        return wait_seconds
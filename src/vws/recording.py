@@ -0,0 +1,607 @@
+"""Transports which record requests and responses, and replay them.
+
+A recording is a file with one JSON object per line, each holding a
+request and the response to it. Response bodies are base64 encoded.
+
+The ``Date`` and ``Authorization`` headers of requests are not recorded,
+as they change with every request, and hold credentials.
+"""
+
+import base64
+import contextlib
+import json
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Iterator  # noqa: TC003
+from pathlib import Path  # noqa: TC003
+from typing import Any
+from urllib.parse import urlsplit
+
+from beartype import BeartypeConf, beartype
+
+from vws._downloads import async_stream_request, stream_request
+from vws.exceptions.custom_exceptions import UnrecordedRequestError
+from vws.response import AsyncStreamedResponse, Response, StreamedResponse
+from vws.transports import AsyncTransport, Transport  # noqa: TC001
+
+# Request headers which are not recorded.
+_UNRECORDED_HEADERS = frozenset({"authorization", "date"})
+
+
+@beartype
+def _record_line(
+    *,
+    method: str,
+    url: str,
+    headers: dict[str, str],
+    response: Response,
+) -> str:
+    """Get the line which records a request and its response.
+
+    Args:
+        method: The HTTP method of the request.
+        url: The URL of the request.
+        headers: The headers of the request.
+        response: The response to the request.
+
+    Returns:
+        A line of compact JSON, ending with a newline.
+    """
+    record = {
+        "method": method,
+        "url": url,
+        "request_headers": {
+            name: value
+            for name, value in headers.items()
+            if name.lower() not in _UNRECORDED_HEADERS
+        },
+        "response_url": response.url,
+        "status_code": response.status_code,
+        "headers": response.headers,
+        "tell_position": response.tell_position,
+        "encoding": response.encoding,
+        "content": base64.b64encode(s=response.content).decode(),
+    }
+    return json.dumps(obj=record, separators=(",", ":")) + "\n"
+
+
+@beartype
+def _response_from_record(*, record: dict[str, Any]) -> Response:
+    """Get the response recorded in a record.
+
+    Args:
+        record: A record read from a recording.
+
+    Returns:
+        The recorded response.
+    """
+    return Response(
+        url=record["response_url"],
+        status_code=record["status_code"],
+        headers=dict(record["headers"]),
+        tell_position=record["tell_position"],
+        content=base64.b64decode(s=record["content"]),
+        encoding=record["encoding"],
+    )
+
+
+@beartype
+def _request_key(*, method: str, url: str) -> tuple[str, str]:
+    """Get the key which a request is matched on when replaying.
+
+    Args:
+        method: The HTTP method of the request.
+        url: The URL of the request.
+
+    Returns:
+        The method and the path of the request.
+    """
+    return method.upper(), urlsplit(url=url).path
+
+
+@beartype
+class _RecordingFile:
+    """A recording which records are added to, from any thread."""
+
+    def __init__(self, *, path: Path) -> None:
+        """
+        Args:
+            path: The file to add records to. It is created if it does
+                not exist.
+        """
+        self._lock = threading.Lock()
+        self._file = path.open(mode="a", encoding="utf-8")
+
+    def add(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        response: Response,
+    ) -> None:
+        """Add a record of a request and its response.
+
+        Args:
+            method: The HTTP method of the request.
+            url: The URL of the request.
+            headers: The headers of the request.
+            response: The response to the request.
+        """
+        line = _record_line(
+            method=method,
+            url=url,
+            headers=headers,
+            response=response,
+        )
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def add_streamed(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        streamed_response: StreamedResponse,
+    ) -> Iterator[bytes]:
+        """Give the chunks of a response body, and add a record of the
+        request and its response once the body has been read to the end.
+
+        Args:
+            method: The HTTP method of the request.
+            url: The URL of the request.
+            headers: The headers of the request.
+            streamed_response: The response to the request, with its body
+                not yet read.
+
+        Yields:
+            The chunks of the response body.
+        """
+        chunks: list[bytes] = []
+        for chunk in streamed_response.iter_bytes():
+            chunks.append(chunk)
+            yield chunk
+        content = b"".join(chunks)
+        self.add(
+            method=method,
+            url=url,
+            headers=headers,
+            response=Response(
+                url=streamed_response.url,
+                status_code=streamed_response.status_code,
+                headers=streamed_response.headers,
+                tell_position=len(content),
+                content=content,
+                encoding=streamed_response.encoding,
+            ),
+        )
+
+    async def async_add_streamed(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        streamed_response: AsyncStreamedResponse,
+    ) -> AsyncIterator[bytes]:
+        """Give the chunks of a response body which is read
+        asynchronously, and add a record of the request and its response
+        once the body has been read to the end.
+
+        Args:
+            method: The HTTP method of the request.
+            url: The URL of the request.
+            headers: The headers of the request.
+            streamed_response: The response to the request, with its body
+                not yet read.
+
+        Yields:
+            The chunks of the response body.
+        """
+        chunks: list[bytes] = []
+        async for chunk in streamed_response.aiter_bytes():
+            chunks.append(chunk)
+            yield chunk
+        content = b"".join(chunks)
+        self.add(
+            method=method,
+            url=url,
+            headers=headers,
+            response=Response(
+                url=streamed_response.url,
+                status_code=streamed_response.status_code,
+                headers=streamed_response.headers,
+                tell_position=len(content),
+                content=content,
+                encoding=streamed_response.encoding,
+            ),
+        )
+
+    def close(self) -> None:
+        """Close the file."""
+        with self._lock:
+            self._file.close()
+
+
+@beartype
+class _Recording:
+    """Responses read from a recording, to be given in recorded order."""
+
+    def __init__(self, *, path: Path, repeat: bool) -> None:
+        """
+        Args:
+            path: The recording to read.
+            repeat: Whether to start again from the first recorded
+                response for a request once all of them have been given.
+        """
+        self._lock = threading.Lock()
+        self._repeat = repeat
+        self._records: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        with path.open(encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(s=line)
+                key = _request_key(method=record["method"], url=record["url"])
+                self._records.setdefault(key, []).append(record)
+        self._remaining = {
+            key: deque(iterable=records)
+            for key, records in self._records.items()
+        }
+
+    def next_response(self, *, method: str, url: str) -> Response:
+        """Get the next recorded response for a request.
+
+        Args:
+            method: The HTTP method of the request.
+            url: The URL of the request.
+
+        Returns:
+            The next recorded response to a request with the same method
+            and path.
+
+        Raises:
+            UnrecordedRequestError: There is no recorded response left
+                for the request.
+        """
+        key = _request_key(method=method, url=url)
+        with self._lock:
+            remaining = self._remaining.get(key)
+            if not remaining and self._repeat and key in self._records:
+                remaining = deque(iterable=self._records[key])
+                self._remaining[key] = remaining
+            if not remaining:
+                raise UnrecordedRequestError(method=key[0], path=key[1])
+            record = remaining.popleft()
+        return _response_from_record(record=record)
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class RecordingTransport:
+    """A transport which makes requests with another transport, and
+    records each request and its response to a file.
+
+    Use the file with a :class:`ReplayTransport` to give the same
+    responses again without the network.
+    """
+
+    def __init__(self, *, transport: Transport, path: Path) -> None:
+        """Create a ``RecordingTransport``.
+
+        Args:
+            transport: The transport to make requests with.
+            path: The file to record to. Records are added to the end of
+                the file if it exists.
+        """
+        self._transport = transport
+        self._file = _RecordingFile(path=path)
+
+    def close(self) -> None:
+        """Close the recording and the wrapped transport."""
+        self._file.close()
+        self._transport.close()
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Make an HTTP request and record it.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Returns:
+            The response to the request.
+        """
+        response = self._transport(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        )
+        self._file.add(
+            method=method,
+            url=url,
+            headers=headers,
+            response=response,
+        )
+        return response
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Iterator[StreamedResponse]:
+        """Make an HTTP request without reading the response body, and
+        record it.
+
+        The request is recorded once its response body has been read to
+        the end. If the wrapped transport cannot stream response bodies,
+        the whole body is read and given as a single chunk.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Yields:
+            The response to the request, with its body not yet read.
+        """
+        with stream_request(
+            transport=self._transport,
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        ) as streamed_response:
+            yield StreamedResponse(
+                url=streamed_response.url,
+                status_code=streamed_response.status_code,
+                headers=streamed_response.headers,
+                chunks=self._file.add_streamed(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    streamed_response=streamed_response,
+                ),
+                encoding=streamed_response.encoding,
+            )
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class AsyncRecordingTransport:
+    """An async transport which makes requests with another async
+    transport, and records each request and its response to a file.
+
+    Use the file with an :class:`AsyncReplayTransport` to give the same
+    responses again without the network.
+    """
+
+    def __init__(self, *, transport: AsyncTransport, path: Path) -> None:
+        """Create an ``AsyncRecordingTransport``.
+
+        Args:
+            transport: The transport to make requests with.
+            path: The file to record to. Records are added to the end of
+                the file if it exists.
+        """
+        self._transport = transport
+        self._file = _RecordingFile(path=path)
+
+    async def aclose(self) -> None:
+        """Close the recording and the wrapped transport."""
+        self._file.close()
+        await self._transport.aclose()
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Make an async HTTP request and record it.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Returns:
+            The response to the request.
+        """
+        response = await self._transport(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        )
+        self._file.add(
+            method=method,
+            url=url,
+            headers=headers,
+            response=response,
+        )
+        return response
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> AsyncIterator[AsyncStreamedResponse]:
+        """Make an async HTTP request without reading the response body,
+        and record it.
+
+        The request is recorded once its response body has been read to
+        the end. If the wrapped transport cannot stream response bodies,
+        the whole body is read and given as a single chunk.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Yields:
+            The response to the request, with its body not yet read.
+        """
+        async with async_stream_request(
+            transport=self._transport,
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        ) as streamed_response:
+            yield AsyncStreamedResponse(
+                url=streamed_response.url,
+                status_code=streamed_response.status_code,
+                headers=streamed_response.headers,
+                chunks=self._file.async_add_streamed(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    streamed_response=streamed_response,
+                ),
+                encoding=streamed_response.encoding,
+            )
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class ReplayTransport:
+    """A transport which gives recorded responses without making
+    requests.
+
+    Requests are matched to recorded requests on their method and path.
+    Other parts of the request, such as the ``Date`` and
+    ``Authorization`` headers and the body, are ignored. Responses to
+    requests with the same method and path are given in recorded order.
+    """
+
+    def __init__(self, *, path: Path, repeat: bool = False) -> None:
+        """Create a ``ReplayTransport``.
+
+        Args:
+            path: A file recorded by a :class:`RecordingTransport` or an
+                :class:`AsyncRecordingTransport`.
+            repeat: Whether to start again from the first recorded
+                response to a request once all of them have been given.
+                This is useful for replaying a recording many times, for
+                example in a benchmark.
+        """
+        self._recording = _Recording(path=path, repeat=repeat)
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Give the next recorded response to a request.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers. These are ignored.
+            data: The request body. This is ignored.
+            request_timeout: The request timeout. This is ignored.
+
+        Returns:
+            The next recorded response to a request with the same method
+            and path.
+
+        Raises:
+            ~vws.exceptions.custom_exceptions.UnrecordedRequestError:
+                There is no recorded response left for the request.
+        """
+        del headers, data, request_timeout
+        return self._recording.next_response(method=method, url=url)
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class AsyncReplayTransport:
+    """An async transport which gives recorded responses without making
+    requests.
+
+    This works like :class:`ReplayTransport`.
+    """
+
+    def __init__(self, *, path: Path, repeat: bool = False) -> None:
+        """Create an ``AsyncReplayTransport``.
+
+        Args:
+            path: A file recorded by a :class:`RecordingTransport` or an
+                :class:`AsyncRecordingTransport`.
+            repeat: Whether to start again from the first recorded
+                response to a request once all of them have been given.
+        """
+        self._recording = _Recording(path=path, repeat=repeat)
+
+    async def aclose(self) -> None:
+        """Nothing to close."""
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Give the next recorded response to a request.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers. These are ignored.
+            data: The request body. This is ignored.
+            request_timeout: The request timeout. This is ignored.
+
+        Returns:
+            The next recorded response to a request with the same method
+            and path.
+
+        Raises:
+            ~vws.exceptions.custom_exceptions.UnrecordedRequestError:
+                There is no recorded response left for the request.
+        """
+        del headers, data, request_timeout
+        return self._recording.next_response(method=method, url=url)
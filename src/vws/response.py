@@ -1,19 +1,240 @@
 """Responses for requests to VWS and VWQ."""
 
+from collections.abc import AsyncIterator, Iterator  # noqa: TC003
 from dataclasses import dataclass
 
 from beartype import beartype
 
 
-@dataclass(frozen=True, kw_only=True)
+@dataclass(frozen=True, kw_only=True, init=False)
 @beartype
 class Response:
-    """A response from a request."""
+    """A response from a request.
+
+    The body is held once, as :attr:`content`. :attr:`text` is decoded
+    from it the first time it is used, unless it is given.
+    """
 
-    text: str
     url: str
     status_code: int
     headers: dict[str, str]
     request_body: bytes | str | None
     tell_position: int
     content: bytes
+    encoding: str | None
+
+    def __init__(
+        self,
+        *,
+        url: str,
+        status_code: int,
+        headers: dict[str, str],
+        tell_position: int,
+        content: bytes,
+        text: str | None = None,
+        request_body: bytes | str | None = None,
+        encoding: str | None = None,
+    ) -> None:
+        """
+        Args:
+            url: The URL of the response.
+            status_code: The HTTP status code of the response.
+            headers: The headers of the response.
+            tell_position: The number of bytes read from the
+                response stream.
+            content: The body of the response.
+            text: The body of the response, decoded. If this is not
+                given, it is decoded from ``content`` when it is first
+                used.
+            request_body: The body of the request which this is a
+                response to, if it was kept.
+            encoding: The encoding to decode ``content`` with.
+                Defaults to UTF-8. Unlike ``requests``, the encoding is
+                not guessed from the content, so a body in another
+                encoding which is not given here is decoded with
+                replacement characters.
+        """
+        # This is frozen, so fields are set as the generated
+        # ``__init__`` of a frozen dataclass sets them.
+        for name, value in (
+            ("url", url),
+            ("status_code", status_code),
+            ("headers", headers),
+            ("request_body", request_body),
+            ("tell_position", tell_position),
+            ("content", content),
+            ("encoding", encoding),
+        ):
+            object.__setattr__(self, name, value)
+        # The decoded text is a cache rather than a field, so it is not
+        # compared, shown or copied by ``dataclasses.replace``.
+        object.__setattr__(self, "_text", text)
+
+    @property
+    def text(self) -> str:
+        """The body of the response, decoded."""
+        text: str | None = self.__dict__["_text"]
+        if text is None:
+            text = self.content.decode(
+                encoding=self.encoding or "utf-8",
+                errors="replace",
+            )
+            object.__setattr__(self, "_text", text)
+        return text
+
+
+@beartype
+class StreamedResponse:
+    """A response whose body has not been read yet.
+
+    The body can be read in chunks with :meth:`iter_bytes`, or all at
+    once with :meth:`read`. It can be read only once.
+    """
+
+    def __init__(
+        self,
+        *,
+        url: str,
+        status_code: int,
+        headers: dict[str, str],
+        chunks: Iterator[bytes],
+        request_body: bytes | str | None = None,
+        encoding: str | None = None,
+    ) -> None:
+        """
+        Args:
+            url: The URL of the response.
+            status_code: The HTTP status code of the response.
+            headers: The headers of the response.
+            chunks: An iterator over the chunks of the body.
+            request_body: The body of the request which this is a
+                response to, if it was kept.
+            encoding: The encoding to decode the body with.
+                Defaults to UTF-8.
+        """
+        self._url = url
+        self._status_code = status_code
+        self._headers = headers
+        self._chunks = chunks
+        self._request_body = request_body
+        self._encoding = encoding
+
+    @property
+    def url(self) -> str:
+        """The URL of the response."""
+        return self._url
+
+    @property
+    def status_code(self) -> int:
+        """The HTTP status code of the response."""
+        return self._status_code
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """The headers of the response."""
+        return self._headers
+
+    @property
+    def encoding(self) -> str | None:
+        """The encoding to decode the body with, if it is known."""
+        return self._encoding
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Iterate over the chunks of the body."""
+        return self._chunks
+
+    def read(self) -> Response:
+        """Read the whole body.
+
+        Returns:
+            A response holding the body.
+        """
+        content = b"".join(self._chunks)
+        return Response(
+            url=self._url,
+            status_code=self._status_code,
+            headers=self._headers,
+            tell_position=len(content),
+            content=content,
+            request_body=self._request_body,
+            encoding=self._encoding,
+        )
+
+
+@beartype
+class AsyncStreamedResponse:
+    """A response whose body has not been read yet, and is read
+    asynchronously.
+
+    The body can be read in chunks with :meth:`aiter_bytes`, or all at
+    once with :meth:`aread`. It can be read only once.
+    """
+
+    def __init__(
+        self,
+        *,
+        url: str,
+        status_code: int,
+        headers: dict[str, str],
+        chunks: AsyncIterator[bytes],
+        request_body: bytes | str | None = None,
+        encoding: str | None = None,
+    ) -> None:
+        """
+        Args:
+            url: The URL of the response.
+            status_code: The HTTP status code of the response.
+            headers: The headers of the response.
+            chunks: An async iterator over the chunks of the body.
+            request_body: The body of the request which this is a
+                response to, if it was kept.
+            encoding: The encoding to decode the body with.
+                Defaults to UTF-8.
+        """
+        self._url = url
+        self._status_code = status_code
+        self._headers = headers
+        self._chunks = chunks
+        self._request_body = request_body
+        self._encoding = encoding
+
+    @property
+    def url(self) -> str:
+        """The URL of the response."""
+        return self._url
+
+    @property
+    def status_code(self) -> int:
+        """The HTTP status code of the response."""
+        return self._status_code
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """The headers of the response."""
+        return self._headers
+
+    @property
+    def encoding(self) -> str | None:
+        """The encoding to decode the body with, if it is known."""
+        return self._encoding
+
+    def aiter_bytes(self) -> AsyncIterator[bytes]:
+        """Iterate over the chunks of the body."""
+        return self._chunks
+
+    async def aread(self) -> Response:
+        """Read the whole body.
+
+        Returns:
+            A response holding the body.
+        """
+        content = b"".join([chunk async for chunk in self._chunks])
+        return Response(
+            url=self._url,
+            status_code=self._status_code,
+            headers=self._headers,
+            tell_position=len(content),
+            content=content,
+            request_body=self._request_body,
+            encoding=self._encoding,
+        )
@@ -0,0 +1,757 @@
+"""Transports which retry requests which fail for a temporary reason."""
+
+import asyncio
+import contextlib
+import datetime
+import random
+import threading
+import time
+from collections.abc import (  # noqa: TC003
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    Sequence,
+)
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from http import HTTPMethod, HTTPStatus
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+import urllib3
+from beartype import BeartypeConf, beartype
+
+from vws._downloads import async_stream_request, stream_request
+from vws.response import (
+    AsyncStreamedResponse,
+    Response,
+    StreamedResponse,
+)
+from vws.transports import AsyncTransport, Transport  # noqa: TC001
+
+# Requests with these methods have the same effect however many times they
+# are made.
+_IDEMPOTENT_METHODS = frozenset(
+    {
+        HTTPMethod.DELETE,
+        HTTPMethod.GET,
+        HTTPMethod.HEAD,
+        HTTPMethod.OPTIONS,
+        HTTPMethod.PUT,
+    },
+)
+
+# ``POST`` requests to these paths change nothing, so they are safe to
+# repeat. Other ``POST`` requests, such as adding a target, are not.
+_DEFAULT_IDEMPOTENT_POST_PATHS = (
+    # Cloud Recognition queries.
+    "/v1/query",
+    # Model Target Web API OAuth2 tokens.
+    "/oauth2/token",
+)
+
+# Errors which mean that a request may not have reached the server, or
+# that no response was received.
+_DEFAULT_RETRY_EXCEPTIONS: tuple[type[Exception], ...] = (
+    requests.ConnectionError,
+    requests.Timeout,
+    httpx.TransportError,
+    urllib3.exceptions.HTTPError,
+)
+
+
+@beartype
+@dataclass(frozen=True, kw_only=True)
+class RetryStatistics:
+    """Counts of the retries made by a retrying transport.
+
+    Args:
+        requests: The number of requests made through the transport.
+        attempts: The number of attempts made, including retries.
+        retries: The number of attempts which were retries.
+        retries_exhausted: The number of requests which failed for a
+            reason worth retrying, but which were not retried again
+            because the attempt limit or the retry budget was reached.
+        failed_attempt_seconds: The total number of seconds spent on
+            attempts which were then retried.
+        sleep_seconds: The total number of seconds spent waiting between
+            attempts.
+    """
+
+    requests: int
+    attempts: int
+    retries: int
+    retries_exhausted: int
+    failed_attempt_seconds: float
+    sleep_seconds: float
+
+
+@beartype
+class _RetryCounters:
+    """Thread-safe counters for the retries made by a retrying transport."""
+
+    def __init__(self) -> None:
+        """Create counters which start at zero."""
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._attempts = 0
+        self._retries = 0
+        self._retries_exhausted = 0
+        self._failed_attempt_seconds = 0.0
+        self._sleep_seconds = 0.0
+
+    def record_request(self) -> None:
+        """Record that a request was made."""
+        with self._lock:
+            self._requests += 1
+
+    def record_attempt(self) -> None:
+        """Record that an attempt was made."""
+        with self._lock:
+            self._attempts += 1
+
+    def record_retry(
+        self,
+        *,
+        failed_attempt_seconds: float,
+        sleep_seconds: float,
+    ) -> None:
+        """Record that a failed attempt will be retried.
+
+        Args:
+            failed_attempt_seconds: The number of seconds which the
+                failed attempt took.
+            sleep_seconds: The number of seconds to wait before retrying.
+        """
+        with self._lock:
+            self._retries += 1
+            self._failed_attempt_seconds += failed_attempt_seconds
+            self._sleep_seconds += sleep_seconds
+
+    def record_retries_exhausted(self) -> None:
+        """Record that a failed attempt will not be retried, because the
+        limits on retries were reached.
+        """
+        with self._lock:
+            self._retries_exhausted += 1
+
+    def snapshot(self) -> RetryStatistics:
+        """Get the current values of the counters."""
+        with self._lock:
+            return RetryStatistics(
+                requests=self._requests,
+                attempts=self._attempts,
+                retries=self._retries,
+                retries_exhausted=self._retries_exhausted,
+                failed_attempt_seconds=self._failed_attempt_seconds,
+                sleep_seconds=self._sleep_seconds,
+            )
+
+
+@beartype
+def _retry_after_seconds(
+    *,
+    response: Response | StreamedResponse | AsyncStreamedResponse,
+) -> float | None:
+    """Get the number of seconds which a response asks clients to wait
+    before retrying.
+
+    Args:
+        response: A response which may have a ``Retry-After`` header.
+
+    Returns:
+        The number of seconds to wait, or ``None`` if the response has no
+        valid ``Retry-After`` header.
+    """
+    value = next(
+        (
+            header_value
+            for header_name, header_value in response.headers.items()
+            if header_name.lower() == "retry-after"
+        ),
+        None,
+    )
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_time = parsedate_to_datetime(data=value)
+    except ValueError:
+        return None
+
+    if retry_time.tzinfo is None:
+        retry_time = retry_time.replace(tzinfo=datetime.UTC)
+
+    now = datetime.datetime.now(tz=datetime.UTC)
+    return max(0.0, (retry_time - now).total_seconds())
+
+
+async def _nothing_to_discard() -> None:
+    """Release nothing, as a response whose body has been read holds no
+    connection.
+    """
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class _RetryPolicy:
+    """Decide which failed attempts to retry, and how long to wait before
+    each retry.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+        retry_budget_seconds: float,
+        idempotent_post_paths: Sequence[str],
+        retry_exceptions: tuple[type[Exception], ...],
+    ) -> None:
+        """
+        Args:
+            max_attempts: The maximum number of attempts for a request.
+            backoff_base_seconds: The longest wait before the first retry.
+            backoff_max_seconds: The longest wait before any retry.
+            retry_budget_seconds: The time after the first attempt after
+                which no more retries are started.
+            idempotent_post_paths: Paths of ``POST`` requests which are
+                safe to repeat.
+            retry_exceptions: The errors which are retried.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.retry_budget_seconds = retry_budget_seconds
+        self.idempotent_post_paths = tuple(idempotent_post_paths)
+        self.retry_exceptions = retry_exceptions
+
+    def is_idempotent(self, *, method: str, url: str) -> bool:
+        """Whether a request is safe to repeat.
+
+        Args:
+            method: The HTTP method of the request.
+            url: The URL of the request.
+
+        Returns:
+            Whether making the request more than once has the same effect
+            as making it once.
+        """
+        if method.upper() in _IDEMPOTENT_METHODS:
+            return True
+
+        path = urlsplit(url=url).path
+        return method.upper() == HTTPMethod.POST and path.endswith(
+            self.idempotent_post_paths,
+        )
+
+    def is_retryable_response(
+        self,
+        *,
+        method: str,
+        url: str,
+        response: Response | StreamedResponse | AsyncStreamedResponse,
+    ) -> bool:
+        """Whether a response is worth retrying the request for.
+
+        A ``429 Too Many Requests`` response is always worth retrying, as
+        the request was not acted on. A server error is worth retrying
+        only for a request which is safe to repeat, as the request may
+        have been acted on.
+
+        Args:
+            method: The HTTP method of the request.
+            url: The URL of the request.
+            response: The response to the request.
+
+        Returns:
+            Whether to retry the request.
+        """
+        if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            return True
+
+        if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            return self.is_idempotent(method=method, url=url)
+
+        return False
+
+    def delay(
+        self,
+        *,
+        attempt: int,
+        elapsed_seconds: float,
+        retry_after_seconds: float | None,
+    ) -> float | None:
+        """Get the number of seconds to wait before retrying.
+
+        Without a ``Retry-After`` value, the wait is chosen at random
+        between zero and an exponentially growing limit, so that clients
+        which failed at the same time do not all retry at the same time.
+
+        Args:
+            attempt: The number of attempts made so far.
+            elapsed_seconds: The number of seconds since the first
+                attempt started.
+            retry_after_seconds: The wait asked for by the server, if any.
+
+        Returns:
+            The number of seconds to wait, or ``None`` if no more retries
+            are allowed.
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        if retry_after_seconds is None:
+            backoff_limit = min(
+                self.backoff_max_seconds,
+                self.backoff_base_seconds * 2 ** (attempt - 1),
+            )
+            delay = random.uniform(a=0, b=backoff_limit)  # noqa: S311
+        else:
+            delay = retry_after_seconds
+
+        if elapsed_seconds + delay > self.retry_budget_seconds:
+            return None
+
+        return delay
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class RetryingTransport:
+    """A transport which retries requests made with another transport
+    when they fail for a temporary reason.
+
+    Requests which get a ``429 Too Many Requests`` response are retried.
+    Requests which get a server error, or which fail with a connection
+    error, are retried only if they are safe to repeat. For example,
+    ``GET`` requests and Cloud Recognition queries are retried, but
+    requests to add a target are not, as the target may have been added.
+    """
+
+    def __init__(
+        self,
+        *,
+        transport: Transport,
+        max_attempts: int = 4,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 30.0,
+        retry_budget_seconds: float = 60.0,
+        idempotent_post_paths: Sequence[str] = _DEFAULT_IDEMPOTENT_POST_PATHS,
+        retry_exceptions: tuple[
+            type[Exception],
+            ...,
+        ] = _DEFAULT_RETRY_EXCEPTIONS,
+    ) -> None:
+        """Create a ``RetryingTransport``.
+
+        Args:
+            transport: The transport to make requests with.
+            max_attempts: The maximum number of attempts for a request,
+                including the first.
+            backoff_base_seconds: The longest wait before the first
+                retry. The longest wait doubles for each later retry.
+            backoff_max_seconds: The longest wait before any retry,
+                unless the server asks for a longer wait with a
+                ``Retry-After`` header.
+            retry_budget_seconds: The number of seconds after a request
+                is first attempted after which it is not retried. A
+                retry which would start after this time is not made.
+            idempotent_post_paths: The paths of ``POST`` requests which
+                are safe to repeat. By default, these are the paths for
+                Cloud Recognition queries and Model Target Web API
+                access tokens.
+            retry_exceptions: The errors from ``transport`` which are
+                retried for requests which are safe to repeat. By
+                default, these are connection and timeout errors from
+                the libraries used by the built-in transports.
+        """
+        self._transport = transport
+        self._policy = _RetryPolicy(
+            max_attempts=max_attempts,
+            backoff_base_seconds=backoff_base_seconds,
+            backoff_max_seconds=backoff_max_seconds,
+            retry_budget_seconds=retry_budget_seconds,
+            idempotent_post_paths=idempotent_post_paths,
+            retry_exceptions=retry_exceptions,
+        )
+        self._counters = _RetryCounters()
+
+    @property
+    def statistics(self) -> RetryStatistics:
+        """Counts of the retries made by this transport."""
+        return self._counters.snapshot()
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Make an HTTP request, retrying it if it fails for a temporary
+        reason.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Returns:
+            The response to the last attempt.
+        """
+        return self._retry(
+            method=method,
+            url=url,
+            make_attempt=lambda: self._transport(
+                method=method,
+                url=url,
+                headers=headers,
+                data=data,
+                request_timeout=request_timeout,
+            ),
+            discard=lambda: None,
+        )
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Iterator[StreamedResponse]:
+        """Make an HTTP request without reading the response body,
+        retrying it if it fails for a temporary reason.
+
+        A request is retried only before its response body is read. The
+        body of a response which is retried is not read.
+
+        If the wrapped transport cannot stream response bodies, the
+        whole body is read and given as a single chunk.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Yields:
+            The response to the last attempt, with its body not yet
+            read.
+        """
+        with contextlib.ExitStack() as stack:
+            yield self._retry(
+                method=method,
+                url=url,
+                make_attempt=lambda: stack.enter_context(
+                    cm=stream_request(
+                        transport=self._transport,
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        data=data,
+                        request_timeout=request_timeout,
+                    ),
+                ),
+                discard=stack.close,
+            )
+
+    def _retry[AttemptResponse: (Response, StreamedResponse)](
+        self,
+        *,
+        method: str,
+        url: str,
+        make_attempt: Callable[[], AttemptResponse],
+        discard: Callable[[], None],
+    ) -> AttemptResponse:
+        """Make attempts at a request until one is not worth retrying.
+
+        Args:
+            method: The HTTP method of the request.
+            url: The URL of the request.
+            make_attempt: A function which makes an attempt.
+            discard: A function which releases the response to an
+                attempt which will be retried.
+
+        Returns:
+            The response to the last attempt.
+        """
+        self._counters.record_request()
+        start_time = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            self._counters.record_attempt()
+            attempt_start_time = time.monotonic()
+            try:
+                response = make_attempt()
+            except self._policy.retry_exceptions:
+                if not self._policy.is_idempotent(method=method, url=url):
+                    raise
+                delay = self._policy.delay(
+                    attempt=attempt,
+                    elapsed_seconds=time.monotonic() - start_time,
+                    retry_after_seconds=None,
+                )
+                if delay is None:
+                    self._counters.record_retries_exhausted()
+                    raise
+            else:
+                if not self._policy.is_retryable_response(
+                    method=method,
+                    url=url,
+                    response=response,
+                ):
+                    return response
+                delay = self._policy.delay(
+                    attempt=attempt,
+                    elapsed_seconds=time.monotonic() - start_time,
+                    retry_after_seconds=_retry_after_seconds(
+                        response=response,
+                    ),
+                )
+                if delay is None:
+                    self._counters.record_retries_exhausted()
+                    return response
+                discard()
+
+            self._counters.record_retry(
+                failed_attempt_seconds=time.monotonic() - attempt_start_time,
+                sleep_seconds=delay,
+            )
+            time.sleep(delay)
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class AsyncRetryingTransport:
+    """An async transport which retries requests made with another async
+    transport when they fail for a temporary reason.
+
+    Requests which get a ``429 Too Many Requests`` response are retried.
+    Requests which get a server error, or which fail with a connection
+    error, are retried only if they are safe to repeat. For example,
+    ``GET`` requests and Cloud Recognition queries are retried, but
+    requests to add a target are not, as the target may have been added.
+    """
+
+    def __init__(
+        self,
+        *,
+        transport: AsyncTransport,
+        max_attempts: int = 4,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 30.0,
+        retry_budget_seconds: float = 60.0,
+        idempotent_post_paths: Sequence[str] = _DEFAULT_IDEMPOTENT_POST_PATHS,
+        retry_exceptions: tuple[
+            type[Exception],
+            ...,
+        ] = _DEFAULT_RETRY_EXCEPTIONS,
+    ) -> None:
+        """Create an ``AsyncRetryingTransport``.
+
+        Args:
+            transport: The transport to make requests with.
+            max_attempts: The maximum number of attempts for a request,
+                including the first.
+            backoff_base_seconds: The longest wait before the first
+                retry. The longest wait doubles for each later retry.
+            backoff_max_seconds: The longest wait before any retry,
+                unless the server asks for a longer wait with a
+                ``Retry-After`` header.
+            retry_budget_seconds: The number of seconds after a request
+                is first attempted after which it is not retried. A
+                retry which would start after this time is not made.
+            idempotent_post_paths: The paths of ``POST`` requests which
+                are safe to repeat. By default, these are the paths for
+                Cloud Recognition queries and Model Target Web API
+                access tokens.
+            retry_exceptions: The errors from ``transport`` which are
+                retried for requests which are safe to repeat. By
+                default, these are connection and timeout errors from
+                the libraries used by the built-in transports.
+        """
+        self._transport = transport
+        self._policy = _RetryPolicy(
+            max_attempts=max_attempts,
+            backoff_base_seconds=backoff_base_seconds,
+            backoff_max_seconds=backoff_max_seconds,
+            retry_budget_seconds=retry_budget_seconds,
+            idempotent_post_paths=idempotent_post_paths,
+            retry_exceptions=retry_exceptions,
+        )
+        self._counters = _RetryCounters()
+
+    @property
+    def statistics(self) -> RetryStatistics:
+        """Counts of the retries made by this transport."""
+        return self._counters.snapshot()
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.aclose()
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Make an async HTTP request, retrying it if it fails for a
+        temporary reason.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Returns:
+            The response to the last attempt.
+        """
+        return await self._retry(
+            method=method,
+            url=url,
+            make_attempt=lambda: self._transport(
+                method=method,
+                url=url,
+                headers=headers,
+                data=data,
+                request_timeout=request_timeout,
+            ),
+            discard=_nothing_to_discard,
+        )
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> AsyncIterator[AsyncStreamedResponse]:
+        """Make an async HTTP request without reading the response body,
+        retrying it if it fails for a temporary reason.
+
+        A request is retried only before its response body is read. The
+        body of a response which is retried is not read.
+
+        If the wrapped transport cannot stream response bodies, the
+        whole body is read and given as a single chunk.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Yields:
+            The response to the last attempt, with its body not yet
+            read.
+        """
+        async with contextlib.AsyncExitStack() as stack:
+            yield await self._retry(
+                method=method,
+                url=url,
+                make_attempt=lambda: stack.enter_async_context(
+                    cm=async_stream_request(
+                        transport=self._transport,
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        data=data,
+                        request_timeout=request_timeout,
+                    ),
+                ),
+                discard=stack.aclose,
+            )
+
+    async def _retry[AttemptResponse: (Response, AsyncStreamedResponse)](
+        self,
+        *,
+        method: str,
+        url: str,
+        make_attempt: Callable[[], Awaitable[AttemptResponse]],
+        discard: Callable[[], Awaitable[None]],
+    ) -> AttemptResponse:
+        """Make attempts at a request until one is not worth retrying.
+
+        Args:
+            method: The HTTP method of the request.
+            url: The URL of the request.
+            make_attempt: A function which makes an attempt.
+            discard: A function which releases the response to an
+                attempt which will be retried.
+
+        Returns:
+            The response to the last attempt.
+        """
+        self._counters.record_request()
+        start_time = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            self._counters.record_attempt()
+            attempt_start_time = time.monotonic()
+            try:
+                response = await make_attempt()
+            except self._policy.retry_exceptions:
+                if not self._policy.is_idempotent(method=method, url=url):
+                    raise
+                delay = self._policy.delay(
+                    attempt=attempt,
+                    elapsed_seconds=time.monotonic() - start_time,
+                    retry_after_seconds=None,
+                )
+                if delay is None:
+                    self._counters.record_retries_exhausted()
+                    raise
+            else:
+                if not self._policy.is_retryable_response(
+                    method=method,
+                    url=url,
+                    response=response,
+                ):
+                    return response
+                delay = self._policy.delay(
+                    attempt=attempt,
+                    elapsed_seconds=time.monotonic() - start_time,
+                    retry_after_seconds=_retry_after_seconds(
+                        response=response,
+                    ),
+                )
+                if delay is None:
+                    self._counters.record_retries_exhausted()
+                    return response
+                await discard()
+
+            self._counters.record_retry(
+                failed_attempt_seconds=time.monotonic() - attempt_start_time,
+                sleep_seconds=delay,
+            )
+            await asyncio.sleep(delay=delay)
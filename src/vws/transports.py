@@ -1,16 +1,217 @@
 """HTTP transport implementations for VWS clients."""
 
+import asyncio
+import contextlib
+from collections.abc import (  # noqa: TC003
+    AsyncIterator,
+    Iterator,
+    Sequence,
+)
+from http import HTTPStatus
 from typing import TYPE_CHECKING, Protocol, Self, runtime_checkable
+from urllib.parse import urljoin
 
 import httpx
 import requests
+import urllib3
 from beartype import BeartypeConf, beartype
+from requests.adapters import HTTPAdapter
 
-from vws.response import Response
+from vws.response import AsyncStreamedResponse, Response, StreamedResponse
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable
 
+_DEFAULT_WARM_URLS = (
+    "https://vws.vuforia.com",
+    "https://cloudreco.vuforia.com",
+)
+
+# The number of bytes to read at a time when streaming a response body.
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Follow redirects, as the other built-in transports do, but raise errors
+# rather than retrying failed requests.
+_URLLIB3_RETRIES = urllib3.Retry(
+    total=None,
+    connect=False,
+    read=False,
+    redirect=30,
+    status=0,
+    other=0,
+)
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+def _httpx_timeout(
+    *,
+    request_timeout: float | tuple[float, float],
+) -> httpx.Timeout:
+    """Get an ``httpx`` timeout from a transport request timeout.
+
+    Args:
+        request_timeout: A float to set both the connect and read
+            timeouts, or a (connect, read) tuple.
+
+    Returns:
+        The equivalent ``httpx`` timeout.
+    """
+    match request_timeout:
+        case tuple() as timeout:
+            connect_timeout, read_timeout = timeout
+            return httpx.Timeout(
+                connect=connect_timeout,
+                read=read_timeout,
+                write=None,
+                pool=None,
+            )
+        case timeout:
+            return httpx.Timeout(
+                connect=timeout,
+                read=timeout,
+                write=None,
+                pool=None,
+            )
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+def _urllib3_timeout(
+    *,
+    request_timeout: float | tuple[float, float],
+) -> urllib3.Timeout:
+    """Get a ``urllib3`` timeout from a transport request timeout.
+
+    Args:
+        request_timeout: A float to set both the connect and read
+            timeouts, or a (connect, read) tuple.
+
+    Returns:
+        The equivalent ``urllib3`` timeout.
+    """
+    match request_timeout:
+        case tuple() as timeout:
+            connect_timeout, read_timeout = timeout
+            return urllib3.Timeout(connect=connect_timeout, read=read_timeout)
+        case timeout:
+            return urllib3.Timeout(connect=timeout, read=timeout)
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+def _urllib3_response_url(
+    *,
+    url: str,
+    urllib3_response: urllib3.BaseHTTPResponse,
+) -> str:
+    """Get the URL which a ``urllib3`` response came from.
+
+    ``urllib3`` gives only the path of the last request, so the URL is
+    found by following the redirects recorded on the response.
+
+    Args:
+        url: The URL which was requested.
+        urllib3_response: The response.
+
+    Returns:
+        The URL of the last request, after any redirects.
+    """
+    if urllib3_response.retries is not None:
+        for request_history in urllib3_response.retries.history:
+            if request_history.redirect_location is not None:
+                url = urljoin(base=url, url=request_history.redirect_location)
+    return url
+
+
+@beartype
+def _urllib3_response_encoding(
+    *,
+    urllib3_response: urllib3.BaseHTTPResponse,
+) -> str | None:
+    """Get the encoding of the body of a ``urllib3`` response.
+
+    The encoding is found from the ``Content-Type`` header in the same
+    way as ``requests`` finds it, so that text is decoded in the same
+    way by each transport.
+
+    Args:
+        urllib3_response: The response.
+
+    Returns:
+        The encoding of the body, or ``None`` if it is not known.
+    """
+    return requests.utils.get_encoding_from_headers(
+        headers=urllib3_response.headers,
+    )
+
+
+@beartype
+def _kept_request_body(
+    *,
+    data: bytes,
+    status_code: int,
+    keep_request_body: bool,
+) -> bytes | None:
+    """Get the request body to keep on a response.
+
+    The body is not copied, so keeping it costs no more memory than the
+    request already used, but it is kept alive for as long as the
+    response is.
+
+    Args:
+        data: The body of the request.
+        status_code: The status code of the response.
+        keep_request_body: Whether the transport keeps the bodies of all
+            requests.
+
+    Returns:
+        The request body, or ``None`` if it is not kept.
+    """
+    if not data:
+        return None
+
+    if keep_request_body or status_code >= HTTPStatus.BAD_REQUEST:
+        return data
+
+    return None
+
+
+@beartype
+def _check_warm_connections(
+    *,
+    connections: int,
+    urls: Sequence[str],
+    max_connections: int | None,
+) -> None:
+    """Check that the connections to warm can all be open at once.
+
+    The requests which warm connections are all kept open until the last
+    one has been sent. If there are more of them than the connection
+    limit, the last requests would wait for a connection until they time
+    out.
+
+    Args:
+        connections: The number of connections to open to each URL's
+            host.
+        urls: The URLs to open connections for.
+        max_connections: The maximum number of connections to open at
+            once, or ``None`` for no limit.
+
+    Raises:
+        ValueError: ``connections`` is less than 1, or more connections
+            would be needed than ``max_connections``.
+    """
+    if connections < 1:
+        msg = "connections must be at least 1."
+        raise ValueError(msg)
+
+    needed_connections = connections * len(urls)
+    if max_connections is not None and needed_connections > max_connections:
+        msg = (
+            f"Warming {connections} connections to each of {len(urls)} "
+            f"URLs needs {needed_connections} connections at once, which "
+            f"is more than max_connections ({max_connections})."
+        )
+        raise ValueError(msg)
+
 
 @runtime_checkable
 class Transport(Protocol):
@@ -50,19 +251,96 @@ class Transport(Protocol):
         ...  # pylint: disable=unnecessary-ellipsis
 
 
+@runtime_checkable
+class StreamingTransport(Transport, Protocol):
+    """Protocol for HTTP transports which can also stream response
+    bodies.
+
+    Streaming lets large bodies, such as dataset downloads, be written
+    out without holding the whole body in memory.
+    """
+
+    def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> contextlib.AbstractContextManager[StreamedResponse]:
+        """Make an HTTP request, without reading the response body.
+
+        Args:
+            method: The HTTP method (e.g. "GET", "POST").
+            url: The full URL to request.
+            headers: Headers to send with the request.
+            data: The request body as bytes.
+            request_timeout: The timeout for the request. A float
+                sets both the connect and read timeouts. A
+                (connect, read) tuple sets them individually.
+
+        Returns:
+            A context manager which gives a ``StreamedResponse``, and
+            releases the connection on exit.
+        """
+        ...  # pylint: disable=unnecessary-ellipsis
+
+
 @beartype(conf=BeartypeConf(is_pep484_tower=True))
 class RequestsTransport:
     """HTTP transport using the ``requests`` library.
 
     This is the default transport.
+    A single ``requests.Session`` is reused across requests
+    for connection pooling.
     """
 
-    def close(self) -> None:
-        """Close the transport.
+    def __init__(
+        self,
+        *,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        keep_alive: bool = True,
+        keep_request_body: bool = False,
+    ) -> None:
+        """Create a ``RequestsTransport``.
 
-        This is a no-op for ``RequestsTransport`` as it does not
-        hold persistent connections.
+        Args:
+            pool_connections: The number of hosts to keep a
+                connection pool for.
+            pool_maxsize: The maximum number of connections
+                to keep open to each host.
+            keep_alive: Whether to keep connections open
+                between requests. If ``False``, each request
+                asks the server to close its connection, so
+                every request opens a new connection.
+            keep_request_body: Whether to keep the body of each
+                request on its response. Request bodies are always
+                kept on error responses, as some exceptions use them.
         """
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+        self._session = requests.Session()
+        self._session.mount(prefix="https://", adapter=adapter)
+        self._session.mount(prefix="http://", adapter=adapter)
+        if not keep_alive:
+            self._session.headers["Connection"] = "close"
+        self._keep_request_body = keep_request_body
+
+    def close(self) -> None:
+        """Close the underlying ``requests.Session``."""
+        self._session.close()
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        """Exit the context manager and close the session."""
+        self.close()
 
     def __call__(
         self,
@@ -85,7 +363,7 @@ class RequestsTransport:
         Returns:
             A Response populated from the requests response.
         """
-        requests_response = requests.request(
+        requests_response = self._session.request(
             method=method,
             url=url,
             headers=headers,
@@ -94,15 +372,69 @@ class RequestsTransport:
         )
 
         return Response(
-            text=requests_response.text,
             url=requests_response.url,
             status_code=requests_response.status_code,
             headers=dict(requests_response.headers),
-            request_body=requests_response.request.body,
+            request_body=_kept_request_body(
+                data=data,
+                status_code=requests_response.status_code,
+                keep_request_body=self._keep_request_body,
+            ),
             tell_position=requests_response.raw.tell(),
-            content=bytes(requests_response.content),
+            content=requests_response.content,
+            encoding=requests_response.encoding,
+        )
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Iterator[StreamedResponse]:
+        """Make an HTTP request using ``requests``, without reading the
+        response body.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Yields:
+            A StreamedResponse which reads the body in chunks.
+        """
+        requests_response = self._session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            timeout=request_timeout,
+            stream=True,
         )
 
+        try:
+            yield StreamedResponse(
+                url=requests_response.url,
+                status_code=requests_response.status_code,
+                headers=dict(requests_response.headers),
+                chunks=requests_response.iter_content(
+                    chunk_size=_STREAM_CHUNK_SIZE,
+                ),
+                request_body=_kept_request_body(
+                    data=data,
+                    status_code=requests_response.status_code,
+                    keep_request_body=self._keep_request_body,
+                ),
+                encoding=requests_response.encoding,
+            )
+        finally:
+            requests_response.close()
+
 
 @beartype(conf=BeartypeConf(is_pep484_tower=True))
 class HTTPXTransport:
@@ -114,9 +446,91 @@ class HTTPXTransport:
     for connection pooling.
     """
 
-    def __init__(self) -> None:
-        """Create an ``HTTPXTransport``."""
-        self._client = httpx.Client()
+    def __init__(
+        self,
+        *,
+        http2: bool = False,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 5.0,
+        keep_request_body: bool = False,
+    ) -> None:
+        """Create an ``HTTPXTransport``.
+
+        Args:
+            http2: Whether to use HTTP/2 when the server supports it.
+                With HTTP/2, concurrent requests to a host share a
+                connection. This needs the ``http2`` extra, installed
+                with ``pip install vws-python[http2]``.
+            max_connections: The maximum number of connections to
+                open at once, or ``None`` for no limit.
+            max_keepalive_connections: The maximum number of idle
+                connections to keep open, or ``None`` for no limit.
+            keepalive_expiry: The number of seconds to keep an idle
+                connection open for, or ``None`` to keep idle
+                connections open indefinitely.
+            keep_request_body: Whether to keep the body of each
+                request on its response. Request bodies are always
+                kept on error responses, as some exceptions use them.
+        """
+        self._client = httpx.Client(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        self._max_connections = max_connections
+        self._keep_request_body = keep_request_body
+
+    def warm(
+        self,
+        *,
+        connections: int,
+        urls: Sequence[str] = _DEFAULT_WARM_URLS,
+    ) -> None:
+        """Open connections ahead of time, so that later requests do
+        not wait for connections to be set up.
+
+        ``connections`` ``HEAD`` requests are kept open at once to each
+        URL, so that each needs a connection of its own. The
+        connections are then kept open for reuse, up to
+        ``max_keepalive_connections``. With HTTP/2, the requests share
+        one connection to each host.
+
+        Args:
+            connections: The number of connections to open to each
+                URL's host.
+            urls: The URLs to open connections for. By default, these
+                are the URLs of the Vuforia Web Services API and the
+                Vuforia Cloud Recognition Web API.
+
+        Raises:
+            ValueError: ``connections`` is less than 1, or
+                ``connections`` for each URL would be more than
+                ``max_connections`` in total.
+        """
+        _check_warm_connections(
+            connections=connections,
+            urls=urls,
+            max_connections=self._max_connections,
+        )
+        with contextlib.ExitStack() as stack:
+            for url in urls:
+                for _ in range(connections):
+                    request = self._client.build_request(
+                        method="HEAD",
+                        url=url,
+                    )
+                    response = self._client.send(
+                        request=request,
+                        stream=True,
+                    )
+                    # Reading the whole response lets its connection be
+                    # reused once it is closed.
+                    stack.callback(response.close)
+                    stack.callback(response.read)
 
     def close(self) -> None:
         """Close the underlying ``httpx.Client``."""
@@ -151,45 +565,241 @@ class HTTPXTransport:
         Returns:
             A Response populated from the httpx response.
         """
-        match request_timeout:
-            case tuple() as timeout:
-                connect_timeout, read_timeout = timeout
-                httpx_timeout = httpx.Timeout(
-                    connect=connect_timeout,
-                    read=read_timeout,
-                    write=None,
-                    pool=None,
-                )
-            case timeout:
-                httpx_timeout = httpx.Timeout(
-                    connect=timeout,
-                    read=timeout,
-                    write=None,
-                    pool=None,
-                )
-
         httpx_response = self._client.request(
             method=method,
             url=url,
             headers=headers,
             content=data,
-            timeout=httpx_timeout,
+            timeout=_httpx_timeout(request_timeout=request_timeout),
             follow_redirects=True,
         )
 
-        content = bytes(httpx_response.content)
-        request_content = httpx_response.request.content
+        content = httpx_response.content
 
         return Response(
-            text=httpx_response.text,
             url=str(object=httpx_response.url),
             status_code=httpx_response.status_code,
             headers=dict(httpx_response.headers),
-            request_body=bytes(request_content) or None,
+            request_body=_kept_request_body(
+                data=data,
+                status_code=httpx_response.status_code,
+                keep_request_body=self._keep_request_body,
+            ),
+            tell_position=len(content),
+            content=content,
+            encoding=httpx_response.encoding,
+        )
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Iterator[StreamedResponse]:
+        """Make an HTTP request using ``httpx``, without reading the
+        response body.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Yields:
+            A StreamedResponse which reads the body in chunks.
+        """
+        with self._client.stream(
+            method=method,
+            url=url,
+            headers=headers,
+            content=data,
+            timeout=_httpx_timeout(request_timeout=request_timeout),
+            follow_redirects=True,
+        ) as httpx_response:
+            yield StreamedResponse(
+                url=str(object=httpx_response.url),
+                status_code=httpx_response.status_code,
+                headers=dict(httpx_response.headers),
+                chunks=httpx_response.iter_bytes(
+                    chunk_size=_STREAM_CHUNK_SIZE,
+                ),
+                request_body=_kept_request_body(
+                    data=data,
+                    status_code=httpx_response.status_code,
+                    keep_request_body=self._keep_request_body,
+                ),
+                encoding=httpx_response.encoding,
+            )
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class URLLib3Transport:
+    """HTTP transport using ``urllib3`` directly.
+
+    This transport does less work for each request than
+    ``RequestsTransport``, which adds session, cookie and hook handling
+    on top of ``urllib3``. Use it where many requests are made from one
+    process, for example in query workers.
+    A single ``urllib3.PoolManager`` is reused across requests
+    for connection pooling.
+    """
+
+    def __init__(
+        self,
+        *,
+        num_pools: int = 10,
+        maxsize: int = 10,
+        block: bool = False,
+        keep_request_body: bool = False,
+    ) -> None:
+        """Create a ``URLLib3Transport``.
+
+        Args:
+            num_pools: The number of hosts to keep a connection pool
+                for.
+            maxsize: The maximum number of connections to keep open to
+                each host.
+            block: Whether to wait for a pooled connection to be free
+                when ``maxsize`` connections to a host are in use, rather
+                than opening a connection which is not kept.
+            keep_request_body: Whether to keep the body of each
+                request on its response. Request bodies are always
+                kept on error responses, as some exceptions use them.
+        """
+        self._pool_manager = urllib3.PoolManager(
+            num_pools=num_pools,
+            maxsize=maxsize,
+            block=block,
+            retries=_URLLIB3_RETRIES,
+        )
+        self._keep_request_body = keep_request_body
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self._pool_manager.clear()
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        """Exit the context manager and close the pooled connections."""
+        self.close()
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Make an HTTP request using ``urllib3``.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Returns:
+            A Response populated from the urllib3 response.
+        """
+        urllib3_response = self._pool_manager.request(
+            method=method,
+            url=url,
+            headers=headers,
+            body=data,
+            timeout=_urllib3_timeout(request_timeout=request_timeout),
+        )
+
+        content = urllib3_response.data
+
+        return Response(
+            url=_urllib3_response_url(
+                url=url,
+                urllib3_response=urllib3_response,
+            ),
+            status_code=urllib3_response.status,
+            headers=dict(urllib3_response.headers),
+            request_body=_kept_request_body(
+                data=data,
+                status_code=urllib3_response.status,
+                keep_request_body=self._keep_request_body,
+            ),
             tell_position=len(content),
             content=content,
+            encoding=_urllib3_response_encoding(
+                urllib3_response=urllib3_response,
+            ),
         )
 
+    @contextlib.contextmanager
+    def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Iterator[StreamedResponse]:
+        """Make an HTTP request using ``urllib3``, without reading the
+        response body.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Yields:
+            A StreamedResponse which reads the body in chunks.
+        """
+        urllib3_response = self._pool_manager.request(
+            method=method,
+            url=url,
+            headers=headers,
+            body=data,
+            timeout=_urllib3_timeout(request_timeout=request_timeout),
+            preload_content=False,
+        )
+
+        try:
+            yield StreamedResponse(
+                url=_urllib3_response_url(
+                    url=url,
+                    urllib3_response=urllib3_response,
+                ),
+                status_code=urllib3_response.status,
+                headers=dict(urllib3_response.headers),
+                chunks=urllib3_response.stream(amt=_STREAM_CHUNK_SIZE),
+                request_body=_kept_request_body(
+                    data=data,
+                    status_code=urllib3_response.status,
+                    keep_request_body=self._keep_request_body,
+                ),
+                encoding=_urllib3_response_encoding(
+                    urllib3_response=urllib3_response,
+                ),
+            )
+        finally:
+            # A connection can only be reused once its response body has
+            # been read. Reading the rest of a large body which was not
+            # wanted could take a long time, so the connection is closed
+            # instead.
+            if not urllib3_response.closed:
+                urllib3_response.close()
+            urllib3_response.release_conn()
+
 
 @runtime_checkable
 class AsyncTransport(Protocol):
@@ -229,6 +839,44 @@ class AsyncTransport(Protocol):
         ...  # pylint: disable=unnecessary-ellipsis
 
 
+@runtime_checkable
+class AsyncStreamingTransport(AsyncTransport, Protocol):
+    """Protocol for async HTTP transports which can also stream
+    response bodies.
+
+    Streaming lets large bodies, such as dataset downloads, be written
+    out without holding the whole body in memory.
+    """
+
+    def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> contextlib.AbstractAsyncContextManager[AsyncStreamedResponse]:
+        """Make an async HTTP request, without reading the response
+        body.
+
+        Args:
+            method: The HTTP method (e.g. "GET", "POST").
+            url: The full URL to request.
+            headers: Headers to send with the request.
+            data: The request body as bytes.
+            request_timeout: The timeout for the request. A float
+                sets both the connect and read timeouts. A
+                (connect, read) tuple sets them individually.
+
+        Returns:
+            An async context manager which gives an
+            ``AsyncStreamedResponse``, and releases the connection on
+            exit.
+        """
+        ...  # pylint: disable=unnecessary-ellipsis
+
+
 @beartype(conf=BeartypeConf(is_pep484_tower=True))
 class AsyncHTTPXTransport:
     """Async HTTP transport using the ``httpx`` library.
@@ -238,9 +886,101 @@ class AsyncHTTPXTransport:
     for connection pooling.
     """
 
-    def __init__(self) -> None:
-        """Create an ``AsyncHTTPXTransport``."""
-        self._client = httpx.AsyncClient()
+    def __init__(
+        self,
+        *,
+        http2: bool = False,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 5.0,
+        keep_request_body: bool = False,
+    ) -> None:
+        """Create an ``AsyncHTTPXTransport``.
+
+        Args:
+            http2: Whether to use HTTP/2 when the server supports it.
+                With HTTP/2, concurrent requests to a host are
+                multiplexed over one connection, rather than each
+                needing a connection of its own. This needs the
+                ``http2`` extra, installed with
+                ``pip install vws-python[http2]``.
+            max_connections: The maximum number of connections to
+                open at once, or ``None`` for no limit.
+            max_keepalive_connections: The maximum number of idle
+                connections to keep open, or ``None`` for no limit.
+            keepalive_expiry: The number of seconds to keep an idle
+                connection open for, or ``None`` to keep idle
+                connections open indefinitely.
+            keep_request_body: Whether to keep the body of each
+                request on its response. Request bodies are always
+                kept on error responses, as some exceptions use them.
+        """
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        self._max_connections = max_connections
+        self._keep_request_body = keep_request_body
+
+    async def warm(
+        self,
+        *,
+        connections: int,
+        urls: Sequence[str] = _DEFAULT_WARM_URLS,
+    ) -> None:
+        """Open connections ahead of time, so that later requests do
+        not wait for connections to be set up.
+
+        ``connections`` concurrent ``HEAD`` requests are made to each
+        URL, and kept open until all have been sent, so that each needs
+        a connection of its own. The connections are then kept open for
+        reuse, up to ``max_keepalive_connections``. With HTTP/2, the
+        requests share one connection to each host.
+
+        Args:
+            connections: The number of connections to open to each
+                URL's host.
+            urls: The URLs to open connections for. By default, these
+                are the URLs of the Vuforia Web Services API and the
+                Vuforia Cloud Recognition Web API.
+
+        Raises:
+            ValueError: ``connections`` is less than 1, or
+                ``connections`` for each URL would be more than
+                ``max_connections`` in total.
+        """
+        _check_warm_connections(
+            connections=connections,
+            urls=urls,
+            max_connections=self._max_connections,
+        )
+        warm_requests = [
+            self._client.build_request(method="HEAD", url=url)
+            for url in urls
+            for _ in range(connections)
+        ]
+        async with contextlib.AsyncExitStack() as stack:
+            results = await asyncio.gather(
+                *(
+                    self._client.send(request=request, stream=True)
+                    for request in warm_requests
+                ),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, httpx.Response):
+                    # Reading the whole response lets its connection be
+                    # reused once it is closed.
+                    stack.push_async_callback(result.aclose)
+                    stack.push_async_callback(result.aread)
+
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
 
     async def aclose(self) -> None:
         """Close the underlying ``httpx.AsyncClient``."""
@@ -275,41 +1015,73 @@ class AsyncHTTPXTransport:
         Returns:
             A Response populated from the httpx response.
         """
-        match request_timeout:
-            case tuple() as timeout:
-                connect_timeout, read_timeout = timeout
-                httpx_timeout = httpx.Timeout(
-                    connect=connect_timeout,
-                    read=read_timeout,
-                    write=None,
-                    pool=None,
-                )
-            case timeout:
-                httpx_timeout = httpx.Timeout(
-                    connect=timeout,
-                    read=timeout,
-                    write=None,
-                    pool=None,
-                )
-
         httpx_response = await self._client.request(
             method=method,
             url=url,
             headers=headers,
             content=data,
-            timeout=httpx_timeout,
+            timeout=_httpx_timeout(request_timeout=request_timeout),
             follow_redirects=True,
         )
 
-        content = bytes(httpx_response.content)
-        request_content = httpx_response.request.content
+        content = httpx_response.content
 
         return Response(
-            text=httpx_response.text,
             url=str(object=httpx_response.url),
             status_code=httpx_response.status_code,
             headers=dict(httpx_response.headers),
-            request_body=bytes(request_content) or None,
+            request_body=_kept_request_body(
+                data=data,
+                status_code=httpx_response.status_code,
+                keep_request_body=self._keep_request_body,
+            ),
             tell_position=len(content),
             content=content,
+            encoding=httpx_response.encoding,
         )
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> AsyncIterator[AsyncStreamedResponse]:
+        """Make an async HTTP request using ``httpx``, without reading
+        the response body.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Yields:
+            An AsyncStreamedResponse which reads the body in chunks.
+        """
+        async with self._client.stream(
+            method=method,
+            url=url,
+            headers=headers,
+            content=data,
+            timeout=_httpx_timeout(request_timeout=request_timeout),
+            follow_redirects=True,
+        ) as httpx_response:
+            yield AsyncStreamedResponse(
+                url=str(object=httpx_response.url),
+                status_code=httpx_response.status_code,
+                headers=dict(httpx_response.headers),
+                chunks=httpx_response.aiter_bytes(
+                    chunk_size=_STREAM_CHUNK_SIZE,
+                ),
+                request_body=_kept_request_body(
+                    data=data,
+                    status_code=httpx_response.status_code,
+                    keep_request_body=self._keep_request_body,
+                ),
+                encoding=httpx_response.encoding,
+            )
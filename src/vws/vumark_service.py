@@ -1,14 +1,18 @@
 """Interface to the Vuforia VuMark Generation Web API."""
 
 import json
+from collections.abc import Sequence  # noqa: TC003
 from http import HTTPMethod, HTTPStatus
+from typing import Self
 
 from beartype import BeartypeConf, beartype
 
+from vws._signing import Signer
 from vws._vws_request import target_api_request
 from vws.exceptions.base_exceptions import VWSError
 from vws.exceptions.custom_exceptions import ServerError
 from vws.exceptions.vws_exceptions import TooManyRequestsError
+from vws.middleware import Middleware  # noqa: TC001
 from vws.transports import RequestsTransport, Transport
 from vws.vumark_accept import VuMarkAccept  # noqa: TC001
 
@@ -25,6 +29,7 @@ class VuMarkService:
         base_vws_url: str = "https://vws.vuforia.com",
         request_timeout_seconds: float | tuple[float, float] = 30.0,
         transport: Transport | None = None,
+        middleware: Sequence[Middleware] = (),
     ) -> None:
         """
         Args:
@@ -38,14 +43,49 @@ class VuMarkService:
             transport: The HTTP transport to use for
                 requests. Defaults to
                 ``RequestsTransport()``.
+                The client closes this transport when it is
+                closed.
+            middleware: Middleware to send each request
+                through, outermost first. See
+                :mod:`vws.middleware`.
         """
-        self._server_access_key = server_access_key
-        self._server_secret_key = server_secret_key
+        self._signer = Signer(
+            access_key=server_access_key,
+            secret_key=server_secret_key,
+        )
         self._base_vws_url = base_vws_url
         self._request_timeout_seconds = request_timeout_seconds
         self._transport = (
             transport if transport is not None else RequestsTransport()
         )
+        self._middleware = tuple(middleware)
+
+    @property
+    def clock_offset_seconds(self) -> float:
+        """The number of seconds which Vuforia's clock was last measured
+        to be ahead of the local clock, or behind it if negative.
+
+        This is measured from the ``Date`` header of each response, and
+        requests are signed with the local time plus this offset.
+        """
+        return self._signer.clock_offset_seconds
+
+    def close(self) -> None:
+        """Close the transport.
+
+        The client owns its transport, including a transport which was
+        given to it. To share one transport between clients, do not close
+        the clients. Close the transport once none of them is in use.
+        """
+        self._transport.close()
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        """Exit the context manager and close the transport."""
+        self.close()
 
     def generate_vumark_instance(
         self,
@@ -105,15 +145,17 @@ class VuMarkService:
 
         response = target_api_request(
             content_type=content_type,
-            server_access_key=self._server_access_key,
-            server_secret_key=self._server_secret_key,
+            signer=self._signer,
             method=HTTPMethod.POST,
             data=request_data,
+            content_md5_hex=None,
             request_path=request_path,
             base_vws_url=self._base_vws_url,
             request_timeout_seconds=self._request_timeout_seconds,
             extra_headers={"Accept": accept},
             transport=self._transport,
+            middleware=self._middleware,
+            rate_limiter=None,
         )
 
         if (
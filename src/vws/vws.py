@@ -1,20 +1,28 @@
 """Tools for interacting with Vuforia APIs."""
 
-import base64
 import calendar  # noqa: TC003
+import contextlib
 import json
 import time
+from collections.abc import Sequence  # noqa: TC003
 from http import HTTPMethod, HTTPStatus
+from typing import Self
 
 from beartype import BeartypeConf, beartype
 
+from vws._downloads import DownloadDestination as _DownloadDestination
+from vws._downloads import stream_request, write_chunks
 from vws._image_utils import ImageType as _ImageType
-from vws._image_utils import get_image_data as _get_image_data
+from vws._image_utils import open_image_data as _open_image_data
+from vws._image_validation import validate_target_image
 from vws._reco_counts import (
+    raise_for_download_error,
     reco_counts_report_body,
     reco_counts_report_path,
     report_from_download_response,
 )
+from vws._request_bodies import JSONFieldValue, json_body
+from vws._signing import Signer
 from vws._vws_request import target_api_request
 from vws.exceptions.base_exceptions import VWSError
 from vws.exceptions.custom_exceptions import (
@@ -24,6 +32,8 @@ from vws.exceptions.custom_exceptions import (
     TargetProcessingTimeoutError,
 )
 from vws.exceptions.vws_exceptions import TooManyRequestsError
+from vws.middleware import Middleware, Request, send_with_middleware
+from vws.rate_limiting import RateLimiter  # noqa: TC001
 from vws.reports import (
     DatabaseSummaryReport,
     RecoCountsReport,
@@ -49,6 +59,9 @@ class VWS:
         database_id: str | None = None,
         request_timeout_seconds: float | tuple[float, float] = 30.0,
         transport: Transport | None = None,
+        rate_limiter: RateLimiter | None = None,
+        middleware: Sequence[Middleware] = (),
+        validate_images: bool = False,
     ) -> None:
         """
         Args:
@@ -66,15 +79,61 @@ class VWS:
             transport: The HTTP transport to use for
                 requests. Defaults to
                 ``RequestsTransport()``.
+                The client closes this transport when it is
+                closed.
+            rate_limiter: A rate limiter to wait for before each
+                request, keyed by the server access key. Share one
+                rate limiter between clients to limit their combined
+                request rate.
+            middleware: Middleware to send each request
+                through, outermost first. See
+                :mod:`vws.middleware`.
+            validate_images: Whether to check target images against
+                Vuforia's documented limits before uploading them,
+                and raise the error which Vuforia would give, without a
+                request. Only the image headers are read.
         """
         self._server_access_key = server_access_key
-        self._server_secret_key = server_secret_key
+        self._signer = Signer(
+            access_key=server_access_key,
+            secret_key=server_secret_key,
+        )
         self._base_vws_url = base_vws_url
         self._database_id = database_id
         self._request_timeout_seconds = request_timeout_seconds
         self._transport = (
             transport if transport is not None else RequestsTransport()
         )
+        self._middleware = tuple(middleware)
+        self._validate_images = validate_images
+        self._rate_limiter = rate_limiter
+
+    @property
+    def clock_offset_seconds(self) -> float:
+        """The number of seconds which Vuforia's clock was last measured
+        to be ahead of the local clock, or behind it if negative.
+
+        This is measured from the ``Date`` header of each response, and
+        requests are signed with the local time plus this offset.
+        """
+        return self._signer.clock_offset_seconds
+
+    def close(self) -> None:
+        """Close the transport.
+
+        The client owns its transport, including a transport which was
+        given to it. To share one transport between clients, do not close
+        the clients. Close the transport once none of them is in use.
+        """
+        self._transport.close()
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        """Exit the context manager and close the transport."""
+        self.close()
 
     def make_request(
         self,
@@ -85,6 +144,7 @@ class VWS:
         expected_result_code: str,
         content_type: str,
         extra_headers: dict[str, str] | None = None,
+        content_md5_hex: str | None = None,
     ) -> Response:
         """Make a request to the Vuforia Target API.
 
@@ -101,6 +161,9 @@ class VWS:
             content_type: The content type of the request.
             extra_headers: Additional headers to include in
                 the request.
+            content_md5_hex: The hex MD5 hash of ``data``, if it is
+                already known. Otherwise, ``data`` is hashed to sign
+                the request.
 
         Returns:
             The response to the request.
@@ -116,15 +179,17 @@ class VWS:
         """
         response = target_api_request(
             content_type=content_type,
-            server_access_key=self._server_access_key,
-            server_secret_key=self._server_secret_key,
+            signer=self._signer,
             method=method,
             data=data,
+            content_md5_hex=content_md5_hex,
             request_path=request_path,
             base_vws_url=self._base_vws_url,
             request_timeout_seconds=self._request_timeout_seconds,
             extra_headers=extra_headers or {},
             transport=self._transport,
+            middleware=self._middleware,
+            rate_limiter=self._rate_limiter,
         )
 
         if (
@@ -202,24 +267,26 @@ class VWS:
             ~vws.exceptions.vws_exceptions.TooManyRequestsError: Vuforia is
                 rate limiting access.
         """
-        image_data = _get_image_data(image=image)
-        image_data_encoded = base64.b64encode(s=image_data).decode(
-            encoding="ascii",
-        )
-
-        data = {
-            "name": name,
-            "width": width,
-            "image": image_data_encoded,
-            "active_flag": active_flag,
-            "application_metadata": application_metadata,
-        }
-
-        content = json.dumps(obj=data).encode(encoding="utf-8")
+        with _open_image_data(image=image) as image_data:
+            if self._validate_images:
+                validate_target_image(
+                    image_data=image_data,
+                    url=self._base_vws_url.rstrip("/") + "/targets",
+                )
+            body = json_body(
+                fields={
+                    "name": name,
+                    "width": width,
+                    "image": image_data,
+                    "active_flag": active_flag,
+                    "application_metadata": application_metadata,
+                },
+            )
 
         response = self.make_request(
             method=HTTPMethod.POST,
-            data=content,
+            data=body.content,
+            content_md5_hex=body.content_md5_hex,
             request_path="/targets",
             expected_result_code="TargetCreated",
             content_type="application/json",
@@ -507,15 +574,71 @@ class VWS:
                 The report could not be downloaded. For example, the report's
                 URL may have expired.
         """
-        response = self._transport(
+
+        def send(request: Request) -> Response:
+            """Send a request which has been through middleware."""
+            return self._transport(
+                method=request.method,
+                url=request.url,
+                headers=request.headers,
+                data=request.data,
+                request_timeout=self._request_timeout_seconds,
+            )
+
+        response = send_with_middleware(
+            middleware=self._middleware,
+            request=Request(
+                method=HTTPMethod.GET,
+                url=presigned_url,
+                headers={},
+                data=b"",
+            ),
+            send=send,
+        )
+
+        return report_from_download_response(response=response)
+
+    def download_reco_counts_report_to_file(
+        self,
+        *,
+        presigned_url: str,
+        file: _DownloadDestination,
+    ) -> None:
+        """Download a requested reco counts report to a file.
+
+        The report is written as it is received, so it is never held in
+        memory all at once. Use :meth:`download_reco_counts_report` to get
+        a parsed report instead.
+
+        Args:
+            presigned_url: The URL of the report, as given by
+                :meth:`request_database_reco_counts_report`.
+            file: The path of a file to write the report's CSV to, or a
+                binary file object to write it to.
+
+        Raises:
+            ~vws.exceptions.custom_exceptions.RecoCountsReportNotReadyError:
+                Vuforia has not finished generating the report.
+            ~vws.exceptions.custom_exceptions.RecoCountsReportDownloadError:
+                The report could not be downloaded. For example, the report's
+                URL may have expired.
+        """
+        with stream_request(
+            transport=self._transport,
             method=HTTPMethod.GET,
             url=presigned_url,
             headers={},
             data=b"",
             request_timeout=self._request_timeout_seconds,
-        )
-
-        return report_from_download_response(response=response)
+        ) as streamed_response:
+            if streamed_response.status_code != HTTPStatus.OK:
+                raise_for_download_error(
+                    response=streamed_response.read(),
+                )
+            write_chunks(
+                chunks=streamed_response.iter_bytes(),
+                destination=file,
+            )
 
     def wait_for_reco_counts_report(
         self,
@@ -687,7 +810,7 @@ class VWS:
             ~vws.exceptions.vws_exceptions.TooManyRequestsError: Vuforia is
                 rate limiting access.
         """
-        data: dict[str, str | bool | float | int] = {}
+        data: dict[str, JSONFieldValue] = {}
 
         if name is not None:
             data["name"] = name
@@ -695,24 +818,31 @@ class VWS:
         if width is not None:
             data["width"] = width
 
-        if image is not None:
-            image_data = _get_image_data(image=image)
-            image_data_encoded = base64.b64encode(s=image_data).decode(
-                encoding="ascii",
-            )
-            data["image"] = image_data_encoded
+        with contextlib.ExitStack() as stack:
+            if image is not None:
+                image_data = stack.enter_context(
+                    cm=_open_image_data(image=image),
+                )
+                if self._validate_images:
+                    validate_target_image(
+                        image_data=image_data,
+                        url=self._base_vws_url.rstrip("/")
+                        + f"/targets/{target_id}",
+                    )
+                data["image"] = image_data
 
-        if active_flag is not None:
-            data["active_flag"] = active_flag
+            if active_flag is not None:
+                data["active_flag"] = active_flag
 
-        if application_metadata is not None:
-            data["application_metadata"] = application_metadata
+            if application_metadata is not None:
+                data["application_metadata"] = application_metadata
 
-        content = json.dumps(obj=data).encode(encoding="utf-8")
+            body = json_body(fields=data)
 
         self.make_request(
             method=HTTPMethod.PUT,
-            data=content,
+            data=body.content,
+            content_md5_hex=body.content_md5_hex,
             request_path=f"/targets/{target_id}",
             expected_result_code="Success",
             content_type="application/json",
@@ -0,0 +1,272 @@
+"""Transports which send requests straight to a ``MockVWS``, in memory.
+
+``MockVWS`` works by intercepting requests made with ``requests`` and
+``httpx``. Each request is still encoded, routed through the interception
+library and decoded again. The transports here skip all of that: they
+give the method, path, headers and body of a request to the mock's fake
+Vuforia Web Services, Cloud Recognition and Model Target APIs, and build
+a :class:`vws.response.Response` from what the fake gives back.
+
+The ``MockVWS`` does not need to be started, so these transports can be
+used in the same process as real HTTP requests. The mock's
+``response_delay_seconds`` is not simulated.
+"""
+
+import re
+from collections.abc import Callable, Mapping
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from beartype import BeartypeConf, beartype
+from mock_vws import MockVWS  # noqa: TC002
+from mock_vws._mock_common import RequestData
+from mock_vws._requests_mock_server.mock_web_query_api import (
+    MockVuforiaWebQueryAPI,  # noqa: TC002
+)
+from mock_vws._requests_mock_server.mock_web_services_api import (
+    MockVuforiaWebServicesAPI,  # noqa: TC002
+)
+
+from vws.response import Response
+
+_Handler = Callable[[RequestData], tuple[int, Mapping[str, str], str | bytes]]
+
+
+@beartype
+class _API:
+    """The routes of one fake API, served at a base URL."""
+
+    def __init__(
+        self,
+        *,
+        api: MockVuforiaWebServicesAPI | MockVuforiaWebQueryAPI,
+        base_url: str,
+    ) -> None:
+        """
+        Args:
+            api: A fake API from a ``MockVWS``, with routes.
+            base_url: The base URL which the fake API is served at.
+        """
+        split_base_url = urlsplit(url=base_url)
+        self.origin = f"{split_base_url.scheme}://{split_base_url.netloc}"
+        self.base_path = split_base_url.path.rstrip("/")
+        self.routes: dict[str, list[tuple[re.Pattern[str], _Handler]]] = {}
+        for route in api.routes:
+            pattern = re.compile(pattern=route.path_pattern)
+            handler = getattr(api, route.route_name)
+            for http_method in route.http_methods:
+                self.routes.setdefault(str(object=http_method), []).append(
+                    (pattern, handler),
+                )
+
+    def handler(self, *, method: str, path: str) -> _Handler | None:
+        """Get the handler for a request.
+
+        Args:
+            method: The HTTP method of the request.
+            path: The path of the request, without the base path.
+
+        Returns:
+            The handler for the request, or ``None`` if no route matches.
+        """
+        for pattern, handler in self.routes.get(method.upper(), []):
+            if pattern.fullmatch(string=path):
+                return handler
+        return None
+
+
+@beartype
+class _InMemoryMock:
+    """Send requests to the fake APIs of a ``MockVWS``."""
+
+    def __init__(self, *, mock: MockVWS) -> None:
+        """
+        Args:
+            mock: The mock to send requests to.
+        """
+        # ``MockVWS`` does not give a public way to call its fake APIs
+        # without intercepting requests.
+        self._apis = (
+            _API(
+                api=mock._mock_vws_api,  # noqa: SLF001  # pylint: disable=protected-access
+                base_url=mock._base_vws_url,  # noqa: SLF001  # pylint: disable=protected-access
+            ),
+            _API(
+                api=mock._mock_vwq_api,  # noqa: SLF001  # pylint: disable=protected-access
+                base_url=mock._base_vwq_url,  # noqa: SLF001  # pylint: disable=protected-access
+            ),
+        )
+
+    def request(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+    ) -> Response | None:
+        """Send a request to the fake APIs.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+
+        Returns:
+            The response from the fake APIs, or ``None`` if no route of
+            any of them matches the request.
+        """
+        split_url = urlsplit(url=url)
+        origin = f"{split_url.scheme}://{split_url.netloc}"
+        for api in self._apis:
+            if origin != api.origin or not split_url.path.startswith(
+                api.base_path,
+            ):
+                continue
+            path = split_url.path.removeprefix(api.base_path)
+            handler = api.handler(method=method, path=path)
+            if handler is None:
+                continue
+            if split_url.query:
+                path = f"{path}?{split_url.query}"
+            # HTTP clients send a ``Content-Length`` header, and the fake
+            # APIs check it.
+            request_headers = {
+                "Content-Length": str(object=len(data)),
+                **headers,
+            }
+            status_code, response_headers, body = handler(
+                RequestData(
+                    method=method.upper(),
+                    path=path,
+                    headers=request_headers,
+                    body=data,
+                ),
+            )
+            content = body.encode() if isinstance(body, str) else body
+            return Response(
+                url=url,
+                status_code=status_code,
+                headers=dict(response_headers),
+                tell_position=len(content),
+                content=content,
+                request_body=(
+                    data
+                    if data and status_code >= HTTPStatus.BAD_REQUEST
+                    else None
+                ),
+            )
+        return None
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class InMemoryTransport:
+    """A transport which sends requests to a ``MockVWS`` without HTTP."""
+
+    def __init__(self, *, mock: MockVWS) -> None:
+        """
+        Args:
+            mock: The mock to send requests to. It does not need to be
+                started.
+        """
+        self._mock = _InMemoryMock(mock=mock)
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Send a request to the mock.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout. This is ignored.
+
+        Returns:
+            The response from the mock.
+
+        Raises:
+            requests.exceptions.ConnectionError: The mock does not handle
+                the request. This is what a started ``MockVWS`` raises.
+        """
+        del request_timeout
+        response = self._mock.request(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+        )
+        if response is None:
+            msg = f"Connection refused by mock: {method} {url}"
+            raise requests.exceptions.ConnectionError(msg)
+        return response
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+class AsyncInMemoryTransport:
+    """An async transport which sends requests to a ``MockVWS`` without
+    HTTP.
+    """
+
+    def __init__(self, *, mock: MockVWS) -> None:
+        """
+        Args:
+            mock: The mock to send requests to. It does not need to be
+                started.
+        """
+        self._mock = _InMemoryMock(mock=mock)
+
+    async def aclose(self) -> None:
+        """Nothing to close."""
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Send a request to the mock.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout. This is ignored.
+
+        Returns:
+            The response from the mock.
+
+        Raises:
+            httpx.ConnectError: The mock does not handle the request. This
+                is what a started ``MockVWS`` raises.
+        """
+        del request_timeout
+        response = self._mock.request(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+        )
+        if response is None:
+            raise httpx.ConnectError(
+                message="Connection refused by mock",
+                request=httpx.Request(method=method, url=url),
+            )
+        return response
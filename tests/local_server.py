@@ -0,0 +1,295 @@
+"""A local HTTP server for tests and benchmarks which need real
+connections.
+
+The server gives a successful VWS-like response to every request, and
+records the client port and HTTP version of each request, so that
+connection reuse and protocol negotiation can be checked. With TLS, it
+serves HTTP/2 to clients which ask for it, and HTTP/1.1 otherwise.
+"""
+
+import contextlib
+import socket  # noqa: TC003
+import ssl
+import threading
+import time
+from collections.abc import Iterator  # noqa: TC003
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import h2.config
+import h2.connection
+import h2.events
+import trustme
+
+RESPONSE_BODY = b'{"result_code":"Success","results":[]}'
+_DOWNLOAD_PATH_PREFIX = "/download/"
+_REDIRECT_PATH_PREFIX = "/redirect"
+_DOWNLOAD_BLOCK = b"0" * (64 * 1024)
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True, kw_only=True)
+class LocalServer:
+    """A running local server.
+
+    Args:
+        base_url: The base URL of the server.
+        certificate_authority_file: With TLS, a PEM file of the
+            certificate authority which signed the server's certificate.
+        client_ports: The client port of each request, in the order the
+            requests were made.
+        http_versions: The HTTP version of each request, such as
+            ``"HTTP/1.1"`` or ``"HTTP/2"``, in the order the requests
+            were made.
+    """
+
+    base_url: str
+    certificate_authority_file: Path | None = None
+    client_ports: list[int] = field(default_factory=list)
+    http_versions: list[str] = field(default_factory=list)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """A handler which gives a successful VWS-like response to every
+    request.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Send each response promptly rather than waiting to fill a packet.
+    disable_nagle_algorithm = True
+    # The server whose requests this handles.
+    local_server: LocalServer
+    # The rate at which request bodies are read, to stand in for a slow
+    # upload link, or ``None`` to read them as fast as possible.
+    upload_bytes_per_second: float | None = None
+
+    def _read_body(self, *, content_length: int) -> None:
+        """Read the request body, at the upload rate if there is one."""
+        remaining = content_length
+        while remaining:
+            chunk = self.rfile.read(min(remaining, _UPLOAD_CHUNK_SIZE))
+            # The client closed the connection before sending the whole
+            # body.
+            if not chunk:  # pragma: no cover
+                return
+            remaining -= len(chunk)
+            if self.upload_bytes_per_second is not None:
+                time.sleep(len(chunk) / self.upload_bytes_per_second)
+
+    def _respond(self) -> None:
+        """Read the request body and send a response.
+
+        A request to ``/download/<n>`` gets a body of ``n`` bytes. A
+        request to ``/redirect/<path>`` is redirected to ``/<path>``. Any
+        other request gets a short JSON body.
+        """
+        self.local_server.client_ports.append(self.client_address[1])
+        self.local_server.http_versions.append(self.request_version)
+        content_length = int(
+            self.headers.get(name="Content-Length", failobj="0"),
+        )
+        self._read_body(content_length=content_length)
+        if self.path.startswith(_REDIRECT_PATH_PREFIX):
+            self.send_response(code=HTTPStatus.TEMPORARY_REDIRECT)
+            self.send_header(
+                keyword="Location",
+                value=self.path.removeprefix(_REDIRECT_PATH_PREFIX),
+            )
+            self.send_header(keyword="Content-Length", value="0")
+            self.end_headers()
+            return
+
+        size = len(RESPONSE_BODY)
+        if self.path.startswith(_DOWNLOAD_PATH_PREFIX):
+            size = int(self.path.removeprefix(_DOWNLOAD_PATH_PREFIX))
+
+        self.send_response(code=HTTPStatus.OK)
+        self.send_header(keyword="Content-Type", value="application/json")
+        self.send_header(keyword="Content-Length", value=str(object=size))
+        if self.close_connection:
+            self.send_header(keyword="Connection", value="close")
+        self.end_headers()
+        if not self.path.startswith(_DOWNLOAD_PATH_PREFIX):
+            self.wfile.write(RESPONSE_BODY)
+            return
+
+        # The body is sent in blocks, so that the server does not add to
+        # the memory used by a benchmark running in the same process.
+        remaining = size
+        while remaining:
+            block = _DOWNLOAD_BLOCK[:remaining]
+            self.wfile.write(block)
+            remaining -= len(block)
+
+    def handle(self) -> None:
+        """Handle requests until the client closes the connection, even
+        if it does so before a response has been sent in full.
+        """
+        with contextlib.suppress(ConnectionError):
+            super().handle()
+
+    def do_GET(self) -> None:
+        """Respond to a GET request."""
+        self._respond()
+
+    def do_POST(self) -> None:
+        """Respond to a POST request."""
+        self._respond()
+
+    def log_message(self, *args: object) -> None:
+        """Do not log requests."""
+        del args
+
+
+def _serve_http2(
+    *,
+    connection: ssl.SSLSocket,
+    local_server: LocalServer,
+) -> None:
+    """Give a short JSON response to each HTTP/2 request on a
+    connection, until the client closes it.
+    """
+    http2_connection = h2.connection.H2Connection(
+        config=h2.config.H2Configuration(client_side=False),
+    )
+    http2_connection.initiate_connection()
+    connection.sendall(data=http2_connection.data_to_send())
+    while data := connection.recv(buflen=65535):
+        for event in http2_connection.receive_data(data=data):
+            if isinstance(event, h2.events.DataReceived):
+                http2_connection.acknowledge_received_data(
+                    acknowledged_size=event.flow_controlled_length,
+                    stream_id=event.stream_id,
+                )
+            elif isinstance(event, h2.events.StreamEnded):
+                local_server.client_ports.append(
+                    connection.getpeername()[1],
+                )
+                local_server.http_versions.append("HTTP/2")
+                http2_connection.send_headers(
+                    stream_id=event.stream_id,
+                    headers=[
+                        (":status", str(object=int(HTTPStatus.OK))),
+                        ("content-type", "application/json"),
+                        ("content-length", str(object=len(RESPONSE_BODY))),
+                    ],
+                )
+                http2_connection.send_data(
+                    stream_id=event.stream_id,
+                    data=RESPONSE_BODY,
+                    end_stream=True,
+                )
+        connection.sendall(data=http2_connection.data_to_send())
+
+
+class _TLSServer(ThreadingHTTPServer):
+    """A server which serves HTTP/2 over TLS to clients which ask for it,
+    and HTTP/1.1 over TLS otherwise.
+    """
+
+    ssl_context: ssl.SSLContext
+    local_server: LocalServer
+
+    def get_request(self) -> tuple[socket.socket, tuple[str, int]]:
+        """Accept a connection, to be set up with TLS by its own
+        thread.
+        """
+        connection, client_address = super().get_request()
+        tls_connection = self.ssl_context.wrap_socket(
+            sock=connection,
+            server_side=True,
+            do_handshake_on_connect=False,
+        )
+        return tls_connection, client_address
+
+    def finish_request(
+        self,
+        request: socket.socket | tuple[bytes, socket.socket],
+        client_address: tuple[str, int],
+    ) -> None:
+        """Set up TLS, and serve the connection with the negotiated
+        protocol.
+        """
+        assert isinstance(request, ssl.SSLSocket)
+        request.do_handshake()
+        if request.selected_alpn_protocol() == "h2":
+            _serve_http2(connection=request, local_server=self.local_server)
+            return
+        super().finish_request(
+            request=request,
+            client_address=client_address,
+        )
+
+
+@contextlib.contextmanager
+def local_server(
+    *,
+    upload_bytes_per_second: float | None = None,
+    tls: bool = False,
+) -> Iterator[LocalServer]:
+    """Run a local HTTP server.
+
+    Args:
+        upload_bytes_per_second: The rate at which the server reads
+            request bodies, to stand in for a slow upload link. By
+            default, bodies are read as fast as possible. This applies
+            to HTTP/1.1 requests only.
+        tls: Whether to serve HTTPS, with a certificate from a new
+            certificate authority. Clients must be told to trust
+            ``certificate_authority_file``.
+
+    Yields:
+        The running server.
+    """
+    with contextlib.ExitStack() as stack:
+        server_class = _TLSServer if tls else ThreadingHTTPServer
+        server = server_class(
+            server_address=("127.0.0.1", 0),
+            RequestHandlerClass=_Handler,
+        )
+        stack.callback(server.server_close)
+        host, port = server.server_address[:2]
+        certificate_authority_file = None
+        scheme = "http"
+        if isinstance(server, _TLSServer):
+            scheme = "https"
+            certificate_authority = trustme.CA()
+            server.ssl_context = ssl.create_default_context(
+                purpose=ssl.Purpose.CLIENT_AUTH,
+            )
+            server.ssl_context.set_alpn_protocols(
+                alpn_protocols=["h2", "http/1.1"],
+            )
+            certificate_authority.issue_cert(str(object=host)).configure_cert(
+                ctx=server.ssl_context,
+            )
+            certificate_authority_file = Path(
+                stack.enter_context(
+                    cm=certificate_authority.cert_pem.tempfile(),
+                ),
+            )
+
+        running_server = LocalServer(
+            base_url=f"{scheme}://{host!s}:{port}",
+            certificate_authority_file=certificate_authority_file,
+        )
+        if isinstance(server, _TLSServer):
+            server.local_server = running_server
+        server.RequestHandlerClass = type(
+            "_LocalServerHandler",
+            (_Handler,),
+            {
+                "local_server": running_server,
+                "upload_bytes_per_second": upload_bytes_per_second,
+            },
+        )
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield running_server
+        finally:
+            server.shutdown()
+            thread.join()
@@ -0,0 +1,259 @@
+"""Transports which give scripted responses and errors, for testing
+transports which wrap other transports.
+"""
+
+import contextlib
+from collections.abc import (  # noqa: TC003
+    AsyncIterator,
+    Iterator,
+    Sequence,
+)
+from http import HTTPStatus
+
+from beartype import BeartypeConf, beartype
+
+from vws.response import AsyncStreamedResponse, Response, StreamedResponse
+from vws.transports import AsyncTransport, Transport  # noqa: TC001
+
+QUERY_URL = "https://cloudreco.vuforia.com/v1/query"
+
+
+@beartype
+def scripted_response(
+    *,
+    status_code: int = HTTPStatus.OK,
+    headers: dict[str, str] | None = None,
+    url: str = QUERY_URL,
+    text: str = "",
+) -> Response:
+    """Get a response to give from a scripted transport.
+
+    Args:
+        status_code: The status code of the response.
+        headers: The headers of the response. By default, there are
+            none.
+        url: The URL of the response.
+        text: The body of the response.
+
+    Returns:
+        A response with the given details.
+    """
+    content = text.encode(encoding="utf-8")
+    return Response(
+        url=url,
+        status_code=status_code,
+        headers={} if headers is None else headers,
+        tell_position=len(content),
+        content=content,
+        encoding="utf-8",
+    )
+
+
+@beartype
+class ScriptedTransport:
+    """A transport which gives a fixed sequence of responses and errors."""
+
+    def __init__(self, *, outcomes: Sequence[Response | Exception]) -> None:
+        """
+        Args:
+            outcomes: What to give for each request, in order. An
+                exception is raised rather than given.
+        """
+        self._outcomes = list(outcomes)
+        self.calls = 0
+        self.streams = 0
+        self.open_streams = 0
+        self.closed = False
+
+    def next_outcome(self) -> Response:
+        """Give the next outcome.
+
+        Returns:
+            The next response.
+
+        Raises:
+            Exception: The next outcome, if it is an error.
+        """
+        outcome = self._outcomes[self.calls]
+        self.calls += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def close(self) -> None:
+        """Close the transport."""
+        self.closed = True
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Give the next outcome."""
+        del method, url, headers, data, request_timeout
+        return self.next_outcome()
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Iterator[StreamedResponse]:
+        """Give the next outcome, with its body not yet read."""
+        del method, url, headers, data, request_timeout
+        response = self.next_outcome()
+        self.streams += 1
+        self.open_streams += 1
+        try:
+            yield StreamedResponse(
+                url=response.url,
+                status_code=response.status_code,
+                headers=response.headers,
+                chunks=iter((response.content,)),
+                encoding=response.encoding,
+            )
+        finally:
+            self.open_streams -= 1
+
+
+async def _chunks(*, content: bytes) -> AsyncIterator[bytes]:
+    """Give a body as a single chunk.
+
+    Args:
+        content: The body.
+
+    Yields:
+        The body.
+    """
+    yield content
+
+
+@beartype
+class AsyncScriptedTransport:
+    """An async transport which gives a fixed sequence of responses and
+    errors.
+    """
+
+    def __init__(self, *, outcomes: Sequence[Response | Exception]) -> None:
+        """
+        Args:
+            outcomes: What to give for each request, in order. An
+                exception is raised rather than given.
+        """
+        self.transport = ScriptedTransport(outcomes=outcomes)
+
+    @property
+    def calls(self) -> int:
+        """The number of requests made."""
+        return self.transport.calls
+
+    async def aclose(self) -> None:
+        """Close the transport."""
+        self.transport.close()
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Give the next outcome."""
+        return self.transport(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        )
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> AsyncIterator[AsyncStreamedResponse]:
+        """Give the next outcome, with its body not yet read."""
+        with self.transport.stream(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        ) as streamed_response:
+            yield AsyncStreamedResponse(
+                url=streamed_response.url,
+                status_code=streamed_response.status_code,
+                headers=streamed_response.headers,
+                chunks=_chunks(content=streamed_response.read().content),
+            )
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+def request(
+    *,
+    transport: Transport,
+    method: str = "GET",
+    url: str = QUERY_URL,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Make a request with an empty body.
+
+    Args:
+        transport: The transport to make the request with.
+        method: The HTTP method.
+        url: The URL to request.
+        headers: The request headers. By default, there are none.
+
+    Returns:
+        The response to the request.
+    """
+    return transport(
+        method=method,
+        url=url,
+        headers={} if headers is None else headers,
+        data=b"",
+        request_timeout=30.0,
+    )
+
+
+@beartype(conf=BeartypeConf(is_pep484_tower=True))
+async def async_request(
+    *,
+    transport: AsyncTransport,
+    method: str = "GET",
+    url: str = QUERY_URL,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Make an async request with an empty body.
+
+    Args:
+        transport: The transport to make the request with.
+        method: The HTTP method.
+        url: The URL to request.
+        headers: The request headers. By default, there are none.
+
+    Returns:
+        The response to the request.
+    """
+    return await transport(
+        method=method,
+        url=url,
+        headers={} if headers is None else headers,
+        data=b"",
+        request_timeout=30.0,
+    )
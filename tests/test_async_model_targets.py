@@ -5,6 +5,7 @@ import json
 import uuid
 import zipfile
 from http import HTTPStatus
+from pathlib import Path  # noqa: TC003
 
 import pytest
 from mock_vws import (
@@ -129,6 +130,47 @@ class TestDatasetLifecycle:
                 dataset_type=dataset_type,
             )
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_download_to_file(
+        *,
+        async_model_target_client: AsyncModelTargetService,
+        model_target_model: ModelTargetModel,
+        tmp_path: Path,
+    ) -> None:
+        """A dataset can be downloaded to a path or to a file object."""
+        client = async_model_target_client
+        dataset_uuid = await client.create_dataset(
+            name="dataset",
+            target_sdk="11.0",
+            models=[model_target_model],
+            dataset_type=ModelTargetDatasetType.STANDARD,
+        )
+        await client.wait_for_dataset_generated(
+            dataset_uuid=dataset_uuid,
+            dataset_type=ModelTargetDatasetType.STANDARD,
+        )
+        dataset = await client.download_dataset(
+            dataset_uuid=dataset_uuid,
+            dataset_type=ModelTargetDatasetType.STANDARD,
+        )
+
+        dataset_path = tmp_path / "dataset.zip"
+        await client.download_dataset_to_file(
+            dataset_uuid=dataset_uuid,
+            dataset_type=ModelTargetDatasetType.STANDARD,
+            file=dataset_path,
+        )
+        assert dataset_path.read_bytes() == dataset
+
+        dataset_file = io.BytesIO()
+        await client.download_dataset_to_file(
+            dataset_uuid=dataset_uuid,
+            dataset_type=ModelTargetDatasetType.STANDARD,
+            file=dataset_file,
+        )
+        assert dataset_file.getvalue() == dataset
+
     @staticmethod
     @pytest.mark.asyncio
     async def test_status_while_processing(
@@ -3,7 +3,7 @@
 import base64
 import calendar
 import datetime  # noqa: TC003
-import io  # noqa: TC003
+import io
 import time
 import uuid
 from http import HTTPStatus
@@ -673,6 +673,30 @@ class TestRecoCountsReport:
 
             assert exc.value.response.status_code == HTTPStatus.FORBIDDEN
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_download_to_file_error() -> None:
+        """An error response from the report's URL raises an error, and
+        nothing is written.
+        """
+        report_file = io.BytesIO()
+        async with AsyncVWS(
+            server_access_key=uuid.uuid4().hex,
+            server_secret_key=uuid.uuid4().hex,
+            transport=_ForbiddenDownloadTransport(),
+        ) as client:
+            with pytest.raises(
+                expected_exception=RecoCountsReportDownloadError,
+            ) as exc:
+                await client.download_reco_counts_report_to_file(
+                    presigned_url="https://example.com/reports/recoCounts/x",
+                    file=report_file,
+                )
+
+            assert exc.value.response.status_code == HTTPStatus.FORBIDDEN
+
+        assert not report_file.getvalue()
+
     @staticmethod
     @pytest.mark.asyncio
     async def test_no_database_id(*, current_month: datetime.date) -> None:
@@ -0,0 +1,137 @@
+"""Tests for querying many images at once."""
+
+import io  # noqa: TC003
+
+import pytest
+
+from vws import VWS, AsyncCloudRecoService, CloudRecoService  # noqa: TC001
+from vws.batch_queries import BatchQueryStatistics, batch_query_statistics
+from vws.exceptions.custom_exceptions import RequestEntityTooLargeError
+
+
+class TestQueryMany:
+    """Tests for ``CloudRecoService.query_many``."""
+
+    @staticmethod
+    def test_results_in_order(
+        *,
+        vws_client: VWS,
+        cloud_reco_client: CloudRecoService,
+        high_quality_image: io.BytesIO,
+        png_too_large: io.BytesIO | io.BufferedRandom,
+    ) -> None:
+        """Results are given in the order of the images, with errors in
+        place of the results of failed queries.
+        """
+        target_id = vws_client.add_target(
+            name="x",
+            width=1,
+            image=high_quality_image,
+            active_flag=True,
+            application_metadata=None,
+        )
+        vws_client.wait_for_target_processed(target_id=target_id)
+
+        batch = cloud_reco_client.query_many(
+            images=[high_quality_image, png_too_large, high_quality_image],
+            max_concurrency=2,
+        )
+
+        first, error, last = batch.results
+        assert isinstance(first, list)
+        assert [match.target_id for match in first] == [target_id]
+        assert isinstance(error, RequestEntityTooLargeError)
+        assert first == last
+        assert batch.statistics.queries == len(batch.results)
+        assert batch.statistics.failures == 1
+
+    @staticmethod
+    def test_no_images(*, cloud_reco_client: CloudRecoService) -> None:
+        """An empty batch gives no results."""
+        batch = cloud_reco_client.query_many(images=[])
+        assert batch.results == []
+        assert batch.statistics.queries == 0
+
+    @staticmethod
+    def test_invalid_concurrency(
+        *,
+        cloud_reco_client: CloudRecoService,
+        high_quality_image: io.BytesIO,
+    ) -> None:
+        """At least one query must be allowed at once."""
+        with pytest.raises(
+            expected_exception=ValueError,
+            match=r"^max_concurrency must be at least 1\.$",
+        ):
+            cloud_reco_client.query_many(
+                images=[high_quality_image],
+                max_concurrency=0,
+            )
+
+
+class TestAsyncQueryMany:
+    """Tests for ``AsyncCloudRecoService.query_many``."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_results_in_order(
+        *,
+        async_cloud_reco_client: AsyncCloudRecoService,
+        high_quality_image: io.BytesIO,
+        png_too_large: io.BytesIO | io.BufferedRandom,
+    ) -> None:
+        """Results are given in the order of the images, with errors in
+        place of the results of failed queries.
+        """
+        batch = await async_cloud_reco_client.query_many(
+            images=[png_too_large, high_quality_image],
+            max_concurrency=1,
+        )
+
+        error, matches = batch.results
+        assert isinstance(error, RequestEntityTooLargeError)
+        assert matches == []
+        assert batch.statistics.queries == len(batch.results)
+        assert batch.statistics.failures == 1
+
+
+class TestBatchQueryStatistics:
+    """Tests for ``batch_query_statistics``."""
+
+    @staticmethod
+    def test_statistics() -> None:
+        """Throughput and latency are summarized."""
+        statistics = batch_query_statistics(
+            latencies_seconds=[float(latency) for latency in range(1, 21)],
+            failures=2,
+            elapsed_seconds=4.0,
+        )
+        assert statistics == BatchQueryStatistics(
+            queries=20,
+            failures=2,
+            elapsed_seconds=4.0,
+            queries_per_second=5.0,
+            mean_latency_seconds=10.5,
+            median_latency_seconds=10.5,
+            p95_latency_seconds=19.0,
+            max_latency_seconds=20.0,
+        )
+
+    @staticmethod
+    def test_empty() -> None:
+        """An empty batch has zero throughput and latency."""
+        statistics = batch_query_statistics(
+            latencies_seconds=[],
+            failures=0,
+            elapsed_seconds=0.0,
+        )
+        assert statistics == BatchQueryStatistics(
+            queries=0,
+            failures=0,
+            elapsed_seconds=0.0,
+            queries_per_second=0.0,
+            mean_latency_seconds=0.0,
+            median_latency_seconds=0.0,
+            p95_latency_seconds=0.0,
+            max_latency_seconds=0.0,
+        )
@@ -0,0 +1,496 @@
+"""Tests for circuit breaker transports."""
+
+import asyncio
+import contextlib
+import io  # noqa: TC003
+import uuid
+from collections.abc import Sequence  # noqa: TC003
+from http import HTTPStatus
+from typing import BinaryIO
+
+import httpx
+import pytest
+import requests
+from beartype import beartype
+
+from tests.scripted_transports import (
+    AsyncScriptedTransport,
+    ScriptedTransport,
+    async_request,
+    request,
+    scripted_response,
+)
+from vws import CloudRecoService
+from vws.circuit_breaker import (
+    AsyncCircuitBreakerTransport,
+    CircuitBreakerTransport,
+    CircuitState,
+)
+from vws.exceptions.custom_exceptions import CircuitOpenError, ServerError
+from vws.response import Response  # noqa: TC001
+
+_VWQ_HOST = "cloudreco.vuforia.com"
+_VWS_HOST = "vws.vuforia.com"
+_VWQ_URL = f"https://{_VWQ_HOST}/summary"
+_VWS_URL = f"https://{_VWS_HOST}/summary"
+
+
+@beartype
+class _AsyncGatedTransport:
+    """An async transport which holds each request until it is let
+    through, then gives the next of a fixed sequence of outcomes.
+    """
+
+    def __init__(self, *, outcomes: Sequence[Response | Exception]) -> None:
+        """
+        Args:
+            outcomes: What to give for each request, in order. An
+                exception is raised rather than given.
+        """
+        self._transport = ScriptedTransport(outcomes=outcomes)
+        self.gate = asyncio.Event()
+
+    @property
+    def calls(self) -> int:
+        """The number of requests made."""
+        return self._transport.calls
+
+    async def aclose(self) -> None:
+        """Close the transport."""
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Wait for the gate to open, then give the next outcome."""
+        await self.gate.wait()
+        return self._transport(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        )
+
+
+class TestCircuitBreakerTransport:
+    """Tests for ``CircuitBreakerTransport``."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames="failure",
+        argvalues=[
+            scripted_response(status_code=HTTPStatus.SERVICE_UNAVAILABLE),
+            requests.ReadTimeout(),
+            httpx.ReadTimeout(message="Timed out."),
+        ],
+    )
+    def test_opens_after_failures(failure: Response | Exception) -> None:
+        """After enough failures in a row, requests fail fast without
+        being made.
+        """
+        scripted = ScriptedTransport(outcomes=[failure, failure])
+        transport = CircuitBreakerTransport(
+            transport=scripted,
+            failure_threshold=2,
+            recovery_seconds=60.0,
+        )
+
+        for _ in range(2):
+            with contextlib.suppress(
+                requests.Timeout,
+                httpx.TimeoutException,
+            ):
+                request(transport=transport, url=_VWQ_URL)
+        assert transport.state(host=_VWQ_HOST) == CircuitState.OPEN
+
+        with pytest.raises(expected_exception=CircuitOpenError) as exc:
+            request(transport=transport, url=_VWQ_URL)
+
+        assert scripted.calls == 2  # noqa: PLR2004
+        assert exc.value.host == _VWQ_HOST
+        assert 59 < exc.value.retry_after_seconds <= 60  # noqa: PLR2004
+        assert _VWQ_HOST in str(object=exc.value)
+        statistics = transport.statistics
+        assert statistics.requests == 3  # noqa: PLR2004
+        assert statistics.failures == 2  # noqa: PLR2004
+        assert statistics.rejected == 1
+        assert statistics.opened == 1
+        assert statistics.probes == 0
+
+    @staticmethod
+    def test_success_resets_failures() -> None:
+        """Only failures in a row open the circuit."""
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                ),
+                scripted_response(status_code=HTTPStatus.OK),
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                ),
+            ],
+        )
+        transport = CircuitBreakerTransport(
+            transport=scripted,
+            failure_threshold=2,
+        )
+
+        for _ in range(3):
+            request(transport=transport, url=_VWQ_URL)
+
+        assert transport.state(host=_VWQ_HOST) == CircuitState.CLOSED
+
+    @staticmethod
+    def test_hosts_are_separate() -> None:
+        """Failures of one host do not stop requests to another host."""
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                ),
+                scripted_response(status_code=HTTPStatus.OK),
+            ],
+        )
+        transport = CircuitBreakerTransport(
+            transport=scripted,
+            failure_threshold=1,
+        )
+
+        request(transport=transport, url=_VWQ_URL)
+        response = request(transport=transport, url=_VWS_URL)
+
+        assert response.status_code == HTTPStatus.OK
+        assert transport.state(host=_VWQ_HOST) == CircuitState.OPEN
+        assert transport.state(host=_VWS_HOST) == CircuitState.CLOSED
+
+    @staticmethod
+    def test_probe_success_closes() -> None:
+        """A probe which succeeds closes the circuit."""
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                ),
+                scripted_response(status_code=HTTPStatus.OK),
+                scripted_response(status_code=HTTPStatus.OK),
+            ],
+        )
+        transport = CircuitBreakerTransport(
+            transport=scripted,
+            failure_threshold=1,
+            recovery_seconds=0.0,
+        )
+
+        request(transport=transport, url=_VWQ_URL)
+        request(transport=transport, url=_VWQ_URL)
+        assert transport.state(host=_VWQ_HOST) == CircuitState.CLOSED
+        request(transport=transport, url=_VWQ_URL)
+
+        assert transport.statistics.probes == 1
+
+    @staticmethod
+    def test_probe_failure_opens() -> None:
+        """A probe which fails opens the circuit again, even below the
+        failure threshold.
+        """
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                ),
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                ),
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                ),
+            ],
+        )
+        transport = CircuitBreakerTransport(
+            transport=scripted,
+            failure_threshold=1,
+            recovery_seconds=0.0,
+        )
+
+        request(transport=transport, url=_VWQ_URL)
+        request(transport=transport, url=_VWQ_URL)
+
+        assert transport.state(host=_VWQ_HOST) == CircuitState.OPEN
+        assert transport.statistics.opened == 2  # noqa: PLR2004
+
+    @staticmethod
+    def test_other_errors_are_not_failures() -> None:
+        """An error which is not a failure does not count towards opening
+        the circuit, and frees the probe which it was made as.
+        """
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                ),
+                requests.ConnectionError(),
+                scripted_response(status_code=HTTPStatus.OK),
+            ],
+        )
+        transport = CircuitBreakerTransport(
+            transport=scripted,
+            failure_threshold=1,
+            recovery_seconds=0.0,
+        )
+
+        request(transport=transport, url=_VWQ_URL)
+        with pytest.raises(expected_exception=requests.ConnectionError):
+            request(transport=transport, url=_VWQ_URL)
+        assert transport.state(host=_VWQ_HOST) == CircuitState.HALF_OPEN
+        request(transport=transport, url=_VWQ_URL)
+
+        assert transport.state(host=_VWQ_HOST) == CircuitState.CLOSED
+        assert transport.statistics.probes == 2  # noqa: PLR2004
+        transport.close()
+
+    @staticmethod
+    def test_client(image: io.BytesIO | BinaryIO) -> None:
+        """Clients raise the error from a transport whose circuit is
+        open.
+        """
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                ),
+            ],
+        )
+        client = CloudRecoService(
+            client_access_key=uuid.uuid4().hex,
+            client_secret_key=uuid.uuid4().hex,
+            transport=CircuitBreakerTransport(
+                transport=scripted,
+                failure_threshold=1,
+            ),
+        )
+
+        with pytest.raises(expected_exception=ServerError):
+            client.query(image=image)
+        with pytest.raises(expected_exception=CircuitOpenError):
+            client.query(image=image)
+
+        assert scripted.calls == 1
+
+    @staticmethod
+    def test_stream() -> None:
+        """Responses are streamed through the wrapped transport, and count
+        towards opening the circuit as other responses do.
+        """
+        scripted = ScriptedTransport(
+            outcomes=[
+                requests.ConnectionError(),
+                requests.ReadTimeout(),
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                    text="Error",
+                ),
+            ],
+        )
+        transport = CircuitBreakerTransport(
+            transport=scripted,
+            failure_threshold=2,
+        )
+        for expected_exception in (
+            requests.ConnectionError,
+            requests.ReadTimeout,
+        ):
+            with (
+                pytest.raises(expected_exception=expected_exception),
+                transport.stream(
+                    method="GET",
+                    url=_VWQ_URL,
+                    headers={},
+                    data=b"",
+                    request_timeout=30.0,
+                ),
+            ):
+                pass  # pragma: no cover
+        assert transport.state(host=_VWQ_HOST) == CircuitState.CLOSED
+
+        with transport.stream(
+            method="GET",
+            url=_VWQ_URL,
+            headers={},
+            data=b"",
+            request_timeout=30.0,
+        ) as streamed_response:
+            assert scripted.open_streams == 1
+            assert streamed_response.read().text == "Error"
+
+        assert scripted.streams == 1
+        assert scripted.open_streams == 0
+        assert transport.state(host=_VWQ_HOST) == CircuitState.OPEN
+        assert transport.statistics.failures == 2  # noqa: PLR2004
+
+
+class TestAsyncCircuitBreakerTransport:
+    """Tests for ``AsyncCircuitBreakerTransport``."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_opens_after_failures() -> None:
+        """After enough failures in a row, requests fail fast without
+        being made.
+        """
+        failure = scripted_response(status_code=HTTPStatus.BAD_GATEWAY)
+        gated = _AsyncGatedTransport(outcomes=[failure, failure])
+        gated.gate.set()
+        transport = AsyncCircuitBreakerTransport(
+            transport=gated,
+            failure_threshold=2,
+        )
+
+        await async_request(transport=transport, url=_VWQ_URL)
+        await async_request(transport=transport, url=_VWQ_URL)
+        with pytest.raises(expected_exception=CircuitOpenError):
+            await async_request(transport=transport, url=_VWQ_URL)
+
+        assert gated.calls == 2  # noqa: PLR2004
+        assert transport.state(host=_VWQ_HOST) == CircuitState.OPEN
+        assert transport.statistics.rejected == 1
+        await transport.aclose()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_requests_in_flight_when_opened() -> None:
+        """Failures of requests which were in flight when the circuit
+        opened do not open it again.
+        """
+        failure = httpx.ConnectTimeout(message="Timed out.")
+        gated = _AsyncGatedTransport(outcomes=[failure, failure])
+        transport = AsyncCircuitBreakerTransport(
+            transport=gated,
+            failure_threshold=1,
+        )
+
+        tasks = [
+            asyncio.create_task(
+                coro=async_request(transport=transport, url=_VWQ_URL),
+            )
+            for _ in range(2)
+        ]
+        await asyncio.sleep(delay=0)
+        gated.gate.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(
+            isinstance(result, httpx.ConnectTimeout) for result in results
+        )
+        statistics = transport.statistics
+        assert statistics.failures == 2  # noqa: PLR2004
+        assert statistics.opened == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_probe_limit() -> None:
+        """While the circuit is half-open, only a limited number of
+        requests are let through at once.
+        """
+        gated = _AsyncGatedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                ),
+                scripted_response(status_code=HTTPStatus.OK),
+            ],
+        )
+        gated.gate.set()
+        transport = AsyncCircuitBreakerTransport(
+            transport=gated,
+            failure_threshold=1,
+            recovery_seconds=0.0,
+            half_open_max_requests=1,
+        )
+        await async_request(transport=transport, url=_VWQ_URL)
+
+        gated.gate.clear()
+        probe = asyncio.create_task(
+            coro=async_request(transport=transport, url=_VWQ_URL),
+        )
+        await asyncio.sleep(delay=0)
+        with pytest.raises(expected_exception=CircuitOpenError) as exc:
+            await async_request(transport=transport, url=_VWQ_URL)
+        gated.gate.set()
+
+        assert (await probe).status_code == HTTPStatus.OK
+        assert exc.value.retry_after_seconds == 0
+        assert transport.state(host=_VWQ_HOST) == CircuitState.CLOSED
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_other_errors_are_not_failures() -> None:
+        """An error which is not a failure does not count towards opening
+        the circuit.
+        """
+        gated = _AsyncGatedTransport(
+            outcomes=[httpx.ConnectError(message="Nope.")]
+        )
+        gated.gate.set()
+        transport = AsyncCircuitBreakerTransport(
+            transport=gated,
+            failure_threshold=1,
+        )
+
+        with pytest.raises(expected_exception=httpx.ConnectError):
+            await async_request(transport=transport, url=_VWQ_URL)
+
+        assert transport.state(host=_VWQ_HOST) == CircuitState.CLOSED
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_stream() -> None:
+        """Responses are streamed through the wrapped transport, and count
+        towards opening the circuit as other responses do.
+        """
+        scripted = AsyncScriptedTransport(
+            outcomes=[
+                httpx.ConnectError(message="Nope."),
+                httpx.ReadTimeout(message="Timed out."),
+                scripted_response(
+                    status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                    text="Error",
+                ),
+            ],
+        )
+        transport = AsyncCircuitBreakerTransport(
+            transport=scripted,
+            failure_threshold=2,
+        )
+        for expected_exception in (httpx.ConnectError, httpx.ReadTimeout):
+            with pytest.raises(expected_exception=expected_exception):
+                async with transport.stream(
+                    method="GET",
+                    url=_VWQ_URL,
+                    headers={},
+                    data=b"",
+                    request_timeout=30.0,
+                ):
+                    pass  # pragma: no cover
+        assert transport.state(host=_VWQ_HOST) == CircuitState.CLOSED
+
+        async with transport.stream(
+            method="GET",
+            url=_VWQ_URL,
+            headers={},
+            data=b"",
+            request_timeout=30.0,
+        ) as streamed_response:
+            assert scripted.transport.open_streams == 1
+            assert (await streamed_response.aread()).text == "Error"
+
+        assert scripted.transport.streams == 1
+        assert scripted.transport.open_streams == 0
+        assert transport.state(host=_VWQ_HOST) == CircuitState.OPEN
+        assert transport.statistics.failures == 2  # noqa: PLR2004
@@ -0,0 +1,476 @@
+"""Tests for adaptive concurrency limits."""
+
+import asyncio
+import datetime
+import email.utils
+import functools
+import io  # noqa: TC003
+from collections.abc import Callable  # noqa: TC003
+from http import HTTPStatus
+
+import httpx
+import pytest
+from beartype import beartype
+from freezegun import freeze_time
+
+from vws import AsyncCloudRecoService, AsyncVWS
+from vws.concurrency import AdaptiveConcurrencyLimiter
+from vws.exceptions.custom_exceptions import ServerError
+from vws.response import Response
+
+_URL = "https://vws.vuforia.com/summary"
+_ERROR_MESSAGE = "The request could not be made."
+
+
+@beartype
+class _GatedTransport:
+    """An async transport which holds each request until it is let
+    through, and records how many requests are in flight at once.
+    """
+
+    def __init__(self, *, status_codes: list[int]) -> None:
+        """
+        Args:
+            status_codes: The status code to give for each request, in
+                order.
+        """
+        self._status_codes = status_codes
+        self.gate = asyncio.Event()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.date_headers: list[str] = []
+        # Called when a request is let through, before its response is
+        # given.
+        self.on_response: Callable[[], object] = lambda: None
+
+    async def aclose(self) -> None:
+        """Close the transport."""
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Wait for the gate to open, then give the next status code."""
+        del method, data, request_timeout
+        self.date_headers.append(headers.get("Date", ""))
+        status_code = self._status_codes[self.calls]
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await self.gate.wait()
+        finally:
+            self.in_flight -= 1
+        self.on_response()
+        if status_code == 0:
+            raise httpx.ConnectError(message="Connection failed.")
+        return Response(
+            url=url,
+            status_code=status_code,
+            headers={},
+            tell_position=0,
+            content=b"",
+        )
+
+
+@beartype
+async def _request(
+    *,
+    limiter: AdaptiveConcurrencyLimiter,
+    transport: _GatedTransport,
+) -> int:
+    """Make a request within a limit and get the status code of the
+    response.
+
+    Args:
+        limiter: The limit to make the request within.
+        transport: The transport to make the request with.
+
+    Returns:
+        The status code of the response.
+    """
+    response = await limiter.limit(
+        make_request=functools.partial(
+            transport,
+            method="GET",
+            url=_URL,
+            headers={},
+            data=b"",
+            request_timeout=30.0,
+        ),
+    )
+    return response.status_code
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Tests for ``AdaptiveConcurrencyLimiter``."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_window_limits_requests_in_flight() -> None:
+        """No more requests than the window are in flight at once."""
+        number_of_requests = 10
+        gated = _GatedTransport(
+            status_codes=[HTTPStatus.OK] * number_of_requests,
+        )
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=3.0,
+            max_window=3.0,
+        )
+
+        tasks = [
+            asyncio.create_task(
+                coro=_request(limiter=limiter, transport=gated),
+            )
+            for _ in range(number_of_requests)
+        ]
+        await asyncio.sleep(delay=0)
+        assert limiter.statistics.in_flight == 3  # noqa: PLR2004
+        gated.gate.set()
+        await asyncio.gather(*tasks)
+
+        assert gated.max_in_flight == 3  # noqa: PLR2004
+        statistics = limiter.statistics
+        assert statistics.in_flight == 0
+        assert statistics.requests == number_of_requests
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_additive_increase() -> None:
+        """The window grows by about one for each window of successful
+        requests.
+        """
+        gated = _GatedTransport(status_codes=[HTTPStatus.OK] * 4)
+        gated.gate.set()
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=2.0,
+            latency_tolerance=float("inf"),
+        )
+
+        await _request(limiter=limiter, transport=gated)
+        await _request(limiter=limiter, transport=gated)
+
+        assert limiter.window == pytest.approx(expected=2.5 + 1 / 2.5)
+        assert limiter.statistics.max_window == limiter.window
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_slow_response_holds_window() -> None:
+        """A response which is much slower than the quickest so far does
+        not grow the window.
+        """
+        gated = _GatedTransport(status_codes=[HTTPStatus.OK] * 2)
+        gated.gate.set()
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=2.0,
+            latency_tolerance=1.5,
+        )
+        await _request(limiter=limiter, transport=gated)
+        assert limiter.window == 2.5  # noqa: PLR2004
+
+        gated.gate.clear()
+        task = asyncio.create_task(
+            coro=_request(limiter=limiter, transport=gated),
+        )
+        await asyncio.sleep(delay=0.05)
+        gated.gate.set()
+        await task
+
+        assert limiter.window == 2.5  # noqa: PLR2004
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_quickest_response_is_forgotten() -> None:
+        """Only recent responses are compared, so that one unusually
+        quick response does not stop the window from growing for good.
+        """
+        gated = _GatedTransport(status_codes=[HTTPStatus.OK] * 3)
+        gated.gate.set()
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=2.0,
+            latency_tolerance=1.5,
+            latency_window_size=2,
+        )
+        await _request(limiter=limiter, transport=gated)
+        assert limiter.window == 2.5  # noqa: PLR2004
+
+        for _ in range(2):
+            gated.gate.clear()
+            task = asyncio.create_task(
+                coro=_request(limiter=limiter, transport=gated),
+            )
+            await asyncio.sleep(delay=0.05)
+            gated.gate.set()
+            await task
+
+        # The second slow response is compared only with the first slow
+        # response, and not with the quick response before them.
+        assert limiter.window == pytest.approx(expected=2.5 + 1 / 2.5)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        argnames="status_code",
+        argvalues=[
+            HTTPStatus.TOO_MANY_REQUESTS,
+            HTTPStatus.SERVICE_UNAVAILABLE,
+        ],
+    )
+    async def test_overload_cuts_window_once(status_code: int) -> None:
+        """The window is cut when the server is overloaded, once for all
+        of the requests which were in flight together.
+        """
+        gated = _GatedTransport(status_codes=[status_code] * 8)
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=8.0,
+            decrease_factor=0.5,
+        )
+
+        tasks = [
+            asyncio.create_task(
+                coro=_request(limiter=limiter, transport=gated),
+            )
+            for _ in range(8)
+        ]
+        await asyncio.sleep(delay=0)
+        gated.gate.set()
+        status_codes = await asyncio.gather(*tasks)
+
+        assert status_codes == [status_code] * 8
+        statistics = limiter.statistics
+        assert statistics.window == 4.0  # noqa: PLR2004
+        assert statistics.decreases == 1
+        assert statistics.overloaded_responses == 8  # noqa: PLR2004
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_min_window() -> None:
+        """The window is not cut below the minimum."""
+        gated = _GatedTransport(
+            status_codes=[HTTPStatus.TOO_MANY_REQUESTS] * 3,
+        )
+        gated.gate.set()
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=2.0,
+            min_window=1.0,
+        )
+
+        for _ in range(3):
+            await _request(limiter=limiter, transport=gated)
+
+        assert limiter.window == 1.0
+        assert limiter.statistics.decreases == 3  # noqa: PLR2004
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_connection_error_cuts_window() -> None:
+        """A request which times out or fails with a connection error
+        frees its room in the window, and cuts the window.
+        """
+        gated = _GatedTransport(status_codes=[0, HTTPStatus.OK])
+        gated.gate.set()
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=4.0,
+            decrease_factor=0.5,
+            latency_tolerance=float("inf"),
+        )
+
+        with pytest.raises(expected_exception=httpx.ConnectError):
+            await _request(limiter=limiter, transport=gated)
+        statistics = limiter.statistics
+        assert statistics.window == 2.0  # noqa: PLR2004
+        assert statistics.overload_errors == 1
+        assert statistics.decreases == 1
+        assert statistics.in_flight == 0
+
+        status_code = await _request(limiter=limiter, transport=gated)
+        assert status_code == HTTPStatus.OK
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_other_error_frees_room() -> None:
+        """A request which fails with an error which does not suggest
+        overload frees its room in the window, and does not change the
+        window.
+        """
+        limiter = AdaptiveConcurrencyLimiter(initial_window=1.0)
+
+        async def make_request() -> Response:
+            """Fail to make a request.
+
+            Raises:
+                ValueError: Always.
+            """
+            raise ValueError(_ERROR_MESSAGE)
+
+        with pytest.raises(
+            expected_exception=ValueError, match=_ERROR_MESSAGE
+        ):
+            await limiter.limit(make_request=make_request)
+
+        statistics = limiter.statistics
+        assert statistics.window == 1.0
+        assert statistics.overload_errors == 0
+        assert statistics.in_flight == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter() -> None:
+        """A request which is cancelled while waiting for room does not
+        take room from later requests.
+        """
+        gated = _GatedTransport(status_codes=[HTTPStatus.OK] * 2)
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=1.0,
+            max_window=1.0,
+        )
+
+        first = asyncio.create_task(
+            coro=_request(limiter=limiter, transport=gated),
+        )
+        second = asyncio.create_task(
+            coro=_request(limiter=limiter, transport=gated),
+        )
+        await asyncio.sleep(delay=0)
+        second.cancel()
+        await asyncio.sleep(delay=0)
+        gated.gate.set()
+        assert await first == HTTPStatus.OK
+        with pytest.raises(expected_exception=asyncio.CancelledError):
+            await second
+
+        status_code = await _request(limiter=limiter, transport=gated)
+        assert status_code == HTTPStatus.OK
+        assert limiter.statistics.in_flight == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_waiter_cancelled_as_room_is_freed() -> None:
+        """A request which is cancelled just before room is freed is
+        passed over, and the room goes to the next request.
+        """
+        gated = _GatedTransport(status_codes=[HTTPStatus.OK] * 2)
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=1.0,
+            max_window=1.0,
+        )
+
+        first = asyncio.create_task(
+            coro=_request(limiter=limiter, transport=gated),
+        )
+        second = asyncio.create_task(
+            coro=_request(limiter=limiter, transport=gated),
+        )
+        third = asyncio.create_task(
+            coro=_request(limiter=limiter, transport=gated),
+        )
+        await asyncio.sleep(delay=0)
+        gated.on_response = second.cancel
+        gated.gate.set()
+        assert await first == HTTPStatus.OK
+        assert await third == HTTPStatus.OK
+        with pytest.raises(expected_exception=asyncio.CancelledError):
+            await second
+
+        assert limiter.statistics.in_flight == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_waiter_cancelled_after_room_is_taken() -> None:
+        """A request which is cancelled after room is taken for it, but
+        before it runs, gives the room to the next request.
+        """
+        gated = _GatedTransport(status_codes=[HTTPStatus.OK] * 2)
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=1.0,
+            max_window=1.0,
+        )
+        second: asyncio.Task[int] | None = None
+
+        async def first_request() -> int:
+            """Make a request, then cancel the second request as soon as
+            room is taken for it.
+            """
+            status_code = await _request(limiter=limiter, transport=gated)
+            if second is not None:
+                second.cancel()
+            return status_code
+
+        first = asyncio.create_task(coro=first_request())
+        second = asyncio.create_task(
+            coro=_request(limiter=limiter, transport=gated),
+        )
+        third = asyncio.create_task(
+            coro=_request(limiter=limiter, transport=gated),
+        )
+        await asyncio.sleep(delay=0)
+        gated.gate.set()
+        assert await first == HTTPStatus.OK
+        assert await third == HTTPStatus.OK
+        with pytest.raises(expected_exception=asyncio.CancelledError):
+            await second
+
+        assert limiter.statistics.in_flight == 0
+
+
+class TestClients:
+    """Tests for giving a limit to clients."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_signed_after_waiting(
+        high_quality_image: io.BytesIO,
+    ) -> None:
+        """Requests from clients which share a limit are signed only once
+        there is room for them within the limit, so that their ``Date``
+        headers are not stale.
+        """
+        gated = _GatedTransport(
+            status_codes=[HTTPStatus.INTERNAL_SERVER_ERROR] * 2,
+        )
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_window=1.0,
+            max_window=1.0,
+        )
+        async with (
+            AsyncVWS(
+                server_access_key="server_access_key",
+                server_secret_key="server_secret_key",  # noqa: S106
+                transport=gated,
+                concurrency_limiter=limiter,
+            ) as vws_client,
+            AsyncCloudRecoService(
+                client_access_key="client_access_key",
+                client_secret_key="client_secret_key",  # noqa: S106
+                transport=gated,
+                concurrency_limiter=limiter,
+            ) as cloud_reco_client,
+        ):
+            with freeze_time(
+                time_to_freeze="2026-01-01",
+                real_asyncio=True,
+            ) as frozen_time:
+                first = asyncio.create_task(coro=vws_client.list_targets())
+                second = asyncio.create_task(
+                    coro=cloud_reco_client.query(image=high_quality_image),
+                )
+                await asyncio.sleep(delay=0)
+                assert gated.calls == 1
+                frozen_time.tick(delta=datetime.timedelta(minutes=1))
+                gated.gate.set()
+                with pytest.raises(expected_exception=ServerError):
+                    await first
+                with pytest.raises(expected_exception=ServerError):
+                    await second
+
+        first_date, second_date = (
+            email.utils.parsedate_to_datetime(data=date)
+            for date in gated.date_headers
+        )
+        assert second_date - first_date == datetime.timedelta(minutes=1)
@@ -0,0 +1,151 @@
+"""Tests for skipping queries of near-duplicate frames."""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from vws import AsyncCloudRecoService, CloudRecoService  # noqa: TC001
+from vws.duplicate_frames import (
+    DuplicateFrameFilter,
+    DuplicateFrameStatistics,
+    image_fingerprint,
+)
+from vws.include_target_data import CloudRecoIncludeTargetData
+
+
+def _gradient_image(*, brighter_to_the_right: bool, noise: int = 0) -> bytes:
+    """Make a PNG image which gets brighter across it.
+
+    Args:
+        brighter_to_the_right: Whether the image gets brighter to the
+            right, rather than to the left.
+        noise: The largest amount of random noise to add to each pixel.
+
+    Returns:
+        A PNG image.
+    """
+    row = np.linspace(start=0, stop=200, num=128)
+    if not brighter_to_the_right:
+        row = row[::-1]
+    pixels = np.tile(A=row, reps=(96, 1))
+    random = np.random.default_rng(seed=0)
+    pixels += random.integers(low=0, high=noise + 1, size=pixels.shape)
+    image_buffer = io.BytesIO()
+    Image.fromarray(obj=pixels.astype(dtype=np.uint8)).convert(
+        mode="RGB"
+    ).save(
+        fp=image_buffer,
+        format="PNG",
+    )
+    return image_buffer.getvalue()
+
+
+class TestImageFingerprint:
+    """Tests for ``image_fingerprint``."""
+
+    @staticmethod
+    def test_similar_images() -> None:
+        """Similar images have similar fingerprints, and different images
+        have different fingerprints.
+        """
+        fingerprint = image_fingerprint(
+            image_data=_gradient_image(brighter_to_the_right=True),
+        )
+        noisy_fingerprint = image_fingerprint(
+            image_data=_gradient_image(brighter_to_the_right=True, noise=4),
+        )
+        reversed_fingerprint = image_fingerprint(
+            image_data=_gradient_image(brighter_to_the_right=False),
+        )
+        fingerprint_bits = 64
+        max_noisy_distance = 4
+        assert fingerprint.shape == (fingerprint_bits,)
+        assert (
+            np.count_nonzero(a=fingerprint != noisy_fingerprint)
+            <= max_noisy_distance
+        )
+        assert (
+            np.count_nonzero(a=fingerprint != reversed_fingerprint)
+            == fingerprint_bits
+        )
+
+
+class TestDuplicateFrameFilter:
+    """Tests for ``DuplicateFrameFilter``."""
+
+    @staticmethod
+    def test_skip_duplicates(*, cloud_reco_client: CloudRecoService) -> None:
+        """Queries are skipped for frames which are near duplicates of a
+        recently queried frame.
+        """
+        duplicate_frame_filter = DuplicateFrameFilter()
+        for image_data in (
+            _gradient_image(brighter_to_the_right=True),
+            _gradient_image(brighter_to_the_right=True, noise=4),
+            _gradient_image(brighter_to_the_right=False),
+            _gradient_image(brighter_to_the_right=True),
+        ):
+            assert (
+                duplicate_frame_filter.query(
+                    client=cloud_reco_client,
+                    image=io.BytesIO(initial_bytes=image_data),
+                )
+                == []
+            )
+        assert duplicate_frame_filter.statistics == DuplicateFrameStatistics(
+            frames=4,
+            skipped=2,
+        )
+
+    @staticmethod
+    def test_query_options(*, cloud_reco_client: CloudRecoService) -> None:
+        """Results are only used for frames queried with the same
+        options.
+        """
+        duplicate_frame_filter = DuplicateFrameFilter()
+        image_data = _gradient_image(brighter_to_the_right=True)
+        for include_target_data in (
+            CloudRecoIncludeTargetData.TOP,
+            CloudRecoIncludeTargetData.ALL,
+        ):
+            duplicate_frame_filter.query(
+                client=cloud_reco_client,
+                image=io.BytesIO(initial_bytes=image_data),
+                include_target_data=include_target_data,
+            )
+        assert duplicate_frame_filter.statistics.skipped == 0
+
+    @staticmethod
+    def test_max_age(*, cloud_reco_client: CloudRecoService) -> None:
+        """Results are not used once they are too old."""
+        duplicate_frame_filter = DuplicateFrameFilter(max_age_seconds=0)
+        image_data = _gradient_image(brighter_to_the_right=True)
+        for _ in range(2):
+            duplicate_frame_filter.query(
+                client=cloud_reco_client,
+                image=io.BytesIO(initial_bytes=image_data),
+            )
+        assert duplicate_frame_filter.statistics.skipped == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async(
+        *,
+        async_cloud_reco_client: AsyncCloudRecoService,
+    ) -> None:
+        """Queries are skipped for near duplicate frames with an async
+        client.
+        """
+        duplicate_frame_filter = DuplicateFrameFilter()
+        image_data = _gradient_image(brighter_to_the_right=True)
+        for _ in range(2):
+            assert (
+                await duplicate_frame_filter.aquery(
+                    client=async_cloud_reco_client,
+                    image=io.BytesIO(initial_bytes=image_data),
+                )
+                == []
+            )
+        assert duplicate_frame_filter.statistics.skipped == 1
@@ -0,0 +1,678 @@
+"""Tests for hedged requests."""
+
+import asyncio
+import io  # noqa: TC003
+import threading
+import time
+from collections.abc import Sequence  # noqa: TC003
+from http import HTTPStatus
+from typing import BinaryIO
+
+import pytest
+from beartype import beartype
+from mock_vws import MockVWS
+from mock_vws.database import CloudDatabase
+
+from tests.scripted_transports import QUERY_URL, scripted_response
+from vws import AsyncCloudRecoService, CloudRecoService
+from vws.hedging import HedgingPolicy
+from vws.response import Response
+from vws.transports import (
+    AsyncHTTPXTransport,
+    AsyncTransport,
+    RequestsTransport,
+    Transport,
+)
+
+
+@beartype
+class _DelayedTransport:
+    """A transport which gives a fixed sequence of outcomes, each after a
+    delay.
+    """
+
+    def __init__(
+        self,
+        *,
+        outcomes: Sequence[tuple[float, Response | Exception]],
+    ) -> None:
+        """
+        Args:
+            outcomes: For each request, in order, the number of seconds
+                to wait, and what to give. An exception is raised rather
+                than given.
+        """
+        self._outcomes = list(outcomes)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.cancelled = 0
+        # Set once a request is made.
+        self.called = threading.Event()
+
+    def _next_outcome(self) -> tuple[float, Response | Exception]:
+        """Get the outcome for the next request."""
+        with self._lock:
+            outcome = self._outcomes[self.calls]
+            self.calls += 1
+        self.called.set()
+        return outcome
+
+    def close(self) -> None:
+        """Close the transport."""
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Wait, then give the next outcome."""
+        del method, url, headers, data, request_timeout
+        delay_seconds, outcome = self._next_outcome()
+        time.sleep(delay_seconds)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def async_call(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Wait without blocking the event loop, then give the next
+        outcome.
+        """
+        del method, url, headers, data, request_timeout
+        delay_seconds, outcome = self._next_outcome()
+        try:
+            await asyncio.sleep(delay=delay_seconds)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@beartype
+class _AsyncDelayedTransport:
+    """An async transport which gives a fixed sequence of outcomes, each
+    after a delay.
+    """
+
+    def __init__(self, *, transport: _DelayedTransport) -> None:
+        """
+        Args:
+            transport: The transport which gives the outcomes.
+        """
+        self._transport = transport
+
+    async def aclose(self) -> None:
+        """Close the transport."""
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Wait, then give the next outcome."""
+        return await self._transport.async_call(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        )
+
+
+@beartype
+class _SlowFirstTransport:
+    """A transport whose first request is slow and fails, and which
+    passes later requests to another transport.
+    """
+
+    def __init__(self, *, transport: Transport, delay_seconds: float) -> None:
+        """
+        Args:
+            transport: The transport to pass later requests to.
+            delay_seconds: How long the first request takes.
+        """
+        self._transport = transport
+        self._delay_seconds = delay_seconds
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Make the request."""
+        with self._lock:
+            self._calls += 1
+            is_first = self._calls == 1
+        if is_first:
+            time.sleep(self._delay_seconds)
+            return Response(
+                url=url,
+                status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                headers={},
+                tell_position=0,
+                content=b"",
+            )
+        return self._transport(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        )
+
+
+@beartype
+class _AsyncSlowFirstTransport:
+    """An async transport whose first request is slow, and which passes
+    later requests to another transport.
+    """
+
+    def __init__(
+        self,
+        *,
+        transport: AsyncTransport,
+        delay_seconds: float,
+    ) -> None:
+        """
+        Args:
+            transport: The transport to pass later requests to.
+            delay_seconds: How long the first request takes.
+        """
+        self._transport = transport
+        self._delay_seconds = delay_seconds
+        self._calls = 0
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.aclose()
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Make the request."""
+        self._calls += 1
+        if self._calls == 1:
+            await asyncio.sleep(delay=self._delay_seconds)
+        return await self._transport(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        )
+
+
+@beartype
+class _CountingRateLimiter:
+    """A rate limiter which counts how many times it is acquired, and
+    never waits.
+    """
+
+    def __init__(self) -> None:
+        """Create a rate limiter which has not been acquired."""
+        self.acquired = 0
+
+    def acquire(self, *, key: str) -> float:
+        """Count the acquisition."""
+        del key
+        self.acquired += 1
+        return 0.0
+
+    async def aacquire(self, *, key: str) -> float:
+        """Count the acquisition."""
+        del key
+        self.acquired += 1
+        return 0.0
+
+
+@beartype
+def _request(*, policy: HedgingPolicy, transport: Transport) -> str:
+    """Make a hedged request and get the body of the response.
+
+    Args:
+        policy: The hedging policy to make the request with.
+        transport: The transport to make the request with.
+
+    Returns:
+        The body of the response.
+    """
+    response = policy.request(
+        transport=transport,
+        method="POST",
+        url=QUERY_URL,
+        headers={},
+        data=b"",
+        request_timeout=30.0,
+    )
+    return response.text
+
+
+@beartype
+async def _async_request(
+    *,
+    policy: HedgingPolicy,
+    transport: AsyncTransport,
+) -> str:
+    """Make an async hedged request and get the body of the response.
+
+    Args:
+        policy: The hedging policy to make the request with.
+        transport: The transport to make the request with.
+
+    Returns:
+        The body of the response.
+    """
+    response = await policy.arequest(
+        transport=transport,
+        method="POST",
+        url=QUERY_URL,
+        headers={},
+        data=b"",
+        request_timeout=30.0,
+    )
+    return response.text
+
+
+class TestDelay:
+    """Tests for the delay before a request is sent again."""
+
+    @staticmethod
+    def test_initial_delay() -> None:
+        """The initial delay is used until enough latencies are
+        known.
+        """
+        policy = HedgingPolicy(min_samples=3, initial_delay_seconds=2.0)
+        policy.record_latency(latency_seconds=0.1)
+        policy.record_latency(latency_seconds=0.1)
+
+        assert policy.delay_seconds() == 2.0  # noqa: PLR2004
+
+    @staticmethod
+    def test_percentile() -> None:
+        """The delay is a percentile of recent latencies."""
+        policy = HedgingPolicy(
+            percentile=75.0,
+            window_size=4,
+            min_samples=4,
+            min_delay_seconds=0.0,
+        )
+        for latency_seconds in (9.0, 0.4, 0.1, 0.3, 0.2):
+            policy.record_latency(latency_seconds=latency_seconds)
+
+        # The oldest latency is dropped, leaving 0.1, 0.2, 0.3 and 0.4.
+        assert policy.delay_seconds() == 0.3  # noqa: PLR2004
+        assert policy.statistics.delay_seconds == 0.3  # noqa: PLR2004
+
+    @staticmethod
+    def test_min_delay() -> None:
+        """The delay is never shorter than the minimum."""
+        policy = HedgingPolicy(min_samples=1, min_delay_seconds=0.5)
+        policy.record_latency(latency_seconds=0.01)
+
+        assert policy.delay_seconds() == 0.5  # noqa: PLR2004
+
+
+class TestRequest:
+    """Tests for sync hedged requests."""
+
+    @staticmethod
+    def test_quick_response_is_not_hedged() -> None:
+        """A request which gets a response before the delay is sent
+        once.
+        """
+        transport = _DelayedTransport(
+            outcomes=[(0.0, scripted_response(text="a"))],
+        )
+        with HedgingPolicy(initial_delay_seconds=5.0) as policy:
+            text = _request(policy=policy, transport=transport)
+
+        transport.close()
+        assert text == "a"
+        assert transport.calls == 1
+        statistics = policy.statistics
+        assert statistics.requests == 1
+        assert statistics.hedges == 0
+        assert statistics.hedge_wins == 0
+
+    @staticmethod
+    def test_hedge_wins() -> None:
+        """A slow request is sent again, and the first response is
+        used.
+        """
+        transport = _DelayedTransport(
+            outcomes=[
+                (1.0, scripted_response(text="first")),
+                (0.0, scripted_response(text="second")),
+            ],
+        )
+        with HedgingPolicy(
+            initial_delay_seconds=0.05,
+            min_samples=1,
+            min_delay_seconds=0.0,
+        ) as policy:
+            start_time = time.monotonic()
+            text = _request(policy=policy, transport=transport)
+            elapsed_seconds = time.monotonic() - start_time
+
+        assert text == "second"
+        assert elapsed_seconds < 0.5  # noqa: PLR2004
+        statistics = policy.statistics
+        assert statistics.hedges == 1
+        assert statistics.hedge_wins == 1
+        # The latency is measured from when the request was first sent,
+        # not from when the second attempt was sent.
+        assert statistics.delay_seconds >= 0.05  # noqa: PLR2004
+
+    @staticmethod
+    def test_first_attempt_wins() -> None:
+        """The first attempt's response is used if it arrives before the
+        second attempt's.
+        """
+        transport = _DelayedTransport(
+            outcomes=[
+                (0.2, scripted_response(text="first")),
+                (2.0, scripted_response(text="second")),
+            ],
+        )
+        with HedgingPolicy(initial_delay_seconds=0.05) as policy:
+            text = _request(policy=policy, transport=transport)
+
+        assert text == "first"
+        statistics = policy.statistics
+        assert statistics.hedges == 1
+        assert statistics.hedge_wins == 0
+
+    @staticmethod
+    def test_failed_attempt_waits_for_other() -> None:
+        """If one attempt fails, the other attempt's response is used."""
+        transport = _DelayedTransport(
+            outcomes=[
+                (0.2, scripted_response(text="first")),
+                (0.0, ValueError("second")),
+            ],
+        )
+        with HedgingPolicy(initial_delay_seconds=0.05) as policy:
+            text = _request(policy=policy, transport=transport)
+
+        assert text == "first"
+
+    @staticmethod
+    def test_both_attempts_fail() -> None:
+        """If both attempts fail, the first attempt's error is raised."""
+        transport = _DelayedTransport(
+            outcomes=[
+                (0.2, ValueError("first")),
+                (0.0, ValueError("second")),
+            ],
+        )
+        with (
+            HedgingPolicy(initial_delay_seconds=0.05) as policy,
+            pytest.raises(expected_exception=ValueError, match="first"),
+        ):
+            _request(policy=policy, transport=transport)
+
+        assert policy.statistics.requests == 1
+
+    @staticmethod
+    def test_threads_in_use() -> None:
+        """A request which is made while all of the threads are in use is
+        made once, on the calling thread, and a slow request is not sent
+        again while all of the threads are in use.
+        """
+        transport = _DelayedTransport(
+            outcomes=[
+                (0.5, scripted_response(text="first")),
+                (0.0, scripted_response(text="second")),
+                (0.0, ValueError("third")),
+            ],
+        )
+        texts: list[str] = []
+        with HedgingPolicy(
+            initial_delay_seconds=0.05,
+            max_workers=1,
+        ) as policy:
+            thread = threading.Thread(
+                target=lambda: texts.append(
+                    _request(policy=policy, transport=transport),
+                ),
+            )
+            thread.start()
+            transport.called.wait()
+
+            assert _request(policy=policy, transport=transport) == "second"
+            with pytest.raises(expected_exception=ValueError, match="third"):
+                _request(policy=policy, transport=transport)
+            thread.join()
+
+        assert texts == ["first"]
+        assert transport.calls == 3  # noqa: PLR2004
+        statistics = policy.statistics
+        assert statistics.requests == 3  # noqa: PLR2004
+        assert statistics.hedges == 0
+
+    @staticmethod
+    def test_reopen_after_close() -> None:
+        """A policy can be used again after it is closed."""
+        transport = _DelayedTransport(
+            outcomes=[
+                (0.0, scripted_response(text="a")),
+                (0.0, scripted_response(text="b")),
+            ],
+        )
+        policy = HedgingPolicy()
+        policy.close()
+        assert _request(policy=policy, transport=transport) == "a"
+        policy.close()
+        assert _request(policy=policy, transport=transport) == "b"
+        policy.close()
+
+
+class TestAsyncRequest:
+    """Tests for async hedged requests."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_quick_response_is_not_hedged() -> None:
+        """A request which gets a response before the delay is sent
+        once.
+        """
+        delayed = _DelayedTransport(
+            outcomes=[(0.0, scripted_response(text="a"))],
+        )
+        policy = HedgingPolicy(initial_delay_seconds=5.0)
+        transport = _AsyncDelayedTransport(transport=delayed)
+
+        text = await _async_request(policy=policy, transport=transport)
+        await transport.aclose()
+
+        assert text == "a"
+        assert delayed.calls == 1
+        assert policy.statistics.hedges == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_hedge_wins() -> None:
+        """A slow request is sent again, the first response is used, and
+        the slower attempt is cancelled.
+        """
+        delayed = _DelayedTransport(
+            outcomes=[
+                (5.0, scripted_response(text="first")),
+                (0.0, scripted_response(text="second")),
+            ],
+        )
+        policy = HedgingPolicy(
+            initial_delay_seconds=0.05,
+            min_samples=1,
+            min_delay_seconds=0.0,
+        )
+
+        text = await _async_request(
+            policy=policy,
+            transport=_AsyncDelayedTransport(transport=delayed),
+        )
+        await asyncio.sleep(delay=0)
+
+        assert text == "second"
+        assert delayed.cancelled == 1
+        statistics = policy.statistics
+        assert statistics.hedges == 1
+        assert statistics.hedge_wins == 1
+        # The latency is measured from when the request was first sent,
+        # not from when the second attempt was sent.
+        assert statistics.delay_seconds >= 0.05  # noqa: PLR2004
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_failed_attempt_waits_for_other() -> None:
+        """If one attempt fails, the other attempt's response is used."""
+        delayed = _DelayedTransport(
+            outcomes=[
+                (0.2, scripted_response(text="first")),
+                (0.0, ValueError("second")),
+            ],
+        )
+        policy = HedgingPolicy(initial_delay_seconds=0.05)
+
+        text = await _async_request(
+            policy=policy,
+            transport=_AsyncDelayedTransport(transport=delayed),
+        )
+
+        assert text == "first"
+        assert policy.statistics.hedge_wins == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_both_attempts_fail() -> None:
+        """If both attempts fail, the first attempt's error is raised."""
+        delayed = _DelayedTransport(
+            outcomes=[
+                (0.2, ValueError("first")),
+                (0.0, ValueError("second")),
+            ],
+        )
+        policy = HedgingPolicy(initial_delay_seconds=0.05)
+
+        with pytest.raises(expected_exception=ValueError, match="first"):
+            await _async_request(
+                policy=policy,
+                transport=_AsyncDelayedTransport(transport=delayed),
+            )
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cancelled() -> None:
+        """Cancelling a hedged request cancels its attempts."""
+        delayed = _DelayedTransport(
+            outcomes=[(5.0, scripted_response(text="a"))],
+        )
+        policy = HedgingPolicy(initial_delay_seconds=5.0)
+
+        task = asyncio.create_task(
+            coro=_async_request(
+                policy=policy,
+                transport=_AsyncDelayedTransport(transport=delayed),
+            ),
+        )
+        await asyncio.sleep(delay=0.01)
+        task.cancel()
+        with pytest.raises(expected_exception=asyncio.CancelledError):
+            await task
+        await asyncio.sleep(delay=0)
+
+        assert delayed.cancelled == 1
+
+
+class TestClients:
+    """Tests for hedged Cloud Recognition queries."""
+
+    @staticmethod
+    def test_sync_client(image: io.BytesIO | BinaryIO) -> None:
+        """A slow query is sent again by the sync client, and each attempt
+        waits for the rate limiter.
+        """
+        rate_limiter = _CountingRateLimiter()
+        with (
+            MockVWS() as mock,
+            HedgingPolicy(
+                initial_delay_seconds=0.05,
+            ) as policy,
+        ):
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            with CloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                transport=_SlowFirstTransport(
+                    transport=RequestsTransport(),
+                    delay_seconds=0.5,
+                ),
+                hedging_policy=policy,
+                rate_limiter=rate_limiter,
+            ) as client:
+                assert client.query(image=image) == []
+
+        assert policy.statistics.hedge_wins == 1
+        expected_attempts = 2
+        assert rate_limiter.acquired == expected_attempts
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async_client(image: io.BytesIO | BinaryIO) -> None:
+        """A slow query is sent again by the async client, and each attempt
+        waits for the rate limiter.
+        """
+        policy = HedgingPolicy(initial_delay_seconds=0.05)
+        rate_limiter = _CountingRateLimiter()
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            async with AsyncCloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                transport=_AsyncSlowFirstTransport(
+                    transport=AsyncHTTPXTransport(),
+                    delay_seconds=5.0,
+                ),
+                hedging_policy=policy,
+                rate_limiter=rate_limiter,
+            ) as client:
+                assert await client.query(image=image) == []
+
+        assert policy.statistics.hedge_wins == 1
+        expected_attempts = 2
+        assert rate_limiter.acquired == expected_attempts
@@ -0,0 +1,143 @@
+"""Tests for the types of image which clients accept."""
+
+import io
+import mmap
+from collections.abc import Buffer, Generator  # noqa: TC003
+from pathlib import Path  # noqa: TC003
+
+import pytest
+
+from vws import VWS, CloudRecoService  # noqa: TC001
+from vws._image_utils import open_image_data
+
+
+@pytest.fixture(
+    name="image_input",
+    params=["bytes", "bytearray", "memoryview", "mmap", "path"],
+)
+def fixture_image_input(
+    *,
+    high_quality_image: io.BytesIO,
+    tmp_path: Path,
+    request: pytest.FixtureRequest,
+) -> Generator[Buffer | Path]:
+    """An image which is not a file object."""
+    image_data = high_quality_image.getvalue()
+    file = tmp_path / "image.jpg"
+    file.write_bytes(data=image_data)
+    if request.param == "bytes":
+        yield image_data
+    elif request.param == "bytearray":
+        yield bytearray(image_data)
+    elif request.param == "memoryview":
+        yield memoryview(image_data)
+    elif request.param == "mmap":
+        with file.open(mode="rb") as file_obj:
+            mapped_file = mmap.mmap(
+                fileno=file_obj.fileno(),
+                length=0,
+                access=mmap.ACCESS_READ,
+            )
+        with mapped_file:
+            yield mapped_file
+    else:
+        yield file
+
+
+class TestClients:
+    """Tests for giving clients images which are not file objects."""
+
+    @staticmethod
+    def test_match(
+        *,
+        vws_client: VWS,
+        cloud_reco_client: CloudRecoService,
+        image_input: Buffer | Path,
+    ) -> None:
+        """Targets can be added and queried with each type of image."""
+        target_id = vws_client.add_target(
+            name="x",
+            width=1,
+            image=image_input,
+            active_flag=True,
+            application_metadata=None,
+        )
+        vws_client.wait_for_target_processed(target_id=target_id)
+        [matching_target] = cloud_reco_client.query(image=image_input)
+        assert matching_target.target_id == target_id
+
+
+class TestOpenImageData:
+    """Tests for getting the data of an image."""
+
+    @staticmethod
+    def test_bytes() -> None:
+        """``bytes`` are used as given."""
+        image_data = b"image"
+        with open_image_data(image=image_data) as data:
+            assert data is image_data
+
+    @staticmethod
+    def test_buffer_not_copied() -> None:
+        """Other buffers are viewed rather than copied, and the view is
+        released on exit.
+        """
+        image_data = bytearray(b"image")
+        with open_image_data(image=image_data) as view:
+            image_data[0:1] = b"I"
+            assert bytes(view) == b"Image"
+        # The buffer can be resized once it is no longer viewed.
+        image_data.extend(b"s")
+
+    @staticmethod
+    def test_non_contiguous_buffer() -> None:
+        """A buffer which is not contiguous is copied."""
+        view = memoryview(b"i-m-a-g-e")[::2]
+        with open_image_data(image=view) as data:
+            assert data == b"image"
+
+    @staticmethod
+    def test_bytes_io_position() -> None:
+        """The whole of a ``BytesIO`` is used, and its position is not
+        changed.
+        """
+        position = 2
+        image = io.BytesIO(initial_bytes=b"image")
+        image.seek(position)
+        with open_image_data(image=image) as data:
+            assert data == b"image"
+        assert image.tell() == position
+
+    @staticmethod
+    def test_file_position(*, tmp_path: Path) -> None:
+        """The whole of a file is read, and its position is not changed."""
+        file = tmp_path / "image.jpg"
+        file.write_bytes(data=b"image")
+        position = 2
+        with file.open(mode="rb") as file_obj:
+            file_obj.seek(position)
+            with open_image_data(image=file_obj) as data:
+                assert data == b"image"
+            assert file_obj.tell() == position
+
+    @staticmethod
+    @pytest.mark.parametrize(argnames="image_data", argvalues=[b"", b"image"])
+    def test_path(*, image_data: bytes, tmp_path: Path) -> None:
+        """The file at a path is used."""
+        file = tmp_path / "image.jpg"
+        file.write_bytes(data=image_data)
+        with open_image_data(image=file) as data:
+            assert data == image_data
+
+    @staticmethod
+    def test_path_unmapped(*, tmp_path: Path) -> None:
+        """The view of the file at a path is released on exit."""
+        file = tmp_path / "image.jpg"
+        file.write_bytes(data=b"image")
+        with open_image_data(image=file) as data:
+            assert isinstance(data, memoryview)
+        with pytest.raises(
+            expected_exception=ValueError,
+            match=r"^operation forbidden on released memoryview object$",
+        ):
+            bytes(data)
@@ -0,0 +1,162 @@
+"""Tests for preparing query images before they are uploaded."""
+
+import io
+
+import pytest
+from mock_vws import MockVWS
+from mock_vws.database import CloudDatabase
+from PIL import ExifTags, Image
+
+from vws import AsyncCloudRecoService, CloudRecoService
+from vws.image_preparation import QueryImagePreparer
+
+
+def _image_data(
+    *,
+    mode: str,
+    size: tuple[int, int],
+    image_format: str,
+) -> bytes:
+    """Make an image of random noise, which does not compress well.
+
+    Args:
+        mode: The Pillow mode of the image.
+        size: The width and height of the image.
+        image_format: The file format to save the image in.
+
+    Returns:
+        The image file.
+    """
+    image_buffer = io.BytesIO()
+    Image.effect_noise(size=size, sigma=64).convert(mode=mode).save(
+        fp=image_buffer,
+        format=image_format,
+    )
+    return image_buffer.getvalue()
+
+
+class TestQueryImagePreparer:
+    """Tests for ``QueryImagePreparer``."""
+
+    @staticmethod
+    @pytest.mark.parametrize(argnames="mode", argvalues=["RGB", "L"])
+    def test_large_image(*, mode: str) -> None:
+        """Images larger than the maximum dimension are scaled down and
+        re-encoded as JPEG files.
+        """
+        image_data = _image_data(
+            mode=mode,
+            size=(2000, 1500),
+            image_format="PNG",
+        )
+        preparer = QueryImagePreparer(max_dimension=400)
+
+        prepared_image_data = preparer(image_data)
+
+        prepared_image_file = io.BytesIO(initial_bytes=prepared_image_data)
+        with Image.open(fp=prepared_image_file) as prepared_image:
+            assert prepared_image.format == "JPEG"
+            assert prepared_image.size == (400, 300)
+            assert prepared_image.mode == mode
+        statistics = preparer.statistics
+        assert statistics.images == 1
+        assert statistics.reencoded == 1
+        assert statistics.bytes_saved == len(image_data) - len(
+            prepared_image_data,
+        )
+        assert statistics.cpu_seconds > 0
+
+    @staticmethod
+    def test_small_image() -> None:
+        """Images within the limits are used as given."""
+        image_data = _image_data(
+            mode="RGB",
+            size=(300, 200),
+            image_format="JPEG",
+        )
+        preparer = QueryImagePreparer(max_dimension=400)
+
+        assert preparer(image_data) is image_data
+        statistics = preparer.statistics
+        assert statistics.images == 1
+        assert statistics.reencoded == 0
+        assert statistics.bytes_saved == 0
+
+    @staticmethod
+    def test_large_file() -> None:
+        """Image files larger than the maximum size are re-encoded."""
+        image_data = _image_data(
+            mode="RGB",
+            size=(300, 200),
+            image_format="PNG",
+        )
+        preparer = QueryImagePreparer(max_bytes=len(image_data) - 1)
+
+        prepared_image_data = preparer(image_data)
+
+        assert len(prepared_image_data) < len(image_data)
+        assert preparer.statistics.reencoded == 1
+
+    @staticmethod
+    def test_exif_orientation() -> None:
+        """The EXIF orientation of an image is applied before it is
+        resized, as the EXIF data is not kept.
+        """
+        exif = Image.Exif()
+        # The camera was turned on its side, so the image must be
+        # rotated by 90 degrees clockwise to be displayed.
+        exif[ExifTags.Base.Orientation] = 6
+        image_buffer = io.BytesIO()
+        Image.effect_noise(size=(800, 400), sigma=64).convert(
+            mode="RGB",
+        ).save(fp=image_buffer, format="JPEG", exif=exif)
+        preparer = QueryImagePreparer(max_dimension=200)
+
+        prepared_image_data = preparer(image_buffer.getvalue())
+
+        prepared_image_file = io.BytesIO(initial_bytes=prepared_image_data)
+        with Image.open(fp=prepared_image_file) as prepared_image:
+            assert prepared_image.size == (100, 200)
+            assert ExifTags.Base.Orientation not in prepared_image.getexif()
+
+
+class TestClients:
+    """Tests for preparing images in clients."""
+
+    @staticmethod
+    def test_cloud_reco_service(
+        png_too_large: io.BytesIO | io.BufferedRandom,
+    ) -> None:
+        """An image which is too large to query can be queried once it is
+        prepared.
+        """
+        preparer = QueryImagePreparer()
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            cloud_reco_client = CloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                image_preparer=preparer,
+            )
+            assert cloud_reco_client.query(image=png_too_large) == []
+        assert preparer.statistics.reencoded == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async_cloud_reco_service(
+        png_too_large: io.BytesIO | io.BufferedRandom,
+    ) -> None:
+        """An async client prepares images before querying them."""
+        preparer = QueryImagePreparer()
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            async with AsyncCloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                image_preparer=preparer,
+            ) as cloud_reco_client:
+                results = await cloud_reco_client.query(image=png_too_large)
+                assert results == []
+        assert preparer.statistics.reencoded == 1
@@ -0,0 +1,220 @@
+"""Tests for checking images before they are uploaded."""
+
+import io
+from http import HTTPStatus
+
+import pytest
+from beartype import beartype
+from mock_vws import MockVWS
+from mock_vws.database import CloudDatabase
+from PIL import Image
+
+from vws import VWS, AsyncCloudRecoService, CloudRecoService
+from vws.exceptions.cloud_reco_exceptions import (
+    BadImageError as CloudRecoBadImageError,
+)
+from vws.exceptions.custom_exceptions import RequestEntityTooLargeError
+from vws.exceptions.vws_exceptions import BadImageError, ImageTooLargeError
+from vws.response import Response  # noqa: TC001
+
+
+@beartype
+class _NoRequestsTransport:
+    """A transport which fails the test if a request is made."""
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+    def __call__(  # pragma: no cover
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Fail, as no request should be made."""
+        del method, url, headers, data, request_timeout
+        raise AssertionError
+
+
+@beartype
+class _AsyncNoRequestsTransport:
+    """An async transport which fails the test if a request is made."""
+
+    async def aclose(self) -> None:
+        """Nothing to close."""
+
+    async def __call__(  # pragma: no cover
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Fail, as no request should be made."""
+        del method, url, headers, data, request_timeout
+        raise AssertionError
+
+
+def _image(*, mode: str, image_format: str) -> io.BytesIO:
+    """Make a small image.
+
+    Args:
+        mode: The Pillow mode of the image.
+        image_format: The file format to save the image in.
+
+    Returns:
+        The image file.
+    """
+    image_buffer = io.BytesIO()
+    Image.new(mode=mode, size=(32, 32)).save(
+        fp=image_buffer,
+        format=image_format,
+    )
+    return image_buffer
+
+
+class TestVWS:
+    """Tests for checking target images."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames="image",
+        argvalues=[
+            io.BytesIO(initial_bytes=b"Not an image"),
+            _image(mode="CMYK", image_format="JPEG"),
+            _image(mode="RGBA", image_format="PNG"),
+        ],
+    )
+    def test_bad_image(*, image: io.BytesIO) -> None:
+        """A ``BadImageError`` is raised without a request for an image
+        which Vuforia does not support.
+        """
+        vws_client = VWS(
+            server_access_key="access_key",
+            server_secret_key="secret_key",  # noqa: S106
+            transport=_NoRequestsTransport(),
+            validate_images=True,
+        )
+        with pytest.raises(expected_exception=BadImageError) as exc:
+            vws_client.add_target(
+                name="x",
+                width=1,
+                image=image,
+                active_flag=True,
+                application_metadata=None,
+            )
+        assert (
+            exc.value.response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+        )
+
+    @staticmethod
+    def test_image_too_large(
+        png_too_large: io.BytesIO | io.BufferedRandom,
+    ) -> None:
+        """An ``ImageTooLargeError`` is raised without a request for an
+        image file which is too large.
+        """
+        vws_client = VWS(
+            server_access_key="access_key",
+            server_secret_key="secret_key",  # noqa: S106
+            transport=_NoRequestsTransport(),
+            validate_images=True,
+        )
+        with pytest.raises(expected_exception=ImageTooLargeError):
+            vws_client.update_target(target_id="x", image=png_too_large)
+
+    @staticmethod
+    def test_good_image(high_quality_image: io.BytesIO) -> None:
+        """Images which Vuforia supports are uploaded."""
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            vws_client = VWS(
+                server_access_key=database.server_access_key,
+                server_secret_key=database.server_secret_key,
+                validate_images=True,
+            )
+            vws_client.add_target(
+                name="x",
+                width=1,
+                image=high_quality_image,
+                active_flag=True,
+                application_metadata=None,
+            )
+
+
+class TestCloudRecoService:
+    """Tests for checking query images."""
+
+    @staticmethod
+    def test_bad_image() -> None:
+        """A ``BadImageError`` is raised without a request for an image
+        which Vuforia does not support.
+        """
+        cloud_reco_client = CloudRecoService(
+            client_access_key="access_key",
+            client_secret_key="secret_key",  # noqa: S106
+            transport=_NoRequestsTransport(),
+            validate_images=True,
+        )
+        with pytest.raises(expected_exception=CloudRecoBadImageError):
+            cloud_reco_client.query(
+                image=_image(mode="LA", image_format="PNG"),
+            )
+
+    @staticmethod
+    def test_image_too_large(
+        png_too_large: io.BytesIO | io.BufferedRandom,
+    ) -> None:
+        """A ``RequestEntityTooLargeError`` is raised without a request for
+        an image file which is too large.
+        """
+        cloud_reco_client = CloudRecoService(
+            client_access_key="access_key",
+            client_secret_key="secret_key",  # noqa: S106
+            transport=_NoRequestsTransport(),
+            validate_images=True,
+        )
+        with pytest.raises(
+            expected_exception=RequestEntityTooLargeError,
+        ) as exc:
+            cloud_reco_client.query(image=png_too_large)
+        assert (
+            exc.value.response.status_code
+            == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        )
+
+    @staticmethod
+    def test_good_image(high_quality_image: io.BytesIO) -> None:
+        """Images which Vuforia supports are queried."""
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            cloud_reco_client = CloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                validate_images=True,
+            )
+            assert cloud_reco_client.query(image=high_quality_image) == []
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async_bad_image() -> None:
+        """A ``BadImageError`` is raised without a request by the async
+        client.
+        """
+        async with AsyncCloudRecoService(
+            client_access_key="access_key",
+            client_secret_key="secret_key",  # noqa: S106
+            transport=_AsyncNoRequestsTransport(),
+            validate_images=True,
+        ) as cloud_reco_client:
+            with pytest.raises(expected_exception=CloudRecoBadImageError):
+                await cloud_reco_client.query(
+                    image=io.BytesIO(initial_bytes=b"Not an image"),
+                )
@@ -0,0 +1,203 @@
+"""Tests for the transports which send requests to a ``MockVWS`` in
+memory.
+"""
+
+import io  # noqa: TC003
+import uuid
+from http import HTTPStatus
+from typing import BinaryIO
+
+import httpx
+import pytest
+import requests
+from mock_vws import MockVWS
+from mock_vws.database import CloudDatabase
+
+from tests.in_memory_transports import (
+    AsyncInMemoryTransport,
+    InMemoryTransport,
+)
+from vws import VWS, AsyncCloudRecoService, AsyncVWS, CloudRecoService
+from vws.exceptions.vws_exceptions import AuthenticationFailureError
+
+
+class TestInMemoryTransport:
+    """Tests for ``InMemoryTransport``."""
+
+    @staticmethod
+    def test_clients(image: io.BytesIO | BinaryIO) -> None:
+        """Clients can use a mock which is not started."""
+        mock = MockVWS(processing_time_seconds=0.0)
+        database = CloudDatabase()
+        mock.add_cloud_database(cloud_database=database)
+        transport = InMemoryTransport(mock=mock)
+        vws_client = VWS(
+            server_access_key=database.server_access_key,
+            server_secret_key=database.server_secret_key,
+            transport=transport,
+        )
+        cloud_reco_client = CloudRecoService(
+            client_access_key=database.client_access_key,
+            client_secret_key=database.client_secret_key,
+            transport=transport,
+        )
+
+        target_id = vws_client.add_target(
+            name=uuid.uuid4().hex,
+            width=1,
+            image=image,
+            active_flag=True,
+            application_metadata=None,
+        )
+        vws_client.wait_for_target_processed(target_id=target_id)
+        (match,) = cloud_reco_client.query(image=image)
+
+        assert vws_client.list_targets() == [target_id]
+        assert match.target_id == target_id
+        vws_client.close()
+
+    @staticmethod
+    def test_base_path(image: io.BytesIO | BinaryIO) -> None:
+        """Requests are sent to the fake APIs at the mock's base URLs,
+        including any base path.
+        """
+        base_vws_url = "http://vws.example.com/prefix"
+        base_vwq_url = "http://vwq.example.com/prefix"
+        mock = MockVWS(base_vws_url=base_vws_url, base_vwq_url=base_vwq_url)
+        database = CloudDatabase()
+        mock.add_cloud_database(cloud_database=database)
+        transport = InMemoryTransport(mock=mock)
+
+        vws_client = VWS(
+            server_access_key=database.server_access_key,
+            server_secret_key=database.server_secret_key,
+            base_vws_url=base_vws_url,
+            transport=transport,
+        )
+        cloud_reco_client = CloudRecoService(
+            client_access_key=database.client_access_key,
+            client_secret_key=database.client_secret_key,
+            base_vwq_url=base_vwq_url,
+            transport=transport,
+        )
+
+        assert vws_client.list_targets() == []
+        assert cloud_reco_client.query(image=image) == []
+
+    @staticmethod
+    def test_error_response() -> None:
+        """Error responses from the mock are given, with the request
+        body.
+        """
+        mock = MockVWS()
+        database = CloudDatabase()
+        mock.add_cloud_database(cloud_database=database)
+        vws_client = VWS(
+            server_access_key=database.server_access_key,
+            server_secret_key=uuid.uuid4().hex,
+            transport=InMemoryTransport(mock=mock),
+        )
+
+        with pytest.raises(
+            expected_exception=AuthenticationFailureError,
+        ) as exc:
+            vws_client.update_target(target_id=uuid.uuid4().hex, width=2)
+
+        response = exc.value.response
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert response.request_body == b'{"width": 2}'
+
+    @staticmethod
+    def test_query_string() -> None:
+        """The query string of a URL is given to the mock."""
+        transport = InMemoryTransport(mock=MockVWS())
+
+        response = transport(
+            method="GET",
+            url="https://vws.vuforia.com/summary?key=value",
+            headers={},
+            data=b"",
+            request_timeout=30.0,
+        )
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert response.request_body is None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames="url",
+        argvalues=[
+            "https://example.com/summary",
+            "https://vws.vuforia.com/unknown",
+        ],
+    )
+    def test_unknown_url(url: str) -> None:
+        """A request which the mock does not handle raises a connection
+        error.
+        """
+        transport = InMemoryTransport(mock=MockVWS())
+
+        with pytest.raises(
+            expected_exception=requests.exceptions.ConnectionError,
+        ):
+            transport(
+                method="GET",
+                url=url,
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            )
+
+
+class TestAsyncInMemoryTransport:
+    """Tests for ``AsyncInMemoryTransport``."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_clients(image: io.BytesIO | BinaryIO) -> None:
+        """Async clients can use a mock which is not started."""
+        mock = MockVWS(processing_time_seconds=0.0)
+        database = CloudDatabase()
+        mock.add_cloud_database(cloud_database=database)
+        transport = AsyncInMemoryTransport(mock=mock)
+
+        async with (
+            AsyncVWS(
+                server_access_key=database.server_access_key,
+                server_secret_key=database.server_secret_key,
+                transport=transport,
+            ) as vws_client,
+            AsyncCloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                transport=transport,
+            ) as cloud_reco_client,
+        ):
+            target_id = await vws_client.add_target(
+                name=uuid.uuid4().hex,
+                width=1,
+                image=image,
+                active_flag=True,
+                application_metadata=None,
+            )
+            await vws_client.wait_for_target_processed(target_id=target_id)
+            (match,) = await cloud_reco_client.query(image=image)
+
+        assert match.target_id == target_id
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_unknown_url() -> None:
+        """A request which the mock does not handle raises a connection
+        error.
+        """
+        transport = AsyncInMemoryTransport(mock=MockVWS())
+
+        with pytest.raises(expected_exception=httpx.ConnectError):
+            await transport(
+                method="GET",
+                url="https://example.com/summary",
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            )
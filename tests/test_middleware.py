@@ -0,0 +1,491 @@
+"""Tests for middleware."""
+
+import dataclasses
+import io  # noqa: TC003
+from collections.abc import Generator  # noqa: TC003
+from http import HTTPMethod, HTTPStatus
+from typing import BinaryIO
+
+import pytest
+from beartype import beartype
+from mock_vws import MockVWS
+from mock_vws.database import CloudDatabase, VuMarkDatabase
+from mock_vws.target import VuMarkTarget
+
+from vws import (
+    VWS,
+    AsyncCloudRecoService,
+    AsyncModelTargetService,
+    AsyncVWS,
+    CloudRecoService,
+    ModelTargetService,
+    VuMarkService,
+)
+from vws.middleware import (
+    Request,
+    async_send_with_middleware,
+    send_with_middleware,
+)
+from vws.model_target_datasets import (
+    ModelTargetDatasetType,
+    ModelTargetModel,
+)
+from vws.response import Response
+from vws.vumark_accept import VuMarkAccept
+
+
+@beartype
+class _RecordingMiddleware:
+    """Middleware which records the requests it sees and the status codes
+    of their responses.
+    """
+
+    def __init__(self) -> None:
+        """Create middleware which has recorded nothing."""
+        self.requests: list[Request] = []
+        self.status_codes: list[int] = []
+
+    def __call__(
+        self,
+        request: Request,
+    ) -> Generator[Request, Response, Response]:
+        """Record the request and the status code of its response."""
+        self.requests.append(request)
+        response = yield request
+        self.status_codes.append(response.status_code)
+        return response
+
+
+@beartype
+def _add_header(
+    request: Request,
+) -> Generator[Request, Response, Response]:
+    """Add a header to a request."""
+    return (
+        yield dataclasses.replace(
+            request,
+            headers={**request.headers, "X-Middleware": "1"},
+        )
+    )
+
+
+@beartype
+def _response(*, request: Request) -> Response:
+    """Make a response which gives the request headers as its body."""
+    content = repr(sorted(request.headers)).encode()
+    return Response(
+        url=request.url,
+        status_code=HTTPStatus.OK,
+        headers={},
+        tell_position=len(content),
+        content=content,
+    )
+
+
+_OTHER_VWS_URL = "http://vws.example.com"
+_OTHER_VWQ_URL = "http://vwq.example.com"
+
+_REQUEST = Request(
+    method=HTTPMethod.GET,
+    url="https://example.com/path",
+    headers={},
+    data=b"",
+)
+
+
+class TestSendWithMiddleware:
+    """Tests for sending requests through middleware."""
+
+    @staticmethod
+    def test_no_middleware() -> None:
+        """Without middleware, the request is sent as it is."""
+        response = send_with_middleware(
+            middleware=(),
+            request=_REQUEST,
+            send=lambda request: _response(request=request),
+        )
+
+        assert response.text == "[]"
+
+    @staticmethod
+    def test_order() -> None:
+        """The first middleware sees the request first and the response
+        last.
+        """
+        first = _RecordingMiddleware()
+        second = _RecordingMiddleware()
+
+        response = send_with_middleware(
+            middleware=(first, _add_header, second),
+            request=_REQUEST,
+            send=lambda request: _response(request=request),
+        )
+
+        assert response.text == "['X-Middleware']"
+        assert first.requests == [_REQUEST]
+        (second_request,) = second.requests
+        assert second_request.headers == {"X-Middleware": "1"}
+        assert first.status_codes == second.status_codes == [HTTPStatus.OK]
+
+    @staticmethod
+    def test_error() -> None:
+        """An error from sending a request is raised inside middleware,
+        which can give a response instead.
+        """
+        seen_errors: list[Exception] = []
+
+        @beartype
+        def recover(
+            request: Request,
+        ) -> Generator[Request, Response, Response]:
+            """Give a response if the request fails."""
+            try:
+                return (yield request)
+            except ConnectionError as exc:
+                seen_errors.append(exc)
+                return _response(request=request)
+
+        @beartype
+        def fail(request: Request) -> Response:
+            """Fail to send a request."""
+            raise ConnectionError(request.url)
+
+        response = send_with_middleware(
+            middleware=(recover,),
+            request=_REQUEST,
+            send=fail,
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert [str(object=error) for error in seen_errors] == [_REQUEST.url]
+
+        with pytest.raises(expected_exception=ConnectionError):
+            send_with_middleware(
+                middleware=(_RecordingMiddleware(),),
+                request=_REQUEST,
+                send=fail,
+            )
+
+    @staticmethod
+    def test_yield_twice() -> None:
+        """Middleware which yields more than one request is an error."""
+
+        def yield_twice(
+            request: Request,
+        ) -> Generator[Request, Response, Response]:
+            """Yield a request twice."""
+            response = yield request
+            yield request
+            return response
+
+        with pytest.raises(
+            expected_exception=RuntimeError,
+            match=r"Middleware must yield exactly one request\.",
+        ):
+            send_with_middleware(
+                middleware=(yield_twice,),
+                request=_REQUEST,
+                send=lambda request: _response(request=request),
+            )
+
+    @staticmethod
+    def test_no_yield() -> None:
+        """Middleware which returns without yielding a request is an
+        error.
+        """
+
+        def no_yield(
+            request: Request,
+        ) -> Generator[Request, Response, Response]:
+            """Return a response without yielding a request."""
+            yield from ()
+            return _response(request=request)
+
+        with pytest.raises(
+            expected_exception=RuntimeError,
+            match=r"Middleware must yield exactly one request\.",
+        ):
+            send_with_middleware(
+                middleware=(no_yield,),
+                request=_REQUEST,
+                send=lambda request: _response(request=request),
+            )
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async_no_yield() -> None:
+        """Middleware which returns without yielding a request is an
+        error with async requests.
+        """
+
+        def no_yield(
+            request: Request,
+        ) -> Generator[Request, Response, Response]:
+            """Return a response without yielding a request."""
+            yield from ()
+            return _response(request=request)
+
+        @beartype
+        async def send(request: Request) -> Response:
+            """Give a response to a request."""
+            return _response(request=request)  # pragma: no cover
+
+        with pytest.raises(
+            expected_exception=RuntimeError,
+            match=r"Middleware must yield exactly one request\.",
+        ):
+            await async_send_with_middleware(
+                middleware=(no_yield,),
+                request=_REQUEST,
+                send=send,
+            )
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async() -> None:
+        """The same middleware works with async requests."""
+        recording_middleware = _RecordingMiddleware()
+
+        @beartype
+        async def send(request: Request) -> Response:
+            """Give a response to a request."""
+            return _response(request=request)
+
+        response = await async_send_with_middleware(
+            middleware=(recording_middleware, _add_header),
+            request=_REQUEST,
+            send=send,
+        )
+
+        assert response.text == "['X-Middleware']"
+        assert recording_middleware.requests == [_REQUEST]
+        assert recording_middleware.status_codes == [HTTPStatus.OK]
+
+
+class TestClients:
+    """Tests for using middleware with clients."""
+
+    @staticmethod
+    def test_sync_clients(image: io.BytesIO | BinaryIO) -> None:
+        """Sync clients send each request through their middleware,
+        before it is signed.
+        """
+        recording_middleware = _RecordingMiddleware()
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            vws_client = VWS(
+                server_access_key=database.server_access_key,
+                server_secret_key=database.server_secret_key,
+                middleware=(recording_middleware, _add_header),
+            )
+            cloud_reco_client = CloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                middleware=(recording_middleware, _add_header),
+            )
+
+            vws_client.list_targets()
+            cloud_reco_client.query(image=image)
+
+        assert [request.url for request in recording_middleware.requests] == [
+            "https://vws.vuforia.com/targets",
+            "https://cloudreco.vuforia.com/v1/query",
+        ]
+        assert recording_middleware.status_codes == [
+            HTTPStatus.OK,
+            HTTPStatus.OK,
+        ]
+        for request in recording_middleware.requests:
+            assert "Authorization" not in request.headers
+            assert "Date" not in request.headers
+
+    @staticmethod
+    def test_changed_request_is_signed() -> None:
+        """A request which middleware changes is signed as changed."""
+
+        @beartype
+        def list_targets(
+            request: Request,
+        ) -> Generator[Request, Response, Response]:
+            """Send a request for a list of targets instead."""
+            return (
+                yield dataclasses.replace(
+                    request,
+                    url=request.url.replace("/summary", "/targets"),
+                )
+            )
+
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            vws_client = VWS(
+                server_access_key=database.server_access_key,
+                server_secret_key=database.server_secret_key,
+                middleware=(list_targets,),
+            )
+            response = vws_client.make_request(
+                method=HTTPMethod.GET,
+                data=b"",
+                request_path="/summary",
+                expected_result_code="Success",
+                content_type="application/json",
+            )
+
+        assert response.url == "https://vws.vuforia.com/targets"
+
+    @staticmethod
+    def test_changed_host_is_signed(image: io.BytesIO | BinaryIO) -> None:
+        """A request whose host middleware changes is signed for its
+        path.
+        """
+
+        @beartype
+        def change_host(
+            request: Request,
+        ) -> Generator[Request, Response, Response]:
+            """Send a request to a different host."""
+            return (
+                yield dataclasses.replace(
+                    request,
+                    url=request.url.replace(
+                        "https://vws.vuforia.com",
+                        _OTHER_VWS_URL,
+                    ).replace("https://cloudreco.vuforia.com", _OTHER_VWQ_URL),
+                )
+            )
+
+        with MockVWS(
+            base_vws_url=_OTHER_VWS_URL,
+            base_vwq_url=_OTHER_VWQ_URL,
+        ) as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            vws_client = VWS(
+                server_access_key=database.server_access_key,
+                server_secret_key=database.server_secret_key,
+                middleware=(change_host,),
+            )
+            cloud_reco_client = CloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                middleware=(change_host,),
+            )
+
+            assert vws_client.list_targets() == []
+            assert cloud_reco_client.query(image=image) == []
+
+    @staticmethod
+    def test_vumark_service() -> None:
+        """The VuMark service sends requests through its middleware."""
+        recording_middleware = _RecordingMiddleware()
+        vumark_target = VuMarkTarget(name="vumark-template")
+        with MockVWS() as mock:
+            database = VuMarkDatabase(vumark_targets={vumark_target})
+            mock.add_vumark_database(vumark_database=database)
+            vumark_service_client = VuMarkService(
+                server_access_key=database.server_access_key,
+                server_secret_key=database.server_secret_key,
+                middleware=(recording_middleware,),
+            )
+
+            vumark_service_client.generate_vumark_instance(
+                target_id=vumark_target.target_id,
+                instance_id="12345",
+                accept=VuMarkAccept.PNG,
+            )
+
+        (request,) = recording_middleware.requests
+        assert request.url.endswith(
+            f"/targets/{vumark_target.target_id}/instances",
+        )
+        assert request.headers["Accept"] == VuMarkAccept.PNG
+
+    @staticmethod
+    @pytest.mark.usefixtures("_mock_model_targets")
+    def test_model_target_service(
+        *,
+        model_target_model: ModelTargetModel,
+    ) -> None:
+        """The Model Target service sends token requests and API requests
+        through its middleware, before they are authorized.
+        """
+        recording_middleware = _RecordingMiddleware()
+        with ModelTargetService(
+            client_id="client-id",
+            client_secret="client-secret",  # noqa: S106
+            middleware=(recording_middleware,),
+        ) as client:
+            client.create_dataset(
+                name="dataset",
+                target_sdk="11.0",
+                models=[model_target_model],
+                dataset_type=ModelTargetDatasetType.STANDARD,
+            )
+
+        assert [request.url for request in recording_middleware.requests] == [
+            "https://vws.vuforia.com/oauth2/token",
+            "https://vws.vuforia.com/modeltargets/datasets",
+        ]
+        for request in recording_middleware.requests:
+            assert "Authorization" not in request.headers
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async_clients(image: io.BytesIO | BinaryIO) -> None:
+        """Async clients send each request through their middleware."""
+        recording_middleware = _RecordingMiddleware()
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            async with (
+                AsyncVWS(
+                    server_access_key=database.server_access_key,
+                    server_secret_key=database.server_secret_key,
+                    middleware=(recording_middleware, _add_header),
+                ) as vws_client,
+                AsyncCloudRecoService(
+                    client_access_key=database.client_access_key,
+                    client_secret_key=database.client_secret_key,
+                    middleware=(recording_middleware, _add_header),
+                ) as cloud_reco_client,
+            ):
+                await vws_client.list_targets()
+                await cloud_reco_client.query(image=image)
+
+        assert [request.url for request in recording_middleware.requests] == [
+            "https://vws.vuforia.com/targets",
+            "https://cloudreco.vuforia.com/v1/query",
+        ]
+        assert recording_middleware.status_codes == [
+            HTTPStatus.OK,
+            HTTPStatus.OK,
+        ]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("_mock_model_targets")
+    async def test_async_model_target_service(
+        *,
+        model_target_model: ModelTargetModel,
+    ) -> None:
+        """The async Model Target service sends requests through its
+        middleware.
+        """
+        recording_middleware = _RecordingMiddleware()
+        async with AsyncModelTargetService(
+            client_id="client-id",
+            client_secret="client-secret",  # noqa: S106
+            middleware=(recording_middleware,),
+        ) as client:
+            await client.create_dataset(
+                name="dataset",
+                target_sdk="11.0",
+                models=[model_target_model],
+                dataset_type=ModelTargetDatasetType.STANDARD,
+            )
+
+        assert [request.url for request in recording_middleware.requests] == [
+            "https://vws.vuforia.com/oauth2/token",
+            "https://vws.vuforia.com/modeltargets/datasets",
+        ]
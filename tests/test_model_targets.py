@@ -5,6 +5,7 @@ import json
 import uuid
 import zipfile
 from http import HTTPStatus
+from pathlib import Path  # noqa: TC003
 
 import pytest
 from beartype import beartype
@@ -352,6 +353,45 @@ class TestDatasetLifecycle:
                 dataset_type=dataset_type,
             )
 
+    @staticmethod
+    def test_download_to_file(
+        *,
+        model_target_client: ModelTargetService,
+        model_target_model: ModelTargetModel,
+        tmp_path: Path,
+    ) -> None:
+        """A dataset can be downloaded to a path or to a file object."""
+        dataset_uuid = model_target_client.create_dataset(
+            name="dataset",
+            target_sdk="11.0",
+            models=[model_target_model],
+            dataset_type=ModelTargetDatasetType.STANDARD,
+        )
+        model_target_client.wait_for_dataset_generated(
+            dataset_uuid=dataset_uuid,
+            dataset_type=ModelTargetDatasetType.STANDARD,
+        )
+        dataset = model_target_client.download_dataset(
+            dataset_uuid=dataset_uuid,
+            dataset_type=ModelTargetDatasetType.STANDARD,
+        )
+
+        dataset_path = tmp_path / "dataset.zip"
+        model_target_client.download_dataset_to_file(
+            dataset_uuid=dataset_uuid,
+            dataset_type=ModelTargetDatasetType.STANDARD,
+            file=dataset_path,
+        )
+        assert dataset_path.read_bytes() == dataset
+
+        dataset_file = io.BytesIO()
+        model_target_client.download_dataset_to_file(
+            dataset_uuid=dataset_uuid,
+            dataset_type=ModelTargetDatasetType.STANDARD,
+            file=dataset_file,
+        )
+        assert dataset_file.getvalue() == dataset
+
     @staticmethod
     def test_status_while_processing(
         *,
@@ -404,6 +444,30 @@ class TestDatasetLifecycle:
         assert exc.value.code == "UNSUPPORTED_STATE"
         assert exc.value.target == dataset_uuid
 
+    @staticmethod
+    def test_download_to_file_while_processing(
+        *,
+        model_target_client: ModelTargetService,
+        model_target_model: ModelTargetModel,
+    ) -> None:
+        """Nothing is written when a dataset cannot be downloaded."""
+        dataset_uuid = model_target_client.create_dataset(
+            name="dataset",
+            target_sdk="11.0",
+            models=[model_target_model],
+            dataset_type=ModelTargetDatasetType.STANDARD,
+        )
+        dataset_file = io.BytesIO()
+
+        with pytest.raises(expected_exception=ModelTargetDatasetNotDoneError):
+            model_target_client.download_dataset_to_file(
+                dataset_uuid=dataset_uuid,
+                dataset_type=ModelTargetDatasetType.STANDARD,
+                file=dataset_file,
+            )
+
+        assert not dataset_file.getvalue()
+
     @staticmethod
     def test_dataset_types_are_separate(
         *,
@@ -0,0 +1,420 @@
+"""Tests for caching query results."""
+
+import asyncio
+import datetime
+import io  # noqa: TC003
+import threading
+import time
+from collections.abc import Callable  # noqa: TC003
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from mock_vws import MockVWS
+from mock_vws.database import CloudDatabase
+
+from vws import VWS, AsyncCloudRecoService, CloudRecoService
+from vws.include_target_data import CloudRecoIncludeTargetData
+from vws.query_cache import QueryCacheStatistics, QueryResultCache
+from vws.reports import QueryResult, TargetData
+
+# The estimated sizes of the parts of a cache entry.
+_IMAGE_HASH_SIZE = 32
+_TARGET_ID_SIZE = 32
+_NAME_SIZE = len("name")
+
+
+def _result(*, application_metadata_size: int) -> QueryResult:
+    """Make a query result with application metadata of a given size."""
+    return QueryResult(
+        target_id="a" * 32,
+        target_data=TargetData(
+            name="name",
+            application_metadata="m" * application_metadata_size,
+            target_timestamp=datetime.datetime.now(tz=datetime.UTC),
+        ),
+    )
+
+
+class TestCloudRecoService:
+    """Tests for using a cache with ``CloudRecoService``."""
+
+    @staticmethod
+    def test_cached(high_quality_image: io.BytesIO) -> None:
+        """Querying the same image again gives the cached results."""
+        query_cache = QueryResultCache()
+        with MockVWS(processing_time_seconds=0.2) as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            vws_client = VWS(
+                server_access_key=database.server_access_key,
+                server_secret_key=database.server_secret_key,
+                database_id=database.database_id,
+            )
+            cloud_reco_client = CloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                query_cache=query_cache,
+            )
+            assert cloud_reco_client.query(image=high_quality_image) == []
+
+            target_id = vws_client.add_target(
+                name="x",
+                width=1,
+                image=high_quality_image,
+                active_flag=True,
+                application_metadata=None,
+            )
+            vws_client.wait_for_target_processed(target_id=target_id)
+
+            # The new target is not reflected in the cached results.
+            assert cloud_reco_client.query(image=high_quality_image) == []
+            # Other query options are cached separately.
+            [matching_target] = cloud_reco_client.query(
+                image=high_quality_image,
+                include_target_data=CloudRecoIncludeTargetData.ALL,
+            )
+            assert matching_target.target_id == target_id
+
+            query_cache.clear()
+            [matching_target] = cloud_reco_client.query(
+                image=high_quality_image,
+            )
+            assert matching_target.target_id == target_id
+
+        statistics = query_cache.statistics
+        expected_misses = 3
+        assert statistics.hits == 1
+        assert statistics.misses == expected_misses
+
+
+class TestAsyncCloudRecoService:
+    """Tests for using a cache with ``AsyncCloudRecoService``."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cached(high_quality_image: io.BytesIO) -> None:
+        """Querying the same image again gives the cached results."""
+        query_cache = QueryResultCache()
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            async with AsyncCloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                query_cache=query_cache,
+            ) as cloud_reco_client:
+                for _ in range(2):
+                    results = await cloud_reco_client.query(
+                        image=high_quality_image,
+                    )
+                    assert results == []
+
+        statistics = query_cache.statistics
+        assert statistics.hits == 1
+        assert statistics.misses == 1
+
+
+class TestQueryResultCache:
+    """Tests for ``QueryResultCache``."""
+
+    @staticmethod
+    def test_ttl() -> None:
+        """Results are not used after they expire."""
+        query_cache = QueryResultCache(ttl_seconds=0)
+        for _ in range(2):
+            query_cache.query(
+                namespace="namespace",
+                image_data=b"image",
+                max_num_results=1,
+                include_target_data=CloudRecoIncludeTargetData.TOP,
+                make_query=list,
+            )
+        expected_misses = 2
+        assert query_cache.statistics.misses == expected_misses
+
+    @staticmethod
+    def test_lru_eviction() -> None:
+        """The least recently used results are evicted when the cache is
+        full.
+        """
+        query_cache = QueryResultCache(max_entries=2)
+        for image_data in (b"a", b"b", b"a", b"c", b"a", b"b"):
+            query_cache.query(
+                namespace="namespace",
+                image_data=image_data,
+                max_num_results=1,
+                include_target_data=CloudRecoIncludeTargetData.TOP,
+                make_query=list,
+            )
+        # "b" is evicted by "c", and "c" by "b".
+        assert query_cache.statistics == QueryCacheStatistics(
+            hits=2,
+            misses=4,
+            shared=0,
+            evictions=2,
+            entries=2,
+            size_bytes=2 * _IMAGE_HASH_SIZE,
+        )
+
+    @staticmethod
+    def test_byte_eviction() -> None:
+        """The least recently used results are evicted when the results
+        in the cache are too large.
+        """
+        query_cache = QueryResultCache(max_bytes=2500)
+        for image_data in (b"a", b"b", b"a", b"c"):
+            query_cache.query(
+                namespace="namespace",
+                image_data=image_data,
+                max_num_results=1,
+                include_target_data=CloudRecoIncludeTargetData.TOP,
+                make_query=lambda: [_result(application_metadata_size=1000)],
+            )
+        # "b" is evicted by "c".
+        assert query_cache.statistics == QueryCacheStatistics(
+            hits=1,
+            misses=3,
+            shared=0,
+            evictions=1,
+            entries=2,
+            size_bytes=2
+            * (_IMAGE_HASH_SIZE + _TARGET_ID_SIZE + _NAME_SIZE + 1000),
+        )
+
+        query_cache.clear()
+        assert query_cache.statistics.size_bytes == 0
+
+    @staticmethod
+    def test_too_large_not_cached() -> None:
+        """Results which are larger than the cache on their own are not
+        cached.
+        """
+        query_cache = QueryResultCache(max_bytes=1000)
+        query_cache.query(
+            namespace="namespace",
+            image_data=b"a",
+            max_num_results=1,
+            include_target_data=CloudRecoIncludeTargetData.NONE,
+            make_query=lambda: [
+                QueryResult(target_id="a" * 32, target_data=None),
+            ],
+        )
+        results = query_cache.query(
+            namespace="namespace",
+            image_data=b"b",
+            max_num_results=1,
+            include_target_data=CloudRecoIncludeTargetData.TOP,
+            make_query=lambda: [_result(application_metadata_size=1000)],
+        )
+        assert len(results) == 1
+        assert query_cache.statistics == QueryCacheStatistics(
+            hits=0,
+            misses=2,
+            shared=0,
+            evictions=0,
+            entries=1,
+            size_bytes=_IMAGE_HASH_SIZE + _TARGET_ID_SIZE,
+        )
+
+    @staticmethod
+    def test_expired_size() -> None:
+        """Expired results no longer count towards the size of the
+        cache once they are removed.
+        """
+        query_cache = QueryResultCache(ttl_seconds=0)
+        for _ in range(2):
+            query_cache.query(
+                namespace="namespace",
+                image_data=b"image",
+                max_num_results=1,
+                include_target_data=CloudRecoIncludeTargetData.TOP,
+                make_query=lambda: [_result(application_metadata_size=10)],
+            )
+        assert query_cache.statistics == QueryCacheStatistics(
+            hits=0,
+            misses=2,
+            shared=0,
+            evictions=0,
+            entries=1,
+            size_bytes=_IMAGE_HASH_SIZE + _TARGET_ID_SIZE + _NAME_SIZE + 10,
+        )
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_replaced_size() -> None:
+        """Results which replace results stored by another query with
+        the same key replace their size.
+        """
+        query_cache = QueryResultCache()
+
+        async def make_query() -> list[QueryResult]:
+            """Make a query while a sync query for the same key is
+            stored.
+            """
+            return query_cache.query(
+                namespace="namespace",
+                image_data=b"image",
+                max_num_results=1,
+                include_target_data=CloudRecoIncludeTargetData.TOP,
+                make_query=lambda: [_result(application_metadata_size=10)],
+            )
+
+        await query_cache.aquery(
+            namespace="namespace",
+            image_data=b"image",
+            max_num_results=1,
+            include_target_data=CloudRecoIncludeTargetData.TOP,
+            make_query=make_query,
+        )
+        assert query_cache.statistics == QueryCacheStatistics(
+            hits=0,
+            misses=2,
+            shared=0,
+            evictions=0,
+            entries=1,
+            size_bytes=_IMAGE_HASH_SIZE + _TARGET_ID_SIZE + _NAME_SIZE + 10,
+        )
+
+    @staticmethod
+    def test_errors_not_cached() -> None:
+        """Errors are raised, and not cached."""
+        query_cache = QueryResultCache()
+
+        def make_query() -> list[QueryResult]:
+            """Fail to make a query."""
+            msg = "The query failed."
+            raise ValueError(msg)
+
+        for _ in range(2):
+            with pytest.raises(
+                expected_exception=ValueError,
+                match=r"^The query failed\.$",
+            ):
+                query_cache.query(
+                    namespace="namespace",
+                    image_data=b"image",
+                    max_num_results=1,
+                    include_target_data=CloudRecoIncludeTargetData.TOP,
+                    make_query=make_query,
+                )
+        expected_misses = 2
+        assert query_cache.statistics.misses == expected_misses
+
+    @staticmethod
+    def test_shared_in_flight() -> None:
+        """Identical queries made at the same time share one query."""
+        query_cache = QueryResultCache()
+        started = threading.Event()
+        release = threading.Event()
+        calls: list[None] = []
+
+        def make_query() -> list[QueryResult]:
+            """Make a slow query."""
+            calls.append(None)
+            started.set()
+            release.wait()
+            return []
+
+        def query() -> list[QueryResult]:
+            """Query through the cache."""
+            return query_cache.query(
+                namespace="namespace",
+                image_data=b"image",
+                max_num_results=1,
+                include_target_data=CloudRecoIncludeTargetData.TOP,
+                make_query=make_query,
+            )
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(query)
+            started.wait()
+            second = executor.submit(query)
+            while query_cache.statistics.shared == 0:
+                time.sleep(0.001)
+            release.set()
+            assert first.result() == second.result() == []
+        assert len(calls) == 1
+
+    @staticmethod
+    def test_interrupted_in_flight() -> None:
+        """A query which waits for an identical query is made again if
+        that query is interrupted, rather than given the interruption.
+        """
+        query_cache = QueryResultCache()
+        started = threading.Event()
+        release = threading.Event()
+
+        def interrupted_query() -> list[QueryResult]:
+            """Make a slow query which is interrupted."""
+            started.set()
+            release.wait()
+            raise KeyboardInterrupt
+
+        def query(
+            make_query: Callable[[], list[QueryResult]],
+        ) -> list[QueryResult]:
+            """Query through the cache."""
+            return query_cache.query(
+                namespace="namespace",
+                image_data=b"image",
+                max_num_results=1,
+                include_target_data=CloudRecoIncludeTargetData.TOP,
+                make_query=make_query,
+            )
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            interrupted = executor.submit(query, interrupted_query)
+            started.wait()
+            waiting = executor.submit(query, list)
+            while query_cache.statistics.shared == 0:
+                time.sleep(0.001)
+            release.set()
+            assert waiting.result() == []
+            with pytest.raises(expected_exception=KeyboardInterrupt):
+                interrupted.result()
+        assert query_cache.statistics == QueryCacheStatistics(
+            hits=0,
+            misses=2,
+            shared=1,
+            evictions=0,
+            entries=1,
+            size_bytes=_IMAGE_HASH_SIZE,
+        )
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async_shared_in_flight() -> None:
+        """Identical async queries made at the same time share one
+        query.
+        """
+        query_cache = QueryResultCache()
+        calls: list[None] = []
+
+        async def make_query() -> list[QueryResult]:
+            """Make a slow query."""
+            calls.append(None)
+            await asyncio.sleep(delay=0.01)
+            return []
+
+        results = await asyncio.gather(
+            *(
+                query_cache.aquery(
+                    namespace="namespace",
+                    image_data=b"image",
+                    max_num_results=1,
+                    include_target_data=CloudRecoIncludeTargetData.TOP,
+                    make_query=make_query,
+                )
+                for _ in range(3)
+            ),
+        )
+        assert results == [[], [], []]
+        assert len(calls) == 1
+        assert query_cache.statistics == QueryCacheStatistics(
+            hits=0,
+            misses=1,
+            shared=2,
+            evictions=0,
+            entries=1,
+            size_bytes=_IMAGE_HASH_SIZE,
+        )
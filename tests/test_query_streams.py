@@ -0,0 +1,232 @@
+"""Tests for querying streams of frames."""
+
+import asyncio
+import io  # noqa: TC003
+import json
+from collections.abc import AsyncIterator  # noqa: TC003
+from http import HTTPStatus
+
+import pytest
+from beartype import beartype
+
+from tests.scripted_transports import scripted_response
+from vws import AsyncCloudRecoService
+from vws.exceptions.custom_exceptions import RequestEntityTooLargeError
+from vws.query_streams import (
+    StaleFramePolicy,
+    StreamResultOrder,
+    stream_queries,
+)
+from vws.response import Response  # noqa: TC001
+
+
+@beartype
+class _SlowFirstQueryTransport:
+    """An async transport which answers the first query slowly with no
+    matches, and later queries at once with an error.
+    """
+
+    def __init__(self) -> None:
+        """Create a transport which has not been called."""
+        self._calls = 0
+
+    async def aclose(self) -> None:
+        """Close the transport."""
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Give the response for the next query."""
+        del method, url, headers, data, request_timeout
+        self._calls += 1
+        if self._calls > 1:
+            return scripted_response(
+                status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
+        await asyncio.sleep(delay=0.1)
+        return scripted_response(
+            headers={"Content-Type": "application/json"},
+            text=json.dumps(obj={"result_code": "Success", "results": []}),
+        )
+
+
+async def _frames(
+    *,
+    images: list[io.BytesIO | io.BufferedRandom],
+) -> AsyncIterator[tuple[int, io.BytesIO | io.BufferedRandom]]:
+    """Give numbered frames, all at once, as if the service lags behind
+    capture.
+    """
+    for frame_id, image in enumerate(iterable=images):
+        yield frame_id, image
+
+
+class TestStreamQueries:
+    """Tests for ``stream_queries``."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        argnames="result_order",
+        argvalues=StreamResultOrder,
+    )
+    async def test_wait(
+        *,
+        async_cloud_reco_client: AsyncCloudRecoService,
+        high_quality_image: io.BytesIO,
+        result_order: StreamResultOrder,
+    ) -> None:
+        """With ``WAIT``, every frame is queried."""
+        results = [
+            result
+            async for result in stream_queries(
+                client=async_cloud_reco_client,
+                frames=_frames(images=[high_quality_image] * 5),
+                max_in_flight=2,
+                result_order=result_order,
+            )
+        ]
+        frame_ids = [frame_id for frame_id, _ in results]
+        if result_order is StreamResultOrder.INPUT:
+            assert frame_ids == [0, 1, 2, 3, 4]
+        else:
+            assert sorted(frame_ids) == [0, 1, 2, 3, 4]
+        assert all(matches == [] for _, matches in results)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        argnames=("stale_frame_policy", "expected_frame_ids"),
+        argvalues=[
+            (StaleFramePolicy.DROP_NEWEST, [0]),
+            (StaleFramePolicy.DROP_OLDEST, [0, 4]),
+        ],
+    )
+    async def test_drop(
+        *,
+        async_cloud_reco_client: AsyncCloudRecoService,
+        high_quality_image: io.BytesIO,
+        stale_frame_policy: StaleFramePolicy,
+        expected_frame_ids: list[int],
+    ) -> None:
+        """Frames which arrive when the in-flight window is full are
+        dropped by the drop policies.
+        """
+        frame_ids = [
+            frame_id
+            async for frame_id, _ in stream_queries(
+                client=async_cloud_reco_client,
+                frames=_frames(images=[high_quality_image] * 5),
+                max_in_flight=1,
+                stale_frame_policy=stale_frame_policy,
+            )
+        ]
+        assert frame_ids == expected_frame_ids
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_slow_consumer(
+        *,
+        async_cloud_reco_client: AsyncCloudRecoService,
+        high_quality_image: io.BytesIO,
+    ) -> None:
+        """A query keeps its slot until its result is consumed, so a slow
+        consumer holds back the queries.
+        """
+        frame_ids_read: list[int] = []
+
+        async def frames() -> AsyncIterator[tuple[int, io.BytesIO]]:
+            """Give numbered frames, recording which have been read."""
+            for frame_id in range(10):
+                frame_ids_read.append(frame_id)
+                yield frame_id, high_quality_image
+
+        results = stream_queries(
+            client=async_cloud_reco_client,
+            frames=frames(),
+            max_in_flight=2,
+        )
+        first_frame_id, _ = await anext(results)
+        # Give the queries in flight time to finish.
+        await asyncio.sleep(delay=0.2)
+        # Two frames are queried, and one more waits for a slot.
+        assert frame_ids_read == [0, 1, 2]
+        remaining_frame_ids = [frame_id async for frame_id, _ in results]
+        assert [first_frame_id, *remaining_frame_ids] == list(range(10))
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        argnames="result_order",
+        argvalues=StreamResultOrder,
+    )
+    async def test_query_error(
+        *,
+        async_cloud_reco_client: AsyncCloudRecoService,
+        high_quality_image: io.BytesIO,
+        png_too_large: io.BytesIO | io.BufferedRandom,
+        result_order: StreamResultOrder,
+    ) -> None:
+        """An error from a query stops the stream once the results
+        before it are given.
+        """
+        images = [high_quality_image, png_too_large, high_quality_image]
+        results = stream_queries(
+            client=async_cloud_reco_client,
+            frames=_frames(images=images),
+            max_in_flight=1,
+            result_order=result_order,
+        )
+        first_frame_id, _ = await anext(results)
+        assert first_frame_id == 0
+        with pytest.raises(expected_exception=RequestEntityTooLargeError):
+            await anext(results)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_query_error_before_slow_result(
+        high_quality_image: io.BytesIO,
+    ) -> None:
+        """When results are given in input order, an error from a query
+        which finishes before the queries of earlier frames is raised
+        only after the results of those frames are given.
+        """
+        client = AsyncCloudRecoService(
+            client_access_key="client_access_key",
+            client_secret_key="client_secret_key",  # noqa: S106
+            transport=_SlowFirstQueryTransport(),
+        )
+        results = stream_queries(
+            client=client,
+            frames=_frames(images=[high_quality_image] * 2),
+            max_in_flight=2,
+            result_order=StreamResultOrder.INPUT,
+        )
+        assert await anext(results) == (0, [])
+        with pytest.raises(expected_exception=RequestEntityTooLargeError):
+            await anext(results)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_invalid_max_in_flight(
+        *,
+        async_cloud_reco_client: AsyncCloudRecoService,
+        high_quality_image: io.BytesIO,
+    ) -> None:
+        """At least one query must be allowed in flight."""
+        results = stream_queries(
+            client=async_cloud_reco_client,
+            frames=_frames(images=[high_quality_image]),
+            max_in_flight=0,
+        )
+        with pytest.raises(
+            expected_exception=ValueError,
+            match=r"^max_in_flight must be at least 1\.$",
+        ):
+            await anext(results)
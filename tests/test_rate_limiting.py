@@ -0,0 +1,497 @@
+"""Tests for rate limiters."""
+
+import io  # noqa: TC003
+import json
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from pathlib import Path  # noqa: TC003
+from typing import BinaryIO
+
+import pytest
+from beartype import beartype
+from mock_vws import MockVWS
+from mock_vws.database import CloudDatabase
+
+from tests.scripted_transports import (
+    AsyncScriptedTransport,
+    ScriptedTransport,
+    scripted_response,
+)
+from vws import VWS, AsyncCloudRecoService, AsyncVWS, CloudRecoService
+from vws.rate_limiting import (
+    RateLimiter,
+    SharedMemoryRateLimiter,
+    TokenBucketRateLimiter,
+)
+from vws.response import Response  # noqa: TC001
+
+
+@beartype
+class _RecordingRateLimiter:
+    """A rate limiter which records the keys which it is acquired for,
+    and never waits.
+    """
+
+    def __init__(self) -> None:
+        """Create a rate limiter which has recorded no keys."""
+        self.keys: list[str] = []
+
+    def acquire(self, *, key: str) -> float:
+        """Record the key."""
+        self.keys.append(key)
+        return 0.0
+
+    async def aacquire(self, *, key: str) -> float:
+        """Record the key."""
+        self.keys.append(key)
+        return 0.0
+
+
+@beartype
+def _clock_skew_outcomes() -> list[Response]:
+    """Get responses which reject a request because of clock skew, and
+    then accept it.
+
+    Returns:
+        A ``RequestTimeTooSkewed`` response, then a successful response.
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "Date": "Thu, 01 Jan 2026 01:00:00 GMT",
+    }
+    return [
+        scripted_response(
+            status_code=HTTPStatus.FORBIDDEN,
+            headers=headers,
+            text=json.dumps(obj={"result_code": "RequestTimeTooSkewed"}),
+        ),
+        scripted_response(
+            headers=headers,
+            text=json.dumps(obj={"result_code": "Success", "results": []}),
+        ),
+    ]
+
+
+@beartype
+def _reserve_many(*, path: Path, count: int) -> list[float]:
+    """Reserve times for requests with a rate limiter shared through a
+    file.
+
+    This is run in other processes.
+
+    Args:
+        path: The file which the rate limiter state is shared through.
+        count: The number of requests to reserve times for.
+
+    Returns:
+        The number of seconds to wait before each request.
+    """
+    with SharedMemoryRateLimiter(
+        path=path,
+        requests_per_second=0.1,
+    ) as rate_limiter:
+        return [rate_limiter.reserve(key="key") for _ in range(count)]
+
+
+class TestTokenBucketRateLimiter:
+    """Tests for ``TokenBucketRateLimiter``."""
+
+    @staticmethod
+    def test_is_rate_limiter() -> None:
+        """``TokenBucketRateLimiter`` is a ``RateLimiter``."""
+        rate_limiter = TokenBucketRateLimiter(requests_per_second=1.0)
+        assert isinstance(rate_limiter, RateLimiter)
+
+    @staticmethod
+    def test_burst() -> None:
+        """Up to ``burst`` requests are let through at once, and later
+        requests wait for tokens to be added.
+        """
+        requests_per_second = 10.0
+        burst = 3
+        rate_limiter = TokenBucketRateLimiter(
+            requests_per_second=requests_per_second,
+            burst=burst,
+        )
+
+        waits = [rate_limiter.reserve(key="key") for _ in range(burst + 2)]
+
+        assert waits[:burst] == [0.0] * burst
+        assert waits[burst] == pytest.approx(expected=0.1, abs=0.01)
+        assert waits[burst + 1] == pytest.approx(expected=0.2, abs=0.01)
+        statistics = rate_limiter.statistics
+        assert statistics.acquisitions == burst + 2
+        assert statistics.delayed_acquisitions == 2  # noqa: PLR2004
+        assert statistics.wait_seconds == pytest.approx(
+            expected=0.3,
+            abs=0.02,
+        )
+        assert statistics.max_wait_seconds == waits[-1]
+
+    @staticmethod
+    def test_keys_are_separate() -> None:
+        """Each key has its own bucket."""
+        rate_limiter = TokenBucketRateLimiter(requests_per_second=1.0)
+
+        assert rate_limiter.reserve(key="first") == 0
+        assert rate_limiter.reserve(key="second") == 0
+        assert rate_limiter.reserve(key="first") > 0
+
+    @staticmethod
+    def test_shared_between_threads() -> None:
+        """Requests from many threads are spread out."""
+        requests_per_second = 50.0
+        number_of_threads = 5
+        rate_limiter = TokenBucketRateLimiter(
+            requests_per_second=requests_per_second,
+        )
+        acquired_times: list[float] = []
+
+        def acquire() -> None:
+            """Acquire the rate limiter and record the time."""
+            rate_limiter.acquire(key="key")
+            acquired_times.append(time.monotonic())
+
+        threads = [
+            threading.Thread(target=acquire) for _ in range(number_of_threads)
+        ]
+        start_time = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        minimum_seconds = (number_of_threads - 1) / requests_per_second
+        assert max(acquired_times) - start_time >= minimum_seconds * 0.9
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_aacquire() -> None:
+        """The rate limiter can be waited for without blocking the event
+        loop.
+        """
+        rate_limiter = TokenBucketRateLimiter(requests_per_second=20.0)
+
+        assert await rate_limiter.aacquire(key="key") == 0
+        waited = await rate_limiter.aacquire(key="key")
+
+        assert waited == pytest.approx(expected=0.05, abs=0.01)
+
+
+class TestSharedMemoryRateLimiter:
+    """Tests for ``SharedMemoryRateLimiter``."""
+
+    @staticmethod
+    def test_is_rate_limiter(tmp_path: Path) -> None:
+        """``SharedMemoryRateLimiter`` is a ``RateLimiter``."""
+        with SharedMemoryRateLimiter(
+            path=tmp_path / "rate",
+            requests_per_second=1.0,
+        ) as rate_limiter:
+            assert isinstance(rate_limiter, RateLimiter)
+
+    @staticmethod
+    def test_burst(tmp_path: Path) -> None:
+        """Up to ``burst`` requests are let through at once, and later
+        requests are spaced out.
+        """
+        burst = 3
+        with SharedMemoryRateLimiter(
+            path=tmp_path / "rate",
+            requests_per_second=10.0,
+            burst=burst,
+        ) as rate_limiter:
+            waits = [rate_limiter.reserve(key="key") for _ in range(burst + 2)]
+            other_key_wait = rate_limiter.reserve(key="other")
+            statistics = rate_limiter.statistics
+
+        assert waits[:burst] == [0.0] * burst
+        assert waits[burst] == pytest.approx(expected=0.1, abs=0.01)
+        assert waits[burst + 1] == pytest.approx(expected=0.2, abs=0.01)
+        assert other_key_wait == 0
+        assert statistics.acquisitions == burst + 3
+        assert statistics.delayed_acquisitions == 2  # noqa: PLR2004
+
+    @staticmethod
+    def test_shared_between_instances(tmp_path: Path) -> None:
+        """Rate limiters which use the same file share a budget."""
+        path = tmp_path / "rate"
+        with (
+            SharedMemoryRateLimiter(
+                path=path,
+                requests_per_second=1.0,
+            ) as first,
+            SharedMemoryRateLimiter(
+                path=path,
+                requests_per_second=1.0,
+            ) as second,
+        ):
+            assert first.reserve(key="key") == 0
+            assert second.reserve(key="key") > 0
+
+    @staticmethod
+    def test_shared_between_threads(tmp_path: Path) -> None:
+        """Rate limiters in many threads which use the same file each
+        reserve their own time for each request.
+        """
+        path = tmp_path / "rate"
+        number_of_threads = 4
+        count = 25
+        waits: list[float] = []
+
+        def reserve_many() -> None:
+            """Reserve times for requests with a new rate limiter."""
+            with SharedMemoryRateLimiter(
+                path=path,
+                requests_per_second=0.1,
+            ) as rate_limiter:
+                thread_waits = [
+                    rate_limiter.reserve(key="key") for _ in range(count)
+                ]
+            waits.extend(thread_waits)
+
+        with SharedMemoryRateLimiter(path=path, requests_per_second=0.1):
+            threads = [
+                threading.Thread(target=reserve_many)
+                for _ in range(number_of_threads)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Each request is reserved its own 10 seconds.
+        assert sorted(waits) == pytest.approx(
+            expected=[10.0 * index for index in range(len(waits))],
+            abs=1,
+        )
+
+    @staticmethod
+    def test_close_one_instance(tmp_path: Path) -> None:
+        """Closing one rate limiter does not stop another which uses the
+        same file from working.
+        """
+        path = tmp_path / "rate"
+        first = SharedMemoryRateLimiter(path=path, requests_per_second=1.0)
+        with SharedMemoryRateLimiter(
+            path=path,
+            requests_per_second=1.0,
+        ) as second:
+            first.close()
+            first.close()
+            assert second.reserve(key="key") == 0
+            assert second.reserve(key="key") > 0
+
+    @staticmethod
+    def test_shared_between_processes(tmp_path: Path) -> None:
+        """Rate limiters in different processes which use the same file
+        share a budget.
+        """
+        path = tmp_path / "rate"
+        number_of_processes = 3
+        count = 5
+        with ProcessPoolExecutor(
+            max_workers=number_of_processes,
+            mp_context=multiprocessing.get_context(method="spawn"),
+        ) as executor:
+            futures = [
+                executor.submit(_reserve_many, path=path, count=count)
+                for _ in range(number_of_processes)
+            ]
+            waits = sorted(
+                wait for future in futures for wait in future.result()
+            )
+
+        assert len(waits) == number_of_processes * count
+        # Only the first request across all processes is let through at
+        # once, and each later request is reserved its own 10 seconds.
+        assert waits[0] == 0
+        assert waits[1] > 0
+        assert waits[-1] == pytest.approx(
+            expected=10 * (len(waits) - 1),
+            abs=1,
+        )
+
+    @staticmethod
+    def test_different_max_keys(tmp_path: Path) -> None:
+        """A file created with a different number of slots cannot be
+        used.
+        """
+        path = tmp_path / "rate"
+        with SharedMemoryRateLimiter(
+            path=path,
+            requests_per_second=1.0,
+            max_keys=4,
+        ):
+            pass
+
+        with pytest.raises(
+            expected_exception=ValueError,
+            match="not a rate limiter file",
+        ):
+            SharedMemoryRateLimiter(
+                path=path,
+                requests_per_second=1.0,
+                max_keys=8,
+            )
+
+    @staticmethod
+    def test_too_many_keys(tmp_path: Path) -> None:
+        """An error is raised when there is no room for another key."""
+        with SharedMemoryRateLimiter(
+            path=tmp_path / "rate",
+            requests_per_second=1.0,
+            max_keys=2,
+        ) as rate_limiter:
+            rate_limiter.reserve(key="first")
+            rate_limiter.reserve(key="second")
+            with pytest.raises(
+                expected_exception=ValueError,
+                match="no room",
+            ):
+                rate_limiter.reserve(key="third")
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_aacquire(tmp_path: Path) -> None:
+        """The rate limiter can be waited for without blocking the event
+        loop.
+        """
+        with SharedMemoryRateLimiter(
+            path=tmp_path / "rate",
+            requests_per_second=20.0,
+        ) as rate_limiter:
+            assert await rate_limiter.aacquire(key="key") == 0
+            waited = await rate_limiter.aacquire(key="key")
+            assert rate_limiter.acquire(key="other") == 0
+
+        assert waited == pytest.approx(expected=0.05, abs=0.01)
+
+
+class TestClients:
+    """Tests for using rate limiters with clients."""
+
+    @staticmethod
+    def test_sync_clients(image: io.BytesIO | BinaryIO) -> None:
+        """Sync clients wait for their rate limiter before each request."""
+        rate_limiter = _RecordingRateLimiter()
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            vws_client = VWS(
+                server_access_key=database.server_access_key,
+                server_secret_key=database.server_secret_key,
+                rate_limiter=rate_limiter,
+            )
+            cloud_reco_client = CloudRecoService(
+                client_access_key=database.client_access_key,
+                client_secret_key=database.client_secret_key,
+                rate_limiter=rate_limiter,
+            )
+
+            vws_client.list_targets()
+            vws_client.get_database_summary_report()
+            cloud_reco_client.query(image=image)
+
+        assert rate_limiter.keys == [
+            database.server_access_key,
+            database.server_access_key,
+            database.client_access_key,
+        ]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async_clients(image: io.BytesIO | BinaryIO) -> None:
+        """Async clients wait for their rate limiter before each
+        request.
+        """
+        rate_limiter = _RecordingRateLimiter()
+        with MockVWS() as mock:
+            database = CloudDatabase()
+            mock.add_cloud_database(cloud_database=database)
+            async with (
+                AsyncVWS(
+                    server_access_key=database.server_access_key,
+                    server_secret_key=database.server_secret_key,
+                    rate_limiter=rate_limiter,
+                ) as vws_client,
+                AsyncCloudRecoService(
+                    client_access_key=database.client_access_key,
+                    client_secret_key=database.client_secret_key,
+                    rate_limiter=rate_limiter,
+                ) as cloud_reco_client,
+            ):
+                await vws_client.list_targets()
+                await cloud_reco_client.query(image=image)
+
+        assert rate_limiter.keys == [
+            database.server_access_key,
+            database.client_access_key,
+        ]
+
+    @staticmethod
+    def test_sync_clock_skew(image: io.BytesIO | BinaryIO) -> None:
+        """Sync clients wait for their rate limiter again before a request
+        which was rejected because of clock skew is sent again.
+        """
+        rate_limiter = _RecordingRateLimiter()
+        vws_client = VWS(
+            server_access_key="server_access_key",
+            server_secret_key="server_secret_key",  # noqa: S106
+            transport=ScriptedTransport(outcomes=_clock_skew_outcomes()),
+            rate_limiter=rate_limiter,
+        )
+        cloud_reco_client = CloudRecoService(
+            client_access_key="client_access_key",
+            client_secret_key="client_secret_key",  # noqa: S106
+            transport=ScriptedTransport(outcomes=_clock_skew_outcomes()),
+            rate_limiter=rate_limiter,
+        )
+
+        assert vws_client.list_targets() == []
+        assert cloud_reco_client.query(image=image) == []
+
+        assert rate_limiter.keys == [
+            "server_access_key",
+            "server_access_key",
+            "client_access_key",
+            "client_access_key",
+        ]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async_clock_skew(image: io.BytesIO | BinaryIO) -> None:
+        """Async clients wait for their rate limiter again before a request
+        which was rejected because of clock skew is sent again.
+        """
+        rate_limiter = _RecordingRateLimiter()
+        async with (
+            AsyncVWS(
+                server_access_key="server_access_key",
+                server_secret_key="server_secret_key",  # noqa: S106
+                transport=AsyncScriptedTransport(
+                    outcomes=_clock_skew_outcomes(),
+                ),
+                rate_limiter=rate_limiter,
+            ) as vws_client,
+            AsyncCloudRecoService(
+                client_access_key="client_access_key",
+                client_secret_key="client_secret_key",  # noqa: S106
+                transport=AsyncScriptedTransport(
+                    outcomes=_clock_skew_outcomes(),
+                ),
+                rate_limiter=rate_limiter,
+            ) as cloud_reco_client,
+        ):
+            assert await vws_client.list_targets() == []
+            assert await cloud_reco_client.query(image=image) == []
+
+        assert rate_limiter.keys == [
+            "server_access_key",
+            "server_access_key",
+            "client_access_key",
+            "client_access_key",
+        ]
@@ -0,0 +1,311 @@
+"""Tests for recording and replaying transports."""
+
+import json
+from http import HTTPStatus
+from pathlib import Path  # noqa: TC003
+
+import pytest
+from mock_vws import MockVWS
+from mock_vws.database import CloudDatabase
+
+from tests.scripted_transports import (
+    AsyncScriptedTransport,
+    ScriptedTransport,
+    async_request,
+    request,
+    scripted_response,
+)
+from vws import VWS
+from vws.exceptions.custom_exceptions import UnrecordedRequestError
+from vws.recording import (
+    AsyncRecordingTransport,
+    AsyncReplayTransport,
+    RecordingTransport,
+    ReplayTransport,
+)
+from vws.transports import RequestsTransport
+
+_TARGETS_URL = "https://vws.vuforia.com/targets"
+_SUMMARY_URL = "https://vws.vuforia.com/summary"
+
+
+class TestRecordAndReplay:
+    """Tests for ``RecordingTransport`` and ``ReplayTransport``."""
+
+    @staticmethod
+    def test_round_trip(tmp_path: Path) -> None:
+        """Recorded responses are replayed in order for each method and
+        path.
+        """
+        path = tmp_path / "recording.jsonl"
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(url=_TARGETS_URL, text='{"n": 1}'),
+                scripted_response(
+                    url=_SUMMARY_URL,
+                    headers={"Content-Type": "application/json"},
+                    text='{"summary": true}',
+                ),
+                scripted_response(url=_TARGETS_URL, text='{"n": 2}'),
+            ],
+        )
+        recording = RecordingTransport(transport=scripted, path=path)
+        request(transport=recording, method="GET", url=_TARGETS_URL)
+        request(transport=recording, method="GET", url=_SUMMARY_URL)
+        request(transport=recording, method="GET", url=_TARGETS_URL)
+        recording.close()
+        assert scripted.closed
+
+        replay = ReplayTransport(path=path)
+        # Requests are matched on the method and path only, so another
+        # host is fine.
+        first = request(
+            transport=replay,
+            method="get",
+            url="http://localhost/targets",
+        )
+        summary = request(transport=replay, method="GET", url=_SUMMARY_URL)
+        second = request(transport=replay, method="GET", url=_TARGETS_URL)
+        replay.close()
+
+        assert json.loads(s=first.text) == {"n": 1}
+        assert json.loads(s=second.text) == {"n": 2}
+        assert json.loads(s=summary.text) == {"summary": True}
+        assert summary.url == _SUMMARY_URL
+        assert summary.status_code == HTTPStatus.OK
+        assert summary.headers == {"Content-Type": "application/json"}
+        assert summary.tell_position == len('{"summary": true}')
+        assert summary.encoding == "utf-8"
+
+    @staticmethod
+    def test_credentials_are_not_recorded(tmp_path: Path) -> None:
+        """The ``Authorization`` and ``Date`` headers are not recorded."""
+        path = tmp_path / "recording.jsonl"
+        recording = RecordingTransport(
+            transport=ScriptedTransport(
+                outcomes=[scripted_response(url=_TARGETS_URL, text="{}")],
+            ),
+            path=path,
+        )
+        request(
+            transport=recording,
+            method="GET",
+            url=_TARGETS_URL,
+            headers={
+                "Authorization": "VWS access:signature",
+                "Date": "Thu, 01 Jan 2026 00:00:00 GMT",
+                "Content-Type": "application/json",
+            },
+        )
+        recording.close()
+
+        (line,) = path.read_text(encoding="utf-8").splitlines()
+        record = json.loads(s=line)
+        assert record["request_headers"] == {
+            "Content-Type": "application/json",
+        }
+        assert "signature" not in line
+
+    @staticmethod
+    def test_unrecordedrequest(tmp_path: Path) -> None:
+        """An error is raised for a request with no recorded response
+        left.
+        """
+        path = tmp_path / "recording.jsonl"
+        recording = RecordingTransport(
+            transport=ScriptedTransport(
+                outcomes=[scripted_response(url=_TARGETS_URL, text="{}")],
+            ),
+            path=path,
+        )
+        request(transport=recording, method="GET", url=_TARGETS_URL)
+        recording.close()
+        replay = ReplayTransport(path=path)
+        request(transport=replay, method="GET", url=_TARGETS_URL)
+
+        with pytest.raises(expected_exception=UnrecordedRequestError) as exc:
+            request(transport=replay, method="GET", url=_TARGETS_URL)
+        assert exc.value.method == "GET"
+        assert exc.value.path == "/targets"
+
+        with pytest.raises(expected_exception=UnrecordedRequestError):
+            request(transport=replay, method="POST", url=_TARGETS_URL)
+
+    @staticmethod
+    def test_repeat(tmp_path: Path) -> None:
+        """With ``repeat``, recorded responses are given again once all of
+        them have been given.
+        """
+        path = tmp_path / "recording.jsonl"
+        recording = RecordingTransport(
+            transport=ScriptedTransport(
+                outcomes=[
+                    scripted_response(url=_TARGETS_URL, text='{"n": 1}'),
+                    scripted_response(url=_TARGETS_URL, text='{"n": 2}'),
+                ],
+            ),
+            path=path,
+        )
+        request(transport=recording, method="GET", url=_TARGETS_URL)
+        request(transport=recording, method="GET", url=_TARGETS_URL)
+        recording.close()
+        # Blank lines, for example at the end of a file edited by hand,
+        # are skipped.
+        with path.open(mode="a", encoding="utf-8") as file:
+            file.write("\n")
+
+        replay = ReplayTransport(path=path, repeat=True)
+        bodies = [
+            json.loads(
+                s=request(
+                    transport=replay,
+                    method="GET",
+                    url=_TARGETS_URL,
+                ).text,
+            )
+            for _ in range(3)
+        ]
+
+        assert bodies == [{"n": 1}, {"n": 2}, {"n": 1}]
+        with pytest.raises(expected_exception=UnrecordedRequestError):
+            request(transport=replay, method="GET", url=_SUMMARY_URL)
+
+    @staticmethod
+    def test_stream(tmp_path: Path) -> None:
+        """Responses are streamed through the wrapped transport, and
+        recorded once their bodies have been read.
+        """
+        path = tmp_path / "recording.jsonl"
+        scripted = ScriptedTransport(
+            outcomes=[scripted_response(url=_TARGETS_URL, text='{"n": 1}')],
+        )
+        recording = RecordingTransport(transport=scripted, path=path)
+        with recording.stream(
+            method="GET",
+            url=_TARGETS_URL,
+            headers={},
+            data=b"",
+            request_timeout=30.0,
+        ) as streamed_response:
+            assert scripted.open_streams == 1
+            assert not path.read_text(encoding="utf-8")
+            assert streamed_response.encoding == "utf-8"
+            content = b"".join(streamed_response.iter_bytes())
+        recording.close()
+
+        assert content == b'{"n": 1}'
+        assert scripted.streams == 1
+        replay = ReplayTransport(path=path)
+        response = request(transport=replay, method="GET", url=_TARGETS_URL)
+        assert response.content == content
+        assert response.encoding == "utf-8"
+
+    @staticmethod
+    def test_client(tmp_path: Path) -> None:
+        """A client session can be recorded, then replayed without the
+        network.
+        """
+        path = tmp_path / "recording.jsonl"
+        database = CloudDatabase()
+        with MockVWS() as mock:
+            mock.add_cloud_database(cloud_database=database)
+            with VWS(
+                server_access_key=database.server_access_key,
+                server_secret_key=database.server_secret_key,
+                transport=RecordingTransport(
+                    transport=RequestsTransport(),
+                    path=path,
+                ),
+            ) as recording_client:
+                recorded_targets = recording_client.list_targets()
+                recorded_summary = (
+                    recording_client.get_database_summary_report()
+                )
+
+        with VWS(
+            server_access_key=database.server_access_key,
+            server_secret_key=database.server_secret_key,
+            transport=ReplayTransport(path=path),
+        ) as replaying_client:
+            assert replaying_client.list_targets() == recorded_targets
+            assert (
+                replaying_client.get_database_summary_report()
+                == recorded_summary
+            )
+
+
+class TestAsyncRecordAndReplay:
+    """Tests for ``AsyncRecordingTransport`` and
+    ``AsyncReplayTransport``.
+    """
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_round_trip(tmp_path: Path) -> None:
+        """Recorded responses are replayed."""
+        path = tmp_path / "recording.jsonl"
+        recording = AsyncRecordingTransport(
+            transport=AsyncScriptedTransport(
+                outcomes=[
+                    scripted_response(url=_TARGETS_URL, text='{"n": 1}'),
+                ],
+            ),
+            path=path,
+        )
+        await async_request(
+            transport=recording,
+            method="GET",
+            url=_TARGETS_URL,
+        )
+        await recording.aclose()
+
+        replay = AsyncReplayTransport(path=path)
+        response = await async_request(
+            transport=replay,
+            method="GET",
+            url=_TARGETS_URL,
+        )
+        await replay.aclose()
+
+        assert json.loads(s=response.text) == {"n": 1}
+        with pytest.raises(expected_exception=UnrecordedRequestError):
+            await async_request(
+                transport=replay,
+                method="GET",
+                url=_TARGETS_URL,
+            )
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_stream(tmp_path: Path) -> None:
+        """Responses are streamed through the wrapped transport, and
+        recorded once their bodies have been read.
+        """
+        path = tmp_path / "recording.jsonl"
+        scripted = AsyncScriptedTransport(
+            outcomes=[scripted_response(url=_TARGETS_URL, text='{"n": 1}')],
+        )
+        recording = AsyncRecordingTransport(transport=scripted, path=path)
+        async with recording.stream(
+            method="GET",
+            url=_TARGETS_URL,
+            headers={},
+            data=b"",
+            request_timeout=30.0,
+        ) as streamed_response:
+            assert scripted.transport.open_streams == 1
+            assert not path.read_text(encoding="utf-8")
+            content = b"".join(
+                [chunk async for chunk in streamed_response.aiter_bytes()],
+            )
+        await recording.aclose()
+
+        assert content == b'{"n": 1}'
+        assert scripted.transport.streams == 1
+        replay = AsyncReplayTransport(path=path)
+        response = await async_request(
+            transport=replay,
+            method="GET",
+            url=_TARGETS_URL,
+        )
+        assert response.content == content
@@ -0,0 +1,109 @@
+"""Tests for building request bodies."""
+
+import base64
+import hashlib
+import json
+from email.message import Message
+from email.parser import BytesParser
+
+import pytest
+
+from vws._request_bodies import (
+    JSONFieldValue,
+    json_body,
+    multipart_form_data_body,
+)
+
+
+class TestJSONBody:
+    """Tests for ``json_body``."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames="image",
+        argvalues=[b"", b"\x00\xff", bytes(range(256)) * 2000],
+    )
+    def test_same_as_json_dumps(image: bytes) -> None:
+        """The body is the same as the body made by ``json.dumps``, with
+        bytes as Base64 strings, and its hash is the MD5 of the body.
+        """
+        fields: dict[str, JSONFieldValue] = {
+            "name": 'a "name" \N{SNOWMAN}',
+            "width": 1.5,
+            "image": image,
+            "active_flag": True,
+            "application_metadata": None,
+        }
+
+        body = json_body(fields=fields)
+
+        expected_content = json.dumps(
+            obj={
+                **fields,
+                "image": base64.b64encode(s=image).decode(encoding="ascii"),
+            },
+        ).encode(encoding="utf-8")
+        assert body.content == expected_content
+        assert (
+            body.content_md5_hex
+            == hashlib.md5(
+                data=expected_content, usedforsecurity=False
+            ).hexdigest()
+        )
+
+    @staticmethod
+    def test_memoryview() -> None:
+        """``memoryview`` values are written in the same way as ``bytes``
+        values.
+        """
+        image = bytes(range(256)) * 2000
+
+        body = json_body(fields={"image": memoryview(image)})
+
+        assert body == json_body(fields={"image": image})
+
+
+class TestMultipartFormDataBody:
+    """Tests for ``multipart_form_data_body``."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames="buffer_type",
+        argvalues=[bytes, memoryview],
+    )
+    def test_parts(buffer_type: type[bytes | memoryview]) -> None:
+        """The body holds each part, and its hash is the MD5 of the
+        body.
+        """
+        image = bytes(range(256)) * 10
+
+        body, content_type = multipart_form_data_body(
+            fields=[
+                ("image", "image.jpeg", buffer_type(image), "image/jpeg"),
+                ("max_num_results", None, b"1", "text/plain"),
+            ],
+        )
+
+        message = BytesParser().parsebytes(
+            text=b"Content-Type: "
+            + content_type.encode(encoding="ascii")
+            + b"\r\n\r\n"
+            + body.content,
+        )
+        parts = [
+            part for part in message.get_payload() if isinstance(part, Message)
+        ]
+        assert [
+            part.get_param(param="name", header="content-disposition")
+            for part in parts
+        ] == ["image", "max_num_results"]
+        assert parts[0].get_filename() == "image.jpeg"
+        assert parts[0].get_content_type() == "image/jpeg"
+        assert parts[0].get_payload(decode=True) == image
+        assert parts[1].get_payload(decode=True) == b"1"
+        assert (
+            body.content_md5_hex
+            == hashlib.md5(
+                data=body.content, usedforsecurity=False
+            ).hexdigest()
+        )
@@ -0,0 +1,143 @@
+"""Tests for responses."""
+
+import dataclasses
+from http import HTTPStatus
+
+from vws.response import Response
+
+
+class TestText:
+    """Tests for the text of a response."""
+
+    @staticmethod
+    def test_decoded_from_content() -> None:
+        """The text is decoded from the content if it is not given."""
+        text = "Café"
+        content = text.encode(encoding="utf-8")
+        response = Response(
+            url="https://example.com",
+            status_code=HTTPStatus.OK,
+            headers={},
+            tell_position=len(content),
+            content=content,
+        )
+        assert response.text == text
+
+    @staticmethod
+    def test_encoding() -> None:
+        """The text is decoded with the given encoding."""
+        text = "Café"
+        content = text.encode(encoding="latin-1")
+        response = Response(
+            url="https://example.com",
+            status_code=HTTPStatus.OK,
+            headers={},
+            tell_position=len(content),
+            content=content,
+            encoding="latin-1",
+        )
+        assert response.text == text
+
+    @staticmethod
+    def test_unknown_encoding() -> None:
+        """Content in an encoding which is not given is decoded as UTF-8,
+        with replacement characters.
+        """
+        content = "Café".encode(encoding="latin-1")
+        response = Response(
+            url="https://example.com",
+            status_code=HTTPStatus.OK,
+            headers={},
+            tell_position=len(content),
+            content=content,
+        )
+        assert response.text == "Caf\N{REPLACEMENT CHARACTER}"
+
+    @staticmethod
+    def test_given_text() -> None:
+        """Text which is given is used rather than decoding the content."""
+        response = Response(
+            url="https://example.com",
+            status_code=HTTPStatus.OK,
+            headers={},
+            tell_position=0,
+            content=b"content",
+            text="text",
+            request_body=None,
+        )
+        assert response.text == "text"
+        assert response.content == b"content"
+
+
+class TestDataclass:
+    """Tests for using a response as a dataclass."""
+
+    @staticmethod
+    def test_equality() -> None:
+        """Responses are compared by their fields, whether or not their
+        text has been decoded.
+        """
+        content = b"content"
+        response = Response(
+            url="https://example.com",
+            status_code=HTTPStatus.OK,
+            headers={},
+            tell_position=len(content),
+            content=content,
+        )
+        other_response = dataclasses.replace(response)
+        assert response.text == "content"
+        assert response == other_response
+        assert response != dataclasses.replace(
+            response,
+            status_code=HTTPStatus.NOT_FOUND,
+        )
+
+    @staticmethod
+    def test_repr() -> None:
+        """The representation of a response shows its fields, but not its
+        decoded text.
+        """
+        response = Response(
+            url="https://example.com",
+            status_code=HTTPStatus.OK,
+            headers={},
+            tell_position=0,
+            content=b"content",
+            text="text",
+        )
+        assert repr(response).startswith("Response(url='https://example.com',")
+        assert "text" not in repr(response)
+
+    @staticmethod
+    def test_replace() -> None:
+        """A changed copy of a response decodes its text from its
+        content.
+        """
+        response = Response(
+            url="https://example.com",
+            status_code=HTTPStatus.OK,
+            headers={},
+            tell_position=0,
+            content=b"content",
+            text="text",
+        )
+        new_response = dataclasses.replace(response, content=b"new content")
+        assert new_response.text == "new content"
+        assert new_response.url == response.url
+
+    @staticmethod
+    def test_fields() -> None:
+        """The fields of a response are its data, not its decoded text."""
+        assert [
+            field.name
+            for field in dataclasses.fields(class_or_instance=Response)
+        ] == [
+            "url",
+            "status_code",
+            "headers",
+            "request_body",
+            "tell_position",
+            "content",
+            "encoding",
+        ]
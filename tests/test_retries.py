@@ -0,0 +1,365 @@
+"""Tests for retrying transports."""
+
+import datetime
+from email.utils import format_datetime
+from http import HTTPStatus
+
+import pytest
+import requests
+
+from tests.scripted_transports import (
+    QUERY_URL,
+    AsyncScriptedTransport,
+    ScriptedTransport,
+    async_request,
+    request,
+    scripted_response,
+)
+from vws.retries import AsyncRetryingTransport, RetryingTransport
+from vws.transports import AsyncStreamingTransport, StreamingTransport
+
+_TARGETS_URL = "https://vws.vuforia.com/targets"
+
+
+class TestRetryingTransport:
+    """Tests for ``RetryingTransport``."""
+
+    @staticmethod
+    def test_too_many_requests_is_retried() -> None:
+        """A request which gets a 429 response is retried, even if it is
+        not safe to repeat.
+        """
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                    headers={},
+                ),
+                scripted_response(status_code=HTTPStatus.CREATED, headers={}),
+            ],
+        )
+        transport = RetryingTransport(
+            transport=scripted,
+            backoff_base_seconds=0.0,
+        )
+
+        response = request(
+            transport=transport,
+            method="POST",
+            url=_TARGETS_URL,
+        )
+
+        assert response.status_code == HTTPStatus.CREATED
+        statistics = transport.statistics
+        assert statistics.requests == 1
+        assert statistics.attempts == 2  # noqa: PLR2004
+        assert statistics.retries == 1
+        assert statistics.retries_exhausted == 0
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames="retry_after",
+        argvalues=[
+            "0.05",
+            format_datetime(
+                dt=datetime.datetime(
+                    year=2000,
+                    month=1,
+                    day=1,
+                    tzinfo=datetime.UTC,
+                ),
+                usegmt=True,
+            ),
+            "not a valid value",
+        ],
+    )
+    def test_retry_after(*, retry_after: str) -> None:
+        """The wait asked for in a ``Retry-After`` header is used."""
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                    headers={"retry-after": retry_after},
+                ),
+                scripted_response(status_code=HTTPStatus.OK, headers={}),
+            ],
+        )
+        transport = RetryingTransport(
+            transport=scripted,
+            backoff_base_seconds=0.0,
+        )
+
+        request(transport=transport, method="POST", url=QUERY_URL)
+
+        expected_sleep_seconds = 0.05 if retry_after == "0.05" else 0.0
+        assert transport.statistics.sleep_seconds == expected_sleep_seconds
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames=("method", "url", "expected_calls"),
+        argvalues=[
+            ("GET", _TARGETS_URL, 2),
+            ("POST", QUERY_URL, 2),
+            ("POST", _TARGETS_URL, 1),
+        ],
+    )
+    def test_server_error(
+        *,
+        method: str,
+        url: str,
+        expected_calls: int,
+    ) -> None:
+        """A request which gets a server error is retried only if it is
+        safe to repeat.
+        """
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                    headers={},
+                ),
+                scripted_response(status_code=HTTPStatus.OK, headers={}),
+            ],
+        )
+        transport = RetryingTransport(
+            transport=scripted,
+            backoff_base_seconds=0.0,
+        )
+
+        request(transport=transport, method=method, url=url)
+
+        assert scripted.calls == expected_calls
+
+    @staticmethod
+    def test_connection_error_idempotent() -> None:
+        """A connection error is retried for a request which is safe to
+        repeat.
+        """
+        scripted = ScriptedTransport(
+            outcomes=[
+                requests.ConnectionError(),
+                scripted_response(status_code=HTTPStatus.OK, headers={}),
+            ],
+        )
+        transport = RetryingTransport(
+            transport=scripted,
+            backoff_base_seconds=0.0,
+        )
+
+        response = request(
+            transport=transport,
+            method="GET",
+            url=_TARGETS_URL,
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert transport.statistics.retries == 1
+
+    @staticmethod
+    def test_connection_error_not_idempotent() -> None:
+        """A connection error is raised for a request which is not safe
+        to repeat.
+        """
+        scripted = ScriptedTransport(
+            outcomes=[
+                requests.ConnectionError(),
+                scripted_response(status_code=HTTPStatus.OK, headers={}),
+            ],
+        )
+        transport = RetryingTransport(transport=scripted)
+
+        with pytest.raises(expected_exception=requests.ConnectionError):
+            request(transport=transport, method="POST", url=_TARGETS_URL)
+
+        assert scripted.calls == 1
+
+    @staticmethod
+    def test_max_attempts() -> None:
+        """The last response is given once the attempt limit is
+        reached.
+        """
+        max_attempts = 3
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                    headers={},
+                ),
+            ]
+            * max_attempts,
+        )
+        transport = RetryingTransport(
+            transport=scripted,
+            max_attempts=max_attempts,
+            backoff_base_seconds=0.0,
+        )
+
+        response = request(
+            transport=transport,
+            method="GET",
+            url=_TARGETS_URL,
+        )
+
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert scripted.calls == max_attempts
+        assert transport.statistics.retries_exhausted == 1
+
+    @staticmethod
+    def test_connection_error_max_attempts() -> None:
+        """The last error is raised once the attempt limit is reached."""
+        scripted = ScriptedTransport(
+            outcomes=[requests.ConnectionError(), requests.ConnectionError()],
+        )
+        transport = RetryingTransport(
+            transport=scripted,
+            max_attempts=2,
+            backoff_base_seconds=0.0,
+        )
+
+        with pytest.raises(expected_exception=requests.ConnectionError):
+            request(transport=transport, method="GET", url=_TARGETS_URL)
+
+        assert transport.statistics.retries_exhausted == 1
+
+    @staticmethod
+    def test_retry_budget() -> None:
+        """A retry which would start after the retry budget is spent is
+        not made.
+        """
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                    headers={"Retry-After": "120"},
+                ),
+            ],
+        )
+        transport = RetryingTransport(
+            transport=scripted,
+            retry_budget_seconds=60.0,
+        )
+
+        response = request(
+            transport=transport,
+            method="GET",
+            url=_TARGETS_URL,
+        )
+
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert scripted.calls == 1
+        assert transport.statistics.sleep_seconds == 0
+
+    @staticmethod
+    def test_stream() -> None:
+        """Streamed requests are retried before their bodies are read,
+        and the responses to retried attempts are released.
+        """
+        scripted = ScriptedTransport(
+            outcomes=[
+                scripted_response(status_code=HTTPStatus.TOO_MANY_REQUESTS),
+                scripted_response(text="body"),
+            ],
+        )
+        transport = RetryingTransport(
+            transport=scripted,
+            backoff_base_seconds=0.0,
+        )
+        assert isinstance(transport, StreamingTransport)
+
+        with transport.stream(
+            method="GET",
+            url=QUERY_URL,
+            headers={},
+            data=b"",
+            request_timeout=30.0,
+        ) as streamed_response:
+            assert scripted.open_streams == 1
+            body = b"".join(streamed_response.iter_bytes())
+
+        assert body == b"body"
+        assert scripted.streams == 2  # noqa: PLR2004
+        assert scripted.open_streams == 0
+        assert transport.statistics.retries == 1
+
+
+class TestAsyncRetryingTransport:
+    """Tests for ``AsyncRetryingTransport``."""
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_too_many_requests_is_retried() -> None:
+        """A request which gets a 429 response is retried."""
+        scripted = AsyncScriptedTransport(
+            outcomes=[
+                scripted_response(
+                    status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                    headers={"Retry-After": "0"},
+                ),
+                scripted_response(status_code=HTTPStatus.OK, headers={}),
+            ],
+        )
+        transport = AsyncRetryingTransport(transport=scripted)
+
+        response = await async_request(
+            transport=transport,
+            method="POST",
+            url=QUERY_URL,
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert scripted.calls == 2  # noqa: PLR2004
+        assert transport.statistics.retries == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_connection_error_not_idempotent() -> None:
+        """A connection error is raised for a request which is not safe
+        to repeat.
+        """
+        scripted = AsyncScriptedTransport(
+            outcomes=[requests.ConnectionError()],
+        )
+        transport = AsyncRetryingTransport(transport=scripted)
+
+        with pytest.raises(expected_exception=requests.ConnectionError):
+            await async_request(
+                transport=transport,
+                method="POST",
+                url=_TARGETS_URL,
+            )
+
+        await transport.aclose()
+        assert scripted.calls == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_stream() -> None:
+        """Streamed requests are retried before their bodies are read,
+        and the responses to retried attempts are released.
+        """
+        scripted = AsyncScriptedTransport(
+            outcomes=[
+                scripted_response(status_code=HTTPStatus.TOO_MANY_REQUESTS),
+                scripted_response(text="body"),
+            ],
+        )
+        transport = AsyncRetryingTransport(
+            transport=scripted,
+            backoff_base_seconds=0.0,
+        )
+        assert isinstance(transport, AsyncStreamingTransport)
+
+        async with transport.stream(
+            method="GET",
+            url=QUERY_URL,
+            headers={},
+            data=b"",
+            request_timeout=30.0,
+        ) as streamed_response:
+            assert scripted.transport.open_streams == 1
+            body = (await streamed_response.aread()).content
+
+        assert body == b"body"
+        assert scripted.transport.streams == 2  # noqa: PLR2004
+        assert scripted.transport.open_streams == 0
+        assert transport.statistics.retries == 1
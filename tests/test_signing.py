@@ -0,0 +1,384 @@
+"""Tests for signing requests."""
+
+import datetime
+import io  # noqa: TC003
+import json
+from collections.abc import Generator  # noqa: TC003
+from http import HTTPMethod, HTTPStatus
+from typing import BinaryIO
+
+import pytest
+from beartype import beartype
+from freezegun import freeze_time
+from vws_auth_tools import authorization_header, rfc_1123_date
+
+from vws import VWS, AsyncCloudRecoService, CloudRecoService
+from vws._signing import Signer
+from vws.exceptions.vws_exceptions import RequestTimeTooSkewedError
+from vws.middleware import Request  # noqa: TC001
+from vws.response import Response
+
+_SERVER_DATE = "Thu, 01 Jan 2026 01:00:00 GMT"
+_LOCAL_TIME = "2026-01-01T00:00:00"
+
+
+@beartype
+def _json_response(*, status_code: int, result_code: str) -> Response:
+    """Make a JSON response from a server whose clock is an hour ahead of
+    the local clock.
+
+    Args:
+        status_code: The status code of the response.
+        result_code: The result code in the body of the response.
+
+    Returns:
+        The response.
+    """
+    content = json.dumps(
+        obj={"result_code": result_code, "results": []},
+    ).encode()
+    return Response(
+        url="https://vws.vuforia.com",
+        status_code=status_code,
+        headers={"Content-Type": "application/json", "Date": _SERVER_DATE},
+        tell_position=len(content),
+        content=content,
+    )
+
+
+@beartype
+class _SkewedServerTransport:
+    """A transport for a server which rejects requests whose date is not
+    its own.
+    """
+
+    def __init__(self) -> None:
+        """Create a transport which has had no requests."""
+        self.dates: list[str] = []
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Give a response which depends on the date of the request.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL.
+            headers: Request headers.
+            data: The request body.
+            request_timeout: The request timeout.
+
+        Returns:
+            A ``RequestTimeTooSkewed`` response if the date of the request
+            is not the server's date, otherwise a successful response.
+        """
+        del method, url, data, request_timeout
+        self.dates.append(headers["Date"])
+        if headers["Date"] == _SERVER_DATE:
+            return _json_response(
+                status_code=HTTPStatus.OK,
+                result_code="Success",
+            )
+        return _json_response(
+            status_code=HTTPStatus.FORBIDDEN,
+            result_code="RequestTimeTooSkewed",
+        )
+
+
+@beartype
+class _AsyncSkewedServerTransport:
+    """An async transport for a server which rejects requests whose date
+    is not its own.
+    """
+
+    def __init__(self) -> None:
+        """Create a transport which has had no requests."""
+        self.transport = _SkewedServerTransport()
+
+    async def aclose(self) -> None:
+        """Nothing to close."""
+
+    async def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Give a response which depends on the date of the request."""
+        return self.transport(
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            request_timeout=request_timeout,
+        )
+
+
+class TestSigner:
+    """Tests for ``Signer``."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames=("method", "content", "content_type"),
+        argvalues=[
+            (HTTPMethod.GET, b"", ""),
+            (HTTPMethod.POST, b'{"width": 1}', "application/json"),
+            (HTTPMethod.POST, b"\x00\xff" * 100, "multipart/form-data"),
+        ],
+    )
+    def test_same_as_vws_auth_tools(
+        *,
+        method: HTTPMethod,
+        content: bytes,
+        content_type: str,
+    ) -> None:
+        """Signatures match those given by ``vws_auth_tools``."""
+        signer = Signer(
+            access_key="access_key",
+            secret_key="secret_key",  # noqa: S106
+        )
+        date = rfc_1123_date()
+
+        signature = signer.authorization_header(
+            method=method,
+            content=content,
+            content_type=content_type,
+            date=date,
+            request_path="/targets",
+        )
+
+        assert signature == authorization_header(
+            access_key="access_key",
+            secret_key="secret_key",  # noqa: S106
+            method=method,
+            content=content,
+            content_type=content_type,
+            date=date,
+            request_path="/targets",
+        )
+
+    @staticmethod
+    def test_date() -> None:
+        """The date is the same as the one given by ``vws_auth_tools``,
+        and changes each second.
+        """
+        signer = Signer(
+            access_key="access_key",
+            secret_key="secret_key",  # noqa: S106
+        )
+        with freeze_time(time_to_freeze="2026-01-01") as frozen_time:
+            first_date = signer.date()
+            assert first_date == rfc_1123_date()
+            frozen_time.tick(delta=datetime.timedelta(milliseconds=500))
+            assert signer.date() == first_date
+            frozen_time.tick(delta=datetime.timedelta(milliseconds=500))
+            assert signer.date() == rfc_1123_date()
+            assert signer.date() != first_date
+
+    @staticmethod
+    def test_clock_offset() -> None:
+        """The clock offset is measured from the ``Date`` header of a
+        response, and the date is given in the server's time.
+        """
+        signer = Signer(
+            access_key="access_key",
+            secret_key="secret_key",  # noqa: S106
+        )
+        response = _json_response(
+            status_code=HTTPStatus.OK,
+            result_code="Success",
+        )
+        with freeze_time(time_to_freeze=_LOCAL_TIME):
+            assert signer.update_clock_offset(response=response)
+            date = signer.date()
+
+        expected_offset_seconds = 60 * 60 + 0.5
+        assert signer.clock_offset_seconds == expected_offset_seconds
+        assert date == _SERVER_DATE
+
+    @staticmethod
+    def test_no_date_header() -> None:
+        """A response without a ``Date`` header does not change the clock
+        offset.
+        """
+        signer = Signer(
+            access_key="access_key",
+            secret_key="secret_key",  # noqa: S106
+        )
+        response = Response(
+            url="https://vws.vuforia.com",
+            status_code=HTTPStatus.OK,
+            headers={},
+            tell_position=0,
+            content=b"",
+        )
+
+        assert not signer.update_clock_offset(response=response)
+        assert signer.clock_offset_seconds == 0
+
+    @staticmethod
+    def test_headers() -> None:
+        """The headers hold a signature for the current date."""
+        signer = Signer(
+            access_key="access_key",
+            secret_key="secret_key",  # noqa: S106
+        )
+        with freeze_time(time_to_freeze="2026-01-01"):
+            headers = signer.headers(
+                method=HTTPMethod.GET,
+                content=b"",
+                content_type="",
+                request_path="/summary",
+            )
+
+        assert headers == {
+            "Authorization": signer.authorization_header(
+                method=HTTPMethod.GET,
+                content=b"",
+                content_type="",
+                date=headers["Date"],
+                request_path="/summary",
+            ),
+            "Date": "Thu, 01 Jan 2026 00:00:00 GMT",
+        }
+
+
+class TestClockSkew:
+    """Tests for clients whose clock is far from Vuforia's."""
+
+    @staticmethod
+    def test_vws_retry() -> None:
+        """A VWS request which is rejected because of clock skew is signed
+        again with the server's time, and later requests use the server's
+        time.
+        """
+        transport = _SkewedServerTransport()
+        vws_client = VWS(
+            server_access_key="access_key",
+            server_secret_key="secret_key",  # noqa: S106
+            transport=transport,
+        )
+
+        with freeze_time(time_to_freeze=_LOCAL_TIME):
+            assert vws_client.list_targets() == []
+            assert vws_client.list_targets() == []
+
+        assert transport.dates == [
+            "Thu, 01 Jan 2026 00:00:00 GMT",
+            _SERVER_DATE,
+            _SERVER_DATE,
+        ]
+        expected_offset_seconds = 60 * 60 + 0.5
+        assert vws_client.clock_offset_seconds == expected_offset_seconds
+
+    @staticmethod
+    def test_cloud_reco_retry(image: io.BytesIO | BinaryIO) -> None:
+        """A query which is rejected because of clock skew is signed
+        again with the server's time.
+        """
+        transport = _SkewedServerTransport()
+        cloud_reco_client = CloudRecoService(
+            client_access_key="access_key",
+            client_secret_key="secret_key",  # noqa: S106
+            transport=transport,
+        )
+
+        with freeze_time(time_to_freeze=_LOCAL_TIME):
+            assert cloud_reco_client.query(image=image) == []
+
+        assert transport.dates == [
+            "Thu, 01 Jan 2026 00:00:00 GMT",
+            _SERVER_DATE,
+        ]
+
+    @staticmethod
+    def test_middleware_sees_one_request() -> None:
+        """A request which is signed again because of clock skew goes
+        through middleware once.
+        """
+        transport = _SkewedServerTransport()
+        requests: list[Request] = []
+
+        @beartype
+        def record(request: Request) -> Generator[Request, Response, Response]:
+            """Record the request."""
+            requests.append(request)
+            return (yield request)
+
+        vws_client = VWS(
+            server_access_key="access_key",
+            server_secret_key="secret_key",  # noqa: S106
+            transport=transport,
+            middleware=(record,),
+        )
+
+        with freeze_time(time_to_freeze=_LOCAL_TIME):
+            assert vws_client.list_targets() == []
+
+        assert len(requests) == 1
+        expected_number_of_requests = 2
+        assert len(transport.dates) == expected_number_of_requests
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_async_middleware_sees_one_request() -> None:
+        """A request from an async client which is signed again because of
+        clock skew goes through middleware once.
+        """
+        transport = _AsyncSkewedServerTransport()
+        requests: list[Request] = []
+
+        @beartype
+        def record(request: Request) -> Generator[Request, Response, Response]:
+            """Record the request."""
+            requests.append(request)
+            return (yield request)
+
+        async with AsyncCloudRecoService(
+            client_access_key="access_key",
+            client_secret_key="secret_key",  # noqa: S106
+            transport=transport,
+            middleware=(record,),
+        ) as cloud_reco_client:
+            with freeze_time(time_to_freeze=_LOCAL_TIME):
+                assert await cloud_reco_client.query(image=b"image") == []
+
+        assert len(requests) == 1
+        expected_number_of_requests = 2
+        assert len(transport.transport.dates) == expected_number_of_requests
+
+    @staticmethod
+    def test_one_retry() -> None:
+        """A request is signed again at most once."""
+        transport = _SkewedServerTransport()
+        vws_client = VWS(
+            server_access_key="access_key",
+            server_secret_key="secret_key",  # noqa: S106
+            transport=transport,
+        )
+
+        # The local clock moves on by an hour between requests, so the
+        # measured offset is always out of date.
+        with (
+            freeze_time(
+                time_to_freeze=_LOCAL_TIME,
+                auto_tick_seconds=60 * 60,
+            ),
+            pytest.raises(expected_exception=RequestTimeTooSkewedError),
+        ):
+            vws_client.list_targets()
+
+        expected_number_of_requests = 2
+        assert len(transport.dates) == expected_number_of_requests
@@ -1,26 +1,298 @@
 """Tests for HTTP transport implementations."""
 
+import asyncio
 import io  # noqa: TC003
 import uuid
+from collections.abc import Generator  # noqa: TC003
 from http import HTTPStatus
 
 import httpx
 import pytest
+import requests
 import respx
 
+from tests.local_server import RESPONSE_BODY, LocalServer, local_server
 from vws import (
     VWS,
     AsyncCloudRecoService,
     AsyncVuMarkService,
     AsyncVWS,
     CloudRecoService,
+    ModelTargetService,
     VuMarkService,
 )
 from vws.response import Response
-from vws.transports import AsyncHTTPXTransport, HTTPXTransport
+from vws.transports import (
+    AsyncHTTPXTransport,
+    HTTPXTransport,
+    RequestsTransport,
+    URLLib3Transport,
+)
 from vws.vumark_accept import VuMarkAccept
 
 
+@pytest.fixture(name="server")
+def fixture_server() -> Generator[LocalServer]:
+    """Yield a running local server."""
+    with local_server() as server:
+        yield server
+
+
+@pytest.fixture(name="tls_server")
+def fixture_tls_server(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[LocalServer]:
+    """Yield a running local HTTPS server, which ``httpx`` clients
+    created in the test trust.
+    """
+    with local_server(tls=True) as server:
+        monkeypatch.setenv(
+            name="SSL_CERT_FILE",
+            value=str(object=server.certificate_authority_file),
+        )
+        yield server
+
+
+class TestRequestsTransport:
+    """Tests for ``RequestsTransport``."""
+
+    @staticmethod
+    def test_connections_are_reused(server: LocalServer) -> None:
+        """Requests reuse a pooled connection by default."""
+        url = server.base_url + "/test"
+        with RequestsTransport() as transport:
+            for _ in range(3):
+                response = transport(
+                    method="POST",
+                    url=url,
+                    headers={"Content-Type": "text/plain"},
+                    data=b"hello",
+                    request_timeout=30.0,
+                )
+                assert response.status_code == HTTPStatus.OK
+                assert response.content == RESPONSE_BODY
+
+        assert len(set(server.client_ports)) == 1
+
+    @staticmethod
+    def test_keep_alive_disabled(server: LocalServer) -> None:
+        """Each request uses a new connection when keep-alive is
+        disabled.
+        """
+        url = server.base_url + "/test"
+        number_of_requests = 3
+        with RequestsTransport(keep_alive=False) as transport:
+            for _ in range(number_of_requests):
+                transport(
+                    method="POST",
+                    url=url,
+                    headers={"Content-Type": "text/plain"},
+                    data=b"hello",
+                    request_timeout=30.0,
+                )
+
+        client_ports = set(server.client_ports)
+        assert len(client_ports) == number_of_requests
+
+    @staticmethod
+    def test_stream(server: LocalServer) -> None:
+        """A response body can be streamed in chunks, and the connection
+        is reused once the stream is closed.
+        """
+        body_size = 200 * 1024
+        url = f"{server.base_url}/download/{body_size}"
+        with RequestsTransport() as transport:
+            for _ in range(2):
+                with transport.stream(
+                    method="GET",
+                    url=url,
+                    headers={},
+                    data=b"",
+                    request_timeout=30.0,
+                ) as streamed_response:
+                    assert streamed_response.status_code == HTTPStatus.OK
+                    chunks = list(streamed_response.iter_bytes())
+                    assert len(chunks) > 1
+                    assert sum(len(chunk) for chunk in chunks) == body_size
+
+        assert len(set(server.client_ports)) == 1
+
+    @staticmethod
+    def test_read_timeout() -> None:
+        """A timeout is raised if the server does not respond within the
+        read timeout.
+        """
+        with (
+            local_server(upload_bytes_per_second=100) as server,
+            RequestsTransport() as transport,
+            pytest.raises(expected_exception=requests.exceptions.Timeout),
+        ):
+            # The server takes a second to read this body.
+            transport(
+                method="POST",
+                url=server.base_url + "/test",
+                headers={"Content-Type": "text/plain"},
+                data=b"0" * 100,
+                request_timeout=(5.0, 0.1),
+            )
+
+
+class TestURLLib3Transport:
+    """Tests for ``URLLib3Transport``."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames="request_timeout",
+        argvalues=[30.0, (5.0, 30.0)],
+    )
+    def test_connections_are_reused(
+        *,
+        server: LocalServer,
+        request_timeout: float | tuple[float, float],
+    ) -> None:
+        """Requests reuse a pooled connection."""
+        url = server.base_url + "/test"
+        with URLLib3Transport() as transport:
+            for _ in range(3):
+                response = transport(
+                    method="POST",
+                    url=url,
+                    headers={"Content-Type": "text/plain"},
+                    data=b"hello",
+                    request_timeout=request_timeout,
+                )
+                assert response.status_code == HTTPStatus.OK
+                assert response.content == RESPONSE_BODY
+                assert response.url == url
+                assert response.request_body is None
+
+        assert len(set(server.client_ports)) == 1
+
+    @staticmethod
+    def test_keep_request_body(server: LocalServer) -> None:
+        """The request body is kept on all responses if asked for."""
+        url = server.base_url + "/test"
+        with URLLib3Transport(keep_request_body=True) as transport:
+            response = transport(
+                method="POST",
+                url=url,
+                headers={"Content-Type": "text/plain"},
+                data=b"hello",
+                request_timeout=30.0,
+            )
+        assert response.request_body == b"hello"
+
+    @staticmethod
+    def test_stream(server: LocalServer) -> None:
+        """A response body can be streamed, and the connection is reused
+        once the stream is closed.
+        """
+        url = server.base_url + "/test"
+        with URLLib3Transport() as transport:
+            for _ in range(2):
+                with transport.stream(
+                    method="POST",
+                    url=url,
+                    headers={"Content-Type": "text/plain"},
+                    data=b"hello",
+                    request_timeout=30.0,
+                ) as streamed_response:
+                    assert streamed_response.status_code == HTTPStatus.OK
+                    assert (
+                        b"".join(streamed_response.iter_bytes())
+                        == RESPONSE_BODY
+                    )
+
+        assert len(set(server.client_ports)) == 1
+
+    @staticmethod
+    def test_stream_not_read(server: LocalServer) -> None:
+        """A connection whose response body was not read in full is not
+        reused.
+        """
+        url = server.base_url + "/test"
+        with URLLib3Transport() as transport:
+            with transport.stream(
+                method="GET",
+                url=server.base_url + "/download/1000000",
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            ) as streamed_response:
+                next(streamed_response.iter_bytes())
+            response = transport(
+                method="GET",
+                url=url,
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            )
+
+        assert response.content == RESPONSE_BODY
+        expected_connections = 2
+        assert len(set(server.client_ports)) == expected_connections
+
+    @staticmethod
+    def test_redirect(server: LocalServer) -> None:
+        """The URL of a response is the URL it was redirected to."""
+        url = server.base_url + "/redirect/test"
+        with URLLib3Transport() as transport:
+            response = transport(
+                method="GET",
+                url=url,
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            )
+            with transport.stream(
+                method="GET",
+                url=url,
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            ) as streamed_response:
+                streamed_url = streamed_response.url
+                streamed_response.read()
+
+        assert response.url == server.base_url + "/test"
+        assert streamed_url == server.base_url + "/test"
+
+    @staticmethod
+    def test_encoding(server: LocalServer) -> None:
+        """The encoding of a response is found from its headers, as it is
+        by ``RequestsTransport``.
+        """
+        url = server.base_url + "/test"
+        with URLLib3Transport() as transport:
+            response = transport(
+                method="GET",
+                url=url,
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            )
+            with transport.stream(
+                method="GET",
+                url=url,
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            ) as streamed_response:
+                streamed_encoding = streamed_response.read().encoding
+
+        with RequestsTransport() as requests_transport:
+            requests_response = requests_transport(
+                method="GET",
+                url=url,
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            )
+
+        assert response.encoding == requests_response.encoding
+        assert streamed_encoding == requests_response.encoding
+
+
 class TestHTTPXTransport:
     """Tests for ``HTTPXTransport``."""
 
@@ -94,6 +366,139 @@ class TestHTTPXTransport:
         assert isinstance(response, Response)
         assert response.status_code == HTTPStatus.OK
 
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames=("http2", "expected_http_version"),
+        argvalues=[(False, "HTTP/1.1"), (True, "HTTP/2")],
+    )
+    def test_http2(
+        *,
+        tls_server: LocalServer,
+        http2: bool,
+        expected_http_version: str,
+    ) -> None:
+        """``HTTPXTransport`` uses HTTP/2 when configured to, if the
+        server supports it.
+        """
+        with HTTPXTransport(http2=http2) as transport:
+            for _ in range(2):
+                response = transport(
+                    method="POST",
+                    url=tls_server.base_url + "/test",
+                    headers={"Content-Type": "text/plain"},
+                    data=b"hello",
+                    request_timeout=30.0,
+                )
+                assert response.status_code == HTTPStatus.OK
+                assert response.content == RESPONSE_BODY
+        assert tls_server.http_versions == [expected_http_version] * 2
+        assert len(set(tls_server.client_ports)) == 1
+
+    @staticmethod
+    @respx.mock
+    def test_warm() -> None:
+        """``HTTPXTransport.warm`` makes one request per connection to
+        each given URL.
+        """
+        urls = ["https://example.com/", "https://example.org/"]
+        routes = [
+            respx.head(url=url).mock(
+                return_value=httpx.Response(status_code=HTTPStatus.OK),
+            )
+            for url in urls
+        ]
+        connections = 3
+        with HTTPXTransport(
+            max_connections=10,
+            max_keepalive_connections=10,
+            keepalive_expiry=60.0,
+        ) as transport:
+            transport.warm(connections=connections, urls=urls)
+        assert [route.call_count for route in routes] == [
+            connections,
+            connections,
+        ]
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames=("connections", "expected_message"),
+        argvalues=[
+            (0, "connections must be at least 1."),
+            (6, r"is more than max_connections \(10\)\."),
+        ],
+    )
+    @respx.mock
+    def test_warm_invalid_connections(
+        *,
+        connections: int,
+        expected_message: str,
+    ) -> None:
+        """``HTTPXTransport.warm`` raises an error without making
+        requests if ``connections`` is less than 1, or if the
+        connections needed would be more than ``max_connections``,
+        rather than waiting for a free connection forever.
+        """
+        urls = ["https://example.com/", "https://example.org/"]
+        routes = [
+            respx.head(url=url).mock(
+                return_value=httpx.Response(status_code=HTTPStatus.OK),
+            )
+            for url in urls
+        ]
+        with (
+            HTTPXTransport(max_connections=10) as transport,
+            pytest.raises(
+                expected_exception=ValueError,
+                match=expected_message,
+            ),
+        ):
+            transport.warm(connections=connections, urls=urls)
+        assert not any(route.called for route in routes)
+
+    @staticmethod
+    @respx.mock
+    def test_warm_error() -> None:
+        """Errors from ``HTTPXTransport.warm`` are raised."""
+        url = "https://example.com/"
+        respx.head(url=url).mock(side_effect=httpx.ConnectError)
+        with (
+            HTTPXTransport() as transport,
+            pytest.raises(expected_exception=httpx.ConnectError),
+        ):
+            transport.warm(connections=2, urls=[url])
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        argnames=("status_code", "keep_request_body", "expected_body"),
+        argvalues=[
+            (HTTPStatus.OK, False, None),
+            (HTTPStatus.OK, True, b"hello"),
+            (HTTPStatus.BAD_REQUEST, False, b"hello"),
+        ],
+    )
+    @respx.mock
+    def test_request_body(
+        *,
+        status_code: int,
+        keep_request_body: bool,
+        expected_body: bytes | None,
+    ) -> None:
+        """The request body is kept on error responses, or on all
+        responses if asked for.
+        """
+        respx.post(url="https://example.com/test").mock(
+            return_value=httpx.Response(status_code=status_code),
+        )
+        with HTTPXTransport(keep_request_body=keep_request_body) as transport:
+            response = transport(
+                method="POST",
+                url="https://example.com/test",
+                headers={"Content-Type": "text/plain"},
+                data=b"hello",
+                request_timeout=30.0,
+            )
+        assert response.request_body == expected_body
+
     @staticmethod
     @respx.mock
     def test_context_manager() -> None:
@@ -116,6 +521,58 @@ class TestHTTPXTransport:
         assert isinstance(response, Response)
         assert response.status_code == HTTPStatus.OK
 
+    @staticmethod
+    @respx.mock
+    def test_stream() -> None:
+        """A response body can be streamed in chunks."""
+        body = bytes(range(256)) * 1024
+        respx.get(url="https://example.com/download").mock(
+            return_value=httpx.Response(
+                status_code=HTTPStatus.OK,
+                content=body,
+            ),
+        )
+        with (
+            HTTPXTransport() as transport,
+            transport.stream(
+                method="GET",
+                url="https://example.com/download",
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            ) as streamed_response,
+        ):
+            assert streamed_response.status_code == HTTPStatus.OK
+            chunks = list(streamed_response.iter_bytes())
+
+        assert len(chunks) > 1
+        assert b"".join(chunks) == body
+
+    @staticmethod
+    @respx.mock
+    def test_stream_read() -> None:
+        """A streamed response body can be read all at once."""
+        respx.get(url="https://example.com/download").mock(
+            return_value=httpx.Response(
+                status_code=HTTPStatus.NOT_FOUND,
+                text="Not found",
+            ),
+        )
+        with (
+            HTTPXTransport() as transport,
+            transport.stream(
+                method="GET",
+                url="https://example.com/download",
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            ) as streamed_response,
+        ):
+            response = streamed_response.read()
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert response.text == "Not found"
+
 
 class TestAsyncHTTPXTransport:
     """Tests for ``AsyncHTTPXTransport``."""
@@ -193,6 +650,113 @@ class TestAsyncHTTPXTransport:
         assert isinstance(response, Response)
         assert response.status_code == HTTPStatus.OK
 
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        argnames=("http2", "expected_http_version"),
+        argvalues=[(False, "HTTP/1.1"), (True, "HTTP/2")],
+    )
+    async def test_http2(
+        *,
+        tls_server: LocalServer,
+        http2: bool,
+        expected_http_version: str,
+    ) -> None:
+        """``AsyncHTTPXTransport`` uses HTTP/2 when configured to, if the
+        server supports it. With HTTP/2, concurrent requests share one
+        connection.
+        """
+        async with AsyncHTTPXTransport(http2=http2) as transport:
+            responses = await asyncio.gather(
+                *(
+                    transport(
+                        method="POST",
+                        url=tls_server.base_url + "/test",
+                        headers={"Content-Type": "text/plain"},
+                        data=b"hello",
+                        request_timeout=30.0,
+                    )
+                    for _ in range(3)
+                ),
+            )
+        assert [response.content for response in responses] == [
+            RESPONSE_BODY,
+        ] * 3
+        assert tls_server.http_versions == [expected_http_version] * 3
+        if http2:
+            assert len(set(tls_server.client_ports)) == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_warm() -> None:
+        """``AsyncHTTPXTransport.warm`` makes one request per connection
+        to each given URL.
+        """
+        urls = ["https://example.com/", "https://example.org/"]
+        routes = [
+            respx.head(url=url).mock(
+                return_value=httpx.Response(status_code=HTTPStatus.OK),
+            )
+            for url in urls
+        ]
+        connections = 3
+        async with AsyncHTTPXTransport(
+            max_connections=10,
+            max_keepalive_connections=10,
+            keepalive_expiry=60.0,
+        ) as transport:
+            await transport.warm(connections=connections, urls=urls)
+        assert [route.call_count for route in routes] == [
+            connections,
+            connections,
+        ]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        argnames=("connections", "expected_message"),
+        argvalues=[
+            (0, "connections must be at least 1."),
+            (6, r"is more than max_connections \(10\)\."),
+        ],
+    )
+    @respx.mock
+    async def test_warm_invalid_connections(
+        *,
+        connections: int,
+        expected_message: str,
+    ) -> None:
+        """``AsyncHTTPXTransport.warm`` raises an error without making
+        requests if ``connections`` is less than 1, or if the
+        connections needed would be more than ``max_connections``.
+        """
+        urls = ["https://example.com/", "https://example.org/"]
+        routes = [
+            respx.head(url=url).mock(
+                return_value=httpx.Response(status_code=HTTPStatus.OK),
+            )
+            for url in urls
+        ]
+        async with AsyncHTTPXTransport(max_connections=10) as transport:
+            with pytest.raises(
+                expected_exception=ValueError,
+                match=expected_message,
+            ):
+                await transport.warm(connections=connections, urls=urls)
+        assert not any(route.called for route in routes)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_warm_error() -> None:
+        """Errors from ``AsyncHTTPXTransport.warm`` are raised."""
+        url = "https://example.com/"
+        respx.head(url=url).mock(side_effect=httpx.ConnectError)
+        async with AsyncHTTPXTransport() as transport:
+            with pytest.raises(expected_exception=httpx.ConnectError):
+                await transport.warm(connections=2, urls=[url])
+
     @staticmethod
     @pytest.mark.asyncio
     @respx.mock
@@ -218,6 +782,34 @@ class TestAsyncHTTPXTransport:
         assert isinstance(response, Response)
         assert response.status_code == HTTPStatus.OK
 
+    @staticmethod
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_stream() -> None:
+        """A response body can be streamed in chunks."""
+        body = bytes(range(256)) * 1024
+        respx.get(url="https://example.com/download").mock(
+            return_value=httpx.Response(
+                status_code=HTTPStatus.OK,
+                content=body,
+            ),
+        )
+        async with (
+            AsyncHTTPXTransport() as transport,
+            transport.stream(
+                method="GET",
+                url="https://example.com/download",
+                headers={},
+                data=b"",
+                request_timeout=30.0,
+            ) as streamed_response,
+        ):
+            assert streamed_response.status_code == HTTPStatus.OK
+            chunks = [chunk async for chunk in streamed_response.aiter_bytes()]
+
+        assert len(chunks) > 1
+        assert b"".join(chunks) == body
+
 
 class _FalsyTransport:
     """A sync transport that is falsy but protocol-conforming."""
@@ -405,3 +997,76 @@ async def test_falsy_async_transport_is_retained(
             )
             == b"vumark-bytes"
         )
+
+
+class _CloseRecordingTransport:
+    """A sync transport which records whether it has been closed."""
+
+    def __init__(self) -> None:
+        """Create a transport which has not been closed."""
+        self.closed = False
+
+    def close(self) -> None:
+        """Record that the transport has been closed."""
+        self.closed = True
+
+    def __call__(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: bytes,
+        request_timeout: float | tuple[float, float],
+    ) -> Response:
+        """Give a successful response with no results."""
+        del method, headers, data, request_timeout
+        return Response(
+            url=url,
+            status_code=HTTPStatus.OK,
+            headers={"Content-Type": "application/json"},
+            tell_position=0,
+            content=RESPONSE_BODY,
+        )
+
+
+def test_sync_clients_close_transport() -> None:
+    """Sync clients own their transport, including a transport which was
+    given to them, and close it when used as context managers.
+    """
+    access_key = uuid.uuid4().hex
+    secret_key = uuid.uuid4().hex
+    transports = [_CloseRecordingTransport() for _ in range(4)]
+    vws_transport, query_transport, vumark_transport, model_transport = (
+        transports
+    )
+
+    with VWS(
+        server_access_key=access_key,
+        server_secret_key=secret_key,
+        transport=vws_transport,
+    ) as vws_client:
+        assert not vws_client.list_targets()
+
+    with CloudRecoService(
+        client_access_key=access_key,
+        client_secret_key=secret_key,
+        transport=query_transport,
+    ):
+        pass
+
+    with VuMarkService(
+        server_access_key=access_key,
+        server_secret_key=secret_key,
+        transport=vumark_transport,
+    ):
+        pass
+
+    with ModelTargetService(
+        client_id=access_key,
+        client_secret=secret_key,
+        transport=model_transport,
+    ):
+        pass
+
+    assert all(transport.closed for transport in transports)
@@ -3,11 +3,12 @@
 import base64
 import calendar
 import datetime
-import io  # noqa: TC003
+import io
 import secrets
 import time
 import uuid
 from http import HTTPStatus
+from pathlib import Path  # noqa: TC003
 from typing import BinaryIO
 
 import pytest
@@ -832,6 +833,30 @@ class TestRecoCountsReport:
         assert not report.reco_counts
         assert report.raw_csv.startswith(b"target_id,reco_count")
 
+    @staticmethod
+    def test_download_to_file(
+        *,
+        vws_client: VWS,
+        report_month: datetime.date,
+        tmp_path: Path,
+    ) -> None:
+        """A report can be downloaded to a file."""
+        report_request = vws_client.request_database_reco_counts_report(
+            year=report_month.year,
+            month=calendar.Month(value=report_month.month),
+        )
+        report = vws_client.wait_for_reco_counts_report(
+            presigned_url=report_request.presigned_url,
+        )
+        report_path = tmp_path / "report.csv"
+
+        vws_client.download_reco_counts_report_to_file(
+            presigned_url=report_request.presigned_url,
+            file=report_path,
+        )
+
+        assert report_path.read_bytes() == report.raw_csv
+
     @staticmethod
     def test_not_ready(*, current_month: datetime.date) -> None:
         """Downloading a report before Vuforia has generated it raises an
@@ -966,6 +991,29 @@ class TestRecoCountsReport:
 
         assert exc.value.response.status_code == HTTPStatus.FORBIDDEN
 
+    @staticmethod
+    def test_download_to_file_error() -> None:
+        """An error response from the report's URL raises an error, and
+        nothing is written.
+        """
+        vws_client = VWS(
+            server_access_key=uuid.uuid4().hex,
+            server_secret_key=uuid.uuid4().hex,
+            transport=_ForbiddenDownloadTransport(),
+        )
+        report_file = io.BytesIO()
+
+        with pytest.raises(
+            expected_exception=RecoCountsReportDownloadError,
+        ) as exc:
+            vws_client.download_reco_counts_report_to_file(
+                presigned_url="https://example.com/reports/recoCounts/x",
+                file=report_file,
+            )
+
+        assert exc.value.response.status_code == HTTPStatus.FORBIDDEN
+        assert not report_file.getvalue()
+
     @staticmethod
     def test_no_database_id(*, current_month: datetime.date) -> None:
         """A client which was given no database ID cannot request a